@@ -0,0 +1,376 @@
+"""
+Transcription throughput benchmark.
+
+Runs a fixed corpus of local clips through every transcription path of
+`AudioTranscriber` and reports, per backend, the model load time, peak RSS,
+per-stage timings and the real-time factor (processing time / audio duration,
+lower is faster) as JSON.
+
+Each backend runs in its own child process so that model load time and peak
+RSS are measured from a cold start and do not leak between backends. The
+default corpus is synthetic: seeded tone-and-noise clips muxed into small MP4
+files with ffmpeg, so results are reproducible between runs and machines.
+
+Usage:
+    python benchmarks/transcription_benchmark.py --output results.json
+    python benchmarks/transcription_benchmark.py --baseline results.json
+
+With `--baseline`, the real-time factor of every backend is compared against an
+earlier result file and the command exits with status 1 if any backend is
+slower by more than `--threshold`.
+
+Backends:
+    moviepy_whisper  moviepy extracts an mp3, Whisper transcribes the file
+    ffmpeg_pipe      ffmpeg decodes to PCM in memory, Whisper transcribes the array
+    audio_cache      decoded audio is read from the memory-mapped AudioCache
+    stream           the file is fed chunk by chunk into a TranscriptionStream
+
+Further paths (VAD trimming, batched decoding or alternative engines) can be
+added by registering a function in `BACKENDS`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.audio_cache import AudioCache
+from src.core.model_cache import load_mmap_model
+from src.core.transcriber import (
+    SAMPLE_RATE,
+    AudioTranscriber,
+    TranscriptionStream,
+    decode_audio,
+)
+from src.utils.bin_checker import get_bin_dir, get_ffmpeg_path
+from src.utils.hashing import sha256_file
+from src.utils.lazy_imports import lazy_import_numpy
+
+SCHEMA_VERSION = 1
+CORPUS_SEED = 1234
+CORPUS_DURATIONS = (5, 15, 45)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str):
+    """Adds the wall time of the enclosed block to `timings[stage]`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def run_moviepy_whisper(model: Any, clip: Path, work_dir: Path, timings: Dict):
+    """Current default path: moviepy temp mp3 extraction, then Whisper."""
+    transcriber = AudioTranscriber()
+    transcriber.whisper_model = model
+    with timed(timings, "extract"):
+        audio_path, temp_path = transcriber._extract_temp_audio(
+            work_dir, 1, {"video_path": str(clip)}
+        )
+    if not audio_path:
+        raise RuntimeError("moviepy could not extract audio")
+    try:
+        with timed(timings, "transcribe"):
+            return model.transcribe(audio_path)["text"]
+    finally:
+        os.remove(temp_path)
+
+
+def run_ffmpeg_pipe(model: Any, clip: Path, work_dir: Path, timings: Dict):
+    """ffmpeg decodes straight to an in-memory float32 array."""
+    with timed(timings, "decode"):
+        audio = decode_audio(str(clip), get_ffmpeg_path())
+    with timed(timings, "transcribe"):
+        return model.transcribe(audio)["text"]
+
+
+def run_audio_cache(model: Any, clip: Path, work_dir: Path, timings: Dict):
+    """Warm AudioCache hit: the decoded array is memory-mapped from disk."""
+    cache = AudioCache(work_dir / "audio_cache")
+    key = cache.key_for(clip)
+    cache.put(key, decode_audio(str(clip), get_ffmpeg_path()))
+    with timed(timings, "cache_read"):
+        audio = cache.get(key)
+    with timed(timings, "transcribe"):
+        return model.transcribe(audio)["text"]
+
+
+def run_stream(model: Any, clip: Path, work_dir: Path, timings: Dict):
+    """The clip is fed in download-sized chunks into a TranscriptionStream."""
+    result: Dict[str, Any] = {}
+    with timed(timings, "stream"):
+        stream = TranscriptionStream(model, get_ffmpeg_path())
+        with open(clip, "rb") as f:
+            for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                stream.feed(chunk)
+        if not stream.finish(work_dir, 1, result):
+            raise RuntimeError("streaming transcription failed")
+    return result["transcript"]
+
+
+BACKENDS: Dict[str, Callable[[Any, Path, Path, Dict], str]] = {
+    "moviepy_whisper": run_moviepy_whisper,
+    "ffmpeg_pipe": run_ffmpeg_pipe,
+    "audio_cache": run_audio_cache,
+    "stream": run_stream,
+}
+
+
+def build_corpus(corpus_dir: Path) -> List[Path]:
+    """
+    Generates the synthetic corpus, reusing clips from earlier runs.
+
+    Every clip is a seeded mix of tones and noise muxed with a tiny black video
+    track, so it goes through the same demux path as a downloaded reel.
+
+    Args:
+        corpus_dir: Directory where the clips are written.
+
+    Returns:
+        List[Path]: The generated MP4 clips.
+    """
+    numpy = lazy_import_numpy()
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    clips = []
+    for duration in CORPUS_DURATIONS:
+        clip_path = corpus_dir / f"synthetic_{duration}s.mp4"
+        clips.append(clip_path)
+        if clip_path.exists():
+            continue
+
+        rng = numpy.random.default_rng(CORPUS_SEED + duration)
+        t = numpy.arange(duration * SAMPLE_RATE) / SAMPLE_RATE
+        signal = 0.3 * numpy.sin(2 * numpy.pi * 220 * t) * (numpy.sin(t) > 0)
+        signal += 0.05 * rng.standard_normal(len(t))
+        pcm = (numpy.clip(signal, -1, 1) * 32767).astype("<i2")
+
+        wav_path = corpus_dir / f"synthetic_{duration}s.wav"
+        with wave.open(str(wav_path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(pcm.tobytes())
+
+        subprocess.run(
+            [
+                get_ffmpeg_path(),
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "lavfi",
+                "-i",
+                "color=black:s=64x64:r=5",
+                "-i",
+                str(wav_path),
+                "-shortest",
+                "-c:v",
+                "libx264",
+                "-c:a",
+                "aac",
+                "-movflags",
+                "+faststart",
+                str(clip_path),
+            ],
+            check=True,
+        )
+        wav_path.unlink()
+    return clips
+
+
+def probe_duration(clip: Path) -> float:
+    """Returns the audio duration of a clip in seconds."""
+    return len(decode_audio(str(clip), get_ffmpeg_path())) / SAMPLE_RATE
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Returns the peak resident set size of this process in MiB, if available."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_worker(backend: str, model_file: Path, clips: List[Path]) -> Dict[str, Any]:
+    """
+    Benchmarks a single backend in the current (fresh) process.
+
+    Args:
+        backend: Name of the backend in `BACKENDS`.
+        model_file: The Whisper checkpoint to load.
+        clips: The corpus clips.
+
+    Returns:
+        Dict[str, Any]: The backend's results.
+    """
+    start = time.perf_counter()
+    model = load_mmap_model(model_file)
+    model_load_s = time.perf_counter() - start
+
+    clip_results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for clip in clips:
+            duration = probe_duration(clip)
+            timings: Dict[str, float] = {}
+            BACKENDS[backend](model, clip, Path(temp_dir), timings)
+            total = sum(timings.values())
+            clip_results.append(
+                {
+                    "clip": clip.name,
+                    "duration_s": round(duration, 3),
+                    "stages_s": {k: round(v, 4) for k, v in timings.items()},
+                    "total_s": round(total, 4),
+                    "rtf": round(total / duration, 4),
+                }
+            )
+
+    total_audio = sum(clip["duration_s"] for clip in clip_results)
+    total_time = sum(clip["total_s"] for clip in clip_results)
+    return {
+        "model_load_s": round(model_load_s, 4),
+        "peak_rss_mb": peak_rss_mb(),
+        "rtf": round(total_time / total_audio, 4),
+        "clips": clip_results,
+    }
+
+
+def run_benchmark(
+    backends: List[str], model_file: Path, clips: List[Path]
+) -> Dict[str, Any]:
+    """
+    Runs each backend in a child process and collects the results.
+
+    Args:
+        backends: Names of the backends to run.
+        model_file: The Whisper checkpoint to load.
+        clips: The corpus clips.
+
+    Returns:
+        Dict[str, Any]: The full benchmark report.
+    """
+    report: Dict[str, Any] = {
+        "schema": SCHEMA_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "model": model_file.name,
+        },
+        "corpus": [{"clip": clip.name, "sha256": sha256_file(clip)} for clip in clips],
+        "backends": {},
+    }
+    for backend in backends:
+        process = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--worker",
+                backend,
+                "--model",
+                str(model_file),
+                "--clips",
+                *map(str, clips),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            report["backends"][backend] = {"error": process.stderr.strip()[-2000:]}
+        else:
+            # The report is the last line; anything above it is library chatter
+            report["backends"][backend] = json.loads(
+                process.stdout.strip().splitlines()[-1]
+            )
+        rtf = report["backends"][backend].get("rtf", "error")
+        print(f"{backend}: rtf {rtf}", file=sys.stderr)
+    return report
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Lists backends whose real-time factor regressed against a baseline.
+
+    Args:
+        report: The current benchmark report.
+        baseline: An earlier report on the same corpus.
+        threshold: Allowed relative slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        List[str]: Human readable regression descriptions.
+    """
+    if [c["sha256"] for c in report["corpus"]] != [
+        c["sha256"] for c in baseline.get("corpus", [])
+    ]:
+        return ["corpus differs from baseline; results are not comparable"]
+
+    regressions = []
+    for backend, result in report["backends"].items():
+        previous = baseline.get("backends", {}).get(backend, {})
+        if "rtf" not in result or "rtf" not in previous:
+            continue
+        if result["rtf"] > previous["rtf"] * (1 + threshold):
+            regressions.append(f"{backend}: rtf {previous['rtf']} -> {result['rtf']}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    default_model = Path(get_bin_dir()).parent / "whisper" / "base.pt"
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", type=Path, default=default_model)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--corpus", type=Path, help="Directory of clips to use")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--clips", nargs="+", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if not get_ffmpeg_path():
+        parser.error("ffmpeg is required to run the benchmark")
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.model, args.clips)))
+        return 0
+
+    if args.corpus:
+        clips = sorted(args.corpus.glob("*.mp4"))
+    else:
+        clips = build_corpus(Path(tempfile.gettempdir()) / "insta_benchmark_corpus")
+
+    report = run_benchmark(list(args.backends), args.model, clips)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,14 +4,18 @@ Instaloader Agent: Handles all downloading operations using the Instaloader libr
 
 import os
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Callable, Optional, Union
 
-from src.utils.lazy_imports import (
-    lazy_import_instaloader,
-    lazy_import_requests,
-    lazy_import_moviepy,
-)
-from src.core.data_models import ReelItem
+from src.utils.lazy_imports import lazy_import_instaloader, lazy_import_moviepy
+from src.core.data_models import ReelItem, option_enabled
+from src.utils.atomic_writer import AtomicWriter, default_writer
+from src.utils.cancellation import CancellationToken, call_cancellable
+from src.utils.http_stream import fetch_to_file
+from src.utils.media_probe import InvalidMediaError, probe_mp4
+from src.utils.scratch import ScratchSpace
+
+# Attempts at downloading a video that turns out truncated or corrupted
+VIDEO_ATTEMPTS = 2
 
 
 def download_reel(
@@ -21,6 +25,10 @@ def download_reel(
     loader: Any,
     download_options: Dict[str, Union[bool, str]],
     progress_callback: Any,
+    chunk_callback: Optional[Callable[[bytes], None]] = None,
+    token: Optional[CancellationToken] = None,
+    writer: Optional[AtomicWriter] = None,
+    scratch: Optional[ScratchSpace] = None,
 ) -> Dict[str, Any]:
     """
     Download individual reel and process it using Instaloader.
@@ -32,6 +40,13 @@ def download_reel(
         loader: An initialized Instaloader instance.
         download_options: A dictionary of download preferences.
         progress_callback: A function to report progress updates.
+        chunk_callback: Optional function receiving each chunk of the video as it
+                        downloads, e.g. to start transcribing before it finishes.
+        token: Optional token pausing or cancelling the download; checked
+               between steps and while fetching files.
+        writer: The atomic writer for output files, defaults to the shared one.
+        scratch: The scratch space for partial downloads, defaults to the
+                 shared one.
 
     Returns:
         A dictionary containing paths to downloaded files.
@@ -50,23 +65,52 @@ def download_reel(
         progress_callback(item.url, 10, "Fetching reel data...")
 
         instaloader_module = lazy_import_instaloader()
-        post = instaloader_module.Post.from_shortcode(loader.context, shortcode)
+        # Instaloader may sleep for minutes when rate limited
+        post = call_cancellable(
+            lambda: instaloader_module.Post.from_shortcode(loader.context, shortcode),
+            token,
+        )
 
         reel_folder = session_folder / f"reel{reel_number}"
         reel_folder.mkdir(exist_ok=True)
         result["folder_path"] = str(reel_folder)
 
         _download_video(
-            post, reel_folder, reel_number, result, download_options, progress_callback
+            post,
+            reel_folder,
+            reel_number,
+            result,
+            download_options,
+            progress_callback,
+            chunk_callback,
+            token,
+            writer,
+            scratch,
         )
         _download_thumbnail(
-            post, reel_folder, reel_number, result, download_options, progress_callback
+            post,
+            reel_folder,
+            reel_number,
+            result,
+            download_options,
+            progress_callback,
+            token,
+            writer,
+            scratch,
         )
+        if token is not None:
+            token.check()
         _extract_audio(
             reel_folder, reel_number, result, download_options, progress_callback
         )
         _save_caption(
-            post, reel_folder, reel_number, result, download_options, progress_callback
+            post,
+            reel_folder,
+            reel_number,
+            result,
+            download_options,
+            progress_callback,
+            writer,
         )
 
         result["title"] = f"Reel {reel_number}"
@@ -89,27 +133,45 @@ def _download_video(
     result: Dict,
     download_options: Dict,
     progress_callback: Any,
+    chunk_callback: Optional[Callable[[bytes], None]] = None,
+    token: Optional[CancellationToken] = None,
+    writer: Optional[AtomicWriter] = None,
+    scratch: Optional[ScratchSpace] = None,
 ):
-    """Download video file if enabled."""
-    need_video_for_audio = download_options.get("audio", False) or download_options.get(
-        "transcribe", False
+    """Download video file if enabled, passing each chunk to `chunk_callback`."""
+    need_video_for_audio = option_enabled(download_options, "audio") or (
+        option_enabled(download_options, "transcribe")
     )
 
-    if download_options.get("video", True) or need_video_for_audio:
+    if option_enabled(download_options, "video") or need_video_for_audio:
         progress_callback("", 20, "Downloading video...")
         video_path = reel_folder / f"video{reel_number}.mp4"
-        try:
-            requests_module = lazy_import_requests()
-            response = requests_module.get(post.video_url, stream=True, timeout=30)
-            response.raise_for_status()
-            with open(video_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            if download_options.get("video", True):
-                result["video_path"] = str(video_path)
-        except Exception as e:
-            raise Exception(f"Video download failed: {str(e)}")
+        # Chunks passed to chunk_callback cannot be taken back, so a streamed
+        # download is not retried here; the other engine takes over instead.
+        attempts = 1 if chunk_callback else VIDEO_ATTEMPTS
+        for attempt in range(1, attempts + 1):
+            try:
+                # Size and MP4 checks run on the temporary file, so a
+                # corrupted video never appears under its final name
+                digest = fetch_to_file(
+                    post.video_url,
+                    video_path,
+                    chunk_callback=chunk_callback,
+                    verify=probe_mp4,
+                    token=token,
+                    writer=writer,
+                    scratch=scratch,
+                ).sha256
+                break
+            except InvalidMediaError as e:
+                if attempt == attempts:
+                    raise Exception(f"Video download failed: {str(e)}")
+                progress_callback("", 20, f"Corrupted video ({e}), retrying...")
+            except Exception as e:
+                raise Exception(f"Video download failed: {str(e)}")
+        if option_enabled(download_options, "video"):
+            result["video_path"] = str(video_path)
+            result.setdefault("hashes", {})["video"] = digest
 
 
 def _download_thumbnail(
@@ -119,9 +181,12 @@ def _download_thumbnail(
     result: Dict,
     download_options: Dict,
     progress_callback: Any,
+    token: Optional[CancellationToken] = None,
+    writer: Optional[AtomicWriter] = None,
+    scratch: Optional[ScratchSpace] = None,
 ):
     """Download thumbnail image if enabled."""
-    if not download_options.get("thumbnail", True):
+    if not option_enabled(download_options, "thumbnail"):
         return
     progress_callback("", 40, "Downloading thumbnail.")
     thumb_path = reel_folder / f"thumbnail{reel_number}.jpg"
@@ -134,12 +199,11 @@ def _download_thumbnail(
             f"Cannot find thumbnail URL on Post object; available attributes: {dir(post)}"
         )
     try:
-        requests_module = lazy_import_requests()
-        resp = requests_module.get(thumb_url, timeout=30)
-        resp.raise_for_status()
-        with open(thumb_path, "wb") as f:
-            f.write(resp.content)
+        digest = fetch_to_file(
+            thumb_url, thumb_path, token=token, writer=writer, scratch=scratch
+        ).sha256
         result["thumbnail_path"] = str(thumb_path)
+        result.setdefault("hashes", {})["thumbnail"] = digest
     except Exception:
         # Log the error if a proper logging mechanism is in place
         pass
@@ -153,7 +217,7 @@ def _extract_audio(
     progress_callback: Any,
 ):
     """Extract audio from video if enabled."""
-    if not download_options.get("audio", True):
+    if not option_enabled(download_options, "audio"):
         return
     progress_callback("", 60, "Extracting audio...")
     video_path = result.get("video_path") or str(
@@ -162,18 +226,35 @@ def _extract_audio(
     if not os.path.exists(video_path):
         return
     audio_path = reel_folder / f"audio{reel_number}.mp3"
+    if extract_audio(video_path, audio_path):
+        result["audio_path"] = str(audio_path)
+
+
+def extract_audio(video_path: Union[str, Path], audio_path: Union[str, Path]) -> bool:
+    """
+    Writes the audio track of a video file to `audio_path`.
+
+    Args:
+        video_path: The source video.
+        audio_path: Where the audio is written.
+
+    Returns:
+        bool: True if the audio was written, False if the video has no audio
+        track or could not be read.
+    """
     video_clip = None
     audio_clip = None
     try:
         VideoFileClip = lazy_import_moviepy()
-        video_clip = VideoFileClip(video_path)
-        if video_clip.audio is not None:
-            audio_clip = video_clip.audio
-            audio_clip.write_audiofile(str(audio_path), verbose=False, logger=None)
-            result["audio_path"] = str(audio_path)
+        video_clip = VideoFileClip(str(video_path))
+        if video_clip.audio is None:
+            return False
+        audio_clip = video_clip.audio
+        audio_clip.write_audiofile(str(audio_path), verbose=False, logger=None)
+        return True
     except Exception:
         # Log the error if a proper logging mechanism is in place
-        pass
+        return False
     finally:
         _cleanup_video_resources(audio_clip, video_clip)
 
@@ -185,16 +266,16 @@ def _save_caption(
     result: Dict,
     download_options: Dict,
     progress_callback: Any,
+    writer: Optional[AtomicWriter] = None,
 ):
     """Save caption text if enabled."""
-    if download_options.get("caption", True):
+    if option_enabled(download_options, "caption"):
         progress_callback("", 80, "Getting caption...")
         caption_text = post.caption or "No caption available"
         result["caption"] = caption_text
         caption_path = reel_folder / f"caption{reel_number}.txt"
         try:
-            with open(caption_path, "w", encoding="utf-8") as f:
-                f.write(caption_text)
+            (writer or default_writer).write_text(caption_path, caption_text)
             result["caption_path"] = str(caption_path)
         except Exception:
             # Log the error if a proper logging mechanism is in place
@@ -6,12 +6,20 @@ import os
 import json
 import subprocess
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 
-from src.utils.lazy_imports import lazy_import_requests, lazy_import_moviepy
+from src.utils.lazy_imports import lazy_import_moviepy
 from src.utils.bin_checker import ensure_yt_dlp, ensure_ffmpeg, get_bin_dir, is_frozen
-from src.core.data_models import ReelItem
+from src.core.data_models import ReelItem, option_enabled
 from src.utils.resource_loader import get_resource_path
+from src.utils.media_probe import InvalidMediaError, probe_mp4
+from src.utils.atomic_writer import AtomicWriter, default_writer
+from src.utils.cancellation import CancellationToken, run_process
+from src.utils.http_stream import fetch_to_file
+from src.utils.scratch import ScratchSpace, default_scratch
+
+# Attempts at downloading a video that turns out truncated or corrupted
+VIDEO_ATTEMPTS = 2
 
 
 def download_reel(
@@ -20,6 +28,9 @@ def download_reel(
     session_folder: Path,
     download_options: Dict[str, Union[bool, str]],
     progress_callback: Any,
+    token: Optional[CancellationToken] = None,
+    writer: Optional[AtomicWriter] = None,
+    scratch: Optional[ScratchSpace] = None,
 ) -> Dict[str, Any]:
     """
     Download individual reel and process it using yt-dlp.
@@ -30,6 +41,11 @@ def download_reel(
         session_folder: The root folder for the current download session.
         download_options: A dictionary of download preferences.
         progress_callback: A function to report progress updates.
+        token: Optional token pausing or cancelling the download; a running
+               yt-dlp process is suspended or terminated with it.
+        writer: The atomic writer for output files, defaults to the shared one.
+        scratch: The scratch space for partial downloads, defaults to the
+                 shared one.
 
     Returns:
         A dictionary containing paths to downloaded files.
@@ -69,35 +85,58 @@ def download_reel(
         startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
         startupinfo.wShowWindow = 0
 
-    subprocess.run(cmd, check=True, startupinfo=startupinfo)
+    writer = writer or default_writer
+    scratch = scratch or default_scratch
+    with scratch.temp_dir() as temp_dir:
+        if temp_dir is not None:
+            # Partial downloads go to the scratch space; yt-dlp moves the
+            # finished video to the output path
+            cmd += ["-P", f"temp:{temp_dir}"]
+        for attempt in range(1, VIDEO_ATTEMPTS + 1):
+            run_process(cmd, token, check=True, startupinfo=startupinfo)
+            try:
+                probe_mp4(video_path)
+                break
+            except (InvalidMediaError, OSError) as e:
+                if attempt == VIDEO_ATTEMPTS:
+                    raise Exception(f"Video download failed: {str(e)}")
+                progress_callback(item.url, 10, f"Corrupted video ({e}), retrying...")
+                # yt-dlp skips files that already exist
+                if video_path.exists():
+                    os.remove(video_path)
     result["video_path"] = str(video_path)
 
     info_cmd = [str(yt_dlp_path), item.url, "--dump-json", "--quiet"]
-    process = subprocess.run(
-        info_cmd, capture_output=True, text=True, check=True, startupinfo=startupinfo
+    process = run_process(
+        info_cmd,
+        token,
+        check=True,
+        capture_output=True,
+        text=True,
+        startupinfo=startupinfo,
     )
     metadata = json.loads(process.stdout)
 
-    if download_options.get("thumbnail"):
+    if option_enabled(download_options, "thumbnail"):
         thumb_url = metadata.get("thumbnail")
         if thumb_url:
             thumb_path = reel_folder / f"thumbnail{reel_number}.jpg"
-            requests_module = lazy_import_requests()
-            resp = requests_module.get(thumb_url, timeout=30)
-            resp.raise_for_status()
-            with open(thumb_path, "wb") as f:
-                f.write(resp.content)
+            digest = fetch_to_file(
+                thumb_url, thumb_path, token=token, writer=writer, scratch=scratch
+            ).sha256
             result["thumbnail_path"] = str(thumb_path)
+            result.setdefault("hashes", {})["thumbnail"] = digest
 
-    if download_options.get("caption"):
+    if option_enabled(download_options, "caption"):
         caption = metadata.get("description", "No caption available")
         caption_path = reel_folder / f"caption{reel_number}.txt"
-        with open(caption_path, "w", encoding="utf-8") as f:
-            f.write(caption)
+        writer.write_text(caption_path, caption)
         result["caption_path"] = str(caption_path)
         result["caption"] = caption
 
-    if download_options.get("audio"):
+    if token is not None:
+        token.check()
+    if option_enabled(download_options, "audio"):
         _extract_audio(
             reel_folder, reel_number, result, download_options, progress_callback
         )
@@ -124,7 +163,7 @@ def _extract_audio(
         download_options: A dictionary of download preferences.
         progress_callback: A function to report progress updates.
     """
-    if not download_options.get("audio", True):
+    if not option_enabled(download_options, "audio"):
         return
 
     # Ensure ffmpeg is available in frozen state
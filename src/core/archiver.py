@@ -0,0 +1,208 @@
+"""
+Streaming archive of a download session.
+
+Shipping a session used to mean archiving it after the batch, a second full
+read of every file. `SessionArchiver` appends each reel's artifacts to a tar or
+zip archive from a background thread as soon as the reel completes, while the
+rest of the batch keeps downloading, and finalizes the archive with an
+`index.json` member listing every reel and file.
+
+The archive is written to `<name>.part` and renamed when it is finalized, so an
+interrupted batch never leaves a truncated archive under the final name.
+"""
+
+import io
+import json
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.core.download_index import ARTIFACT_KINDS
+from src.core.pack_store import PackStore, is_pack_uri, parse_pack_uri
+
+ARCHIVE_FORMATS = ("tar", "zip")
+INDEX_MEMBER_NAME = "index.json"
+
+# Media is already compressed; deflating it costs CPU for no gain
+_STORED_KINDS = ("video", "thumbnail", "audio")
+
+
+class SessionArchiver:
+    """
+    Appends completed reels to a session archive from a worker thread.
+    """
+
+    def __init__(
+        self,
+        archive_path: Union[str, Path],
+        archive_format: str = "tar",
+        pack_store: Optional[PackStore] = None,
+    ):
+        """
+        Creates the archive and starts the worker thread.
+
+        Args:
+            archive_path: The final path of the archive.
+            archive_format: One of `ARCHIVE_FORMATS`.
+            pack_store: Store used to read artifacts kept as `pack://` URIs.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive_format}")
+        self.path = Path(archive_path)
+        self.format = archive_format
+        self.pack_store = pack_store
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._part_path = self.path.with_name(self.path.name + ".part")
+        if archive_format == "zip":
+            self._archive: Any = zipfile.ZipFile(
+                self._part_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True
+            )
+        else:
+            self._archive = tarfile.open(self._part_path, "w")
+        self._entries: List[Dict[str, Any]] = []
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name="SessionArchiver", daemon=True
+        )
+        self._worker.start()
+
+    def add_reel(
+        self,
+        folder_name: str,
+        url: str,
+        shortcode: Optional[str],
+        result: Dict[str, Any],
+    ):
+        """
+        Queues a completed reel for archiving.
+
+        Args:
+            folder_name: Folder of the reel inside the archive, e.g. "reel3".
+            url: The reel's URL.
+            shortcode: The reel's canonical shortcode.
+            result: The download result with the artifact paths.
+        """
+        if self._closed:
+            return
+        self._queue.put(
+            {
+                "folder": folder_name,
+                "url": url,
+                "shortcode": shortcode,
+                "result": dict(result),
+            }
+        )
+
+    def close(self) -> Optional[Path]:
+        """
+        Waits for queued reels, writes the index and finalizes the archive.
+
+        Returns:
+            Optional[Path]: The finalized archive, or None if it failed.
+        """
+        if self._closed:
+            return self.path if self.path.exists() else None
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+        try:
+            index = {
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "reels": self._entries,
+            }
+            self._write_bytes(
+                INDEX_MEMBER_NAME,
+                json.dumps(index, indent=2, ensure_ascii=False).encode("utf-8"),
+                compress=True,
+            )
+            self._archive.close()
+            os.replace(self._part_path, self.path)
+        except Exception as e:
+            print(f"Could not finalize archive {self.path}: {e}")
+            return None
+        return self.path
+
+    def _run(self):
+        """Worker loop writing queued reels until the sentinel arrives."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._entries.append(self._write_reel(job))
+            except Exception as e:
+                print(f"Could not archive {job['url']}: {e}")
+
+    def _write_reel(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Writes the artifacts of one reel.
+
+        Returns:
+            Dict[str, Any]: The reel's entry in the archive index.
+        """
+        result = job["result"]
+        hashes = result.get("hashes", {})
+        files: Dict[str, Dict[str, Any]] = {}
+        for kind, key in ARTIFACT_KINDS.items():
+            source = result.get(key)
+            if not source:
+                continue
+            compress = kind not in _STORED_KINDS
+            if is_pack_uri(source):
+                if self.pack_store is None:
+                    continue
+                packed = self.pack_store.stat(*parse_pack_uri(source))
+                data = self.pack_store.get_uri(source)
+                if packed is None or data is None:
+                    continue
+                member = f"{job['folder']}/{packed['name']}"
+                self._write_bytes(member, data, compress)
+                size = len(data)
+            else:
+                if not os.path.exists(source):
+                    continue
+                member = f"{job['folder']}/{Path(source).name}"
+                self._write_file(member, source, compress)
+                size = os.path.getsize(source)
+            files[kind] = {"member": member, "size": size, "sha256": hashes.get(kind)}
+        return {
+            "url": job["url"],
+            "shortcode": job["shortcode"],
+            "folder": job["folder"],
+            "title": result.get("title"),
+            "files": files,
+        }
+
+    def _write_file(self, member: str, path: str, compress: bool):
+        """Adds a file to the archive under the given member name."""
+        if self.format == "zip":
+            self._archive.write(
+                path,
+                member,
+                zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED,
+            )
+        else:
+            self._archive.add(path, member, recursive=False)
+
+    def _write_bytes(self, member: str, data: bytes, compress: bool):
+        """Adds in-memory content to the archive under the given member name."""
+        if self.format == "zip":
+            self._archive.writestr(
+                member,
+                data,
+                zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED,
+            )
+        else:
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, io.BytesIO(data))
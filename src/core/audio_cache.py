@@ -0,0 +1,169 @@
+"""
+Memory-mapped cache of decoded audio.
+
+Re-running transcription with a different model or decode settings used to
+decode every reel from video again. `AudioCache` keeps decoded 16 kHz mono
+float32 audio (or any other per-file feature array, such as log-mel
+spectrograms) on disk as `.npy` files keyed by the SHA-256 of the source file.
+Hits are opened with copy-on-write memory mapping, so they are read straight
+from the page cache without a copy. The cache is bounded by a size budget and
+evicts least recently used entries first.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+from src.utils.atomic_writer import atomic_open
+from src.utils.hashing import sha256_file
+from src.utils.lazy_imports import lazy_import_numpy
+
+DEFAULT_CACHE_BUDGET = 2 * 1024 * 1024 * 1024  # 2 GiB
+
+
+class AudioCache:
+    """
+    Disk-backed, size-bounded cache of decoded audio arrays.
+
+    Entries are stored as `<hash>.<kind>.npy`. The modification time of an
+    entry is refreshed on every hit and used as its LRU timestamp.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = "downloads/.audio_cache",
+        max_bytes: int = DEFAULT_CACHE_BUDGET,
+    ):
+        """
+        Initializes the AudioCache.
+
+        Args:
+            cache_dir: Directory holding cached arrays. Created on first write.
+            max_bytes: Total size budget of the cache in bytes.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def key_for(self, source_path: Union[str, Path]) -> str:
+        """
+        Returns the cache key of a source media file.
+
+        Args:
+            source_path: The media file the audio is decoded from.
+
+        Returns:
+            str: The SHA-256 hex digest of the file.
+        """
+        return sha256_file(source_path)
+
+    def get(self, key: str, kind: str = "audio") -> Optional[Any]:
+        """
+        Returns a memory-mapped cached array, or None on a miss.
+
+        Args:
+            key: The cache key (source file hash).
+            kind: The kind of array, e.g. "audio" or "mel".
+
+        Returns:
+            Optional[numpy.ndarray]: A copy-on-write memory map of the array.
+        """
+        entry_path = self._entry_path(key, kind)
+        if not entry_path.exists():
+            return None
+
+        numpy = lazy_import_numpy()
+        try:
+            array = numpy.load(entry_path, mmap_mode="c")
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self._safe_file_removal(entry_path)
+            return None
+        return array
+
+    def put(self, key: str, array: Any, kind: str = "audio") -> Any:
+        """
+        Stores an array in the cache and returns its memory-mapped copy.
+
+        The entry is written to a temporary file and renamed into place, then
+        the cache is trimmed back to its budget.
+
+        Args:
+            key: The cache key (source file hash).
+            array: The numpy array to store.
+            kind: The kind of array, e.g. "audio" or "mel".
+
+        Returns:
+            numpy.ndarray: A copy-on-write memory map of the stored array.
+        """
+        numpy = lazy_import_numpy()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(key, kind)
+        # The cache can always be rebuilt, so it is not worth an fsync
+        with atomic_open(entry_path, "wb", fsync_policy="none") as f:
+            numpy.save(f, numpy.ascontiguousarray(array, dtype=numpy.float32))
+
+        self.evict(keep=entry_path)
+        return numpy.load(entry_path, mmap_mode="c")
+
+    def get_or_create(
+        self, key: str, factory: Callable[[], Any], kind: str = "audio"
+    ) -> Any:
+        """
+        Returns a cached array, computing and storing it on a miss.
+
+        Args:
+            key: The cache key (source file hash).
+            factory: Called without arguments to produce the array on a miss.
+            kind: The kind of array, e.g. "audio" or "mel".
+
+        Returns:
+            numpy.ndarray: A copy-on-write memory map of the array.
+        """
+        array = self.get(key, kind)
+        if array is None:
+            array = self.put(key, factory(), kind)
+        return array
+
+    def size(self) -> int:
+        """Returns the total size of all cache entries in bytes."""
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self, keep: Optional[Path] = None):
+        """
+        Removes least recently used entries until the cache fits its budget.
+
+        Args:
+            keep: An entry that must not be evicted, e.g. the one just written.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            total -= entry.stat().st_size
+            self._safe_file_removal(entry)
+
+    def _entries(self) -> List[Path]:
+        """Lists the cache entry files."""
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*.npy"))
+
+    def _entry_path(self, key: str, kind: str) -> Path:
+        """Builds the file path of a cache entry."""
+        return self.cache_dir / f"{key}.{kind}.npy"
+
+    def _safe_file_removal(self, file_path: Path):
+        """
+        Safely removes a file from the filesystem.
+
+        Args:
+            file_path (Path): The path to the file to be removed.
+        """
+        try:
+            os.remove(file_path)
+        except OSError:
+            # Log the error if a proper logging mechanism is in place
+            pass
@@ -0,0 +1,307 @@
+"""
+Fair sharing of workers, request rate and transcription between batches.
+
+Several download batches can run at once, each a `ReelDownloader` with its
+own options and session folder. One `BatchScheduler` shared by all of them
+decides which batch starts its next reel when workers are scarce, paces
+requests to Instagram across every batch, and hands out transcription slots,
+so a batch of long transcriptions started first cannot starve a caption-only
+batch started after it.
+
+Workers and transcription slots are granted by weighted fair queuing. Each
+request is tagged with a virtual finish time
+
+    finish = max(virtual_time, batch's previous finish) + cost / weight
+
+and the waiting request with the smallest tag is served first; the virtual
+time then advances to the start tag of the request served. Costs are
+estimated seconds of work (see `CostEstimator`), so batches share time, not
+reel counts, in proportion to their weights.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Cost charged when a request has no estimate, in seconds
+DEFAULT_COST = 1.0
+
+
+class FairPool:
+    """
+    A fixed number of slots shared between batches by weighted fair queuing.
+    """
+
+    def __init__(self, slots: int = 1, poll_interval: float = 0.1):
+        """
+        Initializes the FairPool.
+
+        Args:
+            slots: Number of requests served at the same time.
+            poll_interval: Seconds between checks of `should_continue` while
+                           a request waits.
+        """
+        self.slots = max(1, slots)
+        self.poll_interval = poll_interval
+        self._busy = 0
+        self._virtual_time = 0.0
+        # Finish tag of the last request of each batch
+        self._finish: Dict[int, float] = {}
+        # Heap of waiting requests: [finish tag, seq, start tag]
+        self._waiting: List[list] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(
+        self,
+        batch: int,
+        weight: float = 1.0,
+        cost: float = DEFAULT_COST,
+        should_continue: Callable[[], bool] = lambda: True,
+        on_wait: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Waits until it is the batch's turn and a slot is free, then takes it.
+
+        Args:
+            batch: The id of the requesting batch.
+            weight: The batch's share relative to other batches.
+            cost: The estimated seconds the slot will be held.
+            should_continue: Polled while waiting; returning False gives up.
+            on_wait: Called once if the request has to wait.
+
+        Returns:
+            bool: True if a slot was taken (release it afterwards), False if
+            waiting was cancelled.
+        """
+        with self._cond:
+            start = max(self._virtual_time, self._finish.get(batch, 0.0))
+            finish = start + max(cost, 0.0) / max(weight, 1e-6)
+            self._finish[batch] = finish
+            request = [finish, next(self._seq), start]
+            heapq.heappush(self._waiting, request)
+            waited = False
+            while self._waiting[0] is not request or self._busy >= self.slots:
+                if not should_continue():
+                    self._waiting.remove(request)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    return False
+                if not waited and on_wait:
+                    on_wait()
+                waited = True
+                self._cond.wait(self.poll_interval)
+            heapq.heappop(self._waiting)
+            self._busy += 1
+            self._virtual_time = max(self._virtual_time, start)
+            # The next request in line may fit a remaining slot
+            self._cond.notify_all()
+            return True
+
+    def release(self):
+        """Frees a slot taken by `acquire`."""
+        with self._cond:
+            self._busy = max(0, self._busy - 1)
+            self._cond.notify_all()
+
+    def forget(self, batch: int):
+        """Drops the finish tag of a batch that ended."""
+        with self._cond:
+            self._finish.pop(batch, None)
+
+    @contextmanager
+    def slot(
+        self,
+        batch: int,
+        weight: float = 1.0,
+        cost: float = DEFAULT_COST,
+        should_continue: Callable[[], bool] = lambda: True,
+    ) -> Iterator[bool]:
+        """
+        Holds a slot for the duration of a `with` block.
+
+        Yields:
+            bool: Whether the slot was taken; False if waiting was cancelled.
+        """
+        acquired = self.acquire(batch, weight, cost, should_continue)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release()
+
+
+class TokenBucket:
+    """
+    Paces requests to a steady rate with short bursts.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, poll_interval: float = 0.1):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate: Requests allowed per second; 0 or less disables pacing.
+            burst: Requests allowed back to back after an idle period.
+            poll_interval: Longest sleep between checks of `should_continue`.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.poll_interval = poll_interval
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, should_continue: Callable[[], bool] = lambda: True) -> bool:
+        """
+        Waits for a token and takes it.
+
+        Args:
+            should_continue: Polled while waiting; returning False gives up.
+
+        Returns:
+            bool: True if a token was taken, False if waiting was cancelled.
+        """
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if not should_continue():
+                return False
+            time.sleep(min(delay, self.poll_interval))
+
+
+class BatchScheduler:
+    """
+    Workers, request pacing and transcription slots shared by all batches.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        transcription_workers: int = 1,
+        requests_per_minute: float = 0,
+    ):
+        """
+        Initializes the BatchScheduler.
+
+        Args:
+            max_workers: Reels processed at the same time across all batches.
+            transcription_workers: Whisper transcriptions run at the same time.
+            requests_per_minute: Reel downloads started per minute across all
+                                 batches; 0 for no limit.
+        """
+        self.workers = FairPool(max_workers)
+        self.transcription = FairPool(transcription_workers)
+        self.rate = TokenBucket(requests_per_minute / 60.0)
+        self._weights: Dict[int, float] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_options(cls, options: Dict) -> "BatchScheduler":
+        """
+        Creates a scheduler from the `download_settings` options.
+
+        Args:
+            options: Download options; reads "max_workers",
+                     "transcription_workers" and "requests_per_minute".
+        """
+        return cls(
+            max_workers=int(options.get("max_workers", 2)),
+            transcription_workers=int(options.get("transcription_workers", 1)),
+            requests_per_minute=float(options.get("requests_per_minute", 0)),
+        )
+
+    def register(self, weight: float = 1.0) -> int:
+        """
+        Adds a batch.
+
+        Args:
+            weight: The batch's share relative to other batches.
+
+        Returns:
+            int: The batch id passed to the other methods.
+        """
+        with self._lock:
+            batch = next(self._ids)
+            self._weights[batch] = weight if weight > 0 else 1.0
+        return batch
+
+    def unregister(self, batch: int):
+        """Removes a batch that ended."""
+        with self._lock:
+            self._weights.pop(batch, None)
+        self.workers.forget(batch)
+        self.transcription.forget(batch)
+
+    def acquire_worker(
+        self,
+        batch: int,
+        cost: float = DEFAULT_COST,
+        should_continue: Callable[[], bool] = lambda: True,
+        on_wait: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        """
+        Waits for the batch's turn to process a reel.
+
+        Args:
+            batch: The batch id.
+            cost: The reel's estimated seconds of work.
+            should_continue: Polled while waiting; returning False gives up.
+            on_wait: Called once if the reel has to wait.
+
+        Returns:
+            bool: True if a worker was taken (release it afterwards), False if
+            waiting was cancelled.
+        """
+        return self.workers.acquire(
+            batch, self._weight(batch), cost, should_continue, on_wait
+        )
+
+    def release_worker(self):
+        """Frees a worker taken by `acquire_worker`."""
+        self.workers.release()
+
+    def pace(self, should_continue: Callable[[], bool] = lambda: True) -> bool:
+        """
+        Waits until another reel download may start under the request limit.
+
+        Returns:
+            bool: False if waiting was cancelled.
+        """
+        return self.rate.take(should_continue)
+
+    def transcription_slot(
+        self,
+        batch: int,
+        cost: float = DEFAULT_COST,
+        should_continue: Callable[[], bool] = lambda: True,
+    ):
+        """
+        Returns a context manager holding a transcription slot.
+
+        Args:
+            batch: The batch id.
+            cost: Seconds of audio to transcribe.
+            should_continue: Polled while waiting; returning False gives up.
+        """
+        return self.transcription.slot(
+            batch, self._weight(batch), cost, should_continue
+        )
+
+    def _weight(self, batch: int) -> float:
+        with self._lock:
+            return self._weights.get(batch, 1.0)
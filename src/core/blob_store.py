@@ -0,0 +1,240 @@
+"""
+Content-addressed store for downloaded media.
+
+The same reel downloaded in several sessions used to leave several full copies
+of its video, thumbnail and audio on disk. `BlobStore` keeps one copy of each
+file under `objects/<2 hex>/<rest of sha256>` and session folders reference it
+through hardlinks. Where hardlinks are not possible it falls back to a reflink
+(copy-on-write clone) and finally to a kernel-side copy, so a duplicate download
+costs a metadata operation instead of another full write.
+
+By default blobs are made read-only once stored. A hardlinked session file
+shares the blob's inode, and so its mode: rewriting it in place would silently
+change every other session's copy, and with the blob read-only such a write
+fails instead. Files are still replaced by renaming a new file over them, which
+leaves the blob alone. A store created with `read_only=False` keeps blobs (and
+the session files linked to them) writable. Read-only files cannot be deleted
+on Windows, so folders holding blob links are removed with `remove_tree` and
+`remove_file`.
+"""
+
+import os
+import shutil
+import stat
+import sys
+from pathlib import Path
+from typing import Union
+
+# Download options whose files are large enough to be worth deduplicating
+MEDIA_KINDS = ("video", "thumbnail", "audio")
+
+# ioctl request number of FICLONE on Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+# Mode of stored blobs, and so of session files hardlinked to them
+BLOB_MODE = 0o444
+# Mode of stored blobs in a store that keeps them writable
+WRITABLE_BLOB_MODE = 0o644
+
+
+class BlobStore:
+    """
+    Stores media files once, keyed by their SHA-256, and links them into place.
+    """
+
+    def __init__(
+        self, root: Union[str, Path] = "downloads/.blobs", read_only: bool = True
+    ):
+        """
+        Initializes the BlobStore.
+
+        Args:
+            root: Directory holding the blob objects. Created on first write.
+            read_only: Whether blobs, and the session files hardlinked to them,
+                       are made read-only. Blobs adopted again get this mode
+                       even if they were stored with the other setting.
+        """
+        self.root = Path(root)
+        self.mode = BLOB_MODE if read_only else WRITABLE_BLOB_MODE
+
+    def blob_path(self, digest: str) -> Path:
+        """
+        Returns the object path of a blob.
+
+        Args:
+            digest: The SHA-256 hex digest of the content.
+
+        Returns:
+            Path: The location of the blob inside the store.
+        """
+        return self.root / "objects" / digest[:2] / digest[2:]
+
+    def contains(self, digest: str) -> bool:
+        """Checks whether a blob with the given digest is stored."""
+        return self.blob_path(digest).exists()
+
+    def adopt(self, file_path: Union[str, Path], digest: str) -> str:
+        """
+        Moves a freshly written file under the store's management.
+
+        If the content is new, the file is linked (or copied) into the store
+        and the blob given the store's mode. If it is already stored, the file is
+        replaced by a link to the existing blob and the duplicate data is
+        released.
+
+        Args:
+            file_path: The file to adopt.
+            digest: Its SHA-256 hex digest.
+
+        Returns:
+            str: "stored" for new content, otherwise the method used to link the
+            file to the existing blob ("hardlink", "reflink" or "copy").
+        """
+        file_path = Path(file_path)
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+            link_or_copy(file_path, temp_path)
+            os.chmod(temp_path, self.mode)
+            os.replace(temp_path, blob)
+            return "stored"
+
+        try:
+            # Blobs stored with another mode, or before blobs had one
+            os.chmod(blob, self.mode)
+        except OSError:
+            pass
+        if os.path.samefile(blob, file_path):
+            return "hardlink"
+        return self.materialize(digest, file_path)
+
+    def materialize(self, digest: str, destination: Union[str, Path]) -> str:
+        """
+        Places a stored blob at `destination`, replacing any existing file.
+
+        Args:
+            digest: The SHA-256 hex digest of the blob.
+            destination: Where the file should appear.
+
+        Returns:
+            str: The method used: "hardlink", "reflink" or "copy".
+
+        Raises:
+            FileNotFoundError: If the blob is not stored.
+        """
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            raise FileNotFoundError(f"Blob not found: {digest}")
+
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = destination.with_name(f"{destination.name}.{os.getpid()}.tmp")
+        method = link_or_copy(blob, temp_path)
+        os.replace(temp_path, destination)
+        return method
+
+
+def remove_file(path: Union[str, Path]):
+    """
+    Deletes a file that may be linked to a read-only blob.
+
+    Args:
+        path: The file to delete.
+
+    Raises:
+        OSError: If the file cannot be deleted.
+    """
+    try:
+        os.remove(path)
+    except PermissionError:
+        if os.name != "nt":
+            raise
+        # Windows refuses to delete read-only files
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+        os.remove(path)
+
+
+def remove_tree(path: Union[str, Path]):
+    """
+    Deletes a folder that may contain links to read-only blobs.
+
+    Errors are ignored, like `shutil.rmtree(path, ignore_errors=True)`.
+
+    Args:
+        path: The folder to delete.
+    """
+
+    def retry_file(function, failed_path, error):
+        if function in (os.remove, os.unlink):
+            try:
+                remove_file(failed_path)
+            except OSError:
+                pass
+
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=retry_file)
+    else:
+        shutil.rmtree(path, onerror=retry_file)
+
+
+def link_or_copy(source: Union[str, Path], destination: Union[str, Path]) -> str:
+    """
+    Makes `destination` a copy of `source` as cheaply as the filesystem allows.
+
+    Tries a hardlink first, then a reflink, then a kernel-side copy.
+
+    Args:
+        source: The existing file.
+        destination: The new path. Must not exist yet.
+
+    Returns:
+        str: The method used: "hardlink", "reflink" or "copy".
+    """
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError:
+        pass
+
+    if _reflink(source, destination):
+        return "reflink"
+
+    _kernel_copy(source, destination)
+    return "copy"
+
+
+def _reflink(source: Union[str, Path], destination: Union[str, Path]) -> bool:
+    """Clones a file with FICLONE on filesystems that support it (Btrfs, XFS)."""
+    if not sys.platform.startswith("linux"):
+        return False
+
+    import fcntl
+
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        return False
+
+
+def _kernel_copy(source: Union[str, Path], destination: Union[str, Path]):
+    """Copies a file without moving the data through Python buffers."""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            return
+        except OSError:
+            pass
+    # shutil uses sendfile/fcopyfile where the platform provides them
+    shutil.copyfile(source, destination)
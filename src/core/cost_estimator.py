@@ -0,0 +1,114 @@
+"""
+Cost estimates used to schedule pending reels.
+
+The live queue used to run reels strictly in insertion order, so one long reel
+with transcription held up many quick ones behind it. `CostEstimator`
+estimates how many seconds a reel will take from what is already known about
+it before any request is made:
+
+- which stages are requested and which artifacts the download index already
+  has on disk (a reel that only needs its caption is cheap);
+- the size of its video, recorded by the index from an earlier download, or
+  the average video size otherwise;
+- the video's duration, read from the MP4 header of a copy on disk, or derived
+  from its size, which drives the cost of audio extraction and transcription.
+
+The estimates only have to rank reels against each other, so the rates below
+are deliberately rough.
+"""
+
+from typing import Any, Dict, Optional
+
+from src.core.download_index import DownloadIndex, requested_kinds
+from src.core.pack_store import is_pack_uri
+from src.core.retention import DEFAULT_ESTIMATES
+from src.utils.media_probe import probe_mp4
+from src.utils.url_validator import extract_shortcode
+
+# Fixed cost of resolving a reel (metadata request, engine start-up)
+REQUEST_SECONDS = 2.0
+# Assumed download speed
+DOWNLOAD_BYTES_PER_SECOND = 4 * 1024 * 1024
+# Assumed video bitrate, used to derive a duration from a size
+VIDEO_BYTES_PER_SECOND = 250 * 1024
+# Processing seconds per second of video
+AUDIO_SECONDS_PER_SECOND = 0.05
+TRANSCRIBE_SECONDS_PER_SECOND = 0.5
+# Kinds that need the video's bytes
+VIDEO_KINDS = ("video", "audio", "transcribe")
+
+
+class CostEstimator:
+    """
+    Estimates the processing time of reels from the download index.
+    """
+
+    def __init__(self, download_index: Optional[DownloadIndex] = None):
+        """
+        Initializes the CostEstimator.
+
+        Args:
+            download_index: Index of earlier downloads, if available.
+        """
+        self.download_index = download_index
+        self._average_video_size = float(DEFAULT_ESTIMATES["video"])
+        if download_index is not None:
+            try:
+                averages = download_index.average_sizes()
+                self._average_video_size = (
+                    averages.get("video") or self._average_video_size
+                )
+            except Exception as e:
+                print(f"Could not read size history: {e}")
+
+    def estimate(self, url: str, download_options: Dict[str, Any]) -> float:
+        """
+        Estimates how long a reel will take.
+
+        Args:
+            url: The reel URL.
+            download_options: The download options the reel will run with.
+
+        Returns:
+            float: The estimated time in seconds; 0 if every requested
+            artifact is already on disk.
+        """
+        present = self._present_artifacts(url)
+        missing = [
+            kind for kind in requested_kinds(download_options) if kind not in present
+        ]
+        if not missing:
+            return 0.0
+
+        video = present.get("video")
+        video_size = video["size"] if video else self._average_video_size
+        cost = REQUEST_SECONDS
+        if video is None and any(kind in VIDEO_KINDS for kind in missing):
+            cost += video_size / DOWNLOAD_BYTES_PER_SECOND
+
+        duration = self._duration(video, video_size)
+        if "audio" in missing:
+            cost += duration * AUDIO_SECONDS_PER_SECOND
+        if "transcribe" in missing:
+            cost += duration * TRANSCRIBE_SECONDS_PER_SECOND
+        return cost
+
+    def _present_artifacts(self, url: str) -> Dict[str, Dict[str, Any]]:
+        """Returns the artifacts of a reel the index has on disk."""
+        shortcode = extract_shortcode(url)
+        if self.download_index is None or not shortcode:
+            return {}
+        try:
+            return self.download_index.present_artifacts(shortcode)
+        except Exception as e:
+            print(f"Download index lookup failed: {e}")
+            return {}
+
+    def _duration(self, video: Optional[Dict[str, Any]], video_size: float) -> float:
+        """Returns the video's duration from its header, or derived from its size."""
+        if video and not is_pack_uri(video["path"]):
+            try:
+                return probe_mp4(video["path"]).duration
+            except (OSError, ValueError):
+                pass
+        return video_size / VIDEO_BYTES_PER_SECOND
@@ -8,6 +8,32 @@ their associated metadata throughout the application's workflow.
 """
 
 from dataclasses import dataclass
+from typing import Any, Dict
+
+# Download options and their values when a caller leaves them out. Shared by
+# the download agents, the download index and the UI so they agree on what an
+# incomplete set of options asks for.
+DEFAULT_DOWNLOAD_OPTIONS = {
+    "video": True,
+    "thumbnail": True,
+    "audio": True,
+    "caption": True,
+    "transcribe": False,
+}
+
+
+def option_enabled(download_options: Dict[str, Any], kind: str) -> bool:
+    """
+    Checks whether an artifact is requested, falling back to its default.
+
+    Args:
+        download_options: The download preferences.
+        kind: An option name from `DEFAULT_DOWNLOAD_OPTIONS`.
+
+    Returns:
+        bool: True if the artifact should be produced.
+    """
+    return bool(download_options.get(kind, DEFAULT_DOWNLOAD_OPTIONS[kind]))
 
 
 @dataclass
@@ -29,6 +55,7 @@ class ReelItem:
         folder_path: Path to reel's download folder
         item_type: Type of item (e.g., 'reel' or 'dependency')
         dependency_name: Name of the dependency if item_type is 'dependency'
+        priority: Priority lane of the download ('high', 'normal' or 'low')
     """
 
     url: str
@@ -44,3 +71,4 @@ class ReelItem:
     transcript: str = ""
     error_message: str = ""
     folder_path: str = ""
+    priority: str = "normal"
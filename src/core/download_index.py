@@ -0,0 +1,329 @@
+"""
+Persistent index of downloaded reels.
+
+`SessionManager` starts a fresh session folder on every run, so nothing used to
+remember what had already been downloaded. `DownloadIndex` keeps a small SQLite
+database next to the session folders that maps each canonical shortcode to the
+artifacts already on disk (path, size, SHA-256, creation time). `ReelDownloader`
+consults it before scheduling a reel and only produces the artifacts that are
+missing.
+
+Both tables are keyed by shortcode and stored `WITHOUT ROWID`, so lookups are a
+single B-tree probe and stay fast with millions of rows.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from src.core.data_models import option_enabled
+from src.core.pack_store import PackStore, is_pack_uri, parse_pack_uri
+from src.utils.hashing import sha256_file
+
+# Download option -> result key holding the produced file
+ARTIFACT_KINDS = {
+    "video": "video_path",
+    "thumbnail": "thumbnail_path",
+    "audio": "audio_path",
+    "caption": "caption_path",
+    "transcribe": "transcript_path",
+}
+
+# Result keys whose text is stored in the artifact file
+TEXT_ARTIFACTS = {"caption": "caption", "transcribe": "transcript"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reels (
+    shortcode TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    title TEXT,
+    folder_path TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    shortcode TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT,
+    created_at REAL NOT NULL,
+    volume TEXT,
+    PRIMARY KEY (shortcode, kind)
+) WITHOUT ROWID;
+"""
+
+# Columns added after the first release, created on older databases at open
+MIGRATIONS = {("artifacts", "volume"): "ALTER TABLE artifacts ADD COLUMN volume TEXT"}
+
+
+class DownloadIndex:
+    """
+    SQLite-backed map of shortcodes to artifacts already on disk.
+
+    The connection is shared between threads and guarded by a lock. The
+    database runs in WAL mode so readers never block the writer.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path] = "downloads/index.sqlite3",
+        pack_store: Optional[PackStore] = None,
+    ):
+        """
+        Opens (and if needed creates) the index database.
+
+        Args:
+            db_path: Location of the SQLite database file.
+            pack_store: Store resolving `pack://` artifact paths, if packing is used.
+        """
+        self.db_path = Path(db_path)
+        self.pack_store = pack_store
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._migrate()
+
+    def lookup(self, shortcode: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns all indexed artifacts of a reel.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Artifact rows keyed by kind.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT kind, path, size, sha256, created_at, volume FROM artifacts "
+                "WHERE shortcode = ?",
+                (shortcode,),
+            ).fetchall()
+        return {
+            kind: {
+                "path": path,
+                "size": size,
+                "sha256": sha256,
+                "created_at": ts,
+                "volume": volume,
+            }
+            for kind, path, size, sha256, ts, volume in rows
+        }
+
+    def present_artifacts(self, shortcode: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the indexed artifacts of a reel that are still on disk.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Artifact rows keyed by kind, as `lookup`.
+        """
+        return {
+            kind: artifact
+            for kind, artifact in self.lookup(shortcode).items()
+            if self._is_present(artifact)
+        }
+
+    def find_existing(self, shortcode: str, kinds: List[str]) -> Dict[str, Any]:
+        """
+        Builds a partial download result from indexed artifacts still on disk.
+
+        Artifacts whose file is gone or has changed size are ignored.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            kinds: Download options to look for, e.g. ["video", "caption"].
+
+        Returns:
+            Dict[str, Any]: Result entries (paths, caption and transcript text,
+            and `hashes` by kind) for every requested kind that is available.
+        """
+        artifacts = self.lookup(shortcode)
+        result: Dict[str, Any] = {}
+        for kind in kinds:
+            artifact = artifacts.get(kind)
+            if not artifact or not self._is_present(artifact):
+                continue
+            result[ARTIFACT_KINDS[kind]] = artifact["path"]
+            result.setdefault("hashes", {})[kind] = artifact["sha256"]
+            if kind in TEXT_ARTIFACTS:
+                try:
+                    result[TEXT_ARTIFACTS[kind]] = self._read_text(artifact["path"])
+                except OSError:
+                    del result[ARTIFACT_KINDS[kind]]
+                    del result["hashes"][kind]
+
+        if any(key in result for key in ARTIFACT_KINDS.values()):
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT title, folder_path FROM reels WHERE shortcode = ?",
+                    (shortcode,),
+                ).fetchone()
+            if row:
+                title, result["folder_path"] = row
+                if title:
+                    result["title"] = title
+            return result
+        return {}
+
+    def record(self, shortcode: str, url: str, result: Dict[str, Any]):
+        """
+        Records the artifacts of a completed download.
+
+        Sizes are read from disk, or from the pack store for packed artifacts.
+        Hashes are taken from `result["hashes"]` when the download computed them
+        while streaming, otherwise the file is hashed. The output volume of each
+        artifact is taken from `result["volumes"]`.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            url: The URL the reel was downloaded from.
+            result: The download result dictionary.
+        """
+        now = time.time()
+        known_hashes = result.get("hashes", {})
+        volumes = result.get("volumes", {})
+        rows = []
+        for kind, key in ARTIFACT_KINDS.items():
+            path = result.get(key)
+            if is_pack_uri(path):
+                info = self.pack_store and self.pack_store.stat(*parse_pack_uri(path))
+                if info:
+                    rows.append(
+                        (shortcode, kind, path, info["size"], info["sha256"], now, None)
+                    )
+                continue
+            if not path or not os.path.exists(path):
+                continue
+            sha256 = known_hashes.get(kind) or sha256_file(path)
+            size = os.path.getsize(path)
+            rows.append((shortcode, kind, path, size, sha256, now, volumes.get(kind)))
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO reels "
+                "(shortcode, url, title, folder_path, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (shortcode, url, result.get("title"), result.get("folder_path"), now),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO artifacts "
+                "(shortcode, kind, path, size, sha256, created_at, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def average_sizes(self) -> Dict[str, float]:
+        """
+        Returns the average recorded size of each artifact kind.
+
+        Returns:
+            Dict[str, float]: Average size in bytes by kind.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT kind, AVG(size) FROM artifacts GROUP BY kind"
+            ).fetchall()
+        return {kind: average for kind, average in rows}
+
+    def referenced_hashes(self) -> Set[str]:
+        """
+        Returns the SHA-256 of every indexed artifact.
+
+        Returns:
+            Set[str]: Content hashes still referenced by the index.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT sha256 FROM artifacts WHERE sha256 IS NOT NULL"
+            ).fetchall()
+        return {sha256 for (sha256,) in rows}
+
+    def purge_missing(self) -> int:
+        """
+        Removes artifacts whose file no longer exists, e.g. after retention.
+
+        Reels left without artifacts are removed as well, so they are
+        downloaded again when requested.
+
+        Returns:
+            int: The number of artifact rows removed.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT shortcode, kind, path FROM artifacts"
+            ).fetchall()
+        missing = [
+            (shortcode, kind)
+            for shortcode, kind, path in rows
+            if not is_pack_uri(path) and not os.path.exists(path)
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM artifacts WHERE shortcode = ? AND kind = ?", missing
+            )
+            self._connection.execute(
+                "DELETE FROM reels WHERE shortcode NOT IN "
+                "(SELECT shortcode FROM artifacts)"
+            )
+        return len(missing)
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _migrate(self):
+        """Adds columns missing from databases created by older versions."""
+        for (table, column), statement in MIGRATIONS.items():
+            columns = {
+                row[1]
+                for row in self._connection.execute(f"PRAGMA table_info({table})")
+            }
+            if column not in columns:
+                self._connection.execute(statement)
+        self._connection.commit()
+
+    def _is_present(self, artifact: Dict[str, Any]) -> bool:
+        """Checks that an indexed artifact still exists with its recorded size."""
+        if is_pack_uri(artifact["path"]):
+            if self.pack_store is None:
+                return False
+            info = self.pack_store.stat(*parse_pack_uri(artifact["path"]))
+            return info is not None and info["size"] == artifact["size"]
+        try:
+            return os.path.getsize(artifact["path"]) == artifact["size"]
+        except OSError:
+            return False
+
+    def _read_text(self, path: str) -> str:
+        """Reads a caption or transcript from a file or the pack store."""
+        if is_pack_uri(path):
+            data = self.pack_store.get_uri(path) if self.pack_store else None
+            if data is None:
+                raise FileNotFoundError(path)
+            return data.decode("utf-8")
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+def requested_kinds(download_options: Dict[str, Any]) -> List[str]:
+    """
+    Lists the artifact kinds enabled in a set of download options.
+
+    Args:
+        download_options: The download preferences.
+
+    Returns:
+        List[str]: Enabled option names that produce an artifact.
+    """
+    return [kind for kind in ARTIFACT_KINDS if option_enabled(download_options, kind)]
@@ -20,16 +20,51 @@ and resource cleanup.
 """
 
 import os
+import re
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Dict, Any, Union
+from typing import ContextManager, List, Dict, Any, Iterator, Optional, Tuple, Union
 from PyQt6.QtCore import QThread, pyqtSignal
 
-from src.core.data_models import ReelItem
+from src.core.data_models import ReelItem, option_enabled
 from src.utils.lazy_imports import lazy_import_instaloader
 from src.agents import instaloader as instaloader_agent
 from src.agents import yt_dlp as yt_dlp_agent
 from src.core.transcriber import AudioTranscriber
+from src.core.audio_cache import AudioCache
 from src.core.session_manager import SessionManager
+from src.core.volumes import Volume
+from src.core.retention import (
+    DiskAdmission,
+    RetentionManager,
+    RetentionPolicy,
+    hold_session,
+    release_session,
+)
+from src.core.download_index import DownloadIndex, ARTIFACT_KINDS, requested_kinds
+from src.core.search_index import SearchIndex
+from src.core.pack_store import PACK_KINDS, PackStore, is_pack_uri
+from src.core.layout import LAYOUT_DIR_NAME, ShardedLayout
+from src.core.archiver import SessionArchiver
+from src.core.upload_sink import UploadSink
+from src.core.job_store import Job, JobStore
+from src.core.live_queue import LiveQueue
+from src.core.cost_estimator import CostEstimator
+from src.core.batch_scheduler import DEFAULT_COST, BatchScheduler
+from src.core.manifest import (
+    SessionManifest,
+    build_entry,
+    build_upload_entry,
+    completed_entries,
+    entry_to_result,
+)
+from src.core.blob_store import BlobStore, MEDIA_KINDS, link_or_copy
+from src.utils.url_validator import extract_shortcode
+from src.utils.hashing import sha256_file
+from src.utils.atomic_writer import AtomicWriter
+from src.utils.scratch import ScratchSpace
+from src.utils.cancellation import CancellationToken, Cancelled
 
 
 class ReelDownloader(QThread):
@@ -54,7 +89,13 @@ class ReelDownloader(QThread):
     error_occurred = pyqtSignal(str, str)
 
     def __init__(
-        self, reel_items: List[ReelItem], download_options: Dict[str, Union[bool, str]]
+        self,
+        reel_items: List[ReelItem],
+        download_options: Dict[str, Union[bool, str]],
+        resume_session: Optional[Union[str, Path]] = None,
+        job_store: Optional[JobStore] = None,
+        live_queue: Optional[LiveQueue] = None,
+        scheduler: Optional[BatchScheduler] = None,
     ):
         """
         Initializes the ReelDownloader thread.
@@ -64,16 +105,98 @@ class ReelDownloader(QThread):
             download_options: A dictionary containing download preferences,
                               e.g., whether to download video, audio, caption,
                               transcribe, and preferred downloader.
+            resume_session: Optional existing session folder to continue. Reels
+                            its manifest records as completed are not redone.
+            job_store: Optional persistent job queue. When given, its unfinished
+                       jobs are processed instead of `reel_items`, each stage
+                       is recorded as it completes, and the session the jobs
+                       were started in is resumed.
+            live_queue: Optional queue shared with the GUI; URLs put into it
+                        while the thread runs are downloaded in this batch.
+                        Without one, a queue of `reel_items` (or of the job
+                        store's unfinished jobs) is used.
+            scheduler: Optional scheduler shared with other batches running at
+                       the same time. Each reel then waits for a worker, the
+                       request limit and a transcription slot, granted in
+                       proportion to the batch's "batch_weight" option.
         """
         super().__init__()
         self.reel_items = reel_items
         self.download_options = download_options
+        self.resume_session = resume_session
+        self.job_store = live_queue.job_store if live_queue else job_store
+        if live_queue is None:
+            live_queue = LiveQueue(job_store)
+            if job_store is None:
+                live_queue.put_many(item.url for item in reel_items)
+        self.live_queue = live_queue
+        self.scheduler = scheduler
+        # Id of the batch in the scheduler, registered while running
+        self.batch_id: Optional[int] = None
+        self.cost_estimator: Optional[CostEstimator] = None
+        # Job id of each URL being processed from the job store
+        self.job_ids: Dict[str, int] = {}
+        self.manifest: Optional[SessionManifest] = None
+        # Session protected from retention while this batch runs
+        self.held_session: Optional[str] = None
+        self.resumed_entries: Dict[str, Dict[str, Any]] = {}
         self.is_running = True
-        self.session_manager = SessionManager()
-        self.audio_transcriber = AudioTranscriber()
+        # Stops or pauses in-flight downloads, processes and transcription
+        self.token = CancellationToken()
+        self.session_manager = SessionManager(
+            output_roots=download_options.get("output_roots"),
+            placement=download_options.get("placement", "most_free"),
+        )
+        # Session folder and volume chosen for each URL
+        self.placements: Dict[str, Tuple[Path, Volume]] = {}
+        self.admission: Optional[DiskAdmission] = None
+        # Disk space reserved by each URL being downloaded
+        self.reservations: Dict[str, Tuple[Volume, int]] = {}
+        # Own writer and scratch space, so batches running at the same time
+        # keep their fsync policy, scratch budget and group commits apart
+        self.writer = AtomicWriter(download_options.get("fsync", "batch"))
+        self.scratch = ScratchSpace(
+            download_options.get("scratch_dir"),
+            int(download_options.get("scratch_budget_mb", 1024) * 1024 * 1024),
+        )
+        # Caching decoded audio costs a hash and a float32 copy of every
+        # transcribed reel, which only pays off when reels are transcribed again
+        audio_cache_mb = download_options.get("audio_cache_mb", 0)
+        self.audio_transcriber = AudioTranscriber(
+            audio_cache=(
+                AudioCache(
+                    self.session_manager.base_download_dir / ".audio_cache",
+                    int(audio_cache_mb * 1024 * 1024),
+                )
+                if audio_cache_mb
+                else None
+            ),
+            transcription_slot=self._transcription_slot,
+            token=self.token,
+            writer=self.writer,
+            scratch=self.scratch,
+        )
         self.loader: Any = (
             None  # Instaloader instance, initialized in _setup_instaloader
         )
+        self.download_index: Optional[DownloadIndex] = None
+        self.search_index: Optional[SearchIndex] = None
+        self.pack_store: Optional[PackStore] = None
+        self.archiver: Optional[SessionArchiver] = None
+        self.upload_sink: Optional[UploadSink] = None
+        self.blob_store: Optional[BlobStore] = (
+            BlobStore(
+                self.session_manager.base_download_dir / ".blobs",
+                download_options.get("read_only_blobs", True),
+            )
+            if download_options.get("dedupe", True)
+            else None
+        )
+        self.layout: Optional[ShardedLayout] = (
+            ShardedLayout(self.session_manager.base_download_dir / LAYOUT_DIR_NAME)
+            if download_options.get("layout") == "sharded"
+            else None
+        )
 
     def run(self):
         """
@@ -83,15 +206,263 @@ class ReelDownloader(QThread):
         initializes Instaloader, and processes all reel downloads in the queue.
         Emits an error_occurred signal if a critical thread error occurs.
         """
+        if self.scheduler is not None:
+            self.batch_id = self.scheduler.register(
+                float(self.download_options.get("batch_weight", 1.0))
+            )
         try:
-            self.session_manager.setup_session_folder()
+            self._setup_session()
+            self._open_pack_store()
+            self._open_archiver()
+            self._open_upload_sink()
+            self._open_download_index()
+            self._open_cost_estimator()
+            self._open_admission()
             self._lazy_load_dependencies()
             self._setup_instaloader()
             self._process_downloads()
+            self._apply_retention()
+
+        except Cancelled:
+            # Stopped; reels left unfinished stay queued for the next batch
+            pass
 
         except Exception as e:
             self.error_occurred.emit("", f"Thread error: {str(e)}")
 
+        finally:
+            self._close_upload_sink()
+            if self.manifest is not None:
+                self.manifest.close()
+            self._close_archiver()
+            self.writer.commit()
+            if self.held_session is not None:
+                release_session(self.held_session)
+            if self.scheduler is not None:
+                self.scheduler.unregister(self.batch_id)
+
+    def _setup_session(self):
+        """
+        Creates (or resumes) the session folder and opens its manifest.
+
+        When resuming, the manifest's completed entries are loaded so those
+        reels are reported from the manifest instead of being processed again.
+        With a job store, the session its unfinished jobs were started in is
+        resumed unless another one is given.
+        """
+        resume_session = self.resume_session
+        if not resume_session and self.job_store is not None:
+            # Continue the session unfinished jobs were started in
+            folder = self.job_store.resumable_session(self.live_queue.batch)
+            if folder and Path(folder).is_dir():
+                resume_session = folder
+        if resume_session:
+            session_folder = self.session_manager.resume_session_folder(resume_session)
+            self.resumed_entries = completed_entries(session_folder)
+        else:
+            session_folder = self.session_manager.setup_session_folder()
+        # Other batches' retention must not delete the folder while it is used
+        hold_session(session_folder.name)
+        self.held_session = session_folder.name
+        self.manifest = SessionManifest(session_folder)
+
+    def _open_pack_store(self):
+        """
+        Opens the pack store for small artifacts.
+
+        It is opened when the "pack" storage backend is selected, and also when
+        earlier sessions packed artifacts, so the download index can resolve them.
+        """
+        packs_path = self.session_manager.base_download_dir / "packs.sqlite3"
+        packing = self.download_options.get("storage_backend") == "pack"
+        if not packing and not packs_path.exists():
+            return
+        try:
+            self.pack_store = PackStore(packs_path)
+        except Exception as e:
+            print(f"Pack store unavailable: {e}")
+            self.pack_store = None
+
+    def _open_archiver(self):
+        """
+        Starts streaming the session into an archive if `archive` is set.
+
+        The archive ("tar" or "zip") is written next to the session folder and
+        receives each reel as soon as it completes.
+        """
+        archive_format = self.download_options.get("archive")
+        session_folder = self.session_manager.get_session_folder()
+        if not archive_format or not session_folder:
+            return
+        archive_path = session_folder.with_name(
+            f"{session_folder.name}.{archive_format}"
+        )
+        try:
+            self.archiver = SessionArchiver(
+                archive_path, archive_format, self.pack_store
+            )
+        except Exception as e:
+            print(f"Archive unavailable: {e}")
+            self.archiver = None
+
+    def _close_archiver(self):
+        """Finalizes the session archive and reports where it was written."""
+        if self.archiver is None:
+            return
+        archive_path = self.archiver.close()
+        if archive_path:
+            self.progress_updated.emit("", 100, f"Archive written: {archive_path}")
+
+    def _archive_reel(self, item: ReelItem, reel_number: int, result: Dict[str, Any]):
+        """Queues a completed reel for the session archive, if one is open."""
+        if self.archiver is not None:
+            self.archiver.add_reel(
+                f"reel{reel_number}", item.url, extract_shortcode(item.url), result
+            )
+
+    def _open_upload_sink(self):
+        """
+        Sets up uploading of completed reels if `upload` names a bucket.
+
+        `upload` holds bucket, prefix, endpoint_url, region, part_size_mb,
+        max_concurrency, memory_budget_mb and delete_local (artifact kinds to
+        remove locally once uploaded). Local files are kept while an archive
+        is being written, since the archiver still reads them.
+        """
+        upload = self.download_options.get("upload")
+        if not upload or not upload.get("bucket"):
+            return
+        delete_local = [] if self.archiver else upload.get("delete_local", [])
+        try:
+            self.upload_sink = UploadSink(
+                upload["bucket"],
+                prefix=upload.get("prefix", ""),
+                endpoint_url=upload.get("endpoint_url"),
+                region_name=upload.get("region"),
+                part_size=int(upload.get("part_size_mb", 8) * 1024 * 1024),
+                max_concurrency=upload.get("max_concurrency", 4),
+                memory_budget=int(upload.get("memory_budget_mb", 64) * 1024 * 1024),
+                delete_local=delete_local,
+                pack_store=self.pack_store,
+            )
+        except Exception as e:
+            print(f"Upload sink unavailable: {e}")
+            self.upload_sink = None
+
+    def _close_upload_sink(self):
+        """Waits for outstanding uploads; unstarted ones are skipped after stop()."""
+        if self.upload_sink is None:
+            return
+        self.progress_updated.emit("", 100, "Finishing uploads...")
+        self.upload_sink.close(cancel_pending=not self.is_running)
+
+    def _upload_reel(self, item: ReelItem, reel_number: int, result: Dict[str, Any]):
+        """Queues a completed reel for upload and records the outcome."""
+        session_folder = self.session_manager.get_session_folder()
+        if self.upload_sink is None or not session_folder:
+            return
+        shortcode = extract_shortcode(item.url)
+
+        def on_done(upload: Dict[str, Any]):
+            self._record_manifest(build_upload_entry(item.url, shortcode, upload))
+            message = (
+                "Uploaded"
+                if upload["status"] == "uploaded"
+                else f"Upload failed: {upload['error']}"
+            )
+            self.progress_updated.emit(item.url, 100, message)
+
+        self.upload_sink.submit_reel(
+            f"{session_folder.name}/reel{reel_number}", result, on_done
+        )
+
+    def _open_download_index(self):
+        """
+        Opens the persistent download and search indexes.
+
+        The download index is used to skip already downloaded reels and the
+        search index receives captions and transcripts. Both are optional; if
+        the download index cannot be opened, every reel is downloaded.
+        """
+        if not self.download_options.get("use_index", True):
+            return
+        try:
+            self.download_index = DownloadIndex(
+                self.session_manager.base_download_dir / "index.sqlite3",
+                self.pack_store,
+            )
+        except Exception as e:
+            print(f"Download index unavailable: {e}")
+            self.download_index = None
+
+        try:
+            self.search_index = SearchIndex(
+                self.session_manager.base_download_dir / "search.sqlite3"
+            )
+        except Exception as e:
+            print(f"Search index unavailable: {e}")
+            self.search_index = None
+
+    def _open_cost_estimator(self):
+        """
+        Lets the live queue order pending reels by their estimated cost.
+
+        Costs depend on the batch's options and on what the download index
+        already holds, so they are re-estimated for every batch.
+        """
+        estimator = CostEstimator(self.download_index)
+        options = dict(self.download_options)
+        self.cost_estimator = estimator
+        self.live_queue.set_cost_estimator(lambda url: estimator.estimate(url, options))
+
+    def _open_admission(self):
+        """
+        Sets up disk-space admission control.
+
+        Reels wait while their volume would have less than `min_free_mb`
+        (default 512) free after the download. Set it to 0 to disable waiting.
+        """
+        min_free_mb = self.download_options.get("min_free_mb", 512)
+        if min_free_mb and min_free_mb > 0:
+            self.admission = DiskAdmission(
+                int(min_free_mb * 1024 * 1024), self.download_index
+            )
+
+    def _apply_retention(self):
+        """
+        Enforces the retention quotas configured in the download options.
+
+        Runs after a batch when `retention_max_age_days` or `retention_max_gb`
+        is set. The current session, sessions other batches are writing to and
+        sessions unfinished jobs will resume are never deleted.
+        """
+        max_age_days = self.download_options.get("retention_max_age_days")
+        max_gb = self.download_options.get("retention_max_gb")
+        if max_age_days is None and max_gb is None:
+            return
+
+        session_folder = self.session_manager.get_session_folder()
+        policy = RetentionPolicy(
+            max_age_days=max_age_days,
+            max_total_bytes=int(max_gb * 1024**3) if max_gb is not None else None,
+            audio_cache_bytes=int(
+                self.download_options.get("audio_cache_mb", 0) * 1024 * 1024
+            ),
+        )
+        manager = RetentionManager(
+            self.session_manager.base_download_dir,
+            policy,
+            [volume.root for volume in self.session_manager.volumes.volumes],
+            progress_callback=lambda message: self.progress_updated.emit(
+                "", 100, message
+            ),
+            job_store=self.job_store,
+        )
+        try:
+            manager.apply(exclude=[session_folder.name] if session_folder else [])
+        except Exception as e:
+            print(f"Retention failed: {e}")
+
     def _lazy_load_dependencies(self):
         """
         Lazily loads heavy dependencies like Whisper model if transcription is enabled.
@@ -100,8 +471,15 @@ class ReelDownloader(QThread):
         """
         self.progress_updated.emit("", 0, "Loading dependencies...")
 
-        if self.download_options.get("transcribe", False):
-            self.audio_transcriber.load_whisper_model(self.progress_updated.emit)
+        if option_enabled(self.download_options, "transcribe"):
+            # Held in a transcription slot, so a load abandoned by stop() does
+            # not run alongside the next batch's transcriptions
+            self.audio_transcriber.call_in_slot(
+                lambda: self.audio_transcriber.load_whisper_model(
+                    self.progress_updated.emit
+                ),
+                DEFAULT_COST,
+            )
 
     def _setup_instaloader(self):
         """
@@ -129,70 +507,711 @@ class ReelDownloader(QThread):
         It attempts to download each reel using the preferred downloader,
         and falls back to the secondary downloader if the primary one fails.
         Handles transcription if enabled and emits appropriate signals for
-        completion or errors.
+        completion or errors. With a scheduler, each reel first waits for a
+        worker shared with the other batches.
         """
-        for i, item in enumerate(self.reel_items, 1):
+        for i, item, job in self._work_items():
             if not self.is_running:
                 break
 
-            downloader_name = self.download_options.get("downloader", "Instaloader")
+            if item.url in self.resumed_entries:
+                self.progress_updated.emit(item.url, 100, "Completed in earlier run")
+                result = entry_to_result(self.resumed_entries[item.url])
+                self._archive_reel(item, i, result)
+                self._finish_job(item)
+                self.download_completed.emit(item.url, result)
+                continue
 
-            primary_agent, fallback_agent = (
-                (self._download_with_instaloader, self._download_with_yt_dlp)
-                if downloader_name == "Instaloader"
-                else (self._download_with_yt_dlp, self._download_with_instaloader)
-            )
+            if not self._acquire_worker(item):
+                break
+            try:
+                if not self._process_item(item, i, job):
+                    break
+            finally:
+                if self.scheduler is not None:
+                    self.scheduler.release_worker()
+
+    def _process_item(
+        self, item: ReelItem, reel_number: int, job: Optional[Job]
+    ) -> bool:
+        """
+        Resumes, reuses or downloads one reel.
+
+        Args:
+            item: The ReelItem to process.
+            reel_number: The sequential number of the reel in the current session.
+            job: The item's job, if it comes from the job store.
+
+        Returns:
+            bool: False if the batch was stopped while the reel waited.
+        """
+        if job is not None and self._resume_job(item, reel_number, job):
+            return True
+
+        self._place(item)
+        existing, item_options = self._lookup_index(item, reel_number)
+        if existing and not requested_kinds(item_options):
+            self.progress_updated.emit(item.url, 100, "Already downloaded")
+            self._complete_download(item, reel_number, existing, {}, "index", {})
+            return True
+
+        if not self._admit(item, item_options):
+            return False
+        try:
+            if self.scheduler is not None and not self.scheduler.pace(
+                lambda: self.is_running
+            ):
+                return False
+            self._download_item(item, reel_number, existing, item_options)
+        finally:
+            self._release(item)
+        return True
+
+    def _acquire_worker(self, item: ReelItem) -> bool:
+        """
+        Waits for the batch's turn to process a reel, if a scheduler is shared.
+
+        Args:
+            item: The ReelItem about to be processed.
+
+        Returns:
+            bool: False if the batch was stopped while waiting.
+        """
+        if self.scheduler is None:
+            return True
+        cost = DEFAULT_COST
+        if self.cost_estimator is not None:
+            try:
+                cost = self.cost_estimator.estimate(item.url, self.download_options)
+            except Exception as e:
+                print(f"Cost estimate failed for {item.url}: {e}")
+        return self.scheduler.acquire_worker(
+            self.batch_id,
+            cost,
+            lambda: self.is_running,
+            lambda: self.progress_updated.emit(
+                item.url, 0, "Waiting for a free worker..."
+            ),
+        )
+
+    def _transcription_slot(self, seconds: float) -> ContextManager[bool]:
+        """
+        Returns the context manager held around each Whisper call; with a
+        scheduler, transcription slots are shared fairly with other batches.
+
+        Args:
+            seconds: Seconds of audio about to be transcribed.
+        """
+        if self.scheduler is None:
+            return nullcontext(True)
+        return self.scheduler.transcription_slot(
+            self.batch_id, seconds, lambda: self.is_running
+        )
+
+    def _work_items(self) -> Iterator[Tuple[int, ReelItem, Optional[Job]]]:
+        """
+        Yields the reels to process with their reel numbers.
+
+        Reels are taken from the live queue one at a time until it is empty,
+        so URLs added while the batch runs are included. Reels are numbered in
+        the order they are taken; with a job store, jobs are marked running
+        and a job started earlier in this session keeps its reel number.
+
+        Yields:
+            Tuple[int, ReelItem, Optional[Job]]: The reel number, the item and
+            its job, if it comes from the job store.
+        """
+        session_folder = str(self.session_manager.get_session_folder())
+        next_number = 1
+        if self.job_store is not None:
+            next_number = self.job_store.next_reel_number(session_folder)
+
+        while self.is_running:
+            # Waits here between reels while paused
+            self.token.check()
+            entry = self.live_queue.get()
+            if entry is None:
+                return
+            job = entry.job
+            if job and job.reel_number and job.session_folder == session_folder:
+                reel_number = job.reel_number
+            else:
+                reel_number = next_number
+                next_number += 1
+            if job is not None:
+                self.job_store.mark_running(job.id, session_folder, reel_number)
+                job.session_folder, job.reel_number = session_folder, reel_number
+                self.job_ids[job.url] = job.id
+            try:
+                yield reel_number, ReelItem(url=entry.url), job
+            finally:
+                # Back to the front if the batch stopped before finishing it
+                self.live_queue.release(entry)
+
+    def _resume_job(self, item: ReelItem, reel_number: int, job: Job) -> bool:
+        """
+        Finishes a job whose download stage completed in an earlier run.
 
-            primary_agent_name = (
-                "Instaloader"
-                if primary_agent == self._download_with_instaloader
-                else "yt-dlp"
+        Only the stages not recorded as done are run, from the files the
+        download stage left in the reel folder.
+
+        Args:
+            item: The ReelItem of the job.
+            reel_number: The job's reel number in this session.
+            job: The job being resumed.
+
+        Returns:
+            bool: False if the job has to start over, e.g. because it never
+            finished downloading or its files are gone.
+        """
+        try:
+            stages = self.job_store.stages(job.id)
+        except Exception as e:
+            print(f"Job store lookup failed: {e}")
+            return False
+        download = stages.get("download", {})
+        result = download.get("detail")
+        if download.get("state") != "done" or not result:
+            return False
+        for key in ARTIFACT_KINDS.values():
+            path = result.get(key)
+            if path and not is_pack_uri(path) and not os.path.exists(path):
+                return False
+
+        self._place(item)
+        self.progress_updated.emit(item.url, 90, "Resuming unfinished stages...")
+        timings: Dict[str, float] = {}
+        if (
+            option_enabled(self.download_options, "transcribe")
+            and stages.get("transcribe", {}).get("state") != "done"
+        ):
+            self._run_transcription(item, reel_number, result, timings)
+        self._complete_download(item, reel_number, {}, result, "resumed", timings)
+        return True
+
+    def _set_stage(
+        self,
+        item: ReelItem,
+        stage: str,
+        state: str,
+        detail: Optional[Dict[str, Any]] = None,
+    ):
+        """Records a stage transition of the item's job, if it has one."""
+        job_id = self.job_ids.get(item.url)
+        if job_id is None or self.job_store is None:
+            return
+        try:
+            self.job_store.set_stage(job_id, stage, state, detail)
+        except Exception as e:
+            print(f"Job store update failed: {e}")
+
+    def _finish_job(self, item: ReelItem, error: Optional[str] = None):
+        """Marks the item done in the queue and its job completed, or failed."""
+        self.live_queue.task_done(item.url)
+        job_id = self.job_ids.pop(item.url, None)
+        if job_id is None or self.job_store is None:
+            return
+        try:
+            if error:
+                self.job_store.mark_failed(job_id, error)
+            else:
+                self.job_store.mark_completed(job_id)
+        except Exception as e:
+            print(f"Job store update failed: {e}")
+
+    def _download_item(
+        self,
+        item: ReelItem,
+        reel_number: int,
+        existing: Dict[str, Any],
+        item_options: Dict[str, Union[bool, str]],
+    ):
+        """
+        Downloads a reel with the preferred agent, falling back to the other one.
+
+        Args:
+            item: The ReelItem to download.
+            reel_number: The sequential number of the reel in the current session.
+            existing: Artifacts reused from earlier sessions.
+            item_options: Download options for this item.
+        """
+        downloader_name = self.download_options.get("downloader", "Instaloader")
+
+        primary_agent, fallback_agent = (
+            (self._download_with_instaloader, self._download_with_yt_dlp)
+            if downloader_name == "Instaloader"
+            else (self._download_with_yt_dlp, self._download_with_instaloader)
+        )
+
+        primary_agent_name = (
+            "Instaloader"
+            if primary_agent == self._download_with_instaloader
+            else "yt-dlp"
+        )
+        fallback_agent_name = (
+            "yt-dlp" if fallback_agent == self._download_with_yt_dlp else "Instaloader"
+        )
+
+        timings: Dict[str, float] = {}
+        primary_error = None
+        try:
+            self.progress_updated.emit(
+                item.url, 0, f"Starting download with {primary_agent_name}..."
             )
-            fallback_agent_name = (
-                "yt-dlp"
-                if fallback_agent == self._download_with_yt_dlp
-                else "Instaloader"
+            result = self._run_agent(
+                primary_agent, item, reel_number, item_options, timings, existing
+            )
+            self._complete_download(
+                item, reel_number, existing, result, primary_agent_name, timings
+            )
+            return
+        except Exception as e:
+            primary_error = e
+            self.progress_updated.emit(
+                item.url,
+                0,
+                f"{primary_agent_name} failed: {e}. Trying fallback {fallback_agent_name}...",
             )
 
-            primary_error = None
-            try:
-                self.progress_updated.emit(
-                    item.url, 0, f"Starting download with {primary_agent_name}..."
+        try:
+            result = self._run_agent(
+                fallback_agent, item, reel_number, item_options, timings, existing
+            )
+            self._complete_download(
+                item, reel_number, existing, result, fallback_agent_name, timings
+            )
+        except Exception as e2:
+            error_msg = f"Both downloaders failed: {primary_error} | {e2}"
+            self._record_manifest(
+                build_entry(
+                    item.url,
+                    extract_shortcode(item.url),
+                    "failed",
+                    timings=timings,
+                    error=error_msg,
                 )
-                result = primary_agent(item, i)
-                if self.download_options.get("transcribe", False):
-                    self._handle_transcription(result, i, item)
-                self.download_completed.emit(item.url, result)
+            )
+            self._finish_job(item, error_msg)
+            self.error_occurred.emit(item.url, error_msg)
+
+    def _run_agent(
+        self,
+        agent: Any,
+        item: ReelItem,
+        reel_number: int,
+        item_options: Dict[str, Union[bool, str]],
+        timings: Dict[str, float],
+        existing: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Runs a download agent and, if enabled, transcription, timing each stage.
+
+        Args:
+            agent: One of the `_download_with_*` methods.
+            item: The ReelItem to download.
+            reel_number: The sequential number of the reel in the current session.
+            item_options: Download options for this item.
+            timings: Updated with "download" and "transcribe" durations in seconds.
+            existing: Artifacts reused from earlier sessions, recorded with the
+                      download stage so a resumed job still has them.
+
+        Returns:
+            The download result dictionary.
+        """
+        self._set_stage(item, "download", "running")
+        started = time.monotonic()
+        try:
+            result = agent(item, reel_number, item_options)
+        except Exception:
+            self._set_stage(item, "download", "failed")
+            raise
+        timings["download"] = time.monotonic() - started
+        self._record_throughput(item, result, timings["download"])
+        self._set_stage(item, "download", "done", {**(existing or {}), **result})
+
+        if option_enabled(item_options, "transcribe"):
+            self._run_transcription(item, reel_number, result, timings)
+        return result
+
+    def _run_transcription(
+        self,
+        item: ReelItem,
+        reel_number: int,
+        result: Dict[str, Any],
+        timings: Dict[str, float],
+    ):
+        """
+        Runs the transcription stage of a reel and records its outcome.
+
+        Args:
+            item: The downloaded ReelItem.
+            reel_number: The sequential number of the reel in the current session.
+            result: The download result, updated with the transcript.
+            timings: Updated with the "transcribe" duration in seconds.
+        """
+        self._set_stage(item, "transcribe", "running")
+        started = time.monotonic()
+        transcribed = self._handle_transcription(result, reel_number, item)
+        timings["transcribe"] = time.monotonic() - started
+        self._set_stage(item, "transcribe", "done" if transcribed else "failed")
+
+    def _admit(self, item: ReelItem, item_options: Dict[str, Union[bool, str]]) -> bool:
+        """
+        Holds a reel until its volume has room for it.
+
+        Args:
+            item: The ReelItem about to be downloaded.
+            item_options: Download options for this item.
+
+        Returns:
+            bool: False if the download was stopped while waiting.
+        """
+        placement = self.placements.get(item.url)
+        if self.admission is None or not placement:
+            return True
+
+        volume = placement[1]
+        estimate = self.admission.estimate(item_options)
+
+        def on_wait(free_bytes: int):
+            self.progress_updated.emit(
+                item.url,
+                0,
+                f"Waiting for disk space ({free_bytes // (1024 * 1024)} MB free)...",
+            )
+
+        if not self.admission.admit(
+            volume, estimate, lambda: self.is_running, on_wait, self.token.wait
+        ):
+            return False
+        self.reservations[item.url] = (volume, estimate)
+        return True
+
+    def _release(self, item: ReelItem):
+        """Releases the disk space reserved for a reel by `_admit`."""
+        reservation = self.reservations.pop(item.url, None)
+        if reservation and self.admission is not None:
+            self.admission.release(*reservation)
+
+    def _place(self, item: ReelItem):
+        """
+        Chooses the output volume of a reel before it is downloaded.
+
+        Args:
+            item: The ReelItem about to be downloaded.
+        """
+        if not self.session_manager.get_session_folder():
+            return
+        key = extract_shortcode(item.url) or item.url
+        self.placements[item.url] = self.session_manager.place(key)
+
+    def _session_folder_for(self, item: ReelItem) -> Optional[Path]:
+        """
+        Returns the session folder a reel is written to.
+
+        Args:
+            item: The ReelItem being downloaded.
+
+        Returns:
+            The session folder on the reel's volume, or None if no session is set up.
+        """
+        placement = self.placements.get(item.url)
+        if placement:
+            return placement[0]
+        return self.session_manager.get_session_folder()
+
+    def _volume_root(self, path: Union[str, Path]) -> Path:
+        """Returns the root of the output volume holding `path`."""
+        volume = self.session_manager.volumes.volume_for(path)
+        return volume.root if volume else self.session_manager.base_download_dir
+
+    def _blob_store_for(self, path: Union[str, Path]) -> BlobStore:
+        """Returns the blob store on the same volume as `path`, so links stay cheap."""
+        return BlobStore(
+            self._volume_root(path) / ".blobs",
+            self.download_options.get("read_only_blobs", True),
+        )
+
+    def _record_throughput(
+        self, item: ReelItem, result: Dict[str, Any], seconds: float
+    ):
+        """
+        Adds a finished download to the write statistics of its volume.
+
+        Args:
+            item: The downloaded ReelItem.
+            result: The download result.
+            seconds: How long the download took.
+        """
+        placement = self.placements.get(item.url)
+        if not placement:
+            return
+        written = 0
+        for key in ARTIFACT_KINDS.values():
+            path = result.get(key)
+            if path and os.path.exists(path):
+                written += os.path.getsize(path)
+        self.session_manager.volumes.record_write(placement[1], written, seconds)
+
+    def _record_volumes(self, result: Dict[str, Any]):
+        """
+        Notes the output volume of every artifact in `result["volumes"]`.
+
+        Args:
+            result: The download result, updated in place.
+        """
+        volumes = {}
+        for kind, key in ARTIFACT_KINDS.items():
+            path = result.get(key)
+            if not path or is_pack_uri(path):
                 continue
+            volume = self.session_manager.volumes.volume_for(path)
+            if volume:
+                volumes[kind] = volume.name
+        result["volumes"] = volumes
+
+    def _lookup_index(
+        self, item: ReelItem, reel_number: int
+    ) -> Tuple[Dict[str, Any], Dict[str, Union[bool, str]]]:
+        """
+        Checks the download index for artifacts of this reel that already exist.
+
+        Reused artifacts are linked into this session's reel folder so every
+        session folder stays complete.
+
+        Args:
+            item: The ReelItem about to be downloaded.
+            reel_number: The sequential number of the reel in the current session.
+
+        Returns:
+            A tuple of the partial result built from existing artifacts and the
+            download options for this item, with those artifacts switched off.
+        """
+        shortcode = extract_shortcode(item.url)
+        if self.download_index is None or not shortcode:
+            return {}, self.download_options
+
+        try:
+            existing = self.download_index.find_existing(
+                shortcode, requested_kinds(self.download_options)
+            )
+        except Exception as e:
+            print(f"Download index lookup failed: {e}")
+            return {}, self.download_options
+
+        # In the sharded layout, existing files are already in their final place
+        if existing and self.blob_store is not None and self.layout is None:
+            try:
+                existing = self._materialize_existing(existing, reel_number, item)
             except Exception as e:
-                primary_error = e
-                self.progress_updated.emit(
-                    item.url,
-                    0,
-                    f"{primary_agent_name} failed: {e}. Trying fallback {fallback_agent_name}...",
-                )
+                print(f"Could not link existing files into session: {e}")
+
+        item_options = dict(self.download_options)
+        for kind, key in ARTIFACT_KINDS.items():
+            if key in existing:
+                item_options[kind] = False
+        return existing, item_options
+
+    def _complete_download(
+        self,
+        item: ReelItem,
+        reel_number: int,
+        existing: Dict[str, Any],
+        result: Dict[str, Any],
+        engine: str,
+        timings: Dict[str, float],
+    ):
+        """
+        Merges reused artifacts into the result, records it and reports completion.
+
+        Args:
+            item: The downloaded ReelItem.
+            reel_number: The sequential number of the reel in the current session.
+            existing: Artifacts reused from earlier sessions.
+            result: The result produced by the download agent.
+            engine: Name of the downloader that produced the result.
+            timings: Stage durations in seconds, recorded in the manifest.
+        """
+        result = {**existing, **result}
+        result["hashes"] = {**existing.get("hashes", {}), **result.get("hashes", {})}
+        if self.blob_store is not None:
+            self._deduplicate(result)
 
+        shortcode = extract_shortcode(item.url)
+        if (
+            self.pack_store is not None
+            and shortcode
+            and self.download_options.get("storage_backend") == "pack"
+        ):
+            self._pack_small_artifacts(shortcode, result)
+        if self.layout is not None and shortcode:
+            result = self._apply_layout(item, shortcode, reel_number, result)
+        self._record_volumes(result)
+        if self.download_index is not None and shortcode:
             try:
-                result = fallback_agent(item, i)
-                if self.download_options.get("transcribe", False):
-                    reel_folder = Path(result["folder_path"])
-                    self.audio_transcriber.transcribe_audio_from_reel(
-                        reel_folder, i, result, self.progress_updated.emit
-                    )
-                self.download_completed.emit(item.url, result)
-            except Exception as e2:
-                error_msg = f"Both downloaders failed: {primary_error} | {e2}"
-                self.error_occurred.emit(item.url, error_msg)
+                self.download_index.record(shortcode, item.url, result)
+            except Exception as e:
+                print(f"Download index update failed: {e}")
+        if self.search_index is not None:
+            try:
+                self.search_index.add_result(item.url, shortcode, result)
+            except Exception as e:
+                print(f"Search index update failed: {e}")
+        self._record_manifest(
+            build_entry(item.url, shortcode, "completed", engine, result, timings)
+        )
+        self._archive_reel(item, reel_number, result)
+        self._upload_reel(item, reel_number, result)
+        self._finish_job(item)
+        self.download_completed.emit(item.url, result)
+
+    def _apply_layout(
+        self,
+        item: ReelItem,
+        shortcode: str,
+        reel_number: int,
+        result: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Moves a completed reel into the sharded layout.
+
+        The session's `reel{n}` folder is replaced by a symlink to the reel's
+        shortcode folder.
+
+        Args:
+            item: The downloaded ReelItem.
+            shortcode: The reel's canonical shortcode.
+            reel_number: The sequential number of the reel in the current session.
+            result: The download result.
+
+        Returns:
+            Dict[str, Any]: The result pointing at the shortcode folder.
+        """
+        layout = ShardedLayout(
+            self._volume_root(result.get("folder_path", "")) / LAYOUT_DIR_NAME
+        )
+        try:
+            result = layout.adopt(shortcode, result)
+        except OSError as e:
+            print(f"Could not move reel into the sharded layout: {e}")
+            return result
+
+        session_folder = self._session_folder_for(item)
+        if session_folder:
+            layout.link_view(session_folder / f"reel{reel_number}", shortcode)
+        return result
+
+    def _record_manifest(self, entry: Dict[str, Any]):
+        """Appends an entry to the session manifest, if one is open."""
+        if self.manifest is None:
+            return
+        try:
+            self.manifest.append(entry)
+        except Exception as e:
+            print(f"Manifest update failed: {e}")
+
+    def _materialize_existing(
+        self, existing: Dict[str, Any], reel_number: int, item: ReelItem
+    ) -> Dict[str, Any]:
+        """
+        Links artifacts from earlier sessions into this session's reel folder.
+
+        Media is materialized from the blob store (hardlink, reflink or kernel
+        copy); small text files are linked or copied from their indexed path.
+
+        Args:
+            existing: Partial result built from the download index.
+            reel_number: The sequential number of the reel in the current session.
+            item: The ReelItem the artifacts belong to.
+
+        Returns:
+            Dict[str, Any]: The partial result pointing at the new session folder.
+        """
+        session_folder = self._session_folder_for(item)
+        if not session_folder:
+            return existing
+
+        reel_folder = session_folder / f"reel{reel_number}"
+        reel_folder.mkdir(parents=True, exist_ok=True)
+        materialized = dict(existing)
+        for kind, key in ARTIFACT_KINDS.items():
+            source = existing.get(key)
+            if not source or is_pack_uri(source):
+                continue
+            # video3.mp4 from an older session becomes video{reel_number}.mp4
+            name = re.sub(r"\d+(\.\w+)$", rf"{reel_number}\1", Path(source).name)
+            destination = reel_folder / name
+            digest = existing.get("hashes", {}).get(kind)
+            blob_store = self._blob_store_for(source)
+            if digest and blob_store.contains(digest):
+                blob_store.materialize(digest, destination)
+            else:
+                link_or_copy(source, destination)
+            materialized[key] = str(destination)
+        materialized["folder_path"] = str(reel_folder)
+        return materialized
+
+    def _deduplicate(self, result: Dict[str, Any]):
+        """
+        Hands downloaded media to the blob store so duplicates share storage.
+
+        Args:
+            result: The download result; its `hashes` entry is completed with
+                    the digest of every stored file.
+        """
+        hashes = result.setdefault("hashes", {})
+        for kind in MEDIA_KINDS:
+            path = result.get(ARTIFACT_KINDS[kind])
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                digest = hashes.get(kind) or sha256_file(path)
+                self._blob_store_for(path).adopt(path, digest)
+                hashes[kind] = digest
+            except OSError as e:
+                print(f"Could not add {path} to the blob store: {e}")
+
+    def _pack_small_artifacts(self, shortcode: str, result: Dict[str, Any]):
+        """
+        Moves the thumbnail, caption and transcript of a reel into the pack store.
+
+        The files are removed and their result paths replaced by `pack://` URIs.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            result: The download result, updated in place.
+        """
+        hashes = result.setdefault("hashes", {})
+        for kind in PACK_KINDS:
+            key = ARTIFACT_KINDS[kind]
+            path = result.get(key)
+            if not path or is_pack_uri(path) or not os.path.exists(path):
+                continue
+            try:
+                packed = self.pack_store.put_file(shortcode, kind, path)
+                os.remove(path)
+            except Exception as e:
+                print(f"Could not pack {path}: {e}")
+                continue
+            result[key] = packed["uri"]
+            hashes[kind] = packed["sha256"]
 
     def _download_with_instaloader(
-        self, item: ReelItem, reel_number: int
+        self,
+        item: ReelItem,
+        reel_number: int,
+        options: Optional[Dict[str, Union[bool, str]]] = None,
     ) -> Dict[str, Any]:
         """
         Initiates a reel download using the Instaloader agent.
 
+        When transcription is enabled, the video bytes are also piped into a
+        streaming transcription so the transcript is ready when the download ends.
+
         Args:
             item: The ReelItem object to download.
             reel_number: The sequential number of the reel in the current session.
+            options: Download options for this item, defaults to the batch options.
 
         Returns:
             A dictionary containing the download results from the Instaloader agent.
@@ -200,30 +1219,67 @@ class ReelDownloader(QThread):
         Raises:
             ValueError: If the session folder is not initialized.
         """
-        session_folder = self.session_manager.get_session_folder()
+        session_folder = self._session_folder_for(item)
         if not session_folder:
             raise ValueError("Session folder is not initialized.")
-        return instaloader_agent.download_reel(
-            item,
-            reel_number,
-            session_folder,
-            self.loader,
-            self.download_options,
-            self.progress_updated.emit,
-        )
+
+        options = options or self.download_options
+        stream = None
+        if option_enabled(options, "transcribe") and (
+            options.get("stream_transcription", True)
+        ):
+            stream = self.audio_transcriber.open_stream(
+                self.progress_updated.emit, item.url
+            )
+
+        try:
+            result = instaloader_agent.download_reel(
+                item,
+                reel_number,
+                session_folder,
+                self.loader,
+                options,
+                self.progress_updated.emit,
+                chunk_callback=stream.feed if stream else None,
+                token=self.token,
+                writer=self.writer,
+                scratch=self.scratch,
+            )
+        except BaseException:
+            # Also when cancelled, so ffmpeg does not outlive the download
+            if stream:
+                stream.abort()
+            raise
+
+        if stream and not stream.finish(
+            Path(result["folder_path"]), reel_number, result
+        ):
+            self.progress_updated.emit(
+                item.url,
+                90,
+                "Streaming transcription unavailable, transcribing file...",
+            )
+        return result
 
     def _handle_transcription(
         self, result: Dict[str, Any], reel_number: int, item: ReelItem
-    ):
-        """Handles transcription for a downloaded reel."""
-        if not self.download_options.get("transcribe", False):
-            return
+    ) -> bool:
+        """
+        Handles transcription for a downloaded reel.
+
+        Returns:
+            bool: False if no transcript was produced.
+        """
+        if result.get("transcript_path"):
+            # Already transcribed while the video was streaming in
+            return True
 
         try:
             reel_folder = Path(result["folder_path"])
             self.audio_transcriber.transcribe_audio_from_reel(
                 reel_folder, reel_number, result, self.progress_updated.emit
             )
+            return bool(result.get("transcript_path"))
         except Exception as e:
             error_msg = f"Transcription failed: {str(e)}"
             result["transcript"] = error_msg
@@ -232,14 +1288,21 @@ class ReelDownloader(QThread):
             import traceback
 
             traceback.print_exc()
+            return False
 
-    def _download_with_yt_dlp(self, item: ReelItem, reel_number: int) -> Dict[str, Any]:
+    def _download_with_yt_dlp(
+        self,
+        item: ReelItem,
+        reel_number: int,
+        options: Optional[Dict[str, Union[bool, str]]] = None,
+    ) -> Dict[str, Any]:
         """
         Initiates a reel download using the yt-dlp agent.
 
         Args:
             item: The ReelItem object to download.
             reel_number: The sequential number of the reel in the current session.
+            options: Download options for this item, defaults to the batch options.
 
         Returns:
             A dictionary containing the download results from the yt-dlp agent.
@@ -247,22 +1310,47 @@ class ReelDownloader(QThread):
         Raises:
             ValueError: If the session folder is not initialized.
         """
-        session_folder = self.session_manager.get_session_folder()
+        session_folder = self._session_folder_for(item)
         if not session_folder:
             raise ValueError("Session folder is not initialized.")
         return yt_dlp_agent.download_reel(
             item,
             reel_number,
             session_folder,
-            self.download_options,
+            options or self.download_options,
             self.progress_updated.emit,
+            token=self.token,
+            writer=self.writer,
+            scratch=self.scratch,
         )
 
     def stop(self):
         """
         Stops the download thread gracefully.
 
-        Sets an internal flag to False, allowing the `run` method's loop
-        to terminate on its next iteration.
+        Sets an internal flag to False and cancels the thread's token, so
+        in-flight downloads, yt-dlp processes and transcription stop within a
+        chunk or poll interval instead of running to completion. The reel in
+        progress is left unfinished and requeued.
         """
         self.is_running = False
+        self.token.cancel()
+
+    def pause(self):
+        """
+        Pauses the download thread.
+
+        In-flight work waits at its next check with its partial state kept:
+        the temporary file of a download, the transcript windows decoded so
+        far, and a suspended yt-dlp process where the platform supports it.
+        """
+        self.token.pause()
+
+    def resume(self):
+        """Resumes a paused download thread."""
+        self.token.resume()
+
+    @property
+    def is_paused(self) -> bool:
+        """Whether the thread is paused."""
+        return self.token.paused
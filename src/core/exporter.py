@@ -0,0 +1,353 @@
+"""
+Columnar export of download sessions for analytics.
+
+Loading results into an analytics pipeline used to mean globbing thousands of
+`caption{n}.txt` and `transcript{n}.txt` files. `SessionExporter` writes one row
+per reel (metadata, file paths and sizes, hashes, stage timings, caption and
+transcript text) of one or all sessions into a single Parquet file or SQLite
+table with typed columns.
+
+Rows are read from each session's `manifest.jsonl`. Sessions created before the
+manifest existed are exported by scanning their `reel{n}` folders. Rows are
+produced lazily and written in row groups of `row_group_size`, so memory stays
+flat regardless of how large the download history is.
+
+Usage:
+    python -m src.core.exporter downloads reels.parquet
+    python -m src.core.exporter downloads reels.sqlite3 --session session_20250101_120000
+"""
+
+import argparse
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.core.manifest import (
+    MANIFEST_FILE_NAME,
+    REEL_STATUSES,
+    build_entry,
+    read_manifest,
+)
+from src.core.pack_store import PackStore, is_pack_uri
+from src.utils.lazy_imports import lazy_import_pyarrow
+
+# Column name -> logical type, in output order
+COLUMNS: List[Tuple[str, str]] = [
+    ("session", "string"),
+    ("reel_number", "int64"),
+    ("url", "string"),
+    ("shortcode", "string"),
+    ("status", "string"),
+    ("engine", "string"),
+    ("title", "string"),
+    ("caption", "string"),
+    ("transcript", "string"),
+    ("video_path", "string"),
+    ("video_size", "int64"),
+    ("video_sha256", "string"),
+    ("thumbnail_path", "string"),
+    ("audio_path", "string"),
+    ("audio_size", "int64"),
+    ("caption_path", "string"),
+    ("transcript_path", "string"),
+    ("download_seconds", "float64"),
+    ("transcribe_seconds", "float64"),
+    ("error", "string"),
+    ("recorded_at", "timestamp"),
+]
+
+SQLITE_TYPES = {
+    "string": "TEXT",
+    "int64": "INTEGER",
+    "float64": "REAL",
+    "timestamp": "TEXT",
+}
+
+# Legacy reel folder file name -> result key, formatted with the reel number
+LEGACY_FILES = {
+    "video{n}.mp4": "video_path",
+    "thumbnail{n}.jpg": "thumbnail_path",
+    "audio{n}.mp3": "audio_path",
+    "caption{n}.txt": "caption_path",
+    "transcript{n}.txt": "transcript_path",
+}
+
+
+class SessionExporter:
+    """
+    Streams the reels of download sessions into a Parquet file or SQLite table.
+    """
+
+    def __init__(
+        self,
+        base_download_dir: Union[str, Path] = "downloads",
+        sessions: Optional[Sequence[str]] = None,
+        include_text: bool = True,
+        row_group_size: int = 10000,
+    ):
+        """
+        Initializes the SessionExporter.
+
+        Args:
+            base_download_dir: The folder containing `session_*` folders.
+            sessions: Names of the sessions to export. Defaults to all sessions.
+            include_text: Whether to read caption and transcript text into rows.
+            row_group_size: Number of rows buffered per Parquet row group or
+                            SQLite transaction.
+        """
+        self.base_download_dir = Path(base_download_dir)
+        self.sessions = sessions
+        self.include_text = include_text
+        self.row_group_size = max(1, row_group_size)
+        self._pack_store: Optional[PackStore] = None
+
+    def session_folders(self) -> List[Path]:
+        """
+        Lists the session folders selected for export.
+
+        Returns:
+            List[Path]: Existing session folders in name (i.e. time) order.
+        """
+        if self.sessions:
+            folders = [self.base_download_dir / name for name in self.sessions]
+        else:
+            folders = sorted(self.base_download_dir.glob("session_*"))
+        return [folder for folder in folders if folder.is_dir()]
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields one row per reel of the selected sessions.
+
+        Yields:
+            Dict[str, Any]: A row with a value for every column in `COLUMNS`.
+        """
+        for session_folder in self.session_folders():
+            if (session_folder / MANIFEST_FILE_NAME).exists():
+                entries = read_manifest(session_folder)
+            else:
+                entries = _scan_legacy_session(session_folder)
+            for entry in entries:
+                if entry.get("status") in REEL_STATUSES:
+                    yield self._to_row(session_folder.name, entry)
+
+    def iter_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Groups rows into lists of at most `row_group_size` rows.
+
+        Yields:
+            List[Dict[str, Any]]: The next batch of rows.
+        """
+        batch: List[Dict[str, Any]] = []
+        for row in self.iter_rows():
+            batch.append(row)
+            if len(batch) >= self.row_group_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def export_parquet(self, output_path: Union[str, Path]) -> int:
+        """
+        Writes the selected sessions to a Parquet file, one row group per batch.
+
+        Args:
+            output_path: The Parquet file to create (overwritten if it exists).
+
+        Returns:
+            int: The number of rows written.
+        """
+        pa = lazy_import_pyarrow()
+        arrow_types = {
+            "string": pa.string(),
+            "int64": pa.int64(),
+            "float64": pa.float64(),
+            "timestamp": pa.timestamp("ms", tz="UTC"),
+        }
+        schema = pa.schema([(name, arrow_types[kind]) for name, kind in COLUMNS])
+
+        rows = 0
+        with pa.parquet.ParquetWriter(str(output_path), schema) as writer:
+            for batch in self.iter_batches():
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                rows += len(batch)
+        return rows
+
+    def export_sqlite(self, output_path: Union[str, Path], table: str = "reels") -> int:
+        """
+        Writes the selected sessions to a SQLite table, one transaction per batch.
+
+        The table is recreated on every export. Timestamps are stored as ISO 8601
+        text.
+
+        Args:
+            output_path: The SQLite database file.
+            table: Name of the table to write.
+
+        Returns:
+            int: The number of rows written.
+        """
+        columns = ", ".join(f"{name} {SQLITE_TYPES[kind]}" for name, kind in COLUMNS)
+        placeholders = ", ".join("?" for _ in COLUMNS)
+
+        connection = sqlite3.connect(str(output_path))
+        rows = 0
+        try:
+            with connection:
+                connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+                connection.execute(f'CREATE TABLE "{table}" ({columns})')
+            for batch in self.iter_batches():
+                with connection:
+                    connection.executemany(
+                        f'INSERT INTO "{table}" VALUES ({placeholders})',
+                        [_sqlite_values(row) for row in batch],
+                    )
+                rows += len(batch)
+        finally:
+            connection.close()
+        return rows
+
+    def export(self, output_path: Union[str, Path], file_format: str = "") -> int:
+        """
+        Exports to Parquet or SQLite, inferring the format from the suffix.
+
+        Args:
+            output_path: The output file.
+            file_format: "parquet" or "sqlite". Inferred when empty.
+
+        Returns:
+            int: The number of rows written.
+        """
+        file_format = file_format or _infer_format(output_path)
+        if file_format == "parquet":
+            return self.export_parquet(output_path)
+        return self.export_sqlite(output_path)
+
+    def _to_row(self, session: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Flattens a manifest entry into a row."""
+        files = entry.get("files", {})
+        timings = entry.get("timings", {})
+        folder_path = entry.get("folder_path")
+        recorded_at = entry.get("recorded_at")
+
+        def file_field(kind: str, field: str) -> Any:
+            return files.get(kind, {}).get(field)
+
+        return {
+            "session": session,
+            "reel_number": _parse_reel_number(folder_path),
+            "url": entry.get("url"),
+            "shortcode": entry.get("shortcode"),
+            "status": entry.get("status"),
+            "engine": entry.get("engine"),
+            "title": entry.get("title"),
+            "caption": self._read_text(file_field("caption", "path")),
+            "transcript": self._read_text(file_field("transcribe", "path")),
+            "video_path": file_field("video", "path"),
+            "video_size": file_field("video", "size"),
+            "video_sha256": file_field("video", "sha256"),
+            "thumbnail_path": file_field("thumbnail", "path"),
+            "audio_path": file_field("audio", "path"),
+            "audio_size": file_field("audio", "size"),
+            "caption_path": file_field("caption", "path"),
+            "transcript_path": file_field("transcribe", "path"),
+            "download_seconds": timings.get("download"),
+            "transcribe_seconds": timings.get("transcribe"),
+            "error": entry.get("error"),
+            "recorded_at": (
+                datetime.fromtimestamp(recorded_at, tz=timezone.utc)
+                if recorded_at is not None
+                else None
+            ),
+        }
+
+    def _read_text(self, path: Optional[str]) -> Optional[str]:
+        """Reads a caption or transcript file, if text export is enabled."""
+        if not self.include_text or not path:
+            return None
+        if is_pack_uri(path):
+            packs_path = self.base_download_dir / "packs.sqlite3"
+            if self._pack_store is None and packs_path.exists():
+                self._pack_store = PackStore(packs_path)
+            data = self._pack_store.get_uri(path) if self._pack_store else None
+            return data.decode("utf-8") if data is not None else None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def _scan_legacy_session(session_folder: Path) -> Iterator[Dict[str, Any]]:
+    """Builds manifest-like entries from the reel folders of a session."""
+    for reel_folder in sorted(session_folder.glob("reel*")):
+        reel_number = _parse_reel_number(str(reel_folder))
+        if reel_number is None or not reel_folder.is_dir():
+            continue
+        result: Dict[str, Any] = {"folder_path": str(reel_folder)}
+        for pattern, key in LEGACY_FILES.items():
+            file_path = reel_folder / pattern.format(n=reel_number)
+            if file_path.exists():
+                result[key] = str(file_path)
+        entry = build_entry("", None, "completed", result=result)
+        entry["recorded_at"] = reel_folder.stat().st_mtime
+        yield entry
+
+
+def _parse_reel_number(folder_path: Optional[str]) -> Optional[int]:
+    """Extracts N from a `.../reelN` folder path."""
+    if not folder_path:
+        return None
+    suffix = Path(folder_path).name[len("reel") :]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def _sqlite_values(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Orders a row's values by column and converts timestamps to text."""
+    return tuple(
+        row[name].isoformat() if kind == "timestamp" and row[name] else row[name]
+        for name, kind in COLUMNS
+    )
+
+
+def _infer_format(output_path: Union[str, Path]) -> str:
+    """Maps an output file suffix to an export format."""
+    return "parquet" if Path(output_path).suffix.lower() == ".parquet" else "sqlite"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point for exporting sessions.
+
+    Args:
+        argv: Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Export download sessions to Parquet or SQLite."
+    )
+    parser.add_argument("downloads_dir", nargs="?", default="downloads")
+    parser.add_argument("output", help="Output .parquet or .sqlite3 file")
+    parser.add_argument("--session", action="append", dest="sessions")
+    parser.add_argument("--format", choices=("parquet", "sqlite"), default="")
+    parser.add_argument("--row-group-size", type=int, default=10000)
+    parser.add_argument(
+        "--no-text", action="store_true", help="Skip caption and transcript text"
+    )
+    args = parser.parse_args(argv)
+
+    exporter = SessionExporter(
+        args.downloads_dir,
+        args.sessions,
+        include_text=not args.no_text,
+        row_group_size=args.row_group_size,
+    )
+    rows = exporter.export(args.output, args.format)
+    print(f"Exported {rows} reels to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,500 @@
+"""
+Persistent, crash-safe queue of download jobs.
+
+The download queue used to live only in the GUI's memory, so closing the app
+or a crash lost it, and a restarted batch redid every stage of a half-finished
+reel. `JobStore` keeps the queue in a SQLite database next to the session
+folders: one row per URL with its status, and one row per (job, stage) with
+that stage's state. Every transition is committed as it happens, so after a
+crash the downloader picks up exactly where it stopped, skipping the stages a
+job had already finished.
+
+Jobs are read in pages keyed on their id, so a queue of millions of URLs is
+never loaded into memory at once, and jobs added while a batch is running are
+picked up by it. Each job belongs to a batch, so batches running at the same
+time only read their own jobs.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+JOB_STATUSES = ("pending", "running", "completed", "failed")
+# Jobs a batch still has to process
+UNFINISHED_STATUSES = ("pending", "running")
+# Stages of a job, in the order they run
+STAGES = ("download", "transcribe")
+STAGE_STATES = ("running", "done", "failed")
+# Priority lanes a user can put a job in, most urgent first
+PRIORITIES = ("high", "normal", "low")
+_JOB_COLUMNS = "id, url, status, session_folder, reel_number, error, priority, batch"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    session_folder TEXT,
+    reel_number INTEGER,
+    error TEXT,
+    priority TEXT NOT NULL DEFAULT 'normal',
+    batch TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+
+CREATE TABLE IF NOT EXISTS job_stages (
+    job_id INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    state TEXT NOT NULL,
+    detail TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, stage)
+) WITHOUT ROWID;
+"""
+
+# Columns added after the first release, created on older databases at open
+MIGRATIONS = {
+    ("jobs", "priority"): "ALTER TABLE jobs ADD COLUMN priority TEXT NOT NULL "
+    "DEFAULT 'normal'",
+    ("jobs", "batch"): "ALTER TABLE jobs ADD COLUMN batch TEXT NOT NULL DEFAULT ''",
+}
+
+
+@dataclass
+class Job:
+    """
+    A queued download.
+
+    Attributes:
+        id: The job's id; ids grow in the order jobs were added.
+        url: The reel URL.
+        status: One of JOB_STATUSES.
+        session_folder: The session folder the job was started in, if any.
+        reel_number: The job's `reel{n}` number in that session, if started.
+        error: The error message of a failed job.
+        priority: The job's priority lane, one of PRIORITIES.
+        batch: The id of the batch the job belongs to.
+    """
+
+    id: int
+    url: str
+    status: str
+    session_folder: Optional[str] = None
+    reel_number: Optional[int] = None
+    error: Optional[str] = None
+    priority: str = "normal"
+    batch: str = ""
+
+
+class JobStore:
+    """
+    SQLite-backed job queue with per-stage state.
+
+    The connection is shared between the GUI and the download thread and
+    guarded by a lock. The database runs in WAL mode so readers never block
+    the writer.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = "downloads/jobs.sqlite3"):
+        """
+        Opens (and if needed creates) the job database.
+
+        Args:
+            db_path: Location of the SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def add(self, url: str, priority: str = "normal", batch: str = "") -> Optional[int]:
+        """
+        Queues a URL.
+
+        A URL whose job already completed or failed is queued again, at the
+        back of the queue.
+
+        Args:
+            url: The reel URL.
+            priority: The job's priority lane, one of PRIORITIES.
+            batch: The id of the batch the job belongs to.
+
+        Returns:
+            Optional[int]: The job id, or None if the URL is already queued,
+            in this or another batch.
+        """
+        ids = self.add_many([url], priority, batch)
+        return ids[0] if ids else None
+
+    def add_many(
+        self, urls: Iterable[str], priority: str = "normal", batch: str = ""
+    ) -> List[int]:
+        """
+        Queues several URLs in one transaction.
+
+        Args:
+            urls: The reel URLs.
+            priority: The priority lane of the new jobs, one of PRIORITIES.
+            batch: The id of the batch the new jobs belong to.
+
+        Returns:
+            List[int]: The ids of the jobs queued; URLs already pending or
+            running are skipped.
+        """
+        _check_priority(priority)
+        now = time.time()
+        ids = []
+        with self._lock:
+            for url in urls:
+                row = self._conn.execute(
+                    "SELECT id, status FROM jobs WHERE url = ?", (url,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] in UNFINISHED_STATUSES:
+                        continue
+                    # Requeued jobs go to the back of the queue with a new id
+                    self._delete(row[0])
+                cursor = self._conn.execute(
+                    "INSERT INTO jobs (url, status, priority, batch, created_at, "
+                    "updated_at) VALUES (?, 'pending', ?, ?, ?, ?)",
+                    (url, priority, batch, now, now),
+                )
+                ids.append(cursor.lastrowid)
+            self._conn.commit()
+        return ids
+
+    def get(self, url: str) -> Optional[Job]:
+        """
+        Looks up the job of a URL.
+
+        Args:
+            url: The reel URL.
+
+        Returns:
+            Optional[Job]: The job, or None if the URL was never queued.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE url = ?", (url,)
+            ).fetchone()
+        return Job(*row) if row else None
+
+    def iter_jobs(
+        self,
+        statuses: Sequence[str] = UNFINISHED_STATUSES,
+        after_id: int = 0,
+        page_size: int = 500,
+        batch: Optional[str] = None,
+    ) -> Iterator[Job]:
+        """
+        Yields jobs in the order they were added, one page at a time.
+
+        Each page is read after the previous one is consumed, so jobs added or
+        requeued meanwhile (they get a higher id) are included.
+
+        Args:
+            statuses: The statuses of the jobs to yield.
+            after_id: Only jobs with a higher id are yielded.
+            page_size: Number of jobs read per query.
+            batch: Only jobs of this batch are yielded; all batches if None.
+
+        Yields:
+            Job: The matching jobs.
+        """
+        condition, params = _batch_condition(batch)
+        placeholders = ",".join("?" for _ in statuses)
+        query = (
+            f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status IN ({placeholders}) "
+            f"{condition} AND id > ? ORDER BY id LIMIT ?"
+        )
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    query, (*statuses, *params, after_id, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield Job(*row)
+            after_id = rows[-1][0]
+
+    def remove(self, url: str) -> bool:
+        """
+        Removes the unfinished job of a URL, e.g. when it is cancelled.
+
+        Args:
+            url: The reel URL.
+
+        Returns:
+            bool: False if the URL has no unfinished job.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE url = ? AND status IN ('pending', "
+                "'running')",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return False
+            self._delete(row[0])
+            self._conn.commit()
+        return True
+
+    def adopt(self, batch: str, from_batch: Optional[str] = None) -> int:
+        """
+        Moves unfinished jobs to a batch, e.g. jobs restored after a restart.
+
+        Args:
+            batch: The id of the batch taking the jobs.
+            from_batch: Only jobs of this batch are moved; all if None.
+
+        Returns:
+            int: The number of jobs moved.
+        """
+        condition, params = _batch_condition(from_batch)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET batch = ? WHERE status IN ('pending', 'running') "
+                f"{condition}",
+                (batch, *params),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def set_priority(self, url: str, priority: str) -> bool:
+        """
+        Moves the unfinished job of a URL to another priority lane.
+
+        Args:
+            url: The reel URL.
+            priority: The new lane, one of PRIORITIES.
+
+        Returns:
+            bool: False if the URL has no unfinished job.
+        """
+        _check_priority(priority)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET priority = ?, updated_at = ? WHERE url = ? AND "
+                "status IN ('pending', 'running')",
+                (priority, time.time(), url),
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def mark_running(
+        self, job_id: int, session_folder: Union[str, Path], reel_number: int
+    ):
+        """
+        Records that a job was started in a session.
+
+        Args:
+            job_id: The job id.
+            session_folder: The session folder the job is written to.
+            reel_number: The job's `reel{n}` number in that session.
+        """
+        self._update(
+            "UPDATE jobs SET status = 'running', session_folder = ?, "
+            "reel_number = ?, error = NULL, updated_at = ? WHERE id = ?",
+            (str(session_folder), reel_number, time.time(), job_id),
+        )
+
+    def mark_completed(self, job_id: int):
+        """Records that every stage of a job is done."""
+        self._update(
+            "UPDATE jobs SET status = 'completed', error = NULL, updated_at = ? "
+            "WHERE id = ?",
+            (time.time(), job_id),
+        )
+
+    def mark_failed(self, job_id: int, error: str):
+        """
+        Records that a job failed.
+
+        Args:
+            job_id: The job id.
+            error: The error message.
+        """
+        self._update(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+            (error, time.time(), job_id),
+        )
+
+    def set_stage(
+        self,
+        job_id: int,
+        stage: str,
+        state: str,
+        detail: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Records the state of one stage of a job.
+
+        Args:
+            job_id: The job id.
+            stage: One of STAGES.
+            state: One of STAGE_STATES.
+            detail: Optional JSON-serializable data kept with the stage, e.g.
+                    the download result needed to run the following stages.
+
+        Raises:
+            ValueError: If the stage or state is unknown.
+        """
+        if stage not in STAGES or state not in STAGE_STATES:
+            raise ValueError(f"Unknown stage state: {stage}={state}")
+        self._update(
+            "INSERT OR REPLACE INTO job_stages (job_id, stage, state, detail, "
+            "updated_at) VALUES (?, ?, ?, ?, ?)",
+            (
+                job_id,
+                stage,
+                state,
+                json.dumps(detail, ensure_ascii=False) if detail is not None else None,
+                time.time(),
+            ),
+        )
+
+    def stages(self, job_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the recorded stages of a job.
+
+        Args:
+            job_id: The job id.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Maps each recorded stage to its "state"
+            and "detail".
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, state, detail FROM job_stages WHERE job_id = ?",
+                (job_id,),
+            ).fetchall()
+        return {
+            stage: {"state": state, "detail": json.loads(detail) if detail else None}
+            for stage, state, detail in rows
+        }
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+    def resumable_session(self, batch: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the session folder unfinished jobs were last started in.
+
+        Args:
+            batch: Only jobs of this batch are considered; all if None.
+
+        Returns:
+            Optional[str]: The folder, or None if no unfinished job was started.
+        """
+        condition, params = _batch_condition(batch)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_folder FROM jobs WHERE status IN ('pending', "
+                f"'running') AND session_folder IS NOT NULL {condition} "
+                "ORDER BY updated_at DESC LIMIT 1",
+                params,
+            ).fetchone()
+        return row[0] if row else None
+
+    def unfinished_sessions(self) -> List[str]:
+        """Returns the session folders unfinished jobs were started in."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT session_folder FROM jobs WHERE status IN "
+                "('pending', 'running') AND session_folder IS NOT NULL"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def next_reel_number(self, session_folder: Union[str, Path]) -> int:
+        """
+        Returns the first `reel{n}` number not yet used by a job in a session.
+
+        Args:
+            session_folder: The session folder.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(reel_number) FROM jobs WHERE session_folder = ?",
+                (str(session_folder),),
+            ).fetchone()
+        return (row[0] or 0) + 1
+
+    def clear(
+        self, statuses: Sequence[str] = JOB_STATUSES, batch: Optional[str] = None
+    ):
+        """
+        Removes jobs and their stages.
+
+        Args:
+            statuses: The statuses of the jobs to remove; all by default.
+            batch: Only jobs of this batch are removed; all if None.
+        """
+        condition, params = _batch_condition(batch)
+        placeholders = ",".join("?" for _ in statuses)
+        where = f"WHERE status IN ({placeholders}) {condition}"
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM job_stages WHERE job_id IN (SELECT id FROM jobs {where})",
+                (*statuses, *params),
+            )
+            self._conn.execute(f"DELETE FROM jobs {where}", (*statuses, *params))
+            self._conn.commit()
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self):
+        """Adds columns missing from databases created by older versions."""
+        for (table, column), statement in MIGRATIONS.items():
+            columns = {
+                row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")
+            }
+            if column not in columns:
+                self._conn.execute(statement)
+        self._conn.commit()
+
+    def _delete(self, job_id: int):
+        """Removes a job and its stages. Must hold the lock."""
+        self._conn.execute("DELETE FROM job_stages WHERE job_id = ?", (job_id,))
+        self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def _update(self, query: str, params: tuple):
+        """Runs one write statement and commits it."""
+        with self._lock:
+            self._conn.execute(query, params)
+            self._conn.commit()
+
+
+def _check_priority(priority: str):
+    """Raises ValueError for an unknown priority lane."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {priority}")
+
+
+def _batch_condition(batch: Optional[str]) -> Tuple[str, tuple]:
+    """Returns the SQL condition and parameters selecting one batch's jobs."""
+    if batch is None:
+        return "", ()
+    return "AND batch = ?", (batch,)
@@ -0,0 +1,140 @@
+"""
+Sharded, shortcode-keyed output layout.
+
+By default every run writes `session_YYYYmmdd_HHMMSS/reel{n}/video{n}.mp4`, so
+the same reel lands in a different place on every run and finding it means
+scanning session folders. With the "sharded" layout a completed reel is moved
+to a stable folder derived from its shortcode:
+
+    downloads/by-shortcode/<ab>/<cd>/<shortcode>/video.mp4
+
+where `ab/cd` are the first four hex digits of the shortcode's SHA-1. Locating
+a reel is a path computation, and no directory holds more than 256 entries
+above the reel level. The session folder keeps a `reel{n}` symlink to the
+reel's folder as a lightweight view; where symlinks are not available the
+session's `manifest.jsonl` serves as the view.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from src.core.download_index import ARTIFACT_KINDS
+from src.core.pack_store import is_pack_uri
+
+LAYOUT_DIR_NAME = "by-shortcode"
+
+# Download option -> canonical file name inside a reel folder
+CANONICAL_NAMES = {
+    "video": "video.mp4",
+    "thumbnail": "thumbnail.jpg",
+    "audio": "audio.mp3",
+    "caption": "caption.txt",
+    "transcribe": "transcript.txt",
+}
+
+
+class ShardedLayout:
+    """
+    Computes and populates shortcode-keyed reel folders.
+    """
+
+    def __init__(self, root: Union[str, Path] = "downloads/by-shortcode"):
+        """
+        Initializes the ShardedLayout.
+
+        Args:
+            root: Directory holding the shard folders. Created on first write.
+        """
+        self.root = Path(root)
+
+    def reel_folder(self, shortcode: str) -> Path:
+        """
+        Returns the folder of a reel.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+
+        Returns:
+            Path: `<root>/<ab>/<cd>/<shortcode>`.
+        """
+        digest = hashlib.sha1(shortcode.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / shortcode
+
+    def locate(self, shortcode: str) -> Optional[Path]:
+        """
+        Returns the folder of a reel if it has been downloaded.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+
+        Returns:
+            Optional[Path]: The reel folder, or None if it does not exist.
+        """
+        folder = self.reel_folder(shortcode)
+        return folder if folder.is_dir() else None
+
+    def adopt(self, shortcode: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Moves a reel's files into its shortcode folder under canonical names.
+
+        Files already in place are left alone; older copies at the destination
+        are replaced. Packed artifacts are not touched.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            result: The download result.
+
+        Returns:
+            Dict[str, Any]: The result pointing at the moved files.
+        """
+        folder = self.reel_folder(shortcode)
+        folder.mkdir(parents=True, exist_ok=True)
+        adopted = dict(result)
+        for kind, key in ARTIFACT_KINDS.items():
+            source = result.get(key)
+            if not source or is_pack_uri(source) or not os.path.exists(source):
+                continue
+            destination = folder / CANONICAL_NAMES[kind]
+            if not (destination.exists() and os.path.samefile(source, destination)):
+                _move(source, destination)
+            adopted[key] = str(destination)
+        adopted["folder_path"] = str(folder)
+        return adopted
+
+    def link_view(self, view_path: Union[str, Path], shortcode: str) -> bool:
+        """
+        Makes `view_path` (e.g. a session's `reel3`) point at a reel's folder.
+
+        An existing empty folder at `view_path` is replaced.
+
+        Args:
+            view_path: Where the view should appear.
+            shortcode: The reel's canonical shortcode.
+
+        Returns:
+            bool: True if the symlink was created.
+        """
+        view_path = Path(view_path)
+        target = self.reel_folder(shortcode)
+        try:
+            if view_path.is_symlink():
+                view_path.unlink()
+            elif view_path.is_dir():
+                view_path.rmdir()
+            view_path.parent.mkdir(parents=True, exist_ok=True)
+            relative = os.path.relpath(target, view_path.parent)
+            view_path.symlink_to(relative, target_is_directory=True)
+            return True
+        except (OSError, NotImplementedError):
+            return False
+
+
+def _move(source: Union[str, Path], destination: Path):
+    """Moves a file, replacing the destination; falls back across filesystems."""
+    try:
+        os.replace(source, destination)
+    except OSError:
+        shutil.move(str(source), str(destination))
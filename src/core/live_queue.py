@@ -0,0 +1,462 @@
+"""
+Thread-safe queue feeding a running download batch.
+
+`ReelDownloader` used to receive a copy of the GUI's queue when Start was
+pressed, so URLs added afterwards waited until the whole batch finished.
+`LiveQueue` is shared between the GUI and the download thread instead: the GUI
+puts URLs while the thread takes them one at a time, so an added URL is picked
+up by the running batch. Pending URLs can be cancelled, moved to the front or
+back of the queue, or put in another priority lane until the thread takes them.
+
+Pending reels are not taken in insertion order but by a score combining their
+priority lane, their estimated cost in seconds (see `CostEstimator`) and how
+long they have waited, so quick reels are not stuck behind long ones and
+nothing starves:
+
+    score = LANE_OFFSETS[lane] + cost - aging_rate * seconds_waited
+
+The lowest score runs first. Every pending reel ages at the same rate, so the
+order only depends on `LANE_OFFSETS[lane] + cost + aging_rate * queued_at`,
+which is fixed when a reel is queued; the queue is a heap that never needs
+re-sorting as time passes.
+
+Costs are estimated without holding the queue's lock, since an estimate can
+query the download index and read video headers: a reel is reserved under the
+lock, estimated, and inserted under the lock again.
+
+With a job store, every URL put is also persisted as a job, and the queue
+holds at most a window of pending jobs in memory, refilling it from the store
+page by page; reels are scheduled within that window. Each batch running at
+the same time has its own queue, reading only the jobs of its batch id.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from src.core.job_store import PRIORITIES, UNFINISHED_STATUSES, Job, JobStore
+
+# Head start of each priority lane, in seconds of estimated cost
+LANE_OFFSETS = {"high": 0.0, "normal": 300.0, "low": 1800.0}
+
+
+@dataclass
+class QueuedReel:
+    """
+    A URL waiting in the live queue.
+
+    Attributes:
+        url: The reel URL.
+        job: Its job in the job store, if one is used.
+        priority: The reel's priority lane, one of PRIORITIES.
+        cost: The estimated processing time in seconds.
+        queued_at: When the reel was queued, on the `time.monotonic` clock.
+    """
+
+    url: str
+    job: Optional[Job] = None
+    priority: str = "normal"
+    cost: float = 0.0
+    queued_at: float = 0.0
+
+
+class LiveQueue:
+    """
+    Pending reels shared between the GUI and the download thread.
+    """
+
+    def __init__(
+        self,
+        job_store: Optional[JobStore] = None,
+        window: int = 500,
+        cost_estimator: Optional[Callable[[str], float]] = None,
+        aging_rate: float = 1.0,
+        batch: str = "",
+    ):
+        """
+        Initializes the LiveQueue.
+
+        Args:
+            job_store: Optional job store the queue writes through to and
+                       refills from.
+            window: Maximum number of stored jobs loaded into memory at once.
+            cost_estimator: Optional function returning the estimated seconds
+                            a URL will take; without one all costs are 0.
+            aging_rate: Seconds of estimated cost forgiven per second waited.
+            batch: The batch id the queue's jobs are stored under.
+        """
+        self.job_store = job_store
+        self.batch = batch
+        self.window = max(1, window)
+        self.cost_estimator = cost_estimator
+        self.aging_rate = aging_rate
+        # Heap of [key, seq, entry]; removed entries are set to None
+        self._heap: List[list] = []
+        self._items: Dict[str, list] = {}
+        self._seq = itertools.count()
+        # URLs being processed
+        self._active: Set[str] = set()
+        # Reserved entries whose cost is being estimated, and moves to the
+        # front (True) or back (False) requested for them meanwhile
+        self._estimating: Dict[str, QueuedReel] = {}
+        self._moves: Dict[str, bool] = {}
+        # Highest job id loaded from the store, and whether none are left
+        self._loaded_id = 0
+        self._exhausted = job_store is None
+        self._lock = threading.Lock()
+        # Notified whenever estimated entries are inserted or reservations dropped
+        self._estimated = threading.Condition(self._lock)
+
+    def put(self, url: str, priority: str = "normal") -> bool:
+        """
+        Queues a URL.
+
+        Args:
+            url: The reel URL.
+            priority: The reel's priority lane, one of PRIORITIES.
+
+        Returns:
+            bool: False if the URL is already pending or being processed.
+
+        Raises:
+            ValueError: If the priority is unknown.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        with self._lock:
+            if self._known(url):
+                return False
+            job = None
+            if self.job_store is not None:
+                job_id = self.job_store.add(url, priority, self.batch)
+                if job_id is None:
+                    return False
+                job = Job(
+                    id=job_id,
+                    url=url,
+                    status="pending",
+                    priority=priority,
+                    batch=self.batch,
+                )
+                if not self._exhausted:
+                    # Older stored jobs come first; this one is loaded after them
+                    return True
+                self._loaded_id = max(self._loaded_id, job_id)
+            entry = self._reserve(QueuedReel(url, job, priority))
+        self._insert_estimated([entry])
+        return True
+
+    def put_many(self, urls: Iterable[str], priority: str = "normal") -> int:
+        """
+        Queues several URLs.
+
+        Args:
+            urls: The reel URLs.
+            priority: Their priority lane, one of PRIORITIES.
+
+        Returns:
+            int: The number of URLs added.
+        """
+        return sum(1 for url in urls if self.put(url, priority))
+
+    def get(self) -> Optional[QueuedReel]:
+        """
+        Takes the pending URL with the lowest score; pass it to `task_done`
+        once processed, or to `release` if it was not.
+
+        Returns:
+            Optional[QueuedReel]: The next reel, or None if the queue is empty.
+        """
+        entries: List[QueuedReel] = []
+        with self._lock:
+            loaded = len(self._items) + len(self._estimating)
+            if loaded <= self.window // 2 and not self._exhausted:
+                entries = self._refill()
+        if entries:
+            self._insert_estimated(entries)
+        with self._lock:
+            while True:
+                while self._heap:
+                    _, _, entry = heapq.heappop(self._heap)
+                    if entry is not None:
+                        del self._items[entry.url]
+                        self._active.add(entry.url)
+                        return entry
+                if not self._estimating:
+                    return None
+                # A reel put or loaded meanwhile is still being estimated
+                self._estimated.wait()
+
+    def task_done(self, url: str):
+        """
+        Marks a URL taken by `get` as processed, so it can be queued again.
+
+        Args:
+            url: The reel URL.
+        """
+        with self._lock:
+            self._active.discard(url)
+
+    def release(self, entry: QueuedReel):
+        """
+        Returns a reel taken by `get` to the queue with its original score,
+        unless it was marked done. Used when a batch stops before finishing it.
+
+        Args:
+            entry: The entry returned by `get`.
+        """
+        with self._lock:
+            if entry.url in self._active:
+                self._active.discard(entry.url)
+                self._insert(self._key(entry), entry)
+
+    def cancel(self, url: str) -> bool:
+        """
+        Removes a pending URL from the queue and the job store.
+
+        Args:
+            url: The reel URL.
+
+        Returns:
+            bool: False if the URL is not pending, e.g. because it is already
+            being downloaded.
+        """
+        with self._lock:
+            if url in self._active:
+                return False
+            removed = self._take(url) is not None
+            if self._estimating.pop(url, None) is not None:
+                removed = True
+                self._moves.pop(url, None)
+                self._estimated.notify_all()
+            if self.job_store is not None:
+                removed = self.job_store.remove(url) or removed
+            return removed
+
+    def reprioritize(self, url: str, to_front: bool = True) -> bool:
+        """
+        Moves a pending URL ahead of or behind every other pending URL.
+
+        Args:
+            url: The reel URL.
+            to_front: Whether the URL is processed next or last.
+
+        Returns:
+            bool: False if the URL is not pending.
+        """
+        with self._lock:
+            if url in self._active:
+                return False
+            if url in self._estimating:
+                self._moves[url] = to_front
+                return True
+            entry = self._take(url)
+            if entry is not None:
+                self._insert(self._edge_key(to_front, self._key(entry)), entry)
+                return True
+            loaded = self._load_job(url)
+            if loaded is None:
+                return False
+            self._moves[url] = to_front
+        self._insert_estimated([loaded])
+        return True
+
+    def set_priority(self, url: str, priority: str) -> bool:
+        """
+        Moves a pending URL to another priority lane.
+
+        Args:
+            url: The reel URL.
+            priority: The new lane, one of PRIORITIES.
+
+        Returns:
+            bool: False if the URL is not pending.
+
+        Raises:
+            ValueError: If the priority is unknown.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        with self._lock:
+            if url in self._active:
+                return False
+            taken = loaded = None
+            # Entries still being estimated get their key once inserted
+            entry = self._estimating.get(url)
+            if entry is None:
+                entry = taken = self._take(url)
+            if entry is None:
+                entry = loaded = self._load_job(url)
+            if entry is None:
+                return False
+            entry.priority = priority
+            if entry.job is not None:
+                entry.job.priority = priority
+                self.job_store.set_priority(url, priority)
+            if taken is not None:
+                self._insert(self._key(taken), taken)
+        if loaded is not None:
+            self._insert_estimated([loaded])
+        return True
+
+    def set_cost_estimator(self, cost_estimator: Optional[Callable[[str], float]]):
+        """
+        Replaces the cost estimator and re-estimates every pending URL.
+
+        Estimates can query the download index and read video headers, so
+        they are made without holding the lock; the GUI can keep adding and
+        moving URLs meanwhile. A URL's score moves by the change in its cost,
+        so a manual move to the front or back is kept.
+
+        Args:
+            cost_estimator: Function returning the estimated seconds a URL
+                            will take, or None to treat all costs as 0.
+        """
+        with self._lock:
+            self.cost_estimator = cost_estimator
+            urls = list(self._items)
+        costs = {url: self._estimate(url, cost_estimator) for url in urls}
+        with self._lock:
+            if self.cost_estimator is not cost_estimator:
+                # Replaced again while estimating
+                return
+            for url, cost in costs.items():
+                item = self._items.get(url)
+                if item is None:
+                    continue
+                item[0] += cost - item[2].cost
+                item[2].cost = cost
+            heapq.heapify(self._heap)
+
+    def pending(self) -> List[str]:
+        """Returns the pending URLs held in memory, in the order they will run."""
+        with self._lock:
+            return [item[2].url for item in sorted(self._items.values())]
+
+    def clear(self):
+        """Removes every pending URL, and all jobs of the batch from the store."""
+        with self._lock:
+            self._heap = []
+            self._items = {}
+            self._estimating = {}
+            self._moves = {}
+            self._estimated.notify_all()
+            if self.job_store is not None:
+                self.job_store.clear(batch=self.batch)
+                self._exhausted = True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def _key(self, entry: QueuedReel) -> float:
+        """Returns the fixed part of an entry's score."""
+        return (
+            LANE_OFFSETS[entry.priority]
+            + entry.cost
+            + self.aging_rate * entry.queued_at
+        )
+
+    def _estimate(
+        self, url: str, cost_estimator: Optional[Callable[[str], float]] = None
+    ) -> float:
+        """Estimates the cost of a URL with the given or the current estimator."""
+        cost_estimator = cost_estimator or self.cost_estimator
+        if cost_estimator is None:
+            return 0.0
+        try:
+            return float(cost_estimator(url))
+        except Exception as e:
+            print(f"Cost estimate failed for {url}: {e}")
+            return 0.0
+
+    def _known(self, url: str) -> bool:
+        """Checks whether a URL is pending or being processed. Must hold the lock."""
+        return url in self._items or url in self._active or url in self._estimating
+
+    def _reserve(self, entry: QueuedReel) -> QueuedReel:
+        """Marks a new entry as queued while its cost is estimated. Must hold the lock."""
+        entry.queued_at = time.monotonic()
+        self._estimating[entry.url] = entry
+        return entry
+
+    def _insert_estimated(self, entries: List[QueuedReel]):
+        """
+        Estimates reserved entries without the lock, then inserts them.
+
+        Entries cancelled or cleared meanwhile are dropped; a move to the front
+        or back requested meanwhile is applied.
+        """
+        costs = [self._estimate(entry.url) for entry in entries]
+        with self._lock:
+            for entry, cost in zip(entries, costs):
+                if self._estimating.get(entry.url) is not entry:
+                    continue
+                del self._estimating[entry.url]
+                entry.cost = cost
+                key = self._key(entry)
+                if entry.url in self._moves:
+                    key = self._edge_key(self._moves.pop(entry.url), key)
+                self._insert(key, entry)
+            self._estimated.notify_all()
+
+    def _edge_key(self, to_front: bool, default: float) -> float:
+        """Returns a key ahead of or behind every pending entry. Must hold the lock."""
+        keys = [item[0] for item in self._items.values()]
+        if not keys:
+            return default
+        return min(keys) - 1 if to_front else max(keys) + 1
+
+    def _insert(self, key: float, entry: QueuedReel):
+        """Adds an entry to the heap. Must hold the lock."""
+        item = [key, next(self._seq), entry]
+        self._items[entry.url] = item
+        heapq.heappush(self._heap, item)
+
+    def _take(self, url: str) -> Optional[QueuedReel]:
+        """Removes a pending URL from memory and returns it. Must hold the lock."""
+        item = self._items.pop(url, None)
+        if item is None:
+            return None
+        entry = item[2]
+        # Left in the heap as a tombstone, skipped by `get`
+        item[2] = None
+        return entry
+
+    def _load_job(self, url: str) -> Optional[QueuedReel]:
+        """
+        Reserves a pending job that is not in memory yet, ahead of its turn.
+        Must hold the lock.
+        """
+        if self.job_store is None:
+            return None
+        job = self.job_store.get(url)
+        if job is None or job.status not in UNFINISHED_STATUSES:
+            return None
+        if job.batch != self.batch:
+            return None
+        return self._reserve(QueuedReel(url, job, job.priority))
+
+    def _refill(self) -> List[QueuedReel]:
+        """
+        Reserves the next page of unfinished jobs from the store, to be passed
+        to `_insert_estimated`. Must hold the lock.
+        """
+        wanted = self.window - len(self._items) - len(self._estimating)
+        entries: List[QueuedReel] = []
+        loaded = 0
+        jobs = self.job_store.iter_jobs(
+            after_id=self._loaded_id, page_size=wanted, batch=self.batch
+        )
+        for job in jobs:
+            self._loaded_id = job.id
+            loaded += 1
+            if not self._known(job.url):
+                entries.append(self._reserve(QueuedReel(job.url, job, job.priority)))
+            if loaded >= wanted:
+                return entries
+        self._exhausted = True
+        return entries
@@ -0,0 +1,231 @@
+"""
+Append-only JSONL manifest of a download session.
+
+Every reel that completes or fails is appended as one JSON line to
+`manifest.jsonl` in the session folder, with its URL, shortcode, engine, files
+(path, size, SHA-256), stage timings and error. Downstream jobs can tail the
+manifest instead of walking the `reel{n}` folders, and an interrupted batch can
+be resumed by skipping URLs the manifest already records as completed.
+
+Lines are flushed immediately but fsynced in batches (every `fsync_every`
+entries or `fsync_interval` seconds), so durability does not cost a disk sync
+per reel.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+from src.core.download_index import ARTIFACT_KINDS
+
+MANIFEST_FILE_NAME = "manifest.jsonl"
+# Statuses of reel entries; other entries (e.g. uploads) annotate a reel
+REEL_STATUSES = ("completed", "failed")
+
+
+class SessionManifest:
+    """
+    Thread-safe appender for a session's `manifest.jsonl`.
+    """
+
+    def __init__(
+        self,
+        session_folder: Union[str, Path],
+        fsync_every: int = 16,
+        fsync_interval: float = 2.0,
+    ):
+        """
+        Opens the manifest of a session folder for appending.
+
+        Args:
+            session_folder: The session folder holding the manifest.
+            fsync_every: Number of entries after which the file is fsynced.
+            fsync_interval: Maximum seconds between fsyncs while entries arrive.
+        """
+        self.path = Path(session_folder) / MANIFEST_FILE_NAME
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Appends an entry as one JSON line.
+
+        Args:
+            entry: The entry to record. A `recorded_at` timestamp is added.
+        """
+        line = json.dumps({**entry, "recorded_at": time.time()}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._pending += 1
+            if (
+                self._pending >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+
+    def close(self):
+        """Fsyncs outstanding entries and closes the manifest."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+
+    def _sync(self):
+        """Forces written entries to disk. Must be called with the lock held."""
+        if self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+
+def build_entry(
+    url: str,
+    shortcode: Optional[str],
+    status: str,
+    engine: Optional[str] = None,
+    result: Optional[Dict[str, Any]] = None,
+    timings: Optional[Dict[str, float]] = None,
+    error: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Builds a manifest entry for a completed or failed reel.
+
+    Args:
+        url: The reel URL.
+        shortcode: The reel's canonical shortcode.
+        status: "completed" or "failed".
+        engine: The downloader that produced the result, e.g. "yt-dlp".
+        result: The download result dictionary.
+        timings: Stage durations in seconds.
+        error: The error message of a failed reel.
+
+    Returns:
+        Dict[str, Any]: The manifest entry.
+    """
+    result = result or {}
+    hashes = result.get("hashes", {})
+    volumes = result.get("volumes", {})
+    files = {}
+    for kind, key in ARTIFACT_KINDS.items():
+        path = result.get(key)
+        if not path:
+            continue
+        try:
+            size: Optional[int] = os.path.getsize(path)
+        except OSError:
+            size = None
+        files[kind] = {"path": path, "size": size, "sha256": hashes.get(kind)}
+        if volumes.get(kind):
+            files[kind]["volume"] = volumes[kind]
+
+    return {
+        "url": url,
+        "shortcode": shortcode,
+        "status": status,
+        "engine": engine,
+        "title": result.get("title"),
+        "folder_path": result.get("folder_path"),
+        "files": files,
+        "timings": {stage: round(t, 3) for stage, t in (timings or {}).items()},
+        "error": error,
+    }
+
+
+def build_upload_entry(
+    url: str, shortcode: Optional[str], upload: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Builds a manifest entry recording the upload of a completed reel.
+
+    Args:
+        url: The reel URL.
+        shortcode: The reel's canonical shortcode.
+        upload: The upload status returned by `UploadSink`.
+
+    Returns:
+        Dict[str, Any]: The manifest entry, with status "uploaded" or
+        "upload_failed".
+    """
+    return {
+        "url": url,
+        "shortcode": shortcode,
+        "status": upload["status"],
+        "upload": upload,
+        "error": upload.get("error"),
+    }
+
+
+def read_manifest(manifest_path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the entries of a manifest in order.
+
+    A truncated last line, left by a crash mid-write, is skipped.
+
+    Args:
+        manifest_path: Path to `manifest.jsonl` or to its session folder.
+
+    Yields:
+        Dict[str, Any]: Manifest entries.
+    """
+    manifest_path = Path(manifest_path)
+    if manifest_path.is_dir():
+        manifest_path = manifest_path / MANIFEST_FILE_NAME
+    if not manifest_path.exists():
+        return
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def completed_entries(manifest_path: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the latest entry of every URL the manifest records as completed.
+
+    Diffing a batch's URLs against the keys gives the items still to process.
+
+    Args:
+        manifest_path: Path to `manifest.jsonl` or to its session folder.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Completed entries keyed by URL.
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for entry in read_manifest(manifest_path):
+        if entry.get("status") in REEL_STATUSES:
+            latest[entry["url"]] = entry
+    return {url: e for url, e in latest.items() if e["status"] == "completed"}
+
+
+def entry_to_result(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuilds a download result dictionary from a manifest entry.
+
+    Args:
+        entry: A completed manifest entry.
+
+    Returns:
+        Dict[str, Any]: The result with file paths, hashes, title and folder.
+    """
+    result: Dict[str, Any] = {"hashes": {}}
+    for kind, info in entry.get("files", {}).items():
+        result[ARTIFACT_KINDS[kind]] = info["path"]
+        if info.get("sha256"):
+            result["hashes"][kind] = info["sha256"]
+        if info.get("volume"):
+            result.setdefault("volumes", {})[kind] = info["volume"]
+    for key in ("title", "folder_path"):
+        if entry.get(key):
+            result[key] = entry[key]
+    return result
@@ -0,0 +1,188 @@
+"""
+Memory-mapped Whisper checkpoint cache.
+
+`torch.load` on the stock `base.pt` reads and copies the whole checkpoint into
+process memory on every start. This module converts the checkpoint once into
+torch's zipfile format with contiguous tensors, which `torch.load(mmap=True)`
+can map straight from the page cache. Floating point weights are stored in the
+inference dtype (float32 on the CPU, where fp16 is slow or unsupported), so
+parameters can be assigned to the model without copying; several transcription
+workers share the same physical pages and only touch the weights they use.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.utils.atomic_writer import atomic_write_text
+from src.utils.lazy_imports import lazy_import_torch
+
+CACHE_DIR_NAME = "cache"
+CACHE_SUFFIX = ".mmap.pt"
+# Records which source file and dtype a converted checkpoint was made from
+SOURCE_SUFFIX = ".source.json"
+INFERENCE_DTYPE = "float32"
+
+
+def get_cache_path(model_file: Path, cache_dir: Optional[Path] = None) -> Path:
+    """
+    Returns the location of the converted checkpoint for a model file.
+
+    Args:
+        model_file: Path to the original Whisper checkpoint (e.g. base.pt).
+        cache_dir: Directory holding converted checkpoints. Defaults to a
+                   `cache` folder next to the model file.
+
+    Returns:
+        The path of the memory-mappable checkpoint.
+    """
+    cache_dir = cache_dir or model_file.parent / CACHE_DIR_NAME
+    return cache_dir / f"{model_file.stem}{CACHE_SUFFIX}"
+
+
+def _source_info(model_file: Path, dtype: str) -> Dict[str, Any]:
+    """Describes the source checkpoint a cache is converted from."""
+    stat = model_file.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "dtype": dtype}
+
+
+def _source_path(cache_path: Path) -> Path:
+    """Returns the path of the source record of a converted checkpoint."""
+    return cache_path.with_name(cache_path.name + SOURCE_SUFFIX)
+
+
+def is_cache_fresh(
+    model_file: Path, cache_path: Path, dtype: str = INFERENCE_DTYPE
+) -> bool:
+    """
+    Checks whether a converted checkpoint matches its source.
+
+    The size and modification time of the source recorded at conversion must
+    match the current file, so a replaced checkpoint is detected even if its
+    mtime went backwards (e.g. restored from a backup).
+
+    Args:
+        model_file: Path to the original checkpoint.
+        cache_path: Path to the converted checkpoint.
+        dtype: The dtype the cache must hold.
+
+    Returns:
+        True if the converted checkpoint exists and is up to date.
+    """
+    try:
+        with open(_source_path(cache_path), "r", encoding="utf-8") as f:
+            recorded = json.load(f)
+        return cache_path.exists() and recorded == _source_info(model_file, dtype)
+    except (OSError, ValueError):
+        return False
+
+
+def convert_checkpoint(
+    model_file: Path, cache_path: Path, dtype: str = INFERENCE_DTYPE
+) -> Path:
+    """
+    Converts a Whisper checkpoint into a memory-mappable cache file.
+
+    The conversion is written to a temporary file and atomically renamed, so
+    concurrent workers never observe a half-written cache.
+
+    Args:
+        model_file: Path to the original checkpoint.
+        cache_path: Destination of the converted checkpoint.
+        dtype: Name of the torch dtype floating point weights are stored in.
+
+    Returns:
+        The path of the converted checkpoint.
+    """
+    torch = lazy_import_torch()
+    source = _source_info(model_file, dtype)
+    checkpoint = torch.load(str(model_file), map_location="cpu")
+    target_dtype = getattr(torch, dtype)
+    state_dict = {
+        name: (
+            tensor.to(target_dtype) if tensor.is_floating_point() else tensor
+        ).contiguous()
+        for name, tensor in checkpoint["model_state_dict"].items()
+    }
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        torch.save(
+            {"dims": checkpoint["dims"], "model_state_dict": state_dict},
+            str(temp_path),
+        )
+        os.replace(temp_path, cache_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    atomic_write_text(_source_path(cache_path), json.dumps(source))
+    return cache_path
+
+
+def get_mmap_checkpoint(model_file: Path, cache_dir: Optional[Path] = None) -> Path:
+    """
+    Returns a fresh memory-mappable checkpoint, converting it on first use.
+
+    Args:
+        model_file: Path to the original checkpoint.
+        cache_dir: Optional directory holding converted checkpoints.
+
+    Returns:
+        The path of the converted checkpoint.
+    """
+    cache_path = get_cache_path(model_file, cache_dir)
+    if not is_cache_fresh(model_file, cache_path):
+        convert_checkpoint(model_file, cache_path)
+    return cache_path
+
+
+def load_mmap_checkpoint(
+    model_file: Path, cache_dir: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    Loads a checkpoint with its tensors memory-mapped from the cache.
+
+    Args:
+        model_file: Path to the original checkpoint.
+        cache_dir: Optional directory holding converted checkpoints.
+
+    Returns:
+        Dict[str, Any]: The checkpoint with "dims" and "model_state_dict".
+
+    Raises:
+        RuntimeError: If the installed torch cannot memory-map checkpoints.
+    """
+    torch = lazy_import_torch()
+    cache_path = get_mmap_checkpoint(model_file, cache_dir)
+    try:
+        return torch.load(
+            str(cache_path), map_location="cpu", mmap=True, weights_only=True
+        )
+    except TypeError as e:
+        raise RuntimeError("Installed torch does not support mmap loading") from e
+
+
+def load_mmap_model(model_file: Path, cache_dir: Optional[Path] = None) -> Any:
+    """
+    Loads a Whisper model whose weights are memory-mapped from the cache.
+
+    Args:
+        model_file: Path to the original checkpoint.
+        cache_dir: Optional directory holding converted checkpoints.
+
+    Returns:
+        A Whisper model on the CPU.
+
+    Raises:
+        RuntimeError: If the installed torch cannot memory-map checkpoints.
+    """
+    from whisper.model import ModelDimensions, Whisper
+
+    checkpoint = load_mmap_checkpoint(model_file, cache_dir)
+    model = Whisper(ModelDimensions(**checkpoint["dims"]))
+    # assign=True swaps in the mapped tensors instead of copying into the
+    # freshly initialised parameters.
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+    return model
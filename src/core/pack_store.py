@@ -0,0 +1,288 @@
+"""
+Pack store for small per-reel artifacts.
+
+Every reel used to leave several tiny files behind (`caption{n}.txt`,
+`transcript{n}.txt`, `thumbnail{n}.jpg`). With hundreds of thousands of reels
+that is millions of inodes, and directory walks and backups slow to a crawl.
+With the "pack" storage backend, `ReelDownloader` moves these artifacts into a
+single SQLite database once a reel completes and removes the files. Media files
+(video, audio) stay regular files.
+
+Packed artifacts are referenced by `pack://<shortcode>/<kind>` URIs in results,
+the download index and manifests. Contents are compressed with zstd when the
+`zstandard` package is installed (zlib otherwise); data that does not shrink,
+such as JPEG thumbnails, is stored as is.
+
+Usage:
+    python -m src.core.pack_store export downloads exported/
+    python -m src.core.pack_store export downloads exported/ --shortcode C0abc123
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.utils.lazy_imports import lazy_import_zstandard
+
+# Download options whose artifacts are small enough to pack
+PACK_KINDS = ("thumbnail", "caption", "transcribe")
+
+PACK_URI_PREFIX = "pack://"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    shortcode TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    data BLOB NOT NULL,
+    UNIQUE (shortcode, kind)
+);
+"""
+
+
+class PackStore:
+    """
+    SQLite-backed store of small artifacts, keyed by shortcode and kind.
+
+    Blobs live in an ordinary rowid table so large rows do not bloat the
+    primary key B-tree. The connection is shared between threads and guarded by
+    a lock.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path] = "downloads/packs.sqlite3",
+        compression: str = "zstd",
+    ):
+        """
+        Opens (and if needed creates) the pack database.
+
+        Args:
+            db_path: Location of the SQLite database file.
+            compression: "zstd", "zlib" or "none". zstd falls back to zlib when
+                         the `zstandard` package is not installed.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = compression
+        if compression == "zstd":
+            try:
+                lazy_import_zstandard()
+            except ImportError:
+                self.codec = "zlib"
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def put(self, shortcode: str, kind: str, name: str, data: bytes) -> Dict[str, Any]:
+        """
+        Stores (or replaces) an artifact.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            kind: The artifact kind, e.g. "caption".
+            name: The original file name, used when exporting.
+            data: The artifact's content.
+
+        Returns:
+            Dict[str, Any]: The stored artifact's uri, size and sha256.
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        codec, stored = _compress(self.codec, data)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO artifacts "
+                "(shortcode, kind, name, codec, size, sha256, created_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (shortcode, kind, name, codec, len(data), sha256, time.time(), stored),
+            )
+        return {"uri": pack_uri(shortcode, kind), "size": len(data), "sha256": sha256}
+
+    def put_file(
+        self, shortcode: str, kind: str, file_path: Union[str, Path]
+    ) -> Dict[str, Any]:
+        """
+        Stores the content of a file as an artifact.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            kind: The artifact kind, e.g. "thumbnail".
+            file_path: The file to pack. It is left in place.
+
+        Returns:
+            Dict[str, Any]: The stored artifact's uri, size and sha256.
+        """
+        file_path = Path(file_path)
+        return self.put(shortcode, kind, file_path.name, file_path.read_bytes())
+
+    def get(self, shortcode: str, kind: str) -> Optional[bytes]:
+        """
+        Returns the content of an artifact.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            kind: The artifact kind.
+
+        Returns:
+            Optional[bytes]: The decompressed content, or None if not stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT codec, data FROM artifacts WHERE shortcode = ? AND kind = ?",
+                (shortcode, kind),
+            ).fetchone()
+        if row is None:
+            return None
+        return _decompress(*row)
+
+    def get_uri(self, uri: str) -> Optional[bytes]:
+        """Returns the content of an artifact by its `pack://` URI."""
+        return self.get(*parse_pack_uri(uri))
+
+    def stat(self, shortcode: str, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns an artifact's metadata without reading its content.
+
+        Args:
+            shortcode: The reel's canonical shortcode.
+            kind: The artifact kind.
+
+        Returns:
+            Optional[Dict[str, Any]]: name, size, sha256 and created_at, or None.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT name, size, sha256, created_at FROM artifacts "
+                "WHERE shortcode = ? AND kind = ?",
+                (shortcode, kind),
+            ).fetchone()
+        if row is None:
+            return None
+        name, size, sha256, created_at = row
+        return {"name": name, "size": size, "sha256": sha256, "created_at": created_at}
+
+    def export(
+        self, destination: Union[str, Path], shortcode: Optional[str] = None
+    ) -> int:
+        """
+        Writes packed artifacts back to regular files.
+
+        Files are written to `<destination>/<shortcode>/<original name>`.
+
+        Args:
+            destination: The folder to export into.
+            shortcode: Export only this reel. Defaults to all reels.
+
+        Returns:
+            int: The number of files written.
+        """
+        destination = Path(destination)
+        written = 0
+        for reel_shortcode, kind in self._keys(shortcode):
+            info = self.stat(reel_shortcode, kind)
+            data = self.get(reel_shortcode, kind)
+            if info is None or data is None:
+                continue
+            reel_folder = destination / reel_shortcode
+            reel_folder.mkdir(parents=True, exist_ok=True)
+            (reel_folder / info["name"]).write_bytes(data)
+            written += 1
+        return written
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _keys(self, shortcode: Optional[str]) -> List[Tuple[str, str]]:
+        """Lists (shortcode, kind) pairs, optionally for a single reel."""
+        query = "SELECT shortcode, kind FROM artifacts"
+        params: Tuple[str, ...] = ()
+        if shortcode:
+            query += " WHERE shortcode = ?"
+            params = (shortcode,)
+        with self._lock:
+            return self._connection.execute(query + " ORDER BY id", params).fetchall()
+
+
+def pack_uri(shortcode: str, kind: str) -> str:
+    """Builds the `pack://<shortcode>/<kind>` URI of an artifact."""
+    return f"{PACK_URI_PREFIX}{shortcode}/{kind}"
+
+
+def is_pack_uri(path: Optional[str]) -> bool:
+    """Checks whether a result path refers to a packed artifact."""
+    return bool(path) and str(path).startswith(PACK_URI_PREFIX)
+
+
+def parse_pack_uri(uri: str) -> Tuple[str, str]:
+    """Splits a `pack://` URI into shortcode and kind."""
+    shortcode, _, kind = uri[len(PACK_URI_PREFIX) :].rpartition("/")
+    return shortcode, kind
+
+
+def _compress(codec: str, data: bytes) -> Tuple[str, bytes]:
+    """Compresses data, keeping it raw when compression does not pay off."""
+    if codec == "zstd":
+        compressed = lazy_import_zstandard().ZstdCompressor(level=10).compress(data)
+    elif codec == "zlib":
+        compressed = zlib.compress(data, 6)
+    else:
+        return "none", data
+    if len(compressed) >= len(data):
+        return "none", data
+    return codec, compressed
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    """Reverses `_compress` for a stored codec."""
+    if codec == "zstd":
+        return lazy_import_zstandard().ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    return bytes(data)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point for exporting packed artifacts to files.
+
+    Args:
+        argv: Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Work with small artifacts packed by the 'pack' storage backend."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Write artifacts to files")
+    export_parser.add_argument("downloads_dir")
+    export_parser.add_argument("destination")
+    export_parser.add_argument("--shortcode")
+    args = parser.parse_args(argv)
+
+    store = PackStore(Path(args.downloads_dir) / "packs.sqlite3")
+    try:
+        written = store.export(args.destination, args.shortcode)
+    finally:
+        store.close()
+    print(f"Exported {written} files to {args.destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
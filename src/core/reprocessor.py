@@ -0,0 +1,479 @@
+"""
+Offline reprocessing of existing session folders.
+
+Scans `downloads/session_*/reel*/` and the sharded `downloads/by-shortcode/`
+layout for reels that are missing extracted audio or a transcript (or whose
+transcript was produced by a different Whisper model), on the downloads folder
+and every additional output root, and runs only the missing
+stages from the video already on disk, without touching the network. Transcripts
+kept in the pack store count as present, redone transcripts are packed
+again, and new transcripts are added to the search index. A small mtime index in the downloads folder remembers which reel folders
+are complete, so re-running the command only inspects folders that changed
+since the last run.
+
+Usage:
+    python -m src.core.reprocessor [downloads_dir] --stages audio transcribe
+    python -m src.core.reprocessor downloads --model small
+    python -m src.core.reprocessor downloads --output-root /mnt/disk2/reels
+"""
+
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from src.agents import instaloader as instaloader_agent
+from src.core.audio_cache import AudioCache
+from src.core.layout import CANONICAL_NAMES, LAYOUT_DIR_NAME, ShardedLayout
+from src.core.manifest import completed_entries
+from src.core.pack_store import PackStore, pack_uri
+from src.core.search_index import SearchIndex
+from src.core.transcriber import DEFAULT_WHISPER_MODEL, AudioTranscriber
+from src.utils.atomic_writer import atomic_write_text
+
+INDEX_FILE_NAME = ".reprocess_index.json"
+PACKS_FILE_NAME = "packs.sqlite3"
+SEARCH_FILE_NAME = "search.sqlite3"
+STAGES = ("audio", "transcribe")
+
+
+def version_tag(model: str) -> str:
+    """Returns the version tag recorded for transcripts of a Whisper model."""
+    return f"whisper-{model}"
+
+
+# Version tag recorded for transcripts produced by the bundled Whisper model
+MODEL_VERSION = version_tag(DEFAULT_WHISPER_MODEL)
+
+
+@dataclass
+class ReprocessTask:
+    """
+    A reel folder together with the stages it still needs.
+
+    Attributes:
+        reel_folder: Path to the reel folder.
+        reel_number: Sequential number of the reel in its session.
+        stages: Stages that must run for this reel.
+        shortcode: The reel's shortcode, if known. Needed for packed transcripts.
+        sharded: Whether the folder is in the sharded layout and uses canonical
+                 file names.
+    """
+
+    reel_folder: Path
+    reel_number: int
+    stages: List[str] = field(default_factory=list)
+    shortcode: Optional[str] = None
+    sharded: bool = False
+
+    def path(self, kind: str) -> Path:
+        """Returns the path of the reel's video, audio or transcript file."""
+        if self.sharded:
+            return self.reel_folder / CANONICAL_NAMES[kind]
+        return self.reel_folder / NUMBERED_NAMES[kind].format(n=self.reel_number)
+
+
+# Download option -> file name inside a session's reel folder
+NUMBERED_NAMES = {
+    "video": "video{n}.mp4",
+    "audio": "audio{n}.mp3",
+    "transcribe": "transcript{n}.txt",
+}
+
+
+class Reprocessor:
+    """
+    Finds reels with missing outputs and fills them in from local files.
+
+    Audio extraction runs in parallel on a thread pool. Transcription shares a
+    single Whisper model, so those calls are serialized while other reels keep
+    extracting audio.
+    """
+
+    def __init__(
+        self,
+        base_download_dir: Union[str, Path] = "downloads",
+        stages: Sequence[str] = STAGES,
+        workers: int = 4,
+        model: str = DEFAULT_WHISPER_MODEL,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        output_roots: Optional[Sequence[Union[str, Path]]] = None,
+    ):
+        """
+        Initializes the Reprocessor.
+
+        Args:
+            base_download_dir: The folder containing `session_*` folders.
+            stages: Stages to backfill, any of "audio" and "transcribe".
+            workers: Number of reels processed in parallel.
+            model: Whisper model used for transcription, e.g. "base" or "small".
+                   Transcripts recorded with another model are redone.
+            progress_callback: Optional function receiving status messages.
+            output_roots: Additional output volumes holding session folders.
+                          The index, pack store and audio cache stay in the
+                          base folder.
+        """
+        self.base_download_dir = Path(base_download_dir)
+        self.roots = [self.base_download_dir] + [
+            Path(root)
+            for root in output_roots or []
+            if Path(root) != self.base_download_dir
+        ]
+        self.stages = [stage for stage in STAGES if stage in stages]
+        self.workers = max(1, workers)
+        self.model = model
+        self.model_version = version_tag(model)
+        self.progress_callback = progress_callback or (lambda message: None)
+        self.index_path = self.base_download_dir / INDEX_FILE_NAME
+        self.index: Dict[str, Dict[str, Any]] = self._load_index()
+        self._index_lock = threading.Lock()
+        self._transcribe_lock = threading.Lock()
+        self._transcriber: Optional[AudioTranscriber] = None
+        packs_path = self.base_download_dir / PACKS_FILE_NAME
+        self.pack_store = PackStore(packs_path) if packs_path.exists() else None
+        self.search_index: Optional[SearchIndex] = None
+
+    def scan(self) -> List[ReprocessTask]:
+        """
+        Finds reel folders that need at least one stage.
+
+        Folders whose mtime matches the index and that were complete on the last
+        run are skipped without listing their contents.
+
+        Returns:
+            List[ReprocessTask]: The reels to process.
+        """
+        tasks = []
+        for task in self._reels():
+            key = self._index_key(task.reel_folder)
+            entry = self.index.get(key, {})
+            if entry.get("mtime_ns") == task.reel_folder.stat().st_mtime_ns and (
+                self._entry_complete(entry)
+            ):
+                continue
+
+            task.stages = self._missing_stages(task, entry)
+            if task.stages:
+                tasks.append(task)
+            else:
+                self._record(task.reel_folder, {})
+        return tasks
+
+    def run(self) -> Dict[str, int]:
+        """
+        Scans the downloads folder and runs all missing stages.
+
+        Returns:
+            Dict[str, int]: Counts of "scanned", "processed" and "failed" reels.
+        """
+        tasks = self.scan()
+        summary = {"scanned": len(tasks), "processed": 0, "failed": 0}
+        if not tasks:
+            self._save_index()
+            self._close_pack_store()
+            return summary
+
+        if any("transcribe" in task.stages for task in tasks):
+            self._transcriber = AudioTranscriber(
+                audio_cache=AudioCache(self.base_download_dir / ".audio_cache"),
+                model_name=self.model,
+            )
+            self._transcriber.load_whisper_model(
+                lambda url, progress, status: self.progress_callback(status)
+            )
+            try:
+                self.search_index = SearchIndex(
+                    self.base_download_dir / SEARCH_FILE_NAME
+                )
+            except Exception as e:
+                print(f"Search index unavailable: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._process, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    future.result()
+                    summary["processed"] += 1
+                    self.progress_callback(f"Processed {task.reel_folder}")
+                except Exception as e:
+                    summary["failed"] += 1
+                    self.progress_callback(f"Failed {task.reel_folder}: {e}")
+
+        self._save_index()
+        self._close_pack_store()
+        if self.search_index is not None:
+            self.search_index.close()
+            self.search_index = None
+        return summary
+
+    def _reels(self) -> Iterator[ReprocessTask]:
+        """
+        Yields every reel folder once, without stages.
+
+        Session `reel{n}` folders are yielded first; symlinks into the sharded
+        layout are followed. Layout folders no session links to come last.
+        """
+        seen = set()
+        shortcodes: Dict[Path, Dict[Path, str]] = {}
+        views = [
+            view for root in self.roots for view in sorted(root.glob("session_*/reel*"))
+        ]
+        for view in views:
+            reel_number = _parse_reel_number(view)
+            if reel_number is None or not view.is_dir():
+                continue
+            folder = view.resolve()
+            if folder in seen:
+                continue
+            seen.add(folder)
+            if os.path.islink(str(view)):
+                yield ReprocessTask(
+                    view, reel_number, shortcode=folder.name, sharded=True
+                )
+            else:
+                if view.parent not in shortcodes:
+                    shortcodes[view.parent] = self._session_shortcodes(view.parent)
+                shortcode = shortcodes[view.parent].get(folder)
+                yield ReprocessTask(view, reel_number, shortcode=shortcode)
+
+        for root in self.roots:
+            for folder in sorted((root / LAYOUT_DIR_NAME).glob("*/*/*")):
+                if folder.is_dir() and folder.resolve() not in seen:
+                    yield ReprocessTask(folder, 1, shortcode=folder.name, sharded=True)
+
+    def _session_shortcodes(self, session_folder: Path) -> Dict[Path, str]:
+        """Maps a session's reel folders to shortcodes through its manifest."""
+        if self.pack_store is None:
+            return {}
+        shortcodes = {}
+        # The manifest of a session spread over volumes is in the base folder
+        manifest_folder = self.base_download_dir / session_folder.name
+        for entry in completed_entries(manifest_folder).values():
+            if entry.get("folder_path") and entry.get("shortcode"):
+                folder = Path(entry["folder_path"]).resolve()
+                shortcodes[folder] = entry["shortcode"]
+        return shortcodes
+
+    def _process(self, task: ReprocessTask):
+        """
+        Runs the missing stages of a single reel.
+
+        Args:
+            task: The reel and the stages it needs.
+
+        Raises:
+            RuntimeError: If a stage did not produce its output.
+        """
+        reel_folder, reel_number = task.reel_folder, task.reel_number
+        result: Dict[str, Any] = {"folder_path": str(reel_folder)}
+        video_path = task.path("video")
+        if video_path.exists():
+            result["video_path"] = str(video_path)
+        audio_path = task.path("audio")
+        if audio_path.exists():
+            result["audio_path"] = str(audio_path)
+
+        completed: Dict[str, Any] = {}
+        if "audio" in task.stages:
+            if not instaloader_agent.extract_audio(video_path, audio_path):
+                raise RuntimeError("Audio extraction failed")
+            result["audio_path"] = str(audio_path)
+            completed["audio"] = True
+
+        if "transcribe" in task.stages:
+            if self._transcriber is None:
+                raise RuntimeError("Transcriber is not available")
+            with self._transcribe_lock:
+                self._transcriber.transcribe_audio_from_reel(
+                    reel_folder, reel_number, result
+                )
+            if "transcript_path" not in result:
+                raise RuntimeError(result.get("transcript", "Transcription failed"))
+            result = self._store_transcript(task, result)
+            if self.search_index is not None:
+                try:
+                    self.search_index.add_result(None, task.shortcode, result)
+                except Exception as e:
+                    print(f"Search index update failed: {e}")
+            completed["transcribe"] = self.model_version
+
+        self._record(reel_folder, completed)
+
+    def _store_transcript(
+        self, task: ReprocessTask, result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Puts a new transcript where the reel keeps it.
+
+        A transcript that was packed is packed again; in the sharded layout the
+        file is renamed to its canonical name.
+
+        Args:
+            task: The reel that was transcribed.
+            result: The result holding the transcript file written by the
+                    transcriber.
+
+        Returns:
+            Dict[str, Any]: The result pointing at the stored transcript.
+        """
+        transcript_path = result["transcript_path"]
+        if self._is_packed(task):
+            self.pack_store.put_file(task.shortcode, "transcribe", transcript_path)
+            os.remove(transcript_path)
+            return {**result, "transcript_path": pack_uri(task.shortcode, "transcribe")}
+        if task.sharded:
+            layout = ShardedLayout(task.reel_folder.resolve().parents[2])
+            adopted = layout.adopt(task.shortcode, {"transcript_path": transcript_path})
+            return {**result, **adopted}
+        return result
+
+    def _missing_stages(self, task: ReprocessTask, entry: Dict[str, Any]) -> List[str]:
+        """
+        Determines which requested stages a reel folder still needs.
+
+        Args:
+            task: The reel folder.
+            entry: The reel's index entry, possibly empty.
+
+        Returns:
+            List[str]: The stages to run.
+        """
+        if not task.path("video").exists():
+            return []
+
+        missing = []
+        if "audio" in self.stages and not task.path("audio").exists():
+            missing.append("audio")
+        if "transcribe" in self.stages:
+            transcript_exists = task.path("transcribe").exists() or (
+                self._is_packed(task)
+            )
+            # Transcripts made before the index existed are assumed to be current
+            recorded_version = entry.get("stages", {}).get(
+                "transcribe", self.model_version
+            )
+            if not transcript_exists or recorded_version != self.model_version:
+                missing.append("transcribe")
+        return missing
+
+    def _close_pack_store(self):
+        """Closes the pack store, if one is open."""
+        if self.pack_store is not None:
+            self.pack_store.close()
+            self.pack_store = None
+
+    def _is_packed(self, task: ReprocessTask) -> bool:
+        """Checks whether the reel's transcript is kept in the pack store."""
+        if self.pack_store is None or not task.shortcode:
+            return False
+        return self.pack_store.stat(task.shortcode, "transcribe") is not None
+
+    def _entry_complete(self, entry: Dict[str, Any]) -> bool:
+        """Checks whether an index entry covers all requested stages."""
+        done = entry.get("stages", {})
+        for stage in self.stages:
+            if stage == "transcribe":
+                if done.get(stage, self.model_version) != self.model_version:
+                    return False
+            elif stage not in done:
+                return False
+        return entry.get("complete", False)
+
+    def _record(self, reel_folder: Path, completed: Dict[str, Any]):
+        """Marks a reel folder as complete in the index at its current mtime."""
+        key = self._index_key(reel_folder)
+        with self._index_lock:
+            entry = self.index.setdefault(key, {"stages": {}})
+            entry["stages"].update(completed)
+            for stage in self.stages:
+                entry["stages"].setdefault(
+                    stage, self.model_version if stage == "transcribe" else True
+                )
+            entry["mtime_ns"] = reel_folder.stat().st_mtime_ns
+            entry["complete"] = True
+
+    def _index_key(self, reel_folder: Path) -> str:
+        """
+        Returns the index key of a reel folder.
+
+        Folders in the downloads folder are keyed relative to it, folders on
+        other output roots by their absolute path.
+        """
+        try:
+            return reel_folder.relative_to(self.base_download_dir).as_posix()
+        except ValueError:
+            return reel_folder.resolve().as_posix()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Loads the mtime index, returning an empty index on any error."""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("folders", {})
+        except Exception:
+            return {}
+
+    def _save_index(self):
+        """Writes the mtime index atomically."""
+        self.base_download_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.index_path, json.dumps({"folders": self.index}))
+
+
+def _parse_reel_number(reel_folder: Path) -> Optional[int]:
+    """Extracts N from a `reelN` folder name."""
+    suffix = reel_folder.name[len("reel") :]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point for offline reprocessing.
+
+    Args:
+        argv: Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Backfill audio and transcripts for existing downloads."
+    )
+    parser.add_argument("downloads_dir", nargs="?", default="downloads")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_WHISPER_MODEL,
+        help="Whisper model to transcribe with; transcripts made with another "
+        "model are redone",
+    )
+    parser.add_argument(
+        "--output-root",
+        action="append",
+        dest="output_roots",
+        help="Additional output volume to scan; may be repeated",
+    )
+    args = parser.parse_args(argv)
+
+    reprocessor = Reprocessor(
+        args.downloads_dir,
+        args.stages,
+        args.workers,
+        model=args.model,
+        progress_callback=print,
+        output_roots=args.output_roots,
+    )
+    summary = reprocessor.run()
+    print(
+        f"Scanned {summary['scanned']} reels: "
+        f"{summary['processed']} processed, {summary['failed']} failed"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
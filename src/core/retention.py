@@ -0,0 +1,672 @@
+"""
+Disk-space admission control and retention of old downloads.
+
+Nothing used to stop a batch from filling the disk halfway through, which left
+cascades of corrupted partial files, and nothing ever cleaned up old sessions.
+
+`DiskAdmission` estimates the size of each reel before it is downloaded (from
+the Content-Length when known, otherwise from the average artifact sizes in the
+download index) and holds the reel while the free space of its volume, minus
+what in-flight reels have reserved, would drop below a threshold.
+
+`RetentionManager` enforces quotas over session folders (maximum age, then
+least recently used until a total size budget is met), trims the audio cache to
+its budget, purges index entries of deleted files and garbage-collects blobs.
+A blob is only deleted when no index entry references its hash and no file
+links to it anymore.
+
+In the sharded layout a session folder only holds `reel{n}` views of folders
+under `by-shortcode/`. Those folders are measured with the sessions that link
+to them and deleted once every session linking to them is. Sessions of batches
+still running in this process (see `hold_session`) and sessions unfinished
+jobs in the job store will resume are never deleted.
+
+Usage:
+    python -m src.core.retention downloads --max-age-days 30 --max-size-gb 200
+    python -m src.core.retention downloads --max-size-gb 200 --dry-run
+"""
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.core.audio_cache import AudioCache, DEFAULT_CACHE_BUDGET
+from src.core.blob_store import remove_file, remove_tree
+from src.core.data_models import option_enabled
+from src.core.download_index import ARTIFACT_KINDS, DownloadIndex
+from src.core.job_store import JobStore
+from src.core.layout import LAYOUT_DIR_NAME
+from src.core.manifest import completed_entries
+from src.core.search_index import SearchIndex
+from src.core.volumes import Volume
+
+# Size assumed per artifact kind before the index has any history
+DEFAULT_ESTIMATES = {
+    "video": 20 * 1024 * 1024,
+    "thumbnail": 200 * 1024,
+    "audio": 2 * 1024 * 1024,
+    "caption": 4 * 1024,
+    "transcribe": 8 * 1024,
+}
+
+# A file's (st_dev, st_ino): hardlinks to the same data share it
+FileKey = Tuple[int, int]
+
+# Names of the session folders batches in this process are writing to
+_held_sessions: Dict[str, int] = {}
+_held_lock = threading.Lock()
+
+
+def hold_session(name: str):
+    """
+    Protects a session from retention while a batch writes to it.
+
+    Args:
+        name: The session folder's name; pair with `release_session`.
+    """
+    with _held_lock:
+        _held_sessions[name] = _held_sessions.get(name, 0) + 1
+
+
+def release_session(name: str):
+    """Ends a `hold_session`."""
+    with _held_lock:
+        count = _held_sessions.pop(name, 0) - 1
+        if count > 0:
+            _held_sessions[name] = count
+
+
+def held_sessions() -> List[str]:
+    """Returns the names of the sessions held by running batches."""
+    with _held_lock:
+        return list(_held_sessions)
+
+
+class DiskAdmission:
+    """
+    Holds downloads while their volume is short of free space.
+
+    Reservations of admitted but unfinished reels count against free space, so
+    concurrent downloads cannot all be admitted into the same last gigabyte.
+    """
+
+    def __init__(
+        self,
+        min_free_bytes: int,
+        download_index: Optional[DownloadIndex] = None,
+        poll_interval: float = 5.0,
+    ):
+        """
+        Initializes the DiskAdmission.
+
+        Args:
+            min_free_bytes: Free space that must remain after a reel is written.
+            download_index: Index providing historical artifact sizes. They
+                            are read once, on the first estimate.
+            poll_interval: Seconds between free space checks while waiting.
+        """
+        self.min_free_bytes = min_free_bytes
+        self.download_index = download_index
+        self.poll_interval = poll_interval
+        self._reserved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._averages: Optional[Dict[str, float]] = None
+        self._averages_lock = threading.Lock()
+
+    def estimate(
+        self, download_options: Dict[str, Any], content_length: Optional[int] = None
+    ) -> int:
+        """
+        Estimates how many bytes a reel will write.
+
+        Args:
+            download_options: The options of the reel; only enabled kinds count.
+            content_length: The video's Content-Length, if already known.
+
+        Returns:
+            int: The estimated size in bytes.
+        """
+        averages = self._average_sizes()
+        total = 0.0
+        for kind in ARTIFACT_KINDS:
+            if not option_enabled(download_options, kind):
+                continue
+            if kind == "video" and content_length:
+                total += content_length
+            else:
+                total += averages.get(kind) or DEFAULT_ESTIMATES[kind]
+        return int(total)
+
+    def _average_sizes(self) -> Dict[str, float]:
+        """Returns the indexed average artifact sizes, querying them only once."""
+        with self._averages_lock:
+            if self._averages is None:
+                self._averages = {}
+                if self.download_index is not None:
+                    try:
+                        self._averages = self.download_index.average_sizes()
+                    except Exception as e:
+                        print(f"Could not read size history: {e}")
+            return self._averages
+
+    def admit(
+        self,
+        volume: Volume,
+        estimate: int,
+        should_continue: Callable[[], bool] = lambda: True,
+        on_wait: Optional[Callable[[int], None]] = None,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> bool:
+        """
+        Waits until a volume has room for a reel, then reserves the space.
+
+        Args:
+            volume: The volume the reel will be written to.
+            estimate: The reel's estimated size in bytes.
+            should_continue: Polled while waiting; returning False gives up.
+            on_wait: Called with the current free bytes whenever the reel has
+                     to wait.
+            sleep: Waits between checks; e.g. a cancellation token's `wait`,
+                   which returns as soon as the download is stopped.
+
+        Returns:
+            bool: True if admitted (release the reservation afterwards), False
+            if waiting was cancelled.
+        """
+        while True:
+            with self._lock:
+                reserved = self._reserved.get(volume.name, 0)
+                free = volume.free_bytes() - reserved
+                if free - estimate >= self.min_free_bytes:
+                    self._reserved[volume.name] = reserved + estimate
+                    return True
+            if not should_continue():
+                return False
+            if on_wait:
+                on_wait(free)
+            sleep(self.poll_interval)
+
+    def release(self, volume: Volume, estimate: int):
+        """
+        Releases the reservation of a finished (or failed) reel.
+
+        Args:
+            volume: The volume passed to `admit`.
+            estimate: The estimate passed to `admit`.
+        """
+        with self._lock:
+            remaining = self._reserved.get(volume.name, 0) - estimate
+            self._reserved[volume.name] = max(0, remaining)
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Quotas enforced by `RetentionManager`. Limits left as None are not enforced.
+
+    An `audio_cache_bytes` of 0 leaves the audio cache alone, as when the
+    downloader runs with the cache disabled.
+    """
+
+    max_age_days: Optional[float] = None
+    max_total_bytes: Optional[int] = None
+    keep_latest: int = 1
+    audio_cache_bytes: int = DEFAULT_CACHE_BUDGET
+
+
+@dataclass
+class SessionUsage:
+    """
+    Disk usage of one session across all output volumes.
+
+    `size` counts the session's own files, each hardlinked file once; `files`
+    maps their `FileKey`s onto the number of links the session holds. `reels`
+    maps the sharded-layout reel folders it links to onto their sizes.
+    `freed` and `freed_reels` are set by `RetentionManager.plan`: the bytes
+    deleting the session frees and the reel folders no remaining session links
+    to afterwards.
+    """
+
+    name: str
+    folders: List[Path] = field(default_factory=list)
+    size: int = 0
+    created_at: float = 0.0
+    last_used: float = 0.0
+    files: Dict[FileKey, int] = field(default_factory=dict)
+    reels: Dict[Path, int] = field(default_factory=dict)
+    freed: int = 0
+    freed_reels: List[Path] = field(default_factory=list)
+
+
+@dataclass
+class _Inventory:
+    """
+    Everything `RetentionManager` measured in one pass.
+
+    Attributes:
+        sessions: The sessions, oldest first.
+        inodes: Size and link count of every file found, by `FileKey`.
+        reel_files: Links held by each sharded-layout reel folder.
+        store_links: Links held by the blob stores. Those are dropped by
+                     `collect_blobs` once nothing else links to a blob.
+    """
+
+    sessions: List[SessionUsage]
+    inodes: Dict[FileKey, Tuple[int, int]]
+    reel_files: Dict[Path, Dict[FileKey, int]]
+    store_links: Dict[FileKey, int]
+
+
+class RetentionManager:
+    """
+    Deletes old sessions and unreferenced blobs according to a policy.
+    """
+
+    def __init__(
+        self,
+        base_download_dir: Union[str, Path] = "downloads",
+        policy: Optional[RetentionPolicy] = None,
+        output_roots: Optional[Sequence[Union[str, Path]]] = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        job_store: Optional[JobStore] = None,
+    ):
+        """
+        Initializes the RetentionManager.
+
+        Args:
+            base_download_dir: The folder holding sessions, indexes and caches.
+            policy: The quotas to enforce.
+            output_roots: Additional output volumes holding session folders.
+            progress_callback: Optional function receiving status messages.
+            job_store: The job store whose unfinished jobs' sessions are kept;
+                       defaults to `jobs.sqlite3` in the base folder, if any.
+        """
+        self.base_download_dir = Path(base_download_dir)
+        self.policy = policy or RetentionPolicy()
+        self.roots = [self.base_download_dir] + [
+            Path(root)
+            for root in output_roots or []
+            if Path(root) != self.base_download_dir
+        ]
+        self.progress_callback = progress_callback or (lambda message: None)
+        self.job_store = job_store
+
+    def sessions(self) -> List[SessionUsage]:
+        """
+        Measures every session, merging its folders on all volumes.
+
+        Returns:
+            List[SessionUsage]: Sessions ordered from oldest to newest.
+        """
+        return self._inventory().sessions
+
+    def _inventory(self) -> _Inventory:
+        """Measures every session, layout reel and blob store on all volumes."""
+        sessions: Dict[str, SessionUsage] = {}
+        inodes: Dict[FileKey, Tuple[int, int]] = {}
+        layout_roots = [
+            (root / LAYOUT_DIR_NAME).resolve()
+            for root in self.roots
+            if (root / LAYOUT_DIR_NAME).is_dir()
+        ]
+        reel_files: Dict[Path, Dict[FileKey, int]] = {}
+        reel_used: Dict[Path, float] = {}
+        for root in self.roots:
+            for folder in root.glob("session_*"):
+                if not folder.is_dir():
+                    continue
+                usage = sessions.setdefault(folder.name, SessionUsage(folder.name))
+                created_at, last_used, files = _measure(folder, inodes)
+                usage.folders.append(folder)
+                for key, links in files.items():
+                    if key not in usage.files:
+                        usage.size += inodes[key][0]
+                    usage.files[key] = usage.files.get(key, 0) + links
+                usage.created_at = max(usage.created_at, created_at)
+                usage.last_used = max(usage.last_used, last_used)
+                for reel in _layout_reels(folder, layout_roots):
+                    if reel not in reel_files:
+                        _, reel_used[reel], reel_files[reel] = _measure(reel, inodes)
+                    usage.reels[reel] = sum(inodes[key][0] for key in reel_files[reel])
+                    usage.last_used = max(usage.last_used, reel_used[reel])
+
+        store_links: Dict[FileKey, int] = {}
+        for root in self.roots:
+            for blob in (root / ".blobs" / "objects").glob("*/*"):
+                try:
+                    stat = blob.lstat()
+                except OSError:
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                inodes[key] = (stat.st_size, stat.st_nlink)
+                store_links[key] = store_links.get(key, 0) + 1
+        return _Inventory(
+            sorted(sessions.values(), key=lambda usage: usage.name),
+            inodes,
+            reel_files,
+            store_links,
+        )
+
+    def plan(self, exclude: Sequence[str] = ()) -> List[SessionUsage]:
+        """
+        Selects the sessions to delete.
+
+        Sessions older than `max_age_days` go first; then the least recently
+        used sessions until the total fits `max_total_bytes`. The newest
+        `keep_latest` sessions, `exclude`, sessions held by running batches
+        and sessions of unfinished jobs are never selected. A sharded-layout
+        reel folder counts once towards the total and is freed with the last
+        session linking to it.
+
+        The total counts every file once, however many sessions hardlink it,
+        and includes the blob stores. A file only counts as freed once no
+        link to it is left other than its blob, which `collect_blobs` then
+        deletes.
+
+        Args:
+            exclude: Session names to keep, e.g. the running session.
+
+        Returns:
+            List[SessionUsage]: The sessions to delete.
+        """
+        inventory = self._inventory()
+        sessions = inventory.sessions
+        inodes = inventory.inodes
+        protected = {usage.name for usage in sessions[-self.policy.keep_latest :]}
+        if self.policy.keep_latest <= 0:
+            protected = set()
+        protected.update(exclude)
+        protected.update(held_sessions())
+        protected.update(self._unfinished_sessions())
+        candidates = [usage for usage in sessions if usage.name not in protected]
+
+        # Sessions still linking to each reel folder
+        links: Dict[Path, set] = {}
+        for usage in sessions:
+            for reel in usage.reels:
+                links.setdefault(reel, set()).add(usage.name)
+        # Links to each file that deleting sessions can release
+        remaining = {
+            key: nlink - inventory.store_links.get(key, 0)
+            for key, (_, nlink) in inodes.items()
+        }
+        total = sum(size for size, _ in inodes.values())
+
+        def release(files: Dict[FileKey, int]) -> int:
+            freed = 0
+            for key, count in files.items():
+                before = remaining[key]
+                remaining[key] -= count
+                if before > 0 >= remaining[key]:
+                    freed += inodes[key][0]
+            return freed
+
+        selected: List[SessionUsage] = []
+
+        def select(usage: SessionUsage):
+            selected.append(usage)
+            usage.freed = release(usage.files)
+            usage.freed_reels = []
+            for reel in usage.reels:
+                links[reel].discard(usage.name)
+                if not links[reel]:
+                    usage.freed += release(inventory.reel_files[reel])
+                    usage.freed_reels.append(reel)
+
+        if self.policy.max_age_days is not None:
+            cutoff = time.time() - self.policy.max_age_days * 86400
+            for usage in candidates:
+                if usage.created_at < cutoff:
+                    select(usage)
+                    total -= usage.freed
+
+        if self.policy.max_total_bytes is not None:
+            for usage in sorted(candidates, key=lambda usage: usage.last_used):
+                if total <= self.policy.max_total_bytes:
+                    break
+                if usage not in selected:
+                    select(usage)
+                    total -= usage.freed
+        return selected
+
+    def apply(
+        self, dry_run: bool = False, exclude: Sequence[str] = ()
+    ) -> Dict[str, int]:
+        """
+        Enforces the policy.
+
+        Args:
+            dry_run: Only report what would be deleted.
+            exclude: Session names to keep, e.g. the running session.
+
+        Returns:
+            Dict[str, int]: Counts of deleted sessions, freed bytes, purged
+            index rows and collected blobs.
+        """
+        summary = {"sessions": 0, "freed_bytes": 0, "index_rows": 0, "blobs": 0}
+        for usage in self.plan(exclude):
+            self.progress_callback(
+                f"{'Would delete' if dry_run else 'Deleting'} {usage.name} "
+                f"({usage.freed / (1024 * 1024):.1f} MB)"
+            )
+            summary["sessions"] += 1
+            summary["freed_bytes"] += usage.freed
+            if not dry_run:
+                for folder in usage.folders:
+                    remove_tree(folder)
+                for reel in usage.freed_reels:
+                    _remove_reel(reel)
+        if dry_run:
+            return summary
+
+        if self.policy.audio_cache_bytes:
+            AudioCache(
+                self.base_download_dir / ".audio_cache", self.policy.audio_cache_bytes
+            ).evict()
+        summary["index_rows"] = self._purge_indexes()
+        summary["blobs"] = self.collect_blobs()
+        return summary
+
+    def collect_blobs(self) -> int:
+        """
+        Deletes blobs that nothing refers to anymore.
+
+        A blob is kept if the download index references its hash or if any
+        file is still hardlinked to it. Without a download index nothing is
+        deleted.
+
+        Returns:
+            int: The number of blobs deleted.
+        """
+        index_path = self.base_download_dir / "index.sqlite3"
+        if not index_path.exists():
+            return 0
+        index = DownloadIndex(index_path)
+        try:
+            referenced = index.referenced_hashes()
+        finally:
+            index.close()
+
+        deleted = 0
+        for root in self.roots:
+            for blob in (root / ".blobs" / "objects").glob("*/*"):
+                if blob.name.endswith(".tmp"):
+                    continue
+                digest = blob.parent.name + blob.name
+                try:
+                    if digest in referenced or blob.stat().st_nlink > 1:
+                        continue
+                    remove_file(blob)
+                    deleted += 1
+                except OSError:
+                    continue
+        return deleted
+
+    def _unfinished_sessions(self) -> List[str]:
+        """Returns the names of the sessions unfinished jobs will resume."""
+        if self.job_store is not None:
+            folders = self.job_store.unfinished_sessions()
+        else:
+            jobs_path = self.base_download_dir / "jobs.sqlite3"
+            if not jobs_path.exists():
+                return []
+            job_store = JobStore(jobs_path)
+            try:
+                folders = job_store.unfinished_sessions()
+            finally:
+                job_store.close()
+        return [Path(folder).name for folder in folders]
+
+    def _purge_indexes(self) -> int:
+        """Removes index and search entries of files that were deleted."""
+        purged = 0
+        index_path = self.base_download_dir / "index.sqlite3"
+        if index_path.exists():
+            index = DownloadIndex(index_path)
+            try:
+                purged = index.purge_missing()
+            finally:
+                index.close()
+
+        search_path = self.base_download_dir / "search.sqlite3"
+        if search_path.exists():
+            search_index = SearchIndex(search_path)
+            try:
+                search_index.purge_missing()
+            finally:
+                search_index.close()
+        return purged
+
+
+def _measure(
+    folder: Path, inodes: Dict[FileKey, Tuple[int, int]]
+) -> Tuple[float, float, Dict[FileKey, int]]:
+    """
+    Measures a session or reel folder.
+
+    Args:
+        folder: The folder to walk; symlinks are not followed.
+        inodes: Updated with the size and link count of every file found.
+
+    Returns:
+        Tuple[float, float, Dict[FileKey, int]]: The creation time, the last
+        use time, and the number of links to each file inside the folder.
+    """
+    try:
+        # Folders of batches started in the same second end in "_<n>"
+        stamp = folder.name[: len("session_YYYYmmdd_HHMMSS")]
+        created_at = datetime.strptime(stamp, "session_%Y%m%d_%H%M%S").timestamp()
+    except ValueError:
+        created_at = folder.stat().st_mtime
+    files: Dict[FileKey, int] = {}
+    last_used = created_at
+    for dirpath, _, filenames in os.walk(folder):
+        for file_name in filenames:
+            try:
+                stat = os.lstat(os.path.join(dirpath, file_name))
+            except OSError:
+                continue
+            key = (stat.st_dev, stat.st_ino)
+            inodes[key] = (stat.st_size, stat.st_nlink)
+            files[key] = files.get(key, 0) + 1
+            last_used = max(last_used, stat.st_atime, stat.st_mtime)
+    return created_at, last_used, files
+
+
+def _layout_reels(folder: Path, layout_roots: Sequence[Path]) -> List[Path]:
+    """
+    Returns the sharded-layout reel folders a session links to.
+
+    They are found through the session's `reel{n}` symlinks and, where
+    symlinks are not available, through the file paths in its manifest. Only
+    folders exactly at `<layout root>/<ab>/<cd>/<shortcode>` are returned.
+    """
+    if not layout_roots:
+        return []
+    candidates = [entry for entry in folder.glob("reel*") if os.path.islink(str(entry))]
+    try:
+        for entry in completed_entries(folder).values():
+            for info in entry.get("files", {}).values():
+                if info.get("path"):
+                    candidates.append(Path(info["path"]).parent)
+    except (OSError, ValueError):
+        pass
+
+    reels: List[Path] = []
+    for candidate in candidates:
+        try:
+            reel = candidate.resolve()
+        except OSError:
+            continue
+        for layout_root in layout_roots:
+            try:
+                depth = len(reel.relative_to(layout_root).parts)
+            except ValueError:
+                continue
+            if depth == 3 and reel.is_dir() and reel not in reels:
+                reels.append(reel)
+    return reels
+
+
+def _remove_reel(reel: Path):
+    """Deletes a sharded-layout reel folder and the shard folders it empties."""
+    remove_tree(reel)
+    for shard in (reel.parent, reel.parent.parent):
+        try:
+            shard.rmdir()
+        except OSError:
+            break
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point for enforcing retention quotas.
+
+    Args:
+        argv: Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Delete old download sessions and unreferenced blobs."
+    )
+    parser.add_argument("downloads_dir", nargs="?", default="downloads")
+    parser.add_argument("--max-age-days", type=float)
+    parser.add_argument("--max-size-gb", type=float)
+    parser.add_argument("--keep-latest", type=int, default=1)
+    parser.add_argument(
+        "--audio-cache-mb", type=float, default=DEFAULT_CACHE_BUDGET / (1024 * 1024)
+    )
+    parser.add_argument("--output-root", action="append", dest="output_roots")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    policy = RetentionPolicy(
+        max_age_days=args.max_age_days,
+        max_total_bytes=(
+            int(args.max_size_gb * 1024**3) if args.max_size_gb is not None else None
+        ),
+        keep_latest=args.keep_latest,
+        audio_cache_bytes=int(args.audio_cache_mb * 1024 * 1024),
+    )
+    manager = RetentionManager(
+        args.downloads_dir, policy, args.output_roots, progress_callback=print
+    )
+    summary = manager.apply(dry_run=args.dry_run)
+    print(
+        f"{summary['sessions']} sessions, "
+        f"{summary['freed_bytes'] / (1024 * 1024):.1f} MB freed, "
+        f"{summary['index_rows']} index entries purged, "
+        f"{summary['blobs']} blobs collected"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
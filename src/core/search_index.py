@@ -0,0 +1,345 @@
+"""
+Full-text search over captions and transcripts of all sessions.
+
+Finding a reel by a spoken phrase used to mean grepping thousands of small
+`caption{n}.txt` and `transcript{n}.txt` files. `SearchIndex` keeps them in a
+SQLite FTS5 table next to the session folders. `ReelDownloader` adds each reel's
+caption and transcript as it completes, and `rebuild()` indexes existing
+`downloads/` trees in bulk, skipping files whose mtime has not changed.
+
+Usage:
+    python -m src.core.search_index rebuild downloads
+    python -m src.core.search_index search "spoken phrase"
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from src.core.download_index import TEXT_ARTIFACTS
+from src.core.layout import LAYOUT_DIR_NAME
+from src.core.pack_store import is_pack_uri
+
+# Download option -> result key of the text file to index
+TEXT_KINDS = {"caption": "caption_path", "transcribe": "transcript_path"}
+
+# Text file name prefix -> indexed kind, used when scanning existing folders
+FILE_PREFIXES = {"caption": "caption", "transcript": "transcribe"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    url TEXT,
+    shortcode TEXT,
+    folder_path TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    text,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index of caption and transcript text.
+
+    Document metadata lives in a regular table whose rowid is shared with the
+    FTS table, so replacing a document is two primary key operations.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = "downloads/search.sqlite3"):
+        """
+        Opens (and if needed creates) the search database.
+
+        Args:
+            db_path: Location of the SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def add(
+        self,
+        path: Union[str, Path],
+        kind: str,
+        text: Optional[str] = None,
+        url: Optional[str] = None,
+        shortcode: Optional[str] = None,
+        folder_path: Optional[str] = None,
+    ):
+        """
+        Indexes (or re-indexes) a caption or transcript file.
+
+        Args:
+            path: The text file, or the `pack://` URI of a packed artifact.
+            kind: "caption" or "transcribe".
+            text: The file's text. Read from `path` when not given (required
+                  for packed artifacts).
+            url: The reel URL, if known.
+            shortcode: The reel's canonical shortcode, if known.
+            folder_path: The reel folder. Defaults to the file's parent folder.
+        """
+        if is_pack_uri(str(path)):
+            row = (str(path), kind, url, shortcode, folder_path, 0)
+        else:
+            path = Path(path)
+            if text is None:
+                with open(path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            row = (
+                str(path),
+                kind,
+                url,
+                shortcode,
+                folder_path or str(path.parent),
+                path.stat().st_mtime_ns,
+            )
+        with self._lock, self._connection:
+            self._upsert(row, text)
+
+    def add_result(
+        self, url: Optional[str], shortcode: Optional[str], result: Dict[str, Any]
+    ):
+        """
+        Indexes the caption and transcript of a download result.
+
+        Args:
+            url: The reel URL. When None, a URL already indexed is kept.
+            shortcode: The reel's canonical shortcode.
+            result: The download result dictionary.
+        """
+        for kind, key in TEXT_KINDS.items():
+            path = result.get(key)
+            if is_pack_uri(path):
+                text = result.get(TEXT_ARTIFACTS[kind])
+                if text is None:
+                    continue
+            elif path and os.path.exists(path):
+                text = None
+            else:
+                continue
+            self.add(path, kind, text, url, shortcode, result.get("folder_path"))
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Finds documents containing all words of a query, best matches first.
+
+        Args:
+            query: Words to look for. Each word is matched as a whole token;
+                   FTS5 operators are not interpreted.
+            limit: Maximum number of matches.
+
+        Returns:
+            List[Dict[str, Any]]: Matches with path, kind, url, shortcode,
+            folder_path and a highlighted snippet.
+        """
+        match = _to_match_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT d.path, d.kind, d.url, d.shortcode, d.folder_path, "
+                "snippet(documents_fts, 0, '[', ']', '…', 12) "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? ORDER BY rank LIMIT ?",
+                (match, limit),
+            ).fetchall()
+        return [
+            {
+                "path": path,
+                "kind": kind,
+                "url": url,
+                "shortcode": shortcode,
+                "folder_path": folder_path,
+                "snippet": snippet,
+            }
+            for path, kind, url, shortcode, folder_path, snippet in rows
+        ]
+
+    def rebuild(self, base_download_dir: Union[str, Path] = "downloads") -> int:
+        """
+        Brings the index in line with the text files of existing sessions.
+
+        New and modified files are (re-)indexed in one transaction, unchanged
+        files are skipped by mtime and documents whose file is gone are removed.
+
+        Args:
+            base_download_dir: The folder containing `session_*` folders.
+
+        Returns:
+            int: The number of files (re-)indexed.
+        """
+        with self._lock:
+            known = dict(
+                self._connection.execute("SELECT path, mtime_ns FROM documents")
+            )
+
+        indexed = 0
+        seen = set()
+        with self._lock, self._connection:
+            for path in _text_files(Path(base_download_dir)):
+                kind = _kind_from_name(path.name)
+                if kind is None:
+                    continue
+                seen.add(str(path))
+                mtime_ns = path.stat().st_mtime_ns
+                if known.get(str(path)) == mtime_ns:
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        text = f.read()
+                except (OSError, UnicodeDecodeError):
+                    continue
+                row = (str(path), kind, None, None, str(path.parent), mtime_ns)
+                self._upsert(row, text)
+                indexed += 1
+
+            for path in set(known) - seen:
+                if not is_pack_uri(path) and not os.path.exists(path):
+                    self._delete(path)
+
+            self._connection.execute(
+                "INSERT INTO documents_fts(documents_fts) VALUES ('optimize')"
+            )
+        return indexed
+
+    def purge_missing(self) -> int:
+        """
+        Removes documents whose file no longer exists, e.g. after retention.
+
+        Returns:
+            int: The number of documents removed.
+        """
+        with self._lock:
+            paths = [
+                path
+                for (path,) in self._connection.execute("SELECT path FROM documents")
+                if not is_pack_uri(path) and not os.path.exists(path)
+            ]
+        with self._lock, self._connection:
+            for path in paths:
+                self._delete(path)
+        return len(paths)
+
+    def close(self):
+        """Closes the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _upsert(self, row: tuple, text: str):
+        """Replaces a document. Must be called with the lock held."""
+        path, kind, url, shortcode, folder_path, mtime_ns = row
+        existing = self._connection.execute(
+            "SELECT id, url, shortcode FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+        if existing:
+            doc_id, old_url, old_shortcode = existing
+            self._connection.execute(
+                "UPDATE documents SET kind = ?, url = ?, shortcode = ?, "
+                "folder_path = ?, mtime_ns = ? WHERE id = ?",
+                (
+                    kind,
+                    url or old_url,
+                    shortcode or old_shortcode,
+                    folder_path,
+                    mtime_ns,
+                    doc_id,
+                ),
+            )
+            self._connection.execute(
+                "DELETE FROM documents_fts WHERE rowid = ?", (doc_id,)
+            )
+        else:
+            doc_id = self._connection.execute(
+                "INSERT INTO documents "
+                "(path, kind, url, shortcode, folder_path, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                row,
+            ).lastrowid
+        self._connection.execute(
+            "INSERT INTO documents_fts (rowid, text) VALUES (?, ?)", (doc_id, text)
+        )
+
+    def _delete(self, path: str):
+        """Removes a document. Must be called with the lock held."""
+        row = self._connection.execute(
+            "SELECT id FROM documents WHERE path = ?", (path,)
+        ).fetchone()
+        if row:
+            self._connection.execute("DELETE FROM documents_fts WHERE rowid = ?", row)
+            self._connection.execute("DELETE FROM documents WHERE id = ?", row)
+
+
+def _to_match_query(query: str) -> str:
+    """Quotes each word so user input cannot form FTS5 syntax."""
+    words = query.split()
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def _text_files(base_download_dir: Path) -> Iterator[Path]:
+    """Yields text files of session reel folders and the sharded layout."""
+    for path in base_download_dir.glob("session_*/reel*/*.txt"):
+        # Reel folders linked into the sharded layout are indexed from there
+        if not path.parent.is_symlink():
+            yield path
+    yield from base_download_dir.glob(f"{LAYOUT_DIR_NAME}/*/*/*/*.txt")
+
+
+def _kind_from_name(file_name: str) -> Optional[str]:
+    """Maps `caption3.txt` / `transcript.txt` and the like to the indexed kind."""
+    for prefix, kind in FILE_PREFIXES.items():
+        number = file_name[len(prefix) : -4]
+        if file_name.startswith(prefix) and (number.isdigit() or not number):
+            return kind
+    return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command line entry point for rebuilding and querying the search index.
+
+    Args:
+        argv: Command line arguments, defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The process exit code.
+    """
+    parser = argparse.ArgumentParser(
+        description="Search captions and transcripts of downloaded reels."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Index existing downloads")
+    rebuild_parser.add_argument("downloads_dir", nargs="?", default="downloads")
+    search_parser = subparsers.add_parser("search", help="Search the index")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--downloads-dir", default="downloads")
+    search_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(Path(args.downloads_dir) / "search.sqlite3")
+    try:
+        if args.command == "rebuild":
+            indexed = index.rebuild(args.downloads_dir)
+            print(f"Indexed {indexed} files")
+        else:
+            for match in index.search(args.query, args.limit):
+                print(f"{match['path']}: {match['snippet']}")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,8 @@
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence, Tuple, Union
+
+from src.core.volumes import Volume, VolumeSet
 
 
 class SessionManager:
@@ -12,30 +14,68 @@ class SessionManager:
     directory.
     """
 
-    def __init__(self, base_download_dir: str = "downloads"):
+    def __init__(
+        self,
+        base_download_dir: str = "downloads",
+        output_roots: Optional[Sequence[Union[str, Path]]] = None,
+        placement: str = "most_free",
+    ):
         """
         Initializes the SessionManager.
 
         Args:
             base_download_dir: The base directory where session folders will be created.
                                Defaults to "downloads".
+            output_roots: Optional output volumes reels are spread across. The
+                          base directory keeps the session manifest and indexes.
+            placement: Placement policy across `output_roots`, see `VolumeSet`.
         """
         self.base_download_dir = Path(base_download_dir)
         self.session_folder: Optional[Path] = None
+        self.volumes = VolumeSet(output_roots or [self.base_download_dir], placement)
 
     def setup_session_folder(self) -> Path:
         """
         Creates a new timestamped session folder for the current download session.
 
         The folder name is generated using the current date and time to ensure uniqueness.
+        A batch started in the same second as another one gets a numbered suffix.
         Parent directories are created if they don't exist.
 
         Returns:
             The Path object representing the newly created session folder.
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.session_folder = self.base_download_dir / f"session_{timestamp}"
-        self.session_folder.mkdir(parents=True, exist_ok=True)
+        self.base_download_dir.mkdir(parents=True, exist_ok=True)
+        name = f"session_{timestamp}"
+        suffix = 1
+        while True:
+            try:
+                (self.base_download_dir / name).mkdir()
+                break
+            except FileExistsError:
+                suffix += 1
+                name = f"session_{timestamp}_{suffix}"
+        self.session_folder = self.base_download_dir / name
+        return self.session_folder
+
+    def resume_session_folder(self, session_folder: Union[str, Path]) -> Path:
+        """
+        Reuses an existing session folder, e.g. to resume an interrupted batch.
+
+        Args:
+            session_folder: The session folder to continue writing into.
+
+        Returns:
+            The Path object representing the resumed session folder.
+
+        Raises:
+            FileNotFoundError: If the folder does not exist.
+        """
+        session_folder = Path(session_folder)
+        if not session_folder.is_dir():
+            raise FileNotFoundError(f"Session folder not found: {session_folder}")
+        self.session_folder = session_folder
         return self.session_folder
 
     def get_session_folder(self) -> Optional[Path]:
@@ -46,3 +86,27 @@ class SessionManager:
             A Path object if a session folder has been set up, otherwise None.
         """
         return self.session_folder
+
+    def place(self, key: str = "") -> Tuple[Path, Volume]:
+        """
+        Chooses the output volume of a reel and returns its session folder there.
+
+        Each volume gets a session folder with the same name as the main one,
+        created on first use.
+
+        Args:
+            key: A stable key of the reel (its shortcode), used by the "hash"
+                 placement policy.
+
+        Returns:
+            A tuple of the session folder on the selected volume and the volume.
+
+        Raises:
+            ValueError: If the session folder is not initialized.
+        """
+        if not self.session_folder:
+            raise ValueError("Session folder is not initialized.")
+        volume = self.volumes.select(key)
+        folder = volume.root / self.session_folder.name
+        folder.mkdir(parents=True, exist_ok=True)
+        return folder, volume
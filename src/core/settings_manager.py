@@ -2,6 +2,8 @@ import json
 from pathlib import Path
 from typing import Dict, Any
 
+from src.utils.atomic_writer import atomic_write_text
+
 
 class SettingsManager:
     """
@@ -52,8 +54,12 @@ class SettingsManager:
         """
         try:
             self.settings.update(current_settings)
-            with open(self.settings_file, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=2)
+            # Replaced atomically, so a crash never leaves a truncated file
+            atomic_write_text(
+                self.settings_file,
+                json.dumps(self.settings, indent=2),
+                fsync_policy="always",
+            )
         except Exception:
             # Log the error if a proper logging mechanism is in place
             pass
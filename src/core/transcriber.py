@@ -1,17 +1,48 @@
 import os
 import sys
+import queue
 import subprocess
+import threading
+from contextlib import ExitStack, nullcontext
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, ContextManager, Dict, Any, List, Optional, TypeVar
 
-from src.utils.lazy_imports import lazy_import_moviepy, lazy_import_whisper
+from src.utils.lazy_imports import (
+    lazy_import_moviepy,
+    lazy_import_numpy,
+    lazy_import_whisper,
+)
 from src.utils.bin_checker import (
     get_bin_dir,
+    get_ffmpeg_path,
     ensure_ffmpeg,
     ensure_whisper_model,
     is_frozen,
 )
 from src.utils.resource_loader import get_resource_path
+from src.utils.atomic_writer import AtomicWriter, default_writer
+from src.utils.cancellation import (
+    CancellationToken,
+    Cancelled,
+    call_cancellable,
+    run_process,
+)
+from src.utils.scratch import ScratchSpace, default_scratch
+from src.core.model_cache import load_mmap_model
+from src.core.audio_cache import AudioCache
+
+# Whisper expects 16 kHz mono audio and works on 30 second windows
+SAMPLE_RATE = 16000
+STREAM_WINDOW_SECONDS = 30
+# Decoded windows buffered ahead of the transcriber (about 1.9 MB each);
+# beyond that ffmpeg, and so the download feeding it, waits
+STREAM_QUEUE_WINDOWS = 4
+# Seconds between checks for a failed stream while waiting on the queue
+STREAM_POLL_INTERVAL = 0.1
+# Whisper model shipped with the application
+DEFAULT_WHISPER_MODEL = "base"
+
+T = TypeVar("T")
 
 
 class AudioTranscriber:
@@ -22,20 +53,57 @@ class AudioTranscriber:
     of audio from video files, including temporary audio extraction if needed.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        audio_cache: Optional[AudioCache] = None,
+        transcription_slot: Optional[Callable[[float], ContextManager[bool]]] = None,
+        token: Optional[CancellationToken] = None,
+        writer: Optional[AtomicWriter] = None,
+        scratch: Optional[ScratchSpace] = None,
+        model_name: str = DEFAULT_WHISPER_MODEL,
+    ):
         """
         Initializes the AudioTranscriber.
 
         The Whisper model is not loaded until `load_whisper_model` is called.
+
+        Args:
+            audio_cache (AudioCache, optional): Cache of decoded audio. When set,
+                                                audio is decoded once per source file
+                                                and re-read from the cache afterwards.
+            transcription_slot (callable, optional): Called with the seconds of audio
+                                                     about to be transcribed; returns a
+                                                     context manager held around each
+                                                     Whisper call, yielding False if the
+                                                     call must not run. Used to share
+                                                     transcription between batches.
+            token (CancellationToken, optional): Pauses or cancels transcription
+                                                 between Whisper calls; a cancelled
+                                                 call is no longer waited for.
+            writer (AtomicWriter, optional): Writes transcripts; defaults to the
+                                             shared writer.
+            scratch (ScratchSpace, optional): Holds temporary audio; defaults to the
+                                              shared scratch space.
+            model_name (str): Name of the Whisper model, e.g. "base" or "small".
+                              Models other than the bundled one are loaded from
+                              `<name>.pt` next to it if present, otherwise fetched
+                              by Whisper.
         """
         self.whisper_model: Optional[Any] = None
+        self.model_name = model_name
+        self.audio_cache = audio_cache
+        self.transcription_slot = transcription_slot or _no_slot
+        self.token = token
+        self.writer = writer or default_writer
+        self.scratch = scratch or default_scratch
 
     def load_whisper_model(self, progress_callback=None):
         """
         Loads the OpenAI Whisper model.
 
-        The model is loaded only once. If a `progress_callback` is provided,
-        it will be used to report the loading status.
+        The model is loaded only once. Weights are memory-mapped from a converted
+        checkpoint cache so that several workers share the same pages. If a
+        `progress_callback` is provided, it will be used to report the loading status.
 
         Args:
             progress_callback (callable, optional): A function to report progress.
@@ -47,17 +115,21 @@ class AudioTranscriber:
         if progress_callback:
             progress_callback("", 5, "Loading Whisper model...")
         try:
+            bundled = self.model_name == DEFAULT_WHISPER_MODEL
             # Ensure whisper model exists in frozen state
-            if not ensure_whisper_model(progress_callback):
+            if bundled and not ensure_whisper_model(progress_callback):
                 raise FileNotFoundError("Failed to download Whisper model files")
 
             whisper_module = lazy_import_whisper()
             model_dir = Path(get_bin_dir()).parent / "whisper"
 
             # Verify model file and assets exist
-            model_file = model_dir / "base.pt"
+            model_file = model_dir / f"{self.model_name}.pt"
             assets_dir = model_dir / "assets"
 
+            if not bundled and not model_file.exists():
+                self.whisper_model = whisper_module(self.model_name, device="cpu")
+                return
             if not model_file.exists():
                 raise FileNotFoundError(f"Model file not found: {model_file}")
             if not assets_dir.exists() or not any(assets_dir.iterdir()):
@@ -65,8 +137,13 @@ class AudioTranscriber:
                     f"Assets directory missing or empty: {assets_dir}"
                 )
 
-            # Load the model
-            self.whisper_model = whisper_module(str(model_file), device="cpu")
+            # Load the model from the memory-mapped cache, converting it on
+            # first use; fall back to a regular load if that is not possible.
+            try:
+                self.whisper_model = load_mmap_model(model_file)
+            except Exception as e:
+                print(f"Memory-mapped model load failed, loading normally: {e}")
+                self.whisper_model = whisper_module(str(model_file), device="cpu")
         except Exception as e:
             self.whisper_model = None
             error_msg = f"Whisper model load failed: {str(e)}"
@@ -74,6 +151,69 @@ class AudioTranscriber:
             if progress_callback:
                 progress_callback("", 0, error_msg)
 
+    def call_in_slot(self, fn: Callable[[], T], seconds: float) -> T:
+        """
+        Runs a Whisper call (or model load) in a transcription slot.
+
+        The call can be abandoned through the token, but the slot is only
+        released once it really returns, so a call left running in the
+        background still counts against the transcription limit.
+
+        Args:
+            fn (callable): The call.
+            seconds (float): Seconds of audio it processes, its cost for the slot.
+
+        Returns:
+            The call's result.
+
+        Raises:
+            Cancelled: If the token is cancelled first.
+            RuntimeError: If no slot was granted.
+        """
+        slot = ExitStack()
+        if not slot.enter_context(self.transcription_slot(seconds)):
+            slot.close()
+            if self.token is not None:
+                self.token.check()
+            raise RuntimeError("Transcription cancelled")
+        return call_cancellable(fn, self.token, on_finish=slot.close)
+
+    def open_stream(
+        self, progress_callback=None, url: str = ""
+    ) -> Optional["TranscriptionStream"]:
+        """
+        Opens a streaming transcription fed with the video bytes as they download.
+
+        Args:
+            progress_callback (callable, optional): A function to report progress.
+                                                    Expected signature: (url, progress, status_message).
+            url (str): The reel URL used when reporting decoded segments.
+
+        Returns:
+            Optional[TranscriptionStream]: The stream, or None if the model is not
+            loaded or ffmpeg is unavailable.
+        """
+        if not self.whisper_model:
+            return None
+
+        ffmpeg_path = get_ffmpeg_path()
+        if not ffmpeg_path:
+            return None
+
+        try:
+            return TranscriptionStream(
+                self.whisper_model,
+                ffmpeg_path,
+                progress_callback,
+                url,
+                self.transcription_slot,
+                self.token,
+                self.writer,
+            )
+        except OSError as e:
+            print(f"Could not start streaming transcription: {e}")
+            return None
+
     def transcribe_audio_from_reel(
         self, reel_folder: Path, reel_number: int, result: Dict, progress_callback=None
     ):
@@ -101,14 +241,17 @@ class AudioTranscriber:
 
         audio_source = result.get("audio_path")
         temp_audio_path = None
+        cached_audio = self._load_cached_audio(reel_folder, reel_number, result)
 
-        if not audio_source:
+        if cached_audio is None and not audio_source:
             audio_source, temp_audio_path = self._extract_temp_audio(
                 reel_folder, reel_number, result
             )
 
         try:
-            if not (audio_source and os.path.exists(audio_source)):
+            if cached_audio is None and not (
+                audio_source and os.path.exists(audio_source)
+            ):
                 error_msg = "Transcription failed: No audio source found."
                 result["transcript"] = error_msg
                 print(error_msg)
@@ -119,16 +262,22 @@ class AudioTranscriber:
                 if is_frozen() and not ensure_ffmpeg(progress_callback):
                     raise FileNotFoundError("FFmpeg not found and download failed")
 
-                # Get ffmpeg path from bin directory
-                ffmpeg_path = Path(get_bin_dir()) / "ffmpeg.exe"
-                os.environ["PATH"] = f"{str(ffmpeg_path.parent)};{os.environ['PATH']}"
+                ffmpeg_path = get_ffmpeg_path()
+                if not ffmpeg_path:
+                    raise FileNotFoundError("FFmpeg not found")
+
+                # Whisper runs "ffmpeg" from PATH when given a file
+                ffmpeg_dir = os.path.dirname(ffmpeg_path)
+                search_path = os.environ.get("PATH", "")
+                if ffmpeg_dir not in search_path.split(os.pathsep):
+                    os.environ["PATH"] = os.pathsep.join([ffmpeg_dir, search_path])
 
                 # Verify ffmpeg works
                 ffmpeg_result = subprocess.run(
-                    [str(ffmpeg_path), "-version"],
+                    [ffmpeg_path, "-version"],
                     capture_output=True,
                     text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
                 )
                 if ffmpeg_result.returncode != 0:
                     raise RuntimeError(
@@ -141,13 +290,22 @@ class AudioTranscriber:
                 return
 
             # Now transcribe audio
-            transcript_result = self.whisper_model.transcribe(audio_source)
+            duration = (
+                len(cached_audio) / SAMPLE_RATE
+                if cached_audio is not None
+                else STREAM_WINDOW_SECONDS
+            )
+            transcript_result = self.call_in_slot(
+                lambda: self.whisper_model.transcribe(
+                    cached_audio if cached_audio is not None else audio_source
+                ),
+                duration,
+            )
             transcript_text = transcript_result["text"]
             result["transcript"] = transcript_text
 
             transcript_path = reel_folder / f"transcript{reel_number}.txt"
-            with open(transcript_path, "w", encoding="utf-8") as f:
-                f.write(transcript_text)
+            self.writer.write_text(transcript_path, transcript_text)
             result["transcript_path"] = str(transcript_path)
 
         except Exception as e:
@@ -159,8 +317,42 @@ class AudioTranscriber:
             traceback.print_exc()  # Print full traceback
 
         finally:
-            if temp_audio_path and os.path.exists(temp_audio_path):
-                self._safe_file_removal(temp_audio_path)
+            if temp_audio_path:
+                self.scratch.free(temp_audio_path)
+
+    def _load_cached_audio(self, reel_folder: Path, reel_number: int, result: Dict):
+        """
+        Returns the reel's decoded audio from the audio cache, decoding it on a miss.
+
+        Args:
+            reel_folder (Path): The folder where the reel's files are located.
+            reel_number (int): The sequential number of the reel.
+            result (Dict): A dictionary containing download results.
+
+        Returns:
+            Optional[numpy.ndarray]: Memory-mapped 16 kHz mono float32 audio, or None
+            if there is no cache, no source file or ffmpeg is unavailable.
+        """
+        if self.audio_cache is None:
+            return None
+
+        source_path = (
+            result.get("video_path")
+            or result.get("audio_path")
+            or str(reel_folder / f"video{reel_number}.mp4")
+        )
+        ffmpeg_path = get_ffmpeg_path()
+        if not (os.path.exists(source_path) and ffmpeg_path):
+            return None
+
+        try:
+            key = self.audio_cache.key_for(source_path)
+            return self.audio_cache.get_or_create(
+                key, lambda: decode_audio(source_path, ffmpeg_path, self.token)
+            )
+        except Exception as e:
+            print(f"Audio cache unavailable, extracting audio: {e}")
+            return None
 
     def _extract_temp_audio(self, reel_folder: Path, reel_number: int, result: Dict):
         """
@@ -179,11 +371,14 @@ class AudioTranscriber:
         video_path = result.get("video_path") or str(
             reel_folder / f"video{reel_number}.mp4"
         )
-        temp_audio_path = str(reel_folder / f"temp_audio{reel_number}.mp3")
-
         if not os.path.exists(video_path):
             return None, None
 
+        # Lives in the scratch space if one is configured; freed by the caller
+        temp_audio_path = str(
+            self.scratch.allocate(f"temp_audio{reel_number}.mp3", reel_folder)
+        )
+
         video_clip = None
         audio_clip = None
 
@@ -202,6 +397,7 @@ class AudioTranscriber:
         finally:
             self._cleanup_video_resources(audio_clip, video_clip)
 
+        self.scratch.free(temp_audio_path)
         return None, None
 
     def _cleanup_video_resources(self, audio_clip, video_clip):
@@ -224,15 +420,275 @@ class AudioTranscriber:
             except Exception:
                 pass
 
-    def _safe_file_removal(self, file_path: str):
+
+def decode_audio(
+    source_path: str, ffmpeg_path: str, token: Optional[CancellationToken] = None
+) -> Any:
+    """
+    Decodes a media file to 16 kHz mono float32 samples with ffmpeg.
+
+    Args:
+        source_path (str): The audio or video file to decode.
+        ffmpeg_path (str): Path to the ffmpeg executable.
+        token (CancellationToken, optional): Stops ffmpeg when cancelled.
+
+    Returns:
+        numpy.ndarray: The decoded samples.
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the file.
+    """
+    numpy = lazy_import_numpy()
+    process = run_process(
+        [
+            ffmpeg_path,
+            "-loglevel",
+            "error",
+            "-nostdin",
+            "-i",
+            source_path,
+            "-f",
+            "f32le",
+            "-ac",
+            "1",
+            "-ar",
+            str(SAMPLE_RATE),
+            "pipe:1",
+        ],
+        token,
+        capture_output=True,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg decode failed: {process.stderr.decode().strip()}")
+    return numpy.frombuffer(process.stdout, dtype=numpy.float32)
+
+
+class TranscriptionStream:
+    """
+    Transcribes audio incrementally while the source video is still downloading.
+
+    Downloaded bytes are fed into an ffmpeg process that decodes them to 16 kHz
+    mono PCM. A reader thread drains ffmpeg's output into fixed-size windows and
+    a worker thread transcribes each window as soon as it is complete, so the
+    download and transcription stages overlap. Decoded segments are reported
+    through the progress callback and the full transcript is written on `finish`.
+    """
+
+    def __init__(
+        self,
+        whisper_model: Any,
+        ffmpeg_path: str,
+        progress_callback=None,
+        url: str = "",
+        transcription_slot: Optional[Callable[[float], ContextManager[bool]]] = None,
+        token: Optional[CancellationToken] = None,
+        writer: Optional[AtomicWriter] = None,
+    ):
+        """
+        Starts the ffmpeg decoder and the reader/transcriber threads.
+
+        Args:
+            whisper_model: A loaded Whisper model.
+            ffmpeg_path (str): Path to the ffmpeg executable.
+            progress_callback (callable, optional): A function to report progress.
+                                                    Expected signature: (url, progress, status_message).
+            url (str): The reel URL used when reporting progress.
+            transcription_slot (callable, optional): Held around the transcription
+                                                     of each window, see
+                                                     `AudioTranscriber`.
+            token (CancellationToken, optional): Checked before each window; while
+                                                 paused, up to `STREAM_QUEUE_WINDOWS`
+                                                 decoded windows are kept queued
+                                                 until resumed.
+            writer (AtomicWriter, optional): Writes the transcript; defaults to the
+                                             shared writer.
+        """
+        self.whisper_model = whisper_model
+        self.progress_callback = progress_callback
+        self.url = url
+        self.transcription_slot = transcription_slot or _no_slot
+        self.token = token
+        self.writer = writer or default_writer
+        self.segments: List[str] = []
+        self.failed = False
+        self._windows: "queue.Queue[Optional[bytes]]" = queue.Queue(
+            maxsize=STREAM_QUEUE_WINDOWS
+        )
+
+        self._process = subprocess.Popen(
+            [
+                ffmpeg_path,
+                "-loglevel",
+                "error",
+                "-i",
+                "pipe:0",
+                "-f",
+                "f32le",
+                "-ac",
+                "1",
+                "-ar",
+                str(SAMPLE_RATE),
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        self._reader = threading.Thread(target=self._read_windows, daemon=True)
+        self._worker = threading.Thread(target=self._transcribe_windows, daemon=True)
+        self._reader.start()
+        self._worker.start()
+
+    def feed(self, chunk: bytes):
+        """
+        Passes a chunk of the in-progress download to the decoder.
+
+        Args:
+            chunk (bytes): Raw bytes of the media file, in download order.
         """
-        Safely removes a file from the filesystem.
+        if self.failed:
+            return
+        try:
+            self._process.stdin.write(chunk)
+        except (BrokenPipeError, OSError):
+            self.failed = True
+
+    def finish(self, reel_folder: Path, reel_number: int, result: Dict) -> bool:
+        """
+        Flushes the decoder, waits for the last window and saves the transcript.
 
         Args:
-            file_path (str): The path to the file to be removed.
+            reel_folder (Path): The folder where the reel's files are located.
+            reel_number (int): The sequential number of the reel.
+            result (Dict): The download result, updated with `transcript` and
+                           `transcript_path` on success.
+
+        Returns:
+            bool: True if the transcript was produced, False if the caller should
+                  fall back to transcribing the finished file.
+        """
+        self._close_input()
+        self._reader.join()
+        self._worker.join()
+        self._process.wait()
+
+        if self.failed or self._process.returncode != 0 or not self.segments:
+            return False
+
+        transcript_text = "".join(self.segments).strip()
+        result["transcript"] = transcript_text
+
+        transcript_path = reel_folder / f"transcript{reel_number}.txt"
+        self.writer.write_text(transcript_path, transcript_text)
+        result["transcript_path"] = str(transcript_path)
+        return True
+
+    def abort(self):
+        """
+        Stops the decoder and discards any pending audio.
+
+        The worker is not waited for: it finishes the window it is on, if any,
+        in the background and then skips the rest.
         """
+        self.failed = True
+        self._close_input()
         try:
-            os.remove(file_path)
+            self._process.kill()
         except OSError:
-            # Log the error if a proper logging mechanism is in place
             pass
+        self._reader.join()
+
+    def _close_input(self):
+        """Closes ffmpeg's stdin so it flushes and exits."""
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+    def _read_windows(self):
+        """Drains decoded PCM from ffmpeg and queues it in whole windows."""
+        window_bytes = SAMPLE_RATE * STREAM_WINDOW_SECONDS * 4
+        buffer = bytearray()
+        try:
+            while True:
+                data = self._process.stdout.read(65536)
+                if not data:
+                    break
+                buffer.extend(data)
+                while len(buffer) >= window_bytes:
+                    self._put(bytes(buffer[:window_bytes]))
+                    del buffer[:window_bytes]
+            if buffer:
+                self._put(bytes(buffer))
+        finally:
+            self._put(None)
+
+    def _put(self, window: Optional[bytes]):
+        """
+        Queues a window, waiting while the queue is full.
+
+        Once the stream has failed, windows (and the end marker) are dropped
+        instead, so a full queue never blocks the reader: the worker stops by
+        itself after draining what is left.
+        """
+        while not self.failed:
+            try:
+                self._windows.put(window, timeout=STREAM_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def _transcribe_windows(self):
+        """Transcribes queued windows in order and reports each segment."""
+        numpy = lazy_import_numpy()
+        offset = 0.0
+        while True:
+            try:
+                window = self._windows.get(timeout=STREAM_POLL_INTERVAL)
+            except queue.Empty:
+                if self.failed:
+                    break
+                continue
+            if window is None:
+                break
+            if self.failed:
+                continue
+            try:
+                if self.token is not None:
+                    self.token.check()
+                audio = numpy.frombuffer(window, dtype=numpy.float32)
+                prompt = "".join(self.segments)[-200:] or None
+                with self.transcription_slot(len(audio) / SAMPLE_RATE) as granted:
+                    if not granted:
+                        raise RuntimeError("Transcription cancelled")
+                    transcript_result = self.whisper_model.transcribe(
+                        audio, initial_prompt=prompt
+                    )
+            except Cancelled:
+                self.failed = True
+                continue
+            except Exception as e:
+                print(f"Streaming transcription failed: {e}")
+                self.failed = True
+                continue
+            if self.failed:
+                # Aborted while this window was transcribed
+                continue
+
+            for segment in transcript_result.get("segments", []):
+                if self.progress_callback:
+                    minutes, seconds = divmod(int(offset + segment["start"]), 60)
+                    self.progress_callback(
+                        self.url,
+                        90,
+                        f"[{minutes:02d}:{seconds:02d}] {segment['text'].strip()}",
+                    )
+            self.segments.append(transcript_result["text"])
+            offset += len(audio) / SAMPLE_RATE
+
+
+def _no_slot(seconds: float) -> ContextManager[bool]:
+    """Default transcription slot: Whisper calls always run right away."""
+    return nullcontext(True)
@@ -0,0 +1,258 @@
+"""
+Upload of completed reels to S3-compatible object storage.
+
+Downstream consumers read sessions from an object store, which used to mean a
+separate upload script after the batch. `UploadSink` uploads each reel's
+artifacts as soon as the reel completes, from background threads:
+
+- Files larger than `part_size` are sent as multipart uploads whose parts are
+  uploaded in parallel (up to `max_concurrency` at a time).
+- At most `memory_budget` bytes of part data are buffered across all uploads;
+  readers wait for a slot before reading the next part.
+- Once every artifact of a reel is uploaded, the local copies of the kinds in
+  `delete_local` are removed.
+
+Any S3-compatible endpoint works (AWS, MinIO, a local stand-in server) via
+`endpoint_url`. Credentials come from the usual boto3 sources, e.g. the
+AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY environment variables.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.core.blob_store import remove_file
+from src.core.download_index import ARTIFACT_KINDS
+from src.core.pack_store import PackStore, is_pack_uri, parse_pack_uri
+from src.utils.lazy_imports import lazy_import_boto3
+
+# S3 rejects multipart parts (other than the last) smaller than 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class UploadSink:
+    """
+    Uploads completed reels to a bucket with bounded concurrency and memory.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        client: Any = None,
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        memory_budget: int = 64 * 1024 * 1024,
+        delete_local: Sequence[str] = (),
+        pack_store: Optional[PackStore] = None,
+    ):
+        """
+        Initializes the UploadSink.
+
+        Args:
+            bucket: The destination bucket.
+            prefix: Key prefix for every uploaded object.
+            client: An S3 client; created with boto3 when omitted.
+            endpoint_url: Endpoint of an S3-compatible server.
+            region_name: Region of the bucket.
+            part_size: Multipart part size in bytes (at least `MIN_PART_SIZE`).
+            max_concurrency: Number of parts uploaded in parallel.
+            memory_budget: Maximum bytes of part data held in memory.
+            delete_local: Artifact kinds whose local file is removed once the
+                          reel is uploaded.
+            pack_store: Store used to read artifacts kept as `pack://` URIs.
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.delete_local = set(delete_local)
+        self.pack_store = pack_store
+        if client is None:
+            boto3 = lazy_import_boto3()
+            from botocore.config import Config
+
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name=region_name,
+                config=Config(max_pool_connections=max_concurrency + 2),
+            )
+        self.client = client
+        self._budget = threading.BoundedSemaphore(
+            max(1, memory_budget // self.part_size)
+        )
+        self._parts = ThreadPoolExecutor(max_concurrency, "UploadPart")
+        self._reels = ThreadPoolExecutor(2, "UploadReel")
+        self._cancelled = False
+
+    def submit_reel(
+        self,
+        key_prefix: str,
+        result: Dict[str, Any],
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> "Future[Dict[str, Any]]":
+        """
+        Queues the artifacts of a completed reel for upload.
+
+        Args:
+            key_prefix: Key of the reel below the sink's prefix, e.g.
+                        "session_20250101_120000/reel3".
+            result: The download result with the artifact paths.
+            on_done: Called with the upload status when the reel is done.
+
+        Returns:
+            Future[Dict[str, Any]]: Resolves to the upload status: "status"
+            ("uploaded" or "upload_failed"), "bucket", "objects" per kind,
+            the "deleted" kinds and an "error" message.
+        """
+        future = self._reels.submit(self._upload_reel, key_prefix, dict(result))
+        if on_done:
+            future.add_done_callback(lambda f: on_done(f.result()))
+        return future
+
+    def close(self, cancel_pending: bool = False):
+        """
+        Waits for queued uploads and shuts the worker threads down.
+
+        Args:
+            cancel_pending: Skip reels whose upload has not started yet.
+        """
+        self._cancelled = cancel_pending
+        self._reels.shutdown(wait=True)
+        self._parts.shutdown(wait=True)
+
+    def _upload_reel(self, key_prefix: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Uploads every artifact of a reel and removes local copies if asked."""
+        status: Dict[str, Any] = {
+            "status": "uploaded",
+            "bucket": self.bucket,
+            "objects": {},
+            "deleted": [],
+            "error": None,
+        }
+        if self._cancelled:
+            status.update(status="upload_failed", error="Cancelled")
+            return status
+
+        uploaded: List[Tuple[str, str]] = []
+        try:
+            for kind, key in ARTIFACT_KINDS.items():
+                source = result.get(key)
+                if not source:
+                    continue
+                if is_pack_uri(source):
+                    name, size = self._upload_packed(key_prefix, source)
+                else:
+                    if not os.path.exists(source):
+                        continue
+                    name = Path(source).name
+                    size = self._upload_file(source, self._key(key_prefix, name))
+                    uploaded.append((kind, source))
+                status["objects"][kind] = {
+                    "key": self._key(key_prefix, name),
+                    "size": size,
+                }
+        except Exception as e:
+            status.update(status="upload_failed", error=str(e))
+            return status
+
+        for kind, source in uploaded:
+            if kind not in self.delete_local:
+                continue
+            try:
+                remove_file(source)
+                status["deleted"].append(kind)
+            except OSError as e:
+                print(f"Could not remove uploaded file {source}: {e}")
+        return status
+
+    def _upload_packed(self, key_prefix: str, uri: str) -> Tuple[str, int]:
+        """Uploads an artifact from the pack store; returns its name and size."""
+        if self.pack_store is None:
+            raise ValueError(f"No pack store to read {uri}")
+        packed = self.pack_store.stat(*parse_pack_uri(uri))
+        data = self.pack_store.get_uri(uri)
+        if packed is None or data is None:
+            raise ValueError(f"Packed artifact not found: {uri}")
+        self.client.put_object(
+            Bucket=self.bucket, Key=self._key(key_prefix, packed["name"]), Body=data
+        )
+        return packed["name"], len(data)
+
+    def _upload_file(self, path: str, key: str) -> int:
+        """
+        Uploads a file, as a parallel multipart upload if it spans several parts.
+
+        Args:
+            path: The local file.
+            key: The destination object key.
+
+        Returns:
+            int: The number of bytes uploaded.
+        """
+        size = os.path.getsize(path)
+        if size <= self.part_size:
+            with self._budget:
+                with open(path, "rb") as f:
+                    self.client.put_object(Bucket=self.bucket, Key=key, Body=f.read())
+            return size
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)[
+            "UploadId"
+        ]
+        futures: List["Future[Dict[str, Any]]"] = []
+        try:
+            with open(path, "rb") as f:
+                part_number = 1
+                while True:
+                    self._budget.acquire()
+                    data = f.read(self.part_size)
+                    if not data:
+                        self._budget.release()
+                        break
+                    future = self._parts.submit(
+                        self._upload_part, key, upload_id, part_number, data
+                    )
+                    # Runs on completion and on cancellation alike
+                    future.add_done_callback(lambda _: self._budget.release())
+                    futures.append(future)
+                    part_number += 1
+            parts = [future.result() for future in futures]
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled():
+                    future.exception()
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id
+            )
+            raise
+        return size
+
+    def _upload_part(
+        self, key: str, upload_id: str, part_number: int, data: bytes
+    ) -> Dict[str, Any]:
+        """Uploads one part and returns its entry for completing the upload."""
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _key(self, key_prefix: str, name: str) -> str:
+        """Joins the sink prefix, the reel's prefix and a file name."""
+        return "/".join(part for part in (self.prefix, key_prefix, name) if part)
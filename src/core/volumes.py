@@ -0,0 +1,165 @@
+"""
+Placement of downloads across several output volumes.
+
+`SessionManager` used to write everything under a single `downloads` folder, so
+one disk's bandwidth and capacity limited ingest. `VolumeSet` spreads reels over
+several output roots with a placement policy:
+
+- "round_robin": cycle through the volumes in order.
+- "most_free": pick the volume with the most free space.
+- "hash": pick a volume from the reel's key (its shortcode), so the same reel
+  always lands on the same volume.
+
+Each volume tracks its write throughput as an exponentially weighted moving
+average, which is reported by `stats()`.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+PLACEMENT_POLICIES = ("round_robin", "most_free", "hash")
+
+
+@dataclass
+class Volume:
+    """
+    An output root and its write statistics.
+    """
+
+    root: Path
+    bytes_written: int = 0
+    write_seconds: float = 0.0
+    throughput_bps: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        """The volume's identifier, recorded in manifests and the index."""
+        return str(self.root)
+
+    def free_bytes(self) -> int:
+        """Returns the free space of the volume, or 0 if it is unavailable."""
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            return shutil.disk_usage(self.root).free
+        except OSError:
+            return 0
+
+
+class VolumeSet:
+    """
+    Chooses an output volume per reel and tracks per-volume throughput.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[Union[str, Path]],
+        policy: str = "most_free",
+        smoothing: float = 0.3,
+    ):
+        """
+        Initializes the VolumeSet.
+
+        Args:
+            roots: The output root of every volume.
+            policy: One of `PLACEMENT_POLICIES`.
+            smoothing: Weight of the newest sample in the throughput average.
+
+        Raises:
+            ValueError: If no roots are given or the policy is unknown.
+        """
+        if not roots:
+            raise ValueError("At least one output root is required.")
+        if policy not in PLACEMENT_POLICIES:
+            raise ValueError(f"Unknown placement policy: {policy}")
+        self.volumes = [Volume(Path(root)) for root in roots]
+        self.policy = policy
+        self.smoothing = smoothing
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def select(self, key: str = "") -> Volume:
+        """
+        Picks the volume for the next reel.
+
+        Args:
+            key: A stable key of the reel, used by the "hash" policy. Without
+                 a key, "hash" falls back to round-robin.
+
+        Returns:
+            Volume: The selected volume.
+        """
+        if len(self.volumes) == 1:
+            return self.volumes[0]
+        if self.policy == "most_free":
+            return max(self.volumes, key=lambda volume: volume.free_bytes())
+        if self.policy == "hash" and key:
+            digest = hashlib.sha1(key.encode("utf-8")).digest()
+            return self.volumes[int.from_bytes(digest[:4], "big") % len(self.volumes)]
+        with self._lock:
+            volume = self.volumes[self._next % len(self.volumes)]
+            self._next += 1
+        return volume
+
+    def volume_for(self, path: Union[str, Path]) -> Optional[Volume]:
+        """
+        Returns the volume a path is stored on.
+
+        Args:
+            path: A file or folder path.
+
+        Returns:
+            Optional[Volume]: The volume whose root contains the path, if any.
+        """
+        path = os.path.abspath(path)
+        for volume in self.volumes:
+            root = os.path.abspath(volume.root)
+            if path == root or path.startswith(root + os.sep):
+                return volume
+        return None
+
+    def record_write(self, volume: Volume, num_bytes: int, seconds: float):
+        """
+        Adds a completed write to a volume's statistics.
+
+        Args:
+            volume: The volume written to.
+            num_bytes: Number of bytes written.
+            seconds: Time the write took.
+        """
+        if seconds <= 0:
+            return
+        sample = num_bytes / seconds
+        with self._lock:
+            volume.bytes_written += num_bytes
+            volume.write_seconds += seconds
+            if volume.throughput_bps is None:
+                volume.throughput_bps = sample
+            else:
+                volume.throughput_bps = (
+                    self.smoothing * sample
+                    + (1 - self.smoothing) * volume.throughput_bps
+                )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Reports free space and write statistics of every volume.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per volume.
+        """
+        with self._lock:
+            return [
+                {
+                    "volume": volume.name,
+                    "free_bytes": volume.free_bytes(),
+                    "bytes_written": volume.bytes_written,
+                    "write_seconds": round(volume.write_seconds, 3),
+                    "throughput_bps": volume.throughput_bps,
+                }
+                for volume in self.volumes
+            ]
@@ -8,16 +8,21 @@ getting captions, and transcribing audio.
 """
 
 import os
+import uuid
 from pathlib import Path
 from typing import List, Dict, Any
 import subprocess
 import platform
 
-from src.core.data_models import ReelItem
+from src.core.data_models import ReelItem, option_enabled
 from src.core.downloader import ReelDownloader
 from src.updater import check_for_updates
 from src.ui.styles import AppStyles
 from src.core.settings_manager import SettingsManager
+from src.core.search_index import SearchIndex
+from src.core.job_store import JobStore
+from src.core.live_queue import LiveQueue
+from src.core.batch_scheduler import BatchScheduler
 from src.utils.url_validator import is_valid_instagram_url
 from src.ui.panel_builder import PanelBuilder
 from src.ui.progress_dialog import DownloadProgressDialog
@@ -27,11 +32,21 @@ from PyQt6.QtWidgets import (
     QMainWindow,
     QWidget,
     QListWidgetItem,
+    QMenu,
     QMessageBox,
 )
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
 
+# Unfinished jobs listed in the queue at startup
+MAX_RESTORED_JOBS = 1000
+# Queue list icon and menu label of each priority lane
+PRIORITY_LABELS = {
+    "high": ("⏫", "High"),
+    "normal": ("🔗", "Normal"),
+    "low": ("⏬", "Low"),
+}
+
 
 class InstagramDownloaderGUI(QMainWindow):
     """
@@ -52,13 +67,21 @@ class InstagramDownloaderGUI(QMainWindow):
         """
         super().__init__()
         self.reel_queue: List[ReelItem] = []
-        self.download_thread = None
+        self.download_threads: List[ReelDownloader] = []  # One per running batch
+        self.scheduler = None  # Shared by all batches, created on first start
+        self.search_index = None  # Opened on first search
+        self.job_store = None  # Opened by _restore_jobs
+        # Queue of the batch the next Start launches
+        self.live_queue = LiveQueue(batch=uuid.uuid4().hex)
+        # Queue each listed URL was put in; running batches keep their own
+        self.url_queues: Dict[str, LiveQueue] = {}
         self.settings_manager = SettingsManager()
         self.panel_builder = PanelBuilder(self)
         self.ui_elements = {}  # To store references to UI elements
 
         self.init_ui()
         self.load_settings()
+        self._restore_jobs()
 
     def init_ui(self):
         """
@@ -110,12 +133,15 @@ class InstagramDownloaderGUI(QMainWindow):
         self.caption_check = self.ui_elements["caption_check"]
         self.transcribe_check = self.ui_elements["transcribe_check"]
         self.download_button = self.ui_elements["download_button"]
+        self.pause_button = self.ui_elements["pause_button"]
         self.clear_button = self.ui_elements["clear_button"]
         self.folder_button = self.ui_elements["folder_button"]
         self.overall_progress = self.ui_elements["overall_progress"]
         self.progress_label = self.ui_elements["progress_label"]
         self.queue_list = self.ui_elements["queue_list"]
         self.results_text = self.ui_elements["results_text"]
+        self.search_input = self.ui_elements["search_input"]
+        self.search_results = self.ui_elements["search_results"]
         self.tab_widget = self.ui_elements["tab_widget"]
 
     def _setup_status_bar(self):
@@ -176,17 +202,253 @@ class InstagramDownloaderGUI(QMainWindow):
                 )
                 return
 
-        reel_item = ReelItem(url=url)
+        # Joins a running batch with the same options, else the next batch
+        queue = self._queue_for_options(self._ui_options())
+        self._append_to_queue(url)
+        try:
+            queue.put(url)
+            self.url_queues[url] = queue
+        except Exception as e:
+            print(f"Could not save job: {e}")
+
+        self.url_input.clear()
+        self.statusBar().showMessage(
+            f"Added to queue. Total items: {len(self.reel_queue)}"
+        )
+
+    def _append_to_queue(self, url: str, priority: str = "normal"):
+        """
+        Adds a URL to the in-memory queue and the queue list.
+
+        Args:
+            url (str): The reel URL.
+            priority (str): The item's priority lane.
+        """
+        reel_item = ReelItem(url=url, priority=priority)
         self.reel_queue.append(reel_item)
 
-        display_url = f"🔗 {url[:50]}{'...' if len(url) > 50 else ''}"
-        list_item = QListWidgetItem(display_url)
+        list_item = QListWidgetItem(self._pending_text(reel_item))
         list_item.setData(Qt.ItemDataRole.UserRole, reel_item)
         self.queue_list.addItem(list_item)
 
-        self.url_input.clear()
+    def _restore_jobs(self):
+        """
+        Opens the persistent job queue and lists the jobs left unfinished.
+
+        At most MAX_RESTORED_JOBS are listed; the download still processes
+        every unfinished job in the store. Jobs of every earlier batch join
+        the batch the next Start launches.
+        """
+        batch = self.live_queue.batch
+        try:
+            self.job_store = JobStore(Path("downloads") / "jobs.sqlite3")
+            self.job_store.adopt(batch)
+            self.live_queue = LiveQueue(self.job_store, batch=batch)
+            restored = 0
+            for job in self.job_store.iter_jobs(batch=batch):
+                if restored >= MAX_RESTORED_JOBS:
+                    break
+                self._append_to_queue(job.url, job.priority)
+                self.url_queues[job.url] = self.live_queue
+                restored += 1
+        except Exception as e:
+            print(f"Job queue unavailable: {e}")
+            self.job_store = None
+            self.live_queue = LiveQueue(batch=batch)
+            return
+
+        if restored:
+            self.statusBar().showMessage(
+                f"Restored {restored} unfinished downloads from the last run"
+            )
+
+    def _pending_text(self, reel_item: ReelItem) -> str:
+        """Returns the queue list text of a pending item."""
+        url = reel_item.url
+        icon = PRIORITY_LABELS[reel_item.priority][0]
+        return f"{icon} {url[:50]}{'...' if len(url) > 50 else ''}"
+
+    def show_queue_menu(self, pos):
+        """
+        Shows the context menu of a queue item.
+
+        Pending items can be put in another priority lane, moved to the top or
+        bottom of the queue, or cancelled, also while a download is running.
+
+        Args:
+            pos (QPoint): The clicked position within the queue list.
+        """
+        list_item = self.queue_list.itemAt(pos)
+        if list_item is None:
+            return
+        reel_item = list_item.data(Qt.ItemDataRole.UserRole)
+        if reel_item.status != "Pending":
+            return
+
+        menu = QMenu(self)
+        priority_menu = menu.addMenu("🚦 Priority")
+        priority_actions = {}
+        for priority, (icon, label) in PRIORITY_LABELS.items():
+            action = priority_menu.addAction(f"{icon} {label}")
+            action.setCheckable(True)
+            action.setChecked(priority == reel_item.priority)
+            priority_actions[action] = priority
+        top_action = menu.addAction("⬆️ Move to Top")
+        bottom_action = menu.addAction("⬇️ Move to Bottom")
+        cancel_action = menu.addAction("✖️ Cancel")
+        action = menu.exec(self.queue_list.mapToGlobal(pos))
+
+        if action in priority_actions:
+            self._set_queue_item_priority(list_item, priority_actions[action])
+        elif action == cancel_action:
+            self._cancel_queue_item(list_item)
+        elif action in (top_action, bottom_action):
+            self._move_queue_item(list_item, to_front=action == top_action)
+
+    def _cancel_queue_item(self, list_item: QListWidgetItem):
+        """
+        Removes a pending item from the queue.
+
+        Args:
+            list_item (QListWidgetItem): The queue list entry of the item.
+        """
+        url = list_item.data(Qt.ItemDataRole.UserRole).url
+        try:
+            cancelled = self._queue_of(url).cancel(url)
+        except Exception as e:
+            print(f"Could not cancel job: {e}")
+            cancelled = False
+        if not cancelled:
+            QMessageBox.information(
+                self, "Cannot Cancel", "This item is already being downloaded"
+            )
+            return
+
+        self.url_queues.pop(url, None)
+        self.reel_queue = [item for item in self.reel_queue if item.url != url]
+        self.queue_list.takeItem(self.queue_list.row(list_item))
         self.statusBar().showMessage(
-            f"Added to queue. Total items: {len(self.reel_queue)}"
+            f"Removed from queue. Total items: {len(self.reel_queue)}"
+        )
+
+    def _set_queue_item_priority(self, list_item: QListWidgetItem, priority: str):
+        """
+        Puts a pending item in another priority lane.
+
+        Args:
+            list_item (QListWidgetItem): The queue list entry of the item.
+            priority (str): The new lane: 'high', 'normal' or 'low'.
+        """
+        reel_item = list_item.data(Qt.ItemDataRole.UserRole)
+        try:
+            queue = self._queue_of(reel_item.url)
+            changed = queue.set_priority(reel_item.url, priority)
+        except Exception as e:
+            print(f"Could not change priority: {e}")
+            changed = False
+        if not changed:
+            QMessageBox.information(
+                self, "Cannot Change Priority", "This item is already being downloaded"
+            )
+            return
+
+        reel_item.priority = priority
+        list_item.setText(self._pending_text(reel_item))
+        self.statusBar().showMessage(f"Priority set to {PRIORITY_LABELS[priority][1]}")
+
+    def _move_queue_item(self, list_item: QListWidgetItem, to_front: bool):
+        """
+        Moves a pending item to the top or bottom of the queue.
+
+        Args:
+            list_item (QListWidgetItem): The queue list entry of the item.
+            to_front (bool): Whether the item is downloaded next or last.
+        """
+        url = list_item.data(Qt.ItemDataRole.UserRole).url
+        try:
+            moved = self._queue_of(url).reprioritize(url, to_front)
+        except Exception as e:
+            print(f"Could not move job: {e}")
+            moved = False
+        if not moved:
+            QMessageBox.information(
+                self, "Cannot Move", "This item is already being downloaded"
+            )
+            return
+
+        taken = self.queue_list.takeItem(self.queue_list.row(list_item))
+        self.queue_list.insertItem(0 if to_front else self.queue_list.count(), taken)
+        self.queue_list.setCurrentItem(taken)
+
+    def _queue_of(self, url: str) -> LiveQueue:
+        """Returns the live queue a listed URL was put in."""
+        return self.url_queues.get(url, self.live_queue)
+
+    def _queue_for_options(self, options: Dict[str, Any]) -> LiveQueue:
+        """
+        Returns the queue new URLs go to: that of the latest running batch
+        started with the same options, or that of the next batch.
+
+        Args:
+            options (Dict[str, Any]): The options selected in the window.
+        """
+        for thread in reversed(self._running_threads()):
+            batch_options = thread.download_options
+            if all(batch_options.get(key) == value for key, value in options.items()):
+                return thread.live_queue
+        return self.live_queue
+
+    def _running_threads(self) -> List[ReelDownloader]:
+        """Returns the download threads of the batches still running."""
+        return [thread for thread in self.download_threads if thread.isRunning()]
+
+    def _ui_options(self) -> Dict[str, Any]:
+        """Returns the download options selected in the window."""
+        return {
+            "video": self.video_check.isChecked(),
+            "thumbnail": self.thumbnail_check.isChecked(),
+            "audio": self.audio_check.isChecked(),
+            "caption": self.caption_check.isChecked(),
+            "transcribe": self.transcribe_check.isChecked(),
+            "downloader": self.downloader_combo.currentText(),
+        }
+
+    def _update_controls(self):
+        """
+        Shows on the Start button how many batches are running, and on the
+        Pause button whether they are paused.
+        """
+        threads = self._running_threads()
+        running = len(threads)
+        paused = bool(threads) and all(thread.is_paused for thread in threads)
+        self.pause_button.setEnabled(bool(threads))
+        self.pause_button.setText("▶️ Resume" if paused else "⏸️ Pause")
+        if running:
+            self.download_button.setText(
+                f"🚀 Start Another Batch ({running} running)"
+            )
+        else:
+            self.download_button.setText("🚀 Start Download")
+
+    def toggle_pause(self):
+        """
+        Pauses every running batch, or resumes them if all are paused.
+
+        Paused downloads keep their partial files and transcripts and continue
+        where they stopped.
+        """
+        threads = self._running_threads()
+        if not threads:
+            return
+        pause = not all(thread.is_paused for thread in threads)
+        for thread in threads:
+            if pause:
+                thread.pause()
+            else:
+                thread.resume()
+        self._update_controls()
+        self.statusBar().showMessage(
+            "Downloads paused" if pause else "Downloads resumed"
         )
 
     def clear_queue(self):
@@ -195,12 +457,20 @@ class InstagramDownloaderGUI(QMainWindow):
 
         Prevents clearing if a download is currently in progress.
         """
-        if self.download_thread and self.download_thread.isRunning():
+        if self._running_threads():
             QMessageBox.warning(
                 self, "Download in Progress", "Cannot clear queue while downloading"
             )
             return
 
+        try:
+            self.live_queue.clear()
+            if self.job_store is not None:
+                # Also forget the jobs of earlier batches
+                self.job_store.clear()
+        except Exception as e:
+            print(f"Could not clear saved jobs: {e}")
+        self.url_queues.clear()
         self.reel_queue.clear()
         self.queue_list.clear()
         self.results_text.clear()
@@ -214,7 +484,8 @@ class InstagramDownloaderGUI(QMainWindow):
 
         Validates the queue, collects selected download options,
         creates and starts a `ReelDownloader` thread, and updates the UI
-        to reflect the active download state.
+        to reflect the active download state. While other batches run, a new
+        batch is started with the URLs added since the last one.
         """
         if not self.reel_queue:
             QMessageBox.information(
@@ -222,20 +493,19 @@ class InstagramDownloaderGUI(QMainWindow):
             )
             return
 
-        if self.download_thread and self.download_thread.isRunning():
+        if self._running_threads() and not any(
+            item.status == "Error" or self.url_queues.get(item.url) is self.live_queue
+            for item in self.reel_queue
+        ):
             QMessageBox.information(
-                self, "Download in Progress", "Download is already in progress"
+                self,
+                "Download in Progress",
+                "Every queued URL is already in a running batch.\n\n"
+                "Change the options and add URLs to start another batch.",
             )
             return
 
-        options = {
-            "video": self.video_check.isChecked(),
-            "thumbnail": self.thumbnail_check.isChecked(),
-            "audio": self.audio_check.isChecked(),
-            "caption": self.caption_check.isChecked(),
-            "transcribe": self.transcribe_check.isChecked(),
-            "downloader": self.downloader_combo.currentText(),
-        }
+        options = self._ui_options()
 
         self.progress_dialog = DownloadProgressDialog(self)
         self.dependency_downloader = DependencyDownloader(options)
@@ -257,25 +527,42 @@ class InstagramDownloaderGUI(QMainWindow):
             QMessageBox.critical(self, "Error", "Failed to download dependencies.")
             return
 
-        options = {
-            "video": self.video_check.isChecked(),
-            "thumbnail": self.thumbnail_check.isChecked(),
-            "audio": self.audio_check.isChecked(),
-            "caption": self.caption_check.isChecked(),
-            "transcribe": self.transcribe_check.isChecked(),
-            "downloader": self.downloader_combo.currentText(),
-        }
+        options = self._ui_options()
+        # Advanced options (e.g. storage_backend) only configurable in settings.json
+        options.update(self.settings_manager.get_setting("download_settings", {}))
 
-        self.download_thread = ReelDownloader(self.reel_queue.copy(), options)
-        self.download_thread.progress_updated.connect(self.update_progress)
-        self.download_thread.download_completed.connect(self.download_completed)
-        self.download_thread.error_occurred.connect(self.download_error)
-        self.download_thread.finished.connect(self.download_finished)
-
-        self.download_thread.start()
-        self.download_button.setEnabled(False)
-        self.download_button.setText("⏳ Downloading...")
-        self.statusBar().showMessage("Download started...")
+        # Retry failed items; completed ones stay done
+        try:
+            for item in self.reel_queue:
+                if item.status == "Error" and self.live_queue.put(
+                    item.url, item.priority
+                ):
+                    self.url_queues[item.url] = self.live_queue
+        except Exception as e:
+            print(f"Could not requeue failed jobs: {e}")
+
+        if self.scheduler is None:
+            self.scheduler = BatchScheduler.from_options(options)
+        thread = ReelDownloader(
+            self.reel_queue.copy(),
+            options,
+            live_queue=self.live_queue,
+            scheduler=self.scheduler,
+        )
+        # URLs added from now on go to the next batch, unless options match
+        self.live_queue = LiveQueue(self.job_store, batch=uuid.uuid4().hex)
+        thread.progress_updated.connect(self.update_progress)
+        thread.download_completed.connect(self.download_completed)
+        thread.error_occurred.connect(self.download_error)
+        thread.finished.connect(self.download_finished)
+
+        self.download_threads.append(thread)
+        thread.start()
+        self._update_controls()
+        running = len(self._running_threads())
+        self.statusBar().showMessage(
+            "Download started..." if running == 1 else f"Batch {running} started..."
+        )
 
     def update_progress(self, url: str, progress: int, status: str):
         """
@@ -373,13 +660,21 @@ class InstagramDownloaderGUI(QMainWindow):
 
     def download_finished(self):
         """
-        Handles the completion of the entire download thread.
+        Handles the completion of a download thread.
 
-        Resets the download button state, updates overall progress and status messages,
-        and displays a summary message box to the user.
+        Once the last running batch is done, resets the download button state,
+        updates overall progress and status messages, and displays a summary
+        message box to the user.
         """
-        self.download_button.setEnabled(True)
-        self.download_button.setText("🚀 Start Download")
+        thread = self.sender()
+        if thread in self.download_threads:
+            self.download_threads.remove(thread)
+        self._update_controls()
+        running = len(self._running_threads())
+        if running:
+            self.statusBar().showMessage(f"Batch finished, {running} still running")
+            return
+
         self.overall_progress.setValue(100)
         self.progress_label.setText("All downloads completed!")
         self.statusBar().showMessage("All downloads completed")
@@ -424,6 +719,44 @@ class InstagramDownloaderGUI(QMainWindow):
 
         self.tab_widget.setCurrentIndex(1)
 
+    def search_downloads(self):
+        """
+        Searches captions and transcripts of all downloads for the entered words.
+
+        Matches are listed with a highlighted snippet; each list item stores the
+        reel folder of the match.
+        """
+        query = self.search_input.text().strip()
+        self.search_results.clear()
+        if not query:
+            return
+
+        try:
+            if self.search_index is None:
+                self.search_index = SearchIndex(Path("downloads") / "search.sqlite3")
+            matches = self.search_index.search(query)
+        except Exception as e:
+            QMessageBox.warning(self, "Search Failed", f"Search failed: {e}")
+            return
+
+        for match in matches:
+            icon = "🎤" if match["kind"] == "transcribe" else "📝"
+            text = f"{icon} {match['path']}\n{match['snippet']}"
+            list_item = QListWidgetItem(text)
+            list_item.setData(Qt.ItemDataRole.UserRole, match["folder_path"])
+            self.search_results.addItem(list_item)
+
+        self.statusBar().showMessage(f"Found {len(matches)} matches for '{query}'")
+
+    def open_search_result(self, list_item: QListWidgetItem):
+        """
+        Opens the reel folder of a search match in the system's file manager.
+
+        Args:
+            list_item (QListWidgetItem): The double-clicked search result.
+        """
+        self._open_folder(Path(list_item.data(Qt.ItemDataRole.UserRole)))
+
     def open_downloads_folder(self):
         """
         Opens the application's default downloads folder in the system's file manager.
@@ -434,20 +767,30 @@ class InstagramDownloaderGUI(QMainWindow):
         """
         download_dir = Path("downloads")
         download_dir.mkdir(exist_ok=True)
+        self._open_folder(download_dir)
+
+    def _open_folder(self, folder: Path):
+        """
+        Opens a folder in the system's file manager.
 
+        If opening fails, it displays a message box with the folder path.
+
+        Args:
+            folder (Path): The folder to open.
+        """
         try:
             if platform.system() == "Windows":
-                os.startfile(str(download_dir))
+                os.startfile(str(folder))
             elif platform.system() == "Darwin":  # macOS
-                subprocess.run(["open", str(download_dir)])
+                subprocess.run(["open", str(folder)])
             else:  # Linux
-                subprocess.run(["xdg-open", str(download_dir)])
+                subprocess.run(["xdg-open", str(folder)])
         except Exception:
             # Fallback: show folder path in message box
             QMessageBox.information(
                 self,
                 "Downloads Folder",
-                f"Downloads are saved to: {download_dir.absolute()}",
+                f"Downloads are saved to: {folder.absolute()}",
             )
 
     def load_settings(self):
@@ -457,11 +800,11 @@ class InstagramDownloaderGUI(QMainWindow):
         Applies the loaded settings to the UI checkboxes and downloader combobox.
         """
         settings = self.settings_manager.get_setting("ui_settings", {})
-        self.video_check.setChecked(settings.get("video", True))
-        self.thumbnail_check.setChecked(settings.get("thumbnail", True))
-        self.audio_check.setChecked(settings.get("audio", True))
-        self.caption_check.setChecked(settings.get("caption", True))
-        self.transcribe_check.setChecked(settings.get("transcribe", False))
+        self.video_check.setChecked(option_enabled(settings, "video"))
+        self.thumbnail_check.setChecked(option_enabled(settings, "thumbnail"))
+        self.audio_check.setChecked(option_enabled(settings, "audio"))
+        self.caption_check.setChecked(option_enabled(settings, "caption"))
+        self.transcribe_check.setChecked(option_enabled(settings, "transcribe"))
         self.downloader_combo.setCurrentText(settings.get("downloader", "Instaloader"))
 
     def save_settings(self):
@@ -470,15 +813,7 @@ class InstagramDownloaderGUI(QMainWindow):
 
         Collects the state of checkboxes and the selected downloader, then persists them.
         """
-        settings = {
-            "video": self.video_check.isChecked(),
-            "thumbnail": self.thumbnail_check.isChecked(),
-            "audio": self.audio_check.isChecked(),
-            "caption": self.caption_check.isChecked(),
-            "transcribe": self.transcribe_check.isChecked(),
-            "downloader": self.downloader_combo.currentText(),
-        }
-        self.settings_manager.set_setting("ui_settings", settings)
+        self.settings_manager.set_setting("ui_settings", self._ui_options())
 
     def closeEvent(self, event):
         """
@@ -490,9 +825,15 @@ class InstagramDownloaderGUI(QMainWindow):
         Args:
             event (QCloseEvent): The close event triggered by the system.
         """
-        if self.download_thread and self.download_thread.isRunning():
-            self.download_thread.stop()
-            self.download_thread.wait(5000)
+        threads = self._running_threads()
+        for thread in threads:
+            thread.stop()
+        for thread in threads:
+            thread.wait(5000)
+
+        # Unfinished jobs stay in the store and are restored on the next start
+        if self.job_store is not None and not self._running_threads():
+            self.job_store.close()
 
         self.save_settings()
         event.accept()
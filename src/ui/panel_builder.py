@@ -52,12 +52,15 @@ class PanelBuilder:
         self.caption_check = QCheckBox("📝 Get Caption")
         self.transcribe_check = QCheckBox("🎤 Transcribe Audio")
         self.download_button = ModernButton("🚀 Start Download")
+        self.pause_button = ModernButton("⏸️ Pause")
         self.clear_button = ModernButton("🗑️ Clear Queue")
         self.folder_button = ModernButton("📁 Open Downloads")
         self.overall_progress = ModernProgressBar()
         self.progress_label = QLabel("Ready to start downloading...")
         self.queue_list = QListWidget()
         self.results_text = QTextEdit()
+        self.search_input = QLineEdit()
+        self.search_results = QListWidget()
         self.tab_widget = QTabWidget()
 
     def create_main_layout(self, central_widget: QWidget):
@@ -218,7 +221,7 @@ class PanelBuilder:
 
     def _add_control_buttons_section(self, layout: QVBoxLayout):
         """
-        Adds the control buttons (Start Download, Clear Queue, Open Downloads)
+        Adds the control buttons (Start Download, Pause, Clear Queue, Open Downloads)
         to a given QVBoxLayout.
 
         Args:
@@ -228,12 +231,16 @@ class PanelBuilder:
         controls_layout.setSpacing(10)
 
         self.download_button.clicked.connect(self.main_window.start_download)
+        self.pause_button.clicked.connect(self.main_window.toggle_pause)
+        # Enabled while a download is running
+        self.pause_button.setEnabled(False)
         self.clear_button.clicked.connect(self.main_window.clear_queue)
         self.clear_button.setStyleSheet(AppStyles.get_danger_button_style())
         self.folder_button.clicked.connect(self.main_window.open_downloads_folder)
         self.folder_button.setStyleSheet(AppStyles.get_success_button_style())
 
         controls_layout.addWidget(self.download_button)
+        controls_layout.addWidget(self.pause_button)
         controls_layout.addWidget(self.clear_button)
         controls_layout.addWidget(self.folder_button)
 
@@ -282,9 +289,11 @@ class PanelBuilder:
 
         queue_widget = self._create_queue_tab()
         results_widget = self._create_results_tab()
+        search_widget = self._create_search_tab()
 
         self.tab_widget.addTab(queue_widget, "📋 Download Queue")
         self.tab_widget.addTab(results_widget, "✅ Results")
+        self.tab_widget.addTab(search_widget, "🔍 Search")
 
         layout.addWidget(self.tab_widget)
 
@@ -310,6 +319,11 @@ class PanelBuilder:
 
         self.queue_list.setStyleSheet(AppStyles.get_list_style())
         self.queue_list.setMinimumHeight(400)
+        # Right click to cancel or move a pending item
+        self.queue_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.queue_list.customContextMenuRequested.connect(
+            self.main_window.show_queue_menu
+        )
 
         layout.addWidget(self.queue_list)
 
@@ -341,6 +355,42 @@ class PanelBuilder:
 
         return widget
 
+    def _create_search_tab(self) -> QWidget:
+        """
+        Creates the "Search" tab content.
+
+        This tab searches captions and transcripts of all downloaded reels.
+
+        Returns:
+            QWidget: The widget containing the search tab's content.
+        """
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        header = QLabel("Search Captions & Transcripts")
+        header.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+        header.setStyleSheet("color: #2c3e50; margin-bottom: 10px;")
+        layout.addWidget(header)
+
+        self.search_input.setPlaceholderText("Type words and press Enter...")
+        self.search_input.setStyleSheet(AppStyles.get_input_style())
+        # Connect returnPressed signal to main window's search_downloads slot
+        self.search_input.returnPressed.connect(self.main_window.search_downloads)
+
+        self.search_results.setStyleSheet(AppStyles.get_list_style())
+        self.search_results.setMinimumHeight(360)
+        self.search_results.setWordWrap(True)
+        # Open the folder of a match on double click
+        self.search_results.itemDoubleClicked.connect(
+            self.main_window.open_search_result
+        )
+
+        layout.addWidget(self.search_input)
+        layout.addWidget(self.search_results)
+
+        return widget
+
     def get_ui_elements(self) -> Dict[str, Any]:
         """
         Returns a dictionary of key UI elements initialized by the PanelBuilder.
@@ -362,11 +412,14 @@ class PanelBuilder:
             "caption_check": self.caption_check,
             "transcribe_check": self.transcribe_check,
             "download_button": self.download_button,
+            "pause_button": self.pause_button,
             "clear_button": self.clear_button,
             "folder_button": self.folder_button,
             "overall_progress": self.overall_progress,
             "progress_label": self.progress_label,
             "queue_list": self.queue_list,
             "results_text": self.results_text,
+            "search_input": self.search_input,
+            "search_results": self.search_results,
             "tab_widget": self.tab_widget,
         }
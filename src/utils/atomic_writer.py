@@ -0,0 +1,264 @@
+"""
+Atomic file writes with configurable durability.
+
+Output files used to be written in place, so a crash left half-written
+captions, transcripts or thumbnails that looked valid. `AtomicWriter` writes to
+a temporary file next to the destination and renames it over the destination
+only once the content is complete: readers see either the old file or the whole
+new one.
+
+How much is spent on durability is set by the fsync policy:
+
+- "always": fsync every file before the rename and its folder after it.
+- "batch": renames happen immediately, and pending files and their folders
+  are fsynced together every `batch_size` files or `batch_interval` seconds,
+  and on `commit()`. This is a group commit, so small files do not cost one
+  disk sync each.
+- "none": leave flushing to the operating system.
+
+Media files whose size is known up front can be preallocated, which avoids
+fragmentation when many downloads grow in parallel.
+"""
+
+import errno
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, List, Optional, Set, Union
+
+FSYNC_POLICIES = ("always", "batch", "none")
+
+
+def _check_policy(fsync_policy: str) -> str:
+    """Validates an fsync policy name."""
+    if fsync_policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+    return fsync_policy
+
+
+class AtomicWriter:
+    """
+    Writes files via temp-file plus rename and fsyncs them per policy.
+    """
+
+    def __init__(
+        self,
+        fsync_policy: str = "batch",
+        batch_size: int = 32,
+        batch_interval: float = 1.0,
+    ):
+        """
+        Initializes the AtomicWriter.
+
+        Args:
+            fsync_policy: One of `FSYNC_POLICIES`.
+            batch_size: Files after which a "batch" group commit happens.
+            batch_interval: Maximum seconds between "batch" group commits.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        self.fsync_policy = _check_policy(fsync_policy)
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval
+        self._pending: List[Path] = []
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def open(
+        self,
+        path: Union[str, Path],
+        mode: str = "wb",
+        encoding: Optional[str] = None,
+        size: Optional[int] = None,
+        fsync_policy: Optional[str] = None,
+        temp_dir: Optional[Union[str, Path]] = None,
+    ) -> Iterator[IO[Any]]:
+        """
+        Opens a temporary file that replaces `path` when the block exits.
+
+        If the block raises, the temporary file is removed and `path` is left
+        untouched.
+
+        Args:
+            path: The destination file.
+            mode: "wb" or "w".
+            encoding: Text encoding for mode "w".
+            size: Expected size in bytes; the file is preallocated and
+                  truncated to the bytes actually written.
+            fsync_policy: Overrides the writer's policy for this file.
+            temp_dir: Folder for the temporary file, e.g. a scratch volume.
+                      The finished file is moved next to `path` first if it
+                      is on another filesystem.
+
+        Yields:
+            IO[Any]: The temporary file object.
+        """
+        path = Path(path)
+        policy = _check_policy(fsync_policy or self.fsync_policy)
+        temp_name = f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        temp_path = (
+            Path(temp_dir) / temp_name if temp_dir else path.with_name(temp_name)
+        )
+        try:
+            with open(temp_path, mode, encoding=encoding) as f:
+                if size:
+                    _preallocate(f, size)
+                yield f
+                f.flush()
+                if size:
+                    f.truncate(f.tell())
+                if policy == "always":
+                    os.fsync(f.fileno())
+            _move_into_place(temp_path, path, policy)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        if policy == "always":
+            _fsync_dir(path.parent)
+        elif policy == "batch":
+            self._add_pending(path)
+
+    def write_bytes(
+        self, path: Union[str, Path], data: bytes, fsync_policy: Optional[str] = None
+    ):
+        """Atomically replaces `path` with `data`."""
+        with self.open(path, "wb", fsync_policy=fsync_policy) as f:
+            f.write(data)
+
+    def write_text(
+        self,
+        path: Union[str, Path],
+        text: str,
+        encoding: str = "utf-8",
+        fsync_policy: Optional[str] = None,
+    ):
+        """Atomically replaces `path` with `text`."""
+        with self.open(path, "w", encoding, fsync_policy=fsync_policy) as f:
+            f.write(text)
+
+    def commit(self):
+        """Fsyncs every file written under the "batch" policy and its folder."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_commit = time.monotonic()
+        folders: Set[Path] = set()
+        for path in pending:
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                # Replaced or removed since; nothing left to make durable
+                continue
+            try:
+                os.fsync(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+            folders.add(path.parent)
+        for folder in folders:
+            _fsync_dir(folder)
+
+    def _add_pending(self, path: Path):
+        """Queues a file for the next group commit, committing when due."""
+        with self._lock:
+            self._pending.append(path)
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.batch_interval
+            )
+        if due:
+            self.commit()
+
+
+# Shared writer for callers outside a download batch, e.g. the settings
+# manager; each `ReelDownloader` holds its own with the batch's fsync policy
+default_writer = AtomicWriter()
+
+
+def atomic_open(
+    path: Union[str, Path],
+    mode: str = "wb",
+    encoding: Optional[str] = None,
+    size: Optional[int] = None,
+    fsync_policy: Optional[str] = None,
+    temp_dir: Optional[Union[str, Path]] = None,
+):
+    """Opens `path` for an atomic write with the shared writer."""
+    return default_writer.open(path, mode, encoding, size, fsync_policy, temp_dir)
+
+
+def atomic_write_bytes(
+    path: Union[str, Path], data: bytes, fsync_policy: Optional[str] = None
+):
+    """Atomically replaces `path` with `data` using the shared writer."""
+    default_writer.write_bytes(path, data, fsync_policy)
+
+
+def atomic_write_text(
+    path: Union[str, Path],
+    text: str,
+    encoding: str = "utf-8",
+    fsync_policy: Optional[str] = None,
+):
+    """Atomically replaces `path` with `text` using the shared writer."""
+    default_writer.write_text(path, text, encoding, fsync_policy)
+
+
+def _preallocate(f: IO[Any], size: int):
+    """Reserves disk blocks for a file, where the platform supports it."""
+    if not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except OSError:
+        # Not supported by every filesystem; the write works without it
+        pass
+
+
+def _move_into_place(temp_path: Path, path: Path, policy: str):
+    """Renames a finished file over `path`, copying it across filesystems."""
+    try:
+        os.replace(temp_path, path)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    local_path = path.with_name(temp_path.name)
+    try:
+        shutil.copyfile(temp_path, local_path)
+        if policy == "always":
+            with open(local_path, "rb") as f:
+                os.fsync(f.fileno())
+        os.replace(local_path, path)
+    except BaseException:
+        try:
+            os.remove(local_path)
+        except OSError:
+            pass
+        raise
+    os.remove(temp_path)
+
+
+def _fsync_dir(folder: Path):
+    """Makes a rename within a folder durable (a no-op on Windows)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -208,3 +208,11 @@ def ensure_ffmpeg(progress_callback=None):
     if not os.path.exists(ffmpeg_path) and is_frozen():
         return download_ffmpeg(progress_callback)
     return True
+
+
+def get_ffmpeg_path():
+    """Get the ffmpeg executable, preferring the bundled bin directory over PATH"""
+    bundled_path = os.path.join(get_bin_dir(), "ffmpeg.exe")
+    if os.path.exists(bundled_path):
+        return bundled_path
+    return shutil.which("ffmpeg")
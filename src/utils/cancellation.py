@@ -0,0 +1,333 @@
+"""
+Cooperative cancellation and pausing of in-flight work.
+
+`ReelDownloader.stop()` used to only clear a flag checked between reels, so a
+running download, a yt-dlp process or a Whisper call ran to completion before
+the thread noticed. A `CancellationToken` is handed down into that work
+instead: download loops check it between chunks, subprocesses are polled and
+terminated (then killed) once it is cancelled, and transcription checks it
+between windows. Blocking calls that cannot be interrupted, such as Whisper on
+a whole file, run in a helper thread that the caller stops waiting for.
+
+Such an abandoned call keeps using the CPU until it returns. Its `on_finish`
+callback runs only then, so a resource it holds (e.g. a transcription slot)
+is not handed to new work early, and at most `MAX_ABANDONED_CALLS` abandoned
+calls run at once: new calls wait until one of them finishes.
+
+Pausing blocks the same checks until the token is resumed, so partial state
+(a half-written temporary file, the windows of a transcript decoded so far) is
+kept rather than thrown away. Subprocesses are suspended where the platform
+supports it.
+
+`Cancelled` derives from `BaseException`, like `asyncio.CancelledError`, so
+the `except Exception` handlers that turn failures into engine fallbacks and
+failed jobs let it through; the interrupted reel is left unfinished.
+"""
+
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TypeVar
+
+# Seconds between checks of the token while waiting for a process or call
+POLL_INTERVAL = 0.05
+# Seconds a terminated process gets to exit before it is killed
+TERMINATE_GRACE = 0.5
+# Abandoned calls allowed to keep running in the background at once
+MAX_ABANDONED_CALLS = 2
+
+T = TypeVar("T")
+
+_abandoned_calls = 0
+_abandoned_cond = threading.Condition()
+
+
+class Cancelled(BaseException):
+    """Raised inside work whose cancellation token was cancelled."""
+
+
+class CancellationToken:
+    """
+    Shared flag telling in-flight work to stop or pause.
+
+    The owner calls `cancel`, `pause` and `resume`; the work calls `check` at
+    safe points, which blocks while paused and raises `Cancelled` once
+    cancelled.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        # Cleared while paused
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._callbacks: List[Callable[[], Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token was cancelled."""
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        """Whether the token is paused (and not cancelled)."""
+        return not self._resumed.is_set()
+
+    def cancel(self):
+        """Cancels the work, waking it if paused and running `on_cancel` callbacks."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks = list(self._callbacks)
+        self._resumed.set()
+        for callback in callbacks:
+            _run_callback(callback)
+
+    def pause(self):
+        """Makes `check` block until `resume` or `cancel` is called."""
+        if not self._cancelled.is_set():
+            self._resumed.clear()
+
+    def resume(self):
+        """Lets paused work continue."""
+        self._resumed.set()
+
+    def check(self):
+        """
+        Blocks while the token is paused.
+
+        Raises:
+            Cancelled: If the token is cancelled.
+        """
+        self._resumed.wait()
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleeps for up to `timeout` seconds, returning early once cancelled.
+
+        Returns:
+            bool: True if the token was cancelled.
+        """
+        return self._cancelled.wait(timeout)
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], Any]) -> Iterator[None]:
+        """
+        Calls `callback` if the token is cancelled during a `with` block, e.g.
+        to close a connection a blocked read is waiting on.
+
+        Args:
+            callback: Called from the cancelling thread; immediately if the
+                      token is already cancelled.
+        """
+        with self._lock:
+            already = self._cancelled.is_set()
+            if not already:
+                self._callbacks.append(callback)
+        if already:
+            _run_callback(callback)
+        try:
+            yield
+        finally:
+            with self._lock:
+                if callback in self._callbacks:
+                    self._callbacks.remove(callback)
+
+
+def run_process(
+    cmd: Sequence[str],
+    token: Optional[CancellationToken] = None,
+    check: bool = False,
+    capture_output: bool = False,
+    **popen_kwargs: Any,
+) -> subprocess.CompletedProcess:
+    """
+    Runs a command like `subprocess.run`, stopping it when the token is cancelled.
+
+    While the token is paused the process is suspended (SIGSTOP) where the
+    platform supports it; elsewhere it keeps running and the work pauses at
+    its next check.
+
+    Args:
+        cmd: The command and its arguments.
+        token: Optional token; once cancelled, the process is terminated and
+               killed if it does not exit within TERMINATE_GRACE seconds.
+        check: Raise CalledProcessError on a non-zero exit code.
+        capture_output: Capture stdout and stderr.
+        **popen_kwargs: Passed to `subprocess.Popen`, e.g. `text` or
+                        `startupinfo`.
+
+    Returns:
+        subprocess.CompletedProcess: The finished process.
+
+    Raises:
+        Cancelled: If the token was cancelled before the process finished.
+        subprocess.CalledProcessError: If `check` is set and the command failed.
+    """
+    if capture_output:
+        popen_kwargs["stdout"] = subprocess.PIPE
+        popen_kwargs["stderr"] = subprocess.PIPE
+    process = subprocess.Popen(cmd, **popen_kwargs)
+    suspended = False
+    try:
+        while True:
+            if token is not None and token.cancelled:
+                raise Cancelled()
+            try:
+                stdout, stderr = process.communicate(
+                    timeout=POLL_INTERVAL if token is not None else None
+                )
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if token.paused != suspended:
+                suspended = token.paused
+                _signal(process, "SIGSTOP" if suspended else "SIGCONT")
+    except BaseException:
+        _stop_process(process)
+        raise
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def call_cancellable(
+    fn: Callable[[], T],
+    token: Optional[CancellationToken],
+    on_finish: Optional[Callable[[], Any]] = None,
+) -> T:
+    """
+    Runs a blocking call that cannot be interrupted, returning as soon as the
+    token is cancelled. The call then finishes in the background and its
+    result is dropped.
+
+    While `MAX_ABANDONED_CALLS` abandoned calls are still running, the call
+    waits for one of them to finish before it starts.
+
+    Args:
+        fn: The call.
+        token: Optional token; without one `fn` runs in the calling thread.
+        on_finish: Called once `fn` has returned or raised, also when the
+                   caller stopped waiting, or right away if `fn` never
+                   starts; e.g. to release a slot the call holds.
+
+    Returns:
+        The call's result.
+
+    Raises:
+        Cancelled: If the token is cancelled before the call returns.
+    """
+    if token is None:
+        try:
+            return fn()
+        finally:
+            if on_finish:
+                _run_callback(on_finish)
+    try:
+        token.check()
+        _wait_for_abandoned_calls(token)
+    except BaseException:
+        if on_finish:
+            _run_callback(on_finish)
+        raise
+
+    outcome = {}
+    state = {"done": False, "abandoned": False}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def run():
+        try:
+            outcome["result"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            if on_finish:
+                _run_callback(on_finish)
+            with lock:
+                state["done"] = True
+                abandoned = state["abandoned"]
+            if abandoned:
+                _end_abandoned_call()
+            done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    while not done.wait(POLL_INTERVAL):
+        if token.cancelled:
+            with lock:
+                if not state["done"]:
+                    state["abandoned"] = True
+                    _start_abandoned_call()
+            raise Cancelled()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def abandoned_calls() -> int:
+    """Returns how many abandoned calls are still running in the background."""
+    with _abandoned_cond:
+        return _abandoned_calls
+
+
+def _wait_for_abandoned_calls(token: CancellationToken):
+    """Waits while the limit of abandoned calls is reached."""
+    with _abandoned_cond:
+        while _abandoned_calls >= MAX_ABANDONED_CALLS:
+            if token.cancelled:
+                raise Cancelled()
+            _abandoned_cond.wait(POLL_INTERVAL)
+
+
+def _start_abandoned_call():
+    """Counts a call its caller stopped waiting for."""
+    global _abandoned_calls
+    with _abandoned_cond:
+        _abandoned_calls += 1
+
+
+def _end_abandoned_call():
+    """Counts an abandoned call that finished and wakes waiting calls."""
+    global _abandoned_calls
+    with _abandoned_cond:
+        _abandoned_calls -= 1
+        _abandoned_cond.notify_all()
+
+
+def _stop_process(process: subprocess.Popen):
+    """Terminates a process, killing it if it does not exit in time."""
+    if process.poll() is not None:
+        return
+    # A stopped process only handles SIGTERM once continued
+    _signal(process, "SIGCONT")
+    try:
+        process.terminate()
+        process.wait(TERMINATE_GRACE)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    except OSError:
+        pass
+
+
+def _signal(process: subprocess.Popen, name: str):
+    """Sends a signal to a process if the platform has it."""
+    signum = getattr(signal, name, None)
+    if signum is None:
+        return
+    try:
+        process.send_signal(signum)
+    except OSError:
+        pass
+
+
+def _run_callback(callback: Callable[[], Any]):
+    """Runs an `on_cancel` callback, logging its errors."""
+    try:
+        callback()
+    except Exception as e:
+        print(f"Cancellation callback failed: {e}")
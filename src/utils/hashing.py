@@ -0,0 +1,60 @@
+import hashlib
+from pathlib import Path
+from typing import BinaryIO, Union
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_file(file_path: Union[str, Path]) -> str:
+    """
+    Computes the SHA-256 hex digest of a file.
+
+    Args:
+        file_path: The file to hash.
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class HashingWriter:
+    """
+    File wrapper that hashes everything written through it.
+
+    Used in download loops so the SHA-256 of a file is known as soon as the
+    last chunk is written, without reading the file back.
+    """
+
+    def __init__(self, file_obj: BinaryIO):
+        """
+        Initializes the HashingWriter.
+
+        Args:
+            file_obj: A binary file object opened for writing.
+        """
+        self.file_obj = file_obj
+        self.bytes_written = 0
+        self._digest = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        """
+        Writes data to the file and adds it to the running hash.
+
+        Args:
+            data: The bytes to write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        self._digest.update(data)
+        self.bytes_written += len(data)
+        return self.file_obj.write(data)
+
+    def hexdigest(self) -> str:
+        """Returns the SHA-256 hex digest of everything written so far."""
+        return self._digest.hexdigest()
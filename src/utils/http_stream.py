@@ -0,0 +1,231 @@
+"""
+Streaming of HTTP responses to files through a reusable buffer.
+
+Media used to be fetched either with `iter_content(chunk_size=8192)`, which
+costs a Python-level `write` and a fresh bytes object per 8 KB, or with
+`resp.content`, which holds whole responses in memory. `stream_response` reads
+into a preallocated per-thread buffer with `readinto` and writes memoryview
+slices of it, so chunks are not copied again on their way to the file. The
+chunk size starts small, which keeps streaming consumers responsive, and
+doubles while the connection keeps filling it.
+
+`fetch_to_file` combines this with the atomic writer and the streaming hash:
+the response is written to a temporary file (in the scratch space when one is
+configured; both default to the shared instances, and a download batch passes
+its own), checked against its Content-Length (and an optional verifier),
+and only then moved into place.
+
+Both take an optional `CancellationToken`, checked before every read: a
+paused download waits with its temporary file and connection open, and a
+cancelled one stops within a chunk. If the connection drops mid-body (e.g.
+during a long pause), `fetch_to_file` continues from the bytes it already has
+with a Range request instead of starting over.
+"""
+
+import threading
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from src.utils.atomic_writer import AtomicWriter, default_writer
+from src.utils.cancellation import CancellationToken, Cancelled
+from src.utils.hashing import HashingWriter
+from src.utils.lazy_imports import lazy_import_requests
+from src.utils.media_probe import InvalidMediaError
+from src.utils.scratch import ScratchSpace, default_scratch
+
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+# Range requests made to continue a body after its connection dropped
+MAX_RESUMES = 3
+
+_buffers = threading.local()
+
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of `fetch_to_file`.
+    """
+
+    size: int
+    sha256: str
+
+
+def stream_response(
+    response: Any,
+    write: Callable[[memoryview], Any],
+    chunk_callback: Optional[Callable[[bytes], None]] = None,
+    min_chunk_size: int = MIN_CHUNK_SIZE,
+    max_chunk_size: int = MAX_CHUNK_SIZE,
+    token: Optional[CancellationToken] = None,
+) -> int:
+    """
+    Copies the body of a streamed `requests` response to `write`.
+
+    Args:
+        response: A response fetched with `stream=True`.
+        write: Receives each chunk as a memoryview of the shared buffer. The
+               view is only valid until `write` returns.
+        chunk_callback: Optional function receiving a bytes copy of each chunk.
+        min_chunk_size: The first read size in bytes.
+        max_chunk_size: The largest read size in bytes.
+        token: Optional token checked before each read.
+
+    Returns:
+        int: The number of body bytes copied.
+
+    Raises:
+        Cancelled: If the token is cancelled, also when that interrupts a read.
+    """
+    raw = response.raw
+    raw.decode_content = True
+    view = _thread_buffer(max_chunk_size)
+    chunk_size = min(min_chunk_size, max_chunk_size)
+    total = 0
+    while True:
+        if token is not None:
+            token.check()
+        try:
+            read = raw.readinto(view[:chunk_size])
+        except Exception:
+            if token is not None and token.cancelled:
+                raise Cancelled()
+            raise
+        if not read:
+            if token is not None and token.cancelled:
+                # The connection was closed by the cancellation
+                raise Cancelled()
+            break
+        chunk = view[:read]
+        write(chunk)
+        if chunk_callback:
+            chunk_callback(bytes(chunk))
+        total += read
+        if read == chunk_size and chunk_size < max_chunk_size:
+            chunk_size = min(chunk_size * 2, max_chunk_size)
+    return total
+
+
+def fetch_to_file(
+    url: str,
+    path: Union[str, Path],
+    timeout: float = 30,
+    chunk_callback: Optional[Callable[[bytes], None]] = None,
+    verify: Optional[Callable[[str], Any]] = None,
+    token: Optional[CancellationToken] = None,
+    writer: Optional[AtomicWriter] = None,
+    scratch: Optional[ScratchSpace] = None,
+) -> FetchResult:
+    """
+    Downloads a URL to a file atomically, hashing it on the way.
+
+    Args:
+        url: The URL to fetch.
+        path: The destination file; it only appears once the download is
+              complete and verified.
+        timeout: Connect and read timeout in seconds.
+        chunk_callback: Optional function receiving each chunk as it arrives.
+        verify: Optional check of the finished temporary file, e.g.
+                `probe_mp4`; it raises to reject the download.
+        token: Optional token pausing or cancelling the download.
+        writer: The atomic writer to use, defaults to the shared one.
+        scratch: The scratch space for the temporary file, defaults to the
+                 shared one.
+
+    Returns:
+        FetchResult: The size and SHA-256 of the file.
+
+    Raises:
+        InvalidMediaError: If fewer bytes than the Content-Length arrive.
+        Cancelled: If the token is cancelled.
+    """
+    requests_module = lazy_import_requests()
+    with requests_module.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        # With a Content-Encoding, Content-Length counts the encoded bytes
+        expected = response.headers.get("Content-Length")
+        if response.headers.get("Content-Encoding") or not expected:
+            expected = None
+        size = int(expected) if expected else None
+
+        writer = writer or default_writer
+        with (scratch or default_scratch).temp_dir(size) as temp_dir:
+            with writer.open(path, "wb", size=size, temp_dir=temp_dir) as f:
+                hashing = HashingWriter(f)
+                _stream_resuming(
+                    requests_module,
+                    url,
+                    response,
+                    hashing,
+                    timeout,
+                    chunk_callback,
+                    token,
+                )
+                f.flush()
+                if size is not None and hashing.bytes_written != size:
+                    raise InvalidMediaError(
+                        f"Received {hashing.bytes_written} of {size} bytes"
+                    )
+                if verify:
+                    verify(f.name)
+    return FetchResult(size=hashing.bytes_written, sha256=hashing.hexdigest())
+
+
+def _stream_resuming(
+    requests_module: Any,
+    url: str,
+    response: Any,
+    writer: HashingWriter,
+    timeout: float,
+    chunk_callback: Optional[Callable[[bytes], None]],
+    token: Optional[CancellationToken],
+):
+    """
+    Streams a response body to `writer`, continuing it with Range requests
+    if the connection drops and the server supports byte ranges.
+    """
+    resumable = response.headers.get("Accept-Ranges") == "bytes" and not (
+        response.headers.get("Content-Encoding")
+    )
+    current = response
+    try:
+        for resumes in range(MAX_RESUMES + 1):
+            try:
+                with _close_on_cancel(current, token):
+                    stream_response(current, writer.write, chunk_callback, token=token)
+                return
+            except Exception:
+                if not resumable or resumes == MAX_RESUMES:
+                    raise
+            if current is not response:
+                current.close()
+            offset = writer.bytes_written
+            current = requests_module.get(
+                url,
+                stream=True,
+                timeout=timeout,
+                headers={"Range": f"bytes={offset}-"},
+            )
+            if current.status_code != 206:
+                raise InvalidMediaError(f"Cannot resume download at byte {offset}")
+    finally:
+        if current is not response:
+            current.close()
+
+
+def _close_on_cancel(response: Any, token: Optional[CancellationToken]):
+    """Closes a response when the token is cancelled, ending a blocked read."""
+    if token is None:
+        return nullcontext()
+    return token.on_cancel(response.close)
+
+
+def _thread_buffer(size: int) -> memoryview:
+    """Returns this thread's reusable buffer, growing it if needed."""
+    view = getattr(_buffers, "view", None)
+    if view is None or len(view) < size:
+        view = memoryview(bytearray(size))
+        _buffers.view = view
+    return view
@@ -16,6 +16,11 @@ _moviepy = None
 _whisper = None
 _requests = None
 _PIL = None
+_torch = None
+_numpy = None
+_pyarrow = None
+_zstandard = None
+_boto3 = None
 
 
 def lazy_import_requests():
@@ -136,3 +141,124 @@ def lazy_import_pil():
                 "Please install it using: pip install Pillow"
             ) from e
     return _PIL
+
+
+def lazy_import_torch():
+    """
+    Lazily imports the 'torch' library.
+
+    Raises:
+        ImportError: If the 'torch' package is not installed.
+
+    Returns:
+        module: The imported 'torch' module.
+    """
+    global _torch
+    if _torch is None:
+        try:
+            import torch
+
+            _torch = torch
+        except ImportError as e:
+            raise ImportError(
+                "The 'torch' package is required for transcription. "
+                "Please install it using: pip install torch"
+            ) from e
+    return _torch
+
+
+def lazy_import_numpy():
+    """
+    Lazily imports the 'numpy' library.
+
+    Raises:
+        ImportError: If the 'numpy' package is not installed.
+
+    Returns:
+        module: The imported 'numpy' module.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+
+            _numpy = numpy
+        except ImportError as e:
+            raise ImportError(
+                "The 'numpy' package is required for audio processing. "
+                "Please install it using: pip install numpy"
+            ) from e
+    return _numpy
+
+
+def lazy_import_pyarrow():
+    """
+    Lazily imports the 'pyarrow' library together with 'pyarrow.parquet'.
+
+    Raises:
+        ImportError: If the 'pyarrow' package is not installed.
+
+    Returns:
+        module: The imported 'pyarrow' module.
+    """
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet  # noqa: F401
+
+            _pyarrow = pyarrow
+        except ImportError as e:
+            raise ImportError(
+                "The 'pyarrow' package is required for Parquet export. "
+                "Please install it using: pip install pyarrow"
+            ) from e
+    return _pyarrow
+
+
+def lazy_import_zstandard():
+    """
+    Lazily imports the 'zstandard' library.
+
+    Raises:
+        ImportError: If the 'zstandard' package is not installed.
+
+    Returns:
+        module: The imported 'zstandard' module.
+    """
+    global _zstandard
+    if _zstandard is None:
+        try:
+            import zstandard
+
+            _zstandard = zstandard
+        except ImportError as e:
+            raise ImportError(
+                "The 'zstandard' package is required for zstd compression. "
+                "Please install it using: pip install zstandard"
+            ) from e
+    return _zstandard
+
+
+def lazy_import_boto3():
+    """
+    Lazily imports the 'boto3' library.
+
+    Raises:
+        ImportError: If the 'boto3' package is not installed.
+
+    Returns:
+        module: The imported 'boto3' module.
+    """
+    global _boto3
+    if _boto3 is None:
+        try:
+            import boto3
+
+            _boto3 = boto3
+        except ImportError as e:
+            raise ImportError(
+                "The 'boto3' package is required for uploading to object storage. "
+                "Please install it using: pip install boto3"
+            ) from e
+    return _boto3
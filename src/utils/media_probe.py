@@ -0,0 +1,127 @@
+"""
+Fast sanity checks of downloaded MP4 files.
+
+A truncated or corrupted video used to be noticed only when moviepy failed to
+open it during audio extraction. `probe_mp4` walks the top-level ISO-BMFF boxes
+instead of decoding anything: the file must start with an `ftyp` box, contain a
+`moov` box, and no box may extend past the end of the file. The duration is
+read from the `mvhd` box inside `moov`.
+"""
+
+import os
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Union
+
+# Largest moov box read into memory; real reels have moov boxes of a few KB
+_MAX_MOOV_SIZE = 64 * 1024 * 1024
+
+
+class InvalidMediaError(ValueError):
+    """Raised when a downloaded media file is truncated or not a valid MP4."""
+
+
+@dataclass
+class Mp4Info:
+    """
+    Summary of an MP4 file's structure.
+    """
+
+    major_brand: str
+    duration: float
+    boxes: List[str] = field(default_factory=list)
+
+
+def probe_mp4(file_path: Union[str, Path]) -> Mp4Info:
+    """
+    Checks the box structure of an MP4 file and reads its duration.
+
+    Args:
+        file_path: The MP4 file.
+
+    Returns:
+        Mp4Info: The major brand, duration in seconds and top-level box types.
+
+    Raises:
+        InvalidMediaError: If the file is truncated, has no `ftyp` or `moov`
+                           box, or reports no duration.
+    """
+    file_size = os.path.getsize(file_path)
+    boxes: List[str] = []
+    major_brand = ""
+    duration: Optional[float] = None
+    with open(file_path, "rb") as f:
+        offset = 0
+        while offset < file_size:
+            box_type, header_size, box_size = _read_box_header(f, offset, file_size)
+            if not boxes and box_type != "ftyp":
+                raise InvalidMediaError("File does not start with an ftyp box")
+            boxes.append(box_type)
+            if box_type == "ftyp":
+                major_brand = f.read(4).decode("latin-1")
+            elif box_type == "moov":
+                if box_size > _MAX_MOOV_SIZE:
+                    raise InvalidMediaError("moov box is implausibly large")
+                duration = _mvhd_duration(f.read(box_size - header_size))
+            offset += box_size
+
+    if "moov" not in boxes:
+        raise InvalidMediaError("No moov box; the download is incomplete")
+    if not duration or duration <= 0:
+        raise InvalidMediaError("The video reports no duration")
+    return Mp4Info(major_brand=major_brand, duration=duration, boxes=boxes)
+
+
+def _read_box_header(f: BinaryIO, offset: int, file_size: int):
+    """
+    Reads the box header at `offset`.
+
+    Returns:
+        Tuple[str, int, int]: The box type, header size and total box size.
+    """
+    f.seek(offset)
+    header = f.read(8)
+    if len(header) < 8:
+        raise InvalidMediaError(f"Truncated box header at offset {offset}")
+    box_size, raw_type = struct.unpack(">I4s", header)
+    header_size = 8
+    if box_size == 1:
+        large = f.read(8)
+        if len(large) < 8:
+            raise InvalidMediaError(f"Truncated box header at offset {offset}")
+        box_size = struct.unpack(">Q", large)[0]
+        header_size = 16
+    elif box_size == 0:
+        # The last box may extend to the end of the file
+        box_size = file_size - offset
+    if box_size < header_size:
+        raise InvalidMediaError(f"Invalid box size at offset {offset}")
+    if offset + box_size > file_size:
+        raise InvalidMediaError(
+            f"{raw_type.decode('latin-1')} box at offset {offset} extends past "
+            f"the end of the file ({offset + box_size} > {file_size} bytes)"
+        )
+    return raw_type.decode("latin-1"), header_size, box_size
+
+
+def _mvhd_duration(moov: bytes) -> Optional[float]:
+    """Returns the duration in seconds from the mvhd box inside a moov payload."""
+    offset = 0
+    while offset + 8 <= len(moov):
+        box_size, raw_type = struct.unpack_from(">I4s", moov, offset)
+        if box_size < 8:
+            return None
+        if raw_type == b"mvhd":
+            body = moov[offset + 8 : offset + box_size]
+            version = body[0] if body else 0
+            try:
+                if version == 1:
+                    timescale, duration = struct.unpack_from(">IQ", body, 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", body, 12)
+            except struct.error:
+                return None
+            return duration / timescale if timescale else None
+        offset += box_size
+    return None
@@ -0,0 +1,156 @@
+"""
+Scratch space for intermediate files.
+
+Partial downloads and temporary audio used to be written next to the final
+outputs, putting their random I/O on the output disk. `ScratchSpace` places
+intermediates in a separate directory (a tmpfs or any fast local volume)
+within a size budget; only final artifacts are moved to the output root. When
+an intermediate would exceed the budget, or the scratch volume runs short of
+space, it spills back to its normal location next to the output.
+
+Without a configured directory every intermediate stays next to its output,
+as before.
+"""
+
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+# Size assumed for an intermediate whose size is not known in advance
+DEFAULT_ESTIMATE = 32 * 1024 * 1024
+
+
+class ScratchSpace:
+    """
+    Hands out scratch locations within a size budget, spilling to disk.
+    """
+
+    def __init__(
+        self,
+        scratch_dir: Optional[Union[str, Path]] = None,
+        budget_bytes: int = 1024 * 1024 * 1024,
+    ):
+        """
+        Initializes the ScratchSpace.
+
+        Args:
+            scratch_dir: The directory for intermediates, or None to disable.
+            budget_bytes: Maximum bytes of intermediates held at once.
+        """
+        self.scratch_dir = Path(scratch_dir) if scratch_dir else None
+        self.budget_bytes = budget_bytes
+        self.spilled = 0
+        self._reserved = 0
+        self._files: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a scratch directory is configured."""
+        return self.scratch_dir is not None
+
+    @property
+    def reserved_bytes(self) -> int:
+        """Bytes currently reserved by intermediates in the scratch directory."""
+        return self._reserved
+
+    def reserve(self, size: Optional[int] = None) -> Optional[Path]:
+        """
+        Reserves room for an intermediate.
+
+        Args:
+            size: The expected size in bytes, if known.
+
+        Returns:
+            Optional[Path]: The scratch directory, or None if the intermediate
+            must spill to its normal location. Pass the same size to
+            `release` when done.
+        """
+        if self.scratch_dir is None:
+            return None
+        size = size or DEFAULT_ESTIMATE
+        with self._lock:
+            if self._reserved + size > self.budget_bytes or not self._has_room(size):
+                self.spilled += 1
+                return None
+            self._reserved += size
+        return self.scratch_dir
+
+    def release(self, size: Optional[int] = None):
+        """Returns a reservation made by `reserve`."""
+        with self._lock:
+            self._reserved = max(0, self._reserved - (size or DEFAULT_ESTIMATE))
+
+    @contextmanager
+    def temp_dir(self, size: Optional[int] = None) -> Iterator[Optional[Path]]:
+        """
+        Reserves room for the duration of a block.
+
+        Args:
+            size: The expected size in bytes, if known.
+
+        Yields:
+            Optional[Path]: The scratch directory, or None to spill.
+        """
+        directory = self.reserve(size)
+        try:
+            yield directory
+        finally:
+            if directory is not None:
+                self.release(size)
+
+    def allocate(
+        self, name: str, fallback_dir: Union[str, Path], size: Optional[int] = None
+    ) -> Path:
+        """
+        Returns a path for an intermediate file, to be passed to `free` later.
+
+        Args:
+            name: The file name.
+            fallback_dir: Where the file goes if it spills, normally next to
+                          the output it is produced for.
+            size: The expected size in bytes, if known.
+
+        Returns:
+            Path: The path in the scratch directory or in `fallback_dir`.
+        """
+        directory = self.reserve(size)
+        if directory is None:
+            return Path(fallback_dir) / name
+        # Names are only unique per reel folder; keep scratch files apart
+        path = directory / f"{os.getpid()}.{threading.get_ident()}.{name}"
+        with self._lock:
+            self._files[str(path)] = size or DEFAULT_ESTIMATE
+        return path
+
+    def free(self, path: Union[str, Path]):
+        """
+        Removes an intermediate file and returns its reservation.
+
+        Args:
+            path: A path returned by `allocate`.
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        with self._lock:
+            size = self._files.pop(str(path), None)
+        if size is not None:
+            self.release(size)
+
+    def _has_room(self, size: int) -> bool:
+        """Checks the scratch volume's free space. Must hold the lock."""
+        try:
+            self.scratch_dir.mkdir(parents=True, exist_ok=True)
+            return shutil.disk_usage(self.scratch_dir).free >= size
+        except OSError:
+            return False
+
+
+# Shared scratch space for callers outside a download batch; each
+# `ReelDownloader` holds its own, configured from its options
+default_scratch = ScratchSpace()
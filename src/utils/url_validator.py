@@ -1,3 +1,4 @@
+from typing import Optional
 from urllib.parse import urlparse
 
 
@@ -42,3 +43,27 @@ def is_valid_instagram_url(url: str) -> bool:
         return False
     except Exception:
         return False
+
+
+def extract_shortcode(url: str) -> Optional[str]:
+    """
+    Extracts the canonical shortcode from an Instagram Reel or Post URL.
+
+    `/reel/<code>` and `/p/<code>` URLs for the same media share a shortcode,
+    so it is used as the stable identity of a reel across sessions.
+
+    Args:
+        url (str): The Instagram URL.
+
+    Returns:
+        Optional[str]: The shortcode, or None if the URL has none.
+    """
+    try:
+        path = urlparse(url).path
+        for marker in ("/reel/", "/p/"):
+            if marker in path:
+                shortcode = path.split(marker, 1)[1].split("/")[0]
+                return shortcode or None
+        return None
+    except ValueError:
+        return None
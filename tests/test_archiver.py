@@ -0,0 +1,73 @@
+import json
+import shutil
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archiver import INDEX_MEMBER_NAME, SessionArchiver
+from src.core.pack_store import PackStore
+
+
+class TestSessionArchiver(unittest.TestCase):
+    """Tests for the SessionArchiver class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.reel_folder = self.base_dir / "session_20250101_120000" / "reel1"
+        self.reel_folder.mkdir(parents=True)
+        (self.reel_folder / "video1.mp4").write_bytes(b"video")
+        self.result = {
+            "video_path": str(self.reel_folder / "video1.mp4"),
+            "hashes": {"video": "abc"},
+            "title": "Reel",
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_tar_archive_with_index(self):
+        """Test that reels and the index end up in a finalized tar archive."""
+        archiver = SessionArchiver(self.base_dir / "session.tar")
+        archiver.add_reel("reel1", "url1", "Cxyz123", self.result)
+        path = archiver.close()
+
+        self.assertEqual(path, self.base_dir / "session.tar")
+        self.assertFalse((self.base_dir / "session.tar.part").exists())
+        with tarfile.open(path) as archive:
+            self.assertEqual(archive.extractfile("reel1/video1.mp4").read(), b"video")
+            index = json.load(archive.extractfile(INDEX_MEMBER_NAME))
+        files = index["reels"][0]["files"]
+        self.assertEqual(
+            files["video"], {"member": "reel1/video1.mp4", "size": 5, "sha256": "abc"}
+        )
+
+    def test_zip_archive_reads_packed_artifacts(self):
+        """Test that `pack://` artifacts are written from the pack store."""
+        store = PackStore(self.base_dir / "packs.sqlite3")
+        try:
+            packed = store.put("Cxyz123", "caption", "caption1.txt", b"hello")
+            self.result["caption_path"] = packed["uri"]
+            archiver = SessionArchiver(self.base_dir / "session.zip", "zip", store)
+            archiver.add_reel("reel1", "url1", "Cxyz123", self.result)
+            path = archiver.close()
+        finally:
+            store.close()
+
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.read("reel1/caption1.txt"), b"hello")
+            self.assertEqual(
+                archive.getinfo("reel1/video1.mp4").compress_type,
+                zipfile.ZIP_STORED,
+            )
+            self.assertIn(INDEX_MEMBER_NAME, archive.namelist())
+
+    def test_invalid_format(self):
+        """Test that an unknown format is rejected."""
+        with self.assertRaises(ValueError):
+            SessionArchiver(self.base_dir / "session.rar", "rar")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.utils.atomic_writer import AtomicWriter
+
+
+class TestAtomicWriter(unittest.TestCase):
+    """Tests for the AtomicWriter class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.path = self.base_dir / "caption1.txt"
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_failed_write_keeps_old_file(self):
+        """Test that an error inside the block leaves the destination untouched."""
+        self.path.write_text("old")
+        writer = AtomicWriter("none")
+        with self.assertRaises(RuntimeError):
+            with writer.open(self.path, "w", "utf-8") as f:
+                f.write("half")
+                raise RuntimeError("crash")
+        self.assertEqual(self.path.read_text(), "old")
+        self.assertEqual(os.listdir(self.base_dir), ["caption1.txt"])
+
+    def test_preallocated_file_is_truncated(self):
+        """Test that a file written short of its size hint has its real size."""
+        writer = AtomicWriter("none")
+        with writer.open(self.path, "wb", size=1024) as f:
+            f.write(b"abc")
+        self.assertEqual(self.path.read_bytes(), b"abc")
+
+    def test_batch_policy_groups_fsyncs(self):
+        """Test that "batch" syncs files together instead of one by one."""
+        writer = AtomicWriter("batch", batch_size=3, batch_interval=3600)
+        with patch("src.utils.atomic_writer.os.fsync") as fsync:
+            writer.write_text(self.base_dir / "a.txt", "a")
+            writer.write_text(self.base_dir / "b.txt", "b")
+            self.assertEqual(fsync.call_count, 0)
+            writer.write_text(self.base_dir / "c.txt", "c")
+            # Three files plus their shared folder
+            self.assertEqual(fsync.call_count, 4)
+
+    def test_always_policy_syncs_each_file(self):
+        """Test that "always" fsyncs the file and its folder on every write."""
+        writer = AtomicWriter("always")
+        with patch("src.utils.atomic_writer.os.fsync") as fsync:
+            writer.write_bytes(self.path, b"data")
+        self.assertEqual(fsync.call_count, 1 if os.name == "nt" else 2)
+
+    def test_invalid_policy(self):
+        """Test that an unknown policy is rejected."""
+        with self.assertRaises(ValueError):
+            AtomicWriter("sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
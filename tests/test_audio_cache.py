@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.core.audio_cache import AudioCache
+
+
+class TestAudioCache(unittest.TestCase):
+    """Tests for the AudioCache class."""
+
+    def setUp(self):
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self.cache = AudioCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_get_missing_entry(self):
+        """Test that a missing key is a cache miss."""
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_put_and_get_round_trip(self):
+        """Test that stored audio is returned as a memory map."""
+        audio = np.linspace(-1, 1, 1600, dtype=np.float32)
+        self.cache.put("abc", audio)
+
+        cached = self.cache.get("abc")
+        self.assertIsInstance(cached, np.memmap)
+        np.testing.assert_array_equal(cached, audio)
+
+    def test_get_or_create_calls_factory_once(self):
+        """Test that the factory only runs on a cache miss."""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return np.zeros(10, dtype=np.float32)
+
+        self.cache.get_or_create("abc", factory)
+        self.cache.get_or_create("abc", factory)
+        self.assertEqual(len(calls), 1)
+
+    def test_key_for_uses_file_hash(self):
+        """Test that identical files share a cache key."""
+        first = self.cache_dir / "a.mp4"
+        second = self.cache_dir / "b.mp4"
+        first.write_bytes(b"same content")
+        second.write_bytes(b"same content")
+        self.assertEqual(self.cache.key_for(first), self.cache.key_for(second))
+
+    def test_evicts_least_recently_used(self):
+        """Test that eviction removes the oldest entries first."""
+        audio = np.zeros(1000, dtype=np.float32)
+        self.cache.put("old", audio)
+        self.cache.put("new", audio)
+        old_entry = self.cache_dir / "old.audio.npy"
+        os.utime(old_entry, (0, 0))
+
+        self.cache.max_bytes = self.cache.size() - 1
+        self.cache.evict()
+
+        self.assertIsNone(self.cache.get("old"))
+        self.assertIsNotNone(self.cache.get("new"))
+
+
+if __name__ == "__main__":
+    unittest.main()
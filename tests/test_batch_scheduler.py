@@ -0,0 +1,163 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.data_models import ReelItem
+from src.core.batch_scheduler import BatchScheduler, FairPool, TokenBucket
+from src.core.downloader import ReelDownloader
+from src.core.live_queue import LiveQueue
+
+
+class TestFairPool(unittest.TestCase):
+    """Tests for the FairPool class."""
+
+    def _queue_request(self, pool, order, name, batch, cost, weight=1.0):
+        """Starts a thread waiting for the pool and returns once it is queued."""
+        waiting = len(pool._waiting)
+
+        def run():
+            if pool.acquire(batch, weight, cost):
+                order.append(name)
+                pool.release()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        while len(pool._waiting) == waiting:
+            time.sleep(0.01)
+        return thread
+
+    def test_backlog_does_not_starve_other_batch(self):
+        """Test that a batch queued later is served before another's backlog."""
+        pool = FairPool(slots=1, poll_interval=0.05)
+        self.assertTrue(pool.acquire(99))
+        order = []
+        threads = [
+            self._queue_request(pool, order, "a1", 1, 10),
+            self._queue_request(pool, order, "a2", 1, 10),
+            self._queue_request(pool, order, "a3", 1, 10),
+            self._queue_request(pool, order, "b1", 2, 10),
+        ]
+        pool.release()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, ["a1", "b1", "a2", "a3"])
+
+    def test_weight_scales_share(self):
+        """Test that a heavier batch's requests are tagged earlier."""
+        pool = FairPool(slots=1, poll_interval=0.05)
+        self.assertTrue(pool.acquire(99))
+        order = []
+        threads = [
+            self._queue_request(pool, order, "light", 1, 10),
+            self._queue_request(pool, order, "light2", 1, 10),
+            self._queue_request(pool, order, "heavy", 2, 10, weight=4),
+        ]
+        pool.release()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(order, ["heavy", "light", "light2"])
+
+    def test_cancelled_request_leaves_queue(self):
+        """Test that a request given up on does not block the ones behind it."""
+        pool = FairPool(slots=1, poll_interval=0.01)
+        self.assertTrue(pool.acquire(1))
+        self.assertFalse(pool.acquire(2, should_continue=lambda: False))
+        self.assertEqual(pool._waiting, [])
+        pool.release()
+        with pool.slot(3) as acquired:
+            self.assertTrue(acquired)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for the TokenBucket class."""
+
+    def test_paces_after_burst(self):
+        """Test that requests beyond the burst have to wait."""
+        bucket = TokenBucket(rate=0.5, burst=2)
+        self.assertTrue(bucket.take())
+        self.assertTrue(bucket.take())
+        self.assertFalse(bucket.take(should_continue=lambda: False))
+        self.assertTrue(TokenBucket(rate=0).take(should_continue=lambda: False))
+
+
+class TestConcurrentBatches(unittest.TestCase):
+    """Tests for batches sharing a BatchScheduler."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    @patch("src.core.downloader.ReelDownloader._download_with_instaloader")
+    def test_batches_share_one_worker(self, mock_download):
+        """Test that two batches never download at the same time with one worker."""
+        scheduler = BatchScheduler(max_workers=1)
+        active = []
+        overlaps = []
+        lock = threading.Lock()
+
+        def download(item, reel_number, options):
+            with lock:
+                active.append(item.url)
+                overlaps.append(len(active) > 1)
+            time.sleep(0.02)
+            with lock:
+                active.remove(item.url)
+            return {"folder_path": str(self.base_dir)}
+
+        mock_download.side_effect = download
+        downloaders = []
+        for batch in ("a", "b"):
+            queue = LiveQueue()
+            queue.put_many(
+                f"https://www.instagram.com/reel/{batch}{i}/" for i in range(3)
+            )
+            downloader = ReelDownloader(
+                [],
+                {"video": True, "dedupe": False},
+                live_queue=queue,
+                scheduler=scheduler,
+            )
+            downloader.batch_id = scheduler.register()
+            downloaders.append(downloader)
+
+        threads = [
+            threading.Thread(target=downloader._process_downloads)
+            for downloader in downloaders
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(mock_download.call_count, 6)
+        self.assertFalse(any(overlaps))
+        with downloaders[0]._transcription_slot(30) as granted:
+            self.assertTrue(granted)
+
+    @patch("src.core.downloader.yt_dlp_agent.download_reel")
+    def test_batches_keep_their_own_writer_and_scratch(self, mock_download):
+        """Test that one batch's fsync policy and scratch space do not reach another."""
+        durable = ReelDownloader(
+            [], {"fsync": "always", "scratch_dir": str(self.base_dir / "scratch")}
+        )
+        fast = ReelDownloader([], {"fsync": "none"})
+        self.assertEqual(durable.writer.fsync_policy, "always")
+        self.assertEqual(fast.writer.fsync_policy, "none")
+        self.assertTrue(durable.scratch.enabled)
+        self.assertFalse(fast.scratch.enabled)
+        self.assertIs(fast.audio_transcriber.writer, fast.writer)
+
+        fast.session_manager.resume_session_folder(self.base_dir)
+        fast._download_with_yt_dlp(ReelItem("https://www.instagram.com/reel/a/"), 1)
+        self.assertIs(mock_download.call_args[1]["writer"], fast.writer)
+        self.assertIs(mock_download.call_args[1]["scratch"], fast.scratch)
+
+
+if __name__ == "__main__":
+    unittest.main()
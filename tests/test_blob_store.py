@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.blob_store import (
+    BLOB_MODE,
+    WRITABLE_BLOB_MODE,
+    BlobStore,
+    link_or_copy,
+    remove_tree,
+)
+from src.utils.hashing import sha256_file
+
+
+class TestBlobStore(unittest.TestCase):
+    """Tests for the BlobStore class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.store = BlobStore(self.base_dir / ".blobs")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def _write(self, name: str, data: bytes) -> Path:
+        path = self.base_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        return path
+
+    def test_adopt_stores_new_content(self):
+        """Test that new content is stored under its digest."""
+        video = self._write("session_1/reel1/video1.mp4", b"video")
+        digest = sha256_file(video)
+        self.assertEqual(self.store.adopt(video, digest), "stored")
+        self.assertTrue(self.store.contains(digest))
+        self.assertEqual(self.store.blob_path(digest).read_bytes(), b"video")
+
+    def test_adopt_deduplicates_identical_files(self):
+        """Test that a second copy of the same content shares the stored blob."""
+        first = self._write("session_1/reel1/video1.mp4", b"video")
+        second = self._write("session_2/reel1/video1.mp4", b"video")
+        digest = sha256_file(first)
+        self.store.adopt(first, digest)
+        self.store.adopt(second, digest)
+        self.assertTrue(os.path.samefile(first, second))
+        self.assertEqual(second.read_bytes(), b"video")
+
+    def test_stored_blobs_are_read_only(self):
+        """Test that a blob and the session file linked to it are read-only."""
+        video = self._write("session_1/reel1/video1.mp4", b"video")
+        digest = sha256_file(video)
+        self.store.adopt(video, digest)
+        blob = self.store.blob_path(digest)
+        self.assertEqual(blob.stat().st_mode & 0o777, BLOB_MODE)
+        if os.path.samefile(blob, video):
+            self.assertEqual(video.stat().st_mode & 0o777, BLOB_MODE)
+
+        # Replacing the session file by rename leaves the blob intact
+        replacement = self._write("session_1/reel1/video1.mp4.tmp", b"edited")
+        os.replace(replacement, video)
+        self.assertEqual(blob.read_bytes(), b"video")
+
+        remove_tree(self.base_dir / "session_1")
+        self.assertFalse((self.base_dir / "session_1").exists())
+        self.assertTrue(blob.exists())
+
+    def test_writable_store_keeps_linked_files_writable(self):
+        """Test that read_only=False stores writable blobs and unlocks old ones."""
+        video = self._write("session_1/reel1/video1.mp4", b"video")
+        digest = sha256_file(video)
+        self.store.adopt(video, digest)
+        blob = self.store.blob_path(digest)
+
+        copy = self._write("session_2/reel1/video1.mp4", b"video")
+        BlobStore(self.base_dir / ".blobs", read_only=False).adopt(copy, digest)
+        self.assertEqual(blob.stat().st_mode & 0o777, WRITABLE_BLOB_MODE)
+        if os.path.samefile(blob, copy):
+            self.assertEqual(copy.stat().st_mode & 0o777, WRITABLE_BLOB_MODE)
+
+    def test_materialize_missing_blob(self):
+        """Test that materializing an unknown digest raises."""
+        with self.assertRaises(FileNotFoundError):
+            self.store.materialize("0" * 64, self.base_dir / "out.mp4")
+
+    def test_link_or_copy_falls_back_to_copy(self):
+        """Test the copy fallback when hardlinks and reflinks are unavailable."""
+        source = self._write("a.mp4", b"video")
+        destination = self.base_dir / "b.mp4"
+        with patch("os.link", side_effect=OSError("cross-device link")), patch(
+            "src.core.blob_store._reflink", return_value=False
+        ):
+            self.assertEqual(link_or_copy(source, destination), "copy")
+        self.assertEqual(destination.read_bytes(), b"video")
+        self.assertFalse(os.path.samefile(source, destination))
+
+
+if __name__ == "__main__":
+    unittest.main()
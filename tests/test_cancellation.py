@@ -0,0 +1,201 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.core.batch_scheduler import FairPool
+from src.core.transcriber import AudioTranscriber
+from src.utils.cancellation import (
+    CancellationToken,
+    Cancelled,
+    abandoned_calls,
+    call_cancellable,
+    run_process,
+)
+from src.utils.http_stream import fetch_to_file, stream_response
+
+
+class _FailingRaw(io.BytesIO):
+    """Response body whose connection drops after `fail_after` bytes."""
+
+    def __init__(self, data: bytes, fail_after: int):
+        super().__init__(data)
+        self.fail_after = fail_after
+        self.decode_content = False
+
+    def readinto(self, buffer) -> int:
+        if self.tell() >= self.fail_after:
+            raise ConnectionError("connection reset")
+        limit = self.fail_after - self.tell()
+        return super().readinto(memoryview(buffer)[:limit])
+
+
+def _response(raw, headers=None, status_code=200) -> MagicMock:
+    """Builds a streamed response reading from `raw`."""
+    response = MagicMock()
+    response.raw = raw
+    response.headers = headers if headers is not None else {}
+    response.status_code = status_code
+    response.__enter__.return_value = response
+    return response
+
+
+class TestCancellationToken(unittest.TestCase):
+    """Tests for the CancellationToken class."""
+
+    def test_pause_blocks_until_resume(self):
+        """Test that check waits while paused and raises once cancelled."""
+        token = CancellationToken()
+        token.pause()
+        passed = threading.Event()
+
+        def work():
+            token.check()
+            passed.set()
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        self.assertFalse(passed.wait(0.1))
+        token.resume()
+        self.assertTrue(passed.wait(1))
+        thread.join(1)
+
+        closed = []
+        with token.on_cancel(lambda: closed.append(True)):
+            token.pause()
+            token.cancel()
+        self.assertEqual(closed, [True])
+        self.assertFalse(token.paused)
+        with self.assertRaises(Cancelled):
+            token.check()
+
+    def test_run_process_is_stopped_quickly(self):
+        """Test that a running subprocess is terminated soon after cancel."""
+        token = CancellationToken()
+        threading.Timer(0.2, token.cancel).start()
+        start = time.monotonic()
+        with self.assertRaises(Cancelled):
+            run_process([sys.executable, "-c", "import time; time.sleep(30)"], token)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+        result = run_process(
+            [sys.executable, "-c", "print('ok')"],
+            CancellationToken(),
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.stdout.strip(), "ok")
+
+    def test_call_cancellable_returns_early(self):
+        """Test that waiting for a blocking call ends when the token is cancelled."""
+        token = CancellationToken()
+        self.assertEqual(call_cancellable(lambda: 42, token), 42)
+        release = threading.Event()
+        threading.Timer(0.1, token.cancel).start()
+        start = time.monotonic()
+        with self.assertRaises(Cancelled):
+            call_cancellable(lambda: release.wait(5), token)
+        self.assertLess(time.monotonic() - start, 1)
+        release.set()
+
+    def test_abandoned_call_finishes_before_release(self):
+        """Test that on_finish waits for an abandoned call and new calls are limited."""
+        running = abandoned_calls()
+        token = CancellationToken()
+        release = threading.Event()
+        finished = threading.Event()
+        threading.Timer(0.1, token.cancel).start()
+        with self.assertRaises(Cancelled):
+            call_cancellable(lambda: release.wait(5), token, on_finish=finished.set)
+        self.assertFalse(finished.is_set())
+        self.assertEqual(abandoned_calls(), running + 1)
+
+        with patch("src.utils.cancellation.MAX_ABANDONED_CALLS", running + 1):
+            other = CancellationToken()
+            started = []
+            threading.Timer(0.2, other.cancel).start()
+            with self.assertRaises(Cancelled):
+                call_cancellable(lambda: started.append(True), other)
+            self.assertEqual(started, [])
+
+        release.set()
+        self.assertTrue(finished.wait(1))
+        for _ in range(20):
+            if abandoned_calls() == running:
+                break
+            time.sleep(0.05)
+        self.assertEqual(abandoned_calls(), running)
+
+    def test_transcription_slot_held_by_abandoned_call(self):
+        """Test that a stopped Whisper call keeps its slot until it returns."""
+        pool = FairPool(slots=1, poll_interval=0.01)
+        token = CancellationToken()
+        transcriber = AudioTranscriber(
+            transcription_slot=lambda seconds: pool.slot(1, cost=seconds),
+            token=token,
+        )
+        release = threading.Event()
+        threading.Timer(0.1, token.cancel).start()
+        with self.assertRaises(Cancelled):
+            transcriber.call_in_slot(lambda: release.wait(5), 30)
+        self.assertFalse(pool.acquire(2, should_continue=lambda: False))
+
+        release.set()
+        self.assertTrue(pool.acquire(2))
+        pool.release()
+
+
+class TestCancellableStreams(unittest.TestCase):
+    """Tests for cancelling and resuming HTTP downloads."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.data = os.urandom(200 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_stream_response_stops_mid_body(self):
+        """Test that cancelling during a stream stops it before the end."""
+        token = CancellationToken()
+        out = bytearray()
+
+        def write(chunk):
+            out.extend(chunk)
+            token.cancel()
+
+        response = _response(io.BytesIO(self.data))
+        with self.assertRaises(Cancelled):
+            stream_response(
+                response, write, min_chunk_size=1024, max_chunk_size=1024, token=token
+            )
+        self.assertEqual(len(out), 1024)
+
+    def test_fetch_to_file_resumes_with_range(self):
+        """Test that a dropped connection is continued from the bytes received."""
+        headers = {"Content-Length": str(len(self.data)), "Accept-Ranges": "bytes"}
+        first = _response(_FailingRaw(self.data, 64 * 1024), headers)
+        rest = _response(io.BytesIO(self.data[64 * 1024 :]), status_code=206)
+        requests_module = MagicMock()
+        requests_module.get.side_effect = [first, rest]
+        path = self.base_dir / "video1.mp4"
+        with patch(
+            "src.utils.http_stream.lazy_import_requests", return_value=requests_module
+        ):
+            result = fetch_to_file("https://example.com/v.mp4", path)
+
+        self.assertEqual(path.read_bytes(), self.data)
+        self.assertEqual(result.size, len(self.data))
+        self.assertEqual(
+            requests_module.get.call_args[1]["headers"], {"Range": "bytes=65536-"}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import shutil
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core import cost_estimator
+from src.core.cost_estimator import CostEstimator
+from src.core.data_models import DEFAULT_DOWNLOAD_OPTIONS
+from src.core.download_index import DownloadIndex
+
+URL = "https://www.instagram.com/reel/AAA111/"
+# Every artifact off; tests switch on the ones they need
+NOTHING = {kind: False for kind in DEFAULT_DOWNLOAD_OPTIONS}
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    """Builds an ISO-BMFF box."""
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+class TestCostEstimator(unittest.TestCase):
+    """Tests for the CostEstimator class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.index = DownloadIndex(self.base_dir / "index.sqlite3")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_caption_only_is_cheaper_than_transcription(self):
+        """Test that requested stages drive the estimate."""
+        estimator = CostEstimator(self.index)
+        caption = estimator.estimate(URL, {**NOTHING, "caption": True})
+        transcribe = estimator.estimate(
+            URL, {**NOTHING, "video": True, "transcribe": True}
+        )
+        self.assertEqual(caption, cost_estimator.REQUEST_SECONDS)
+        self.assertGreater(transcribe, caption)
+
+    def test_uses_duration_of_video_on_disk(self):
+        """Test that a video already downloaded is not fetched again."""
+        video_path = self.base_dir / "video1.mp4"
+        # 60 second video: mvhd with timescale 1000 and duration 60000
+        mvhd = struct.pack(">B3xIIII", 0, 0, 0, 1000, 60000) + b"\0" * 80
+        video_path.write_bytes(
+            _box(b"ftyp", b"isom" + b"\0\0\2\0") + _box(b"moov", _box(b"mvhd", mvhd))
+        )
+        self.index.record("AAA111", URL, {"video_path": str(video_path)})
+
+        estimator = CostEstimator(self.index)
+        self.assertEqual(estimator.estimate(URL, {**NOTHING, "video": True}), 0.0)
+        self.assertAlmostEqual(
+            estimator.estimate(URL, {**NOTHING, "video": True, "transcribe": True}),
+            cost_estimator.REQUEST_SECONDS
+            + 60 * cost_estimator.TRANSCRIBE_SECONDS_PER_SECOND,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
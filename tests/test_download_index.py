@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.download_index import DownloadIndex, requested_kinds
+
+
+class TestDownloadIndex(unittest.TestCase):
+    """Tests for the DownloadIndex class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.index = DownloadIndex(self.base_dir / "index.sqlite3")
+        self.reel_folder = self.base_dir / "session_1" / "reel1"
+        self.reel_folder.mkdir(parents=True)
+        self.video_path = self.reel_folder / "video1.mp4"
+        self.video_path.write_bytes(b"video bytes")
+        self.caption_path = self.reel_folder / "caption1.txt"
+        self.caption_path.write_text("A caption", encoding="utf-8")
+        self.result = {
+            "folder_path": str(self.reel_folder),
+            "video_path": str(self.video_path),
+            "caption_path": str(self.caption_path),
+            "caption": "A caption",
+            "title": "Reel 1",
+        }
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_lookup_unknown_shortcode(self):
+        """Test that unknown shortcodes have no artifacts."""
+        self.assertEqual(self.index.lookup("missing"), {})
+
+    def test_record_and_lookup(self):
+        """Test that recorded artifacts are returned with size and hash."""
+        self.index.record(
+            "Cxyz123", "https://www.instagram.com/reel/Cxyz123/", self.result
+        )
+        artifacts = self.index.lookup("Cxyz123")
+        self.assertEqual(set(artifacts), {"video", "caption"})
+        self.assertEqual(artifacts["video"]["size"], len(b"video bytes"))
+        self.assertEqual(len(artifacts["video"]["sha256"]), 64)
+
+    def test_find_existing_builds_result(self):
+        """Test that existing artifacts are returned as a partial result."""
+        self.index.record(
+            "Cxyz123", "https://www.instagram.com/reel/Cxyz123/", self.result
+        )
+        existing = self.index.find_existing("Cxyz123", ["video", "caption", "audio"])
+        self.assertEqual(existing["video_path"], str(self.video_path))
+        self.assertEqual(existing["caption"], "A caption")
+        self.assertEqual(existing["title"], "Reel 1")
+        self.assertNotIn("audio_path", existing)
+
+    def test_find_existing_ignores_changed_files(self):
+        """Test that deleted or resized files are treated as missing."""
+        self.index.record(
+            "Cxyz123", "https://www.instagram.com/reel/Cxyz123/", self.result
+        )
+        self.video_path.write_bytes(b"truncated")
+        self.caption_path.unlink()
+        self.assertEqual(self.index.find_existing("Cxyz123", ["video", "caption"]), {})
+
+    def test_requested_kinds(self):
+        """Test that disabled artifact options are left out."""
+        options = {
+            "video": True,
+            "audio": False,
+            "transcribe": True,
+            "downloader": "yt-dlp",
+        }
+        self.assertEqual(
+            requested_kinds(options), ["video", "thumbnail", "caption", "transcribe"]
+        )
+
+    def test_requested_kinds_defaults(self):
+        """Test that missing options use the same defaults as the agents."""
+        self.assertEqual(
+            requested_kinds({}), ["video", "thumbnail", "audio", "caption"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
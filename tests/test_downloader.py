@@ -1,6 +1,9 @@
 import os
+import shutil
 import sys
+import tempfile
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
@@ -114,6 +117,40 @@ class TestReelDownloader(unittest.TestCase):
         mock_instaloader_download.assert_called_once()
         mock_yt_dlp_download.assert_called_once()
 
+    def test_audio_cache_is_opt_in(self):
+        """Test that decoded audio is only cached when a budget is configured."""
+        self.assertIsNone(self.downloader.audio_transcriber.audio_cache)
+        cached = ReelDownloader(self.reel_items, {"audio_cache_mb": 64})
+        self.assertEqual(
+            cached.audio_transcriber.audio_cache.max_bytes, 64 * 1024 * 1024
+        )
+
+    def test_thumbnail_is_hashed_while_streamed(self):
+        """Test that the streamed thumbnail digest is reused by deduplication."""
+        folder = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+
+        def fetch(url, path, **kwargs):
+            Path(path).write_bytes(b"jpeg")
+            return SimpleNamespace(sha256="digest")
+
+        result = {}
+        post = SimpleNamespace(thumbnail_url="https://example.com/thumb.jpg")
+        with patch("src.agents.instaloader.fetch_to_file", side_effect=fetch):
+            instaloader_agent._download_thumbnail(
+                post, folder, 1, result, {"thumbnail": True}, MagicMock()
+            )
+        self.assertEqual(result["hashes"], {"thumbnail": "digest"})
+
+        with patch.object(self.downloader, "_blob_store_for") as blob_store_for, patch(
+            "src.core.downloader.sha256_file"
+        ) as sha256_file:
+            self.downloader._deduplicate(result)
+        sha256_file.assert_not_called()
+        blob_store_for.return_value.adopt.assert_called_once_with(
+            result["thumbnail_path"], "digest"
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,93 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.exporter import SessionExporter
+from src.core.manifest import SessionManifest, build_entry
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestSessionExporter(unittest.TestCase):
+    """Tests for the SessionExporter class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+
+        session = self.base_dir / "session_20250101_120000"
+        reel_folder = session / "reel1"
+        reel_folder.mkdir(parents=True)
+        (reel_folder / "caption1.txt").write_text("hello", encoding="utf-8")
+        (reel_folder / "video1.mp4").write_bytes(b"video")
+        manifest = SessionManifest(session)
+        manifest.append(
+            build_entry(
+                "https://www.instagram.com/reel/abc/",
+                "abc",
+                "completed",
+                "Instaloader",
+                {
+                    "folder_path": str(reel_folder),
+                    "caption_path": str(reel_folder / "caption1.txt"),
+                    "video_path": str(reel_folder / "video1.mp4"),
+                },
+                {"download": 1.5},
+            )
+        )
+        manifest.close()
+
+        legacy_reel = self.base_dir / "session_20240101_120000" / "reel2"
+        legacy_reel.mkdir(parents=True)
+        (legacy_reel / "transcript2.txt").write_text("spoken", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_iter_rows_reads_manifest_and_legacy_sessions(self):
+        """Test that rows come from manifests and from legacy reel folders."""
+        rows = list(SessionExporter(self.base_dir).iter_rows())
+        self.assertEqual(len(rows), 2)
+
+        legacy, current = rows
+        self.assertEqual(legacy["reel_number"], 2)
+        self.assertEqual(legacy["transcript"], "spoken")
+        self.assertEqual(current["caption"], "hello")
+        self.assertEqual(current["video_size"], 5)
+        self.assertEqual(current["download_seconds"], 1.5)
+
+    def test_iter_batches_respects_row_group_size(self):
+        """Test that rows are grouped into batches of the configured size."""
+        exporter = SessionExporter(self.base_dir, row_group_size=1)
+        self.assertEqual([len(b) for b in exporter.iter_batches()], [1, 1])
+
+    def test_export_sqlite(self):
+        """Test that a SQLite export has one typed row per reel."""
+        output = self.base_dir / "reels.sqlite3"
+        self.assertEqual(SessionExporter(self.base_dir).export(output), 2)
+
+        connection = sqlite3.connect(str(output))
+        rows = connection.execute(
+            "SELECT shortcode, reel_number, typeof(video_size) FROM reels "
+            "ORDER BY reel_number"
+        ).fetchall()
+        connection.close()
+        self.assertEqual(rows, [("abc", 1, "integer"), (None, 2, "null")])
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_export_parquet(self):
+        """Test that a Parquet export can be read back."""
+        output = self.base_dir / "reels.parquet"
+        SessionExporter(self.base_dir, row_group_size=1).export(output)
+
+        parquet_file = pq.ParquetFile(str(output))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+        self.assertEqual(parquet_file.read().column("caption").to_pylist()[1], "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from src.utils.http_stream import fetch_to_file, stream_response
+from src.utils.media_probe import InvalidMediaError
+
+
+class _RecordingRaw(io.BytesIO):
+    """Response body recording the size of every read."""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.read_sizes = []
+        self.decode_content = False
+
+    def readinto(self, buffer) -> int:
+        self.read_sizes.append(len(buffer))
+        return super().readinto(buffer)
+
+
+def _response(data: bytes, headers=None) -> MagicMock:
+    """Builds a streamed response whose body is `data`."""
+    response = MagicMock()
+    response.raw = _RecordingRaw(data)
+    response.headers = headers if headers is not None else {}
+    response.__enter__.return_value = response
+    return response
+
+
+class TestHttpStream(unittest.TestCase):
+    """Tests for the streaming HTTP helpers."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.data = os.urandom(300 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_stream_response_grows_chunks(self):
+        """Test that reads double in size while the buffer keeps filling."""
+        response = _response(self.data)
+        out = bytearray()
+        chunks = []
+        total = stream_response(
+            response,
+            out.extend,
+            chunk_callback=chunks.append,
+            min_chunk_size=16 * 1024,
+            max_chunk_size=128 * 1024,
+        )
+        self.assertEqual(total, len(self.data))
+        self.assertEqual(bytes(out), self.data)
+        self.assertEqual(b"".join(chunks), self.data)
+        self.assertEqual(response.raw.read_sizes[:4], [16384, 32768, 65536, 131072])
+        self.assertTrue(response.raw.decode_content)
+
+    def test_fetch_to_file_hashes_and_checks_length(self):
+        """Test that the file is hashed and short bodies are rejected."""
+        requests_module = MagicMock()
+        requests_module.get.return_value = _response(
+            self.data, {"Content-Length": str(len(self.data))}
+        )
+        path = self.base_dir / "video1.mp4"
+        with patch(
+            "src.utils.http_stream.lazy_import_requests", return_value=requests_module
+        ):
+            result = fetch_to_file("https://example.com/v.mp4", path)
+            self.assertEqual(result.sha256, hashlib.sha256(self.data).hexdigest())
+            self.assertEqual(path.read_bytes(), self.data)
+
+            requests_module.get.return_value = _response(
+                self.data[:-1], {"Content-Length": str(len(self.data))}
+            )
+            with self.assertRaises(InvalidMediaError):
+                fetch_to_file("https://example.com/v.mp4", self.base_dir / "v2.mp4")
+        self.assertEqual(os.listdir(self.base_dir), ["video1.mp4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
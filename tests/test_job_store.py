@@ -0,0 +1,179 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.downloader import ReelDownloader
+from src.core.job_store import JobStore
+from src.core.session_manager import SessionManager
+
+URL_1 = "https://www.instagram.com/reel/AAA111/"
+URL_2 = "https://www.instagram.com/reel/BBB222/"
+
+
+class TestJobStore(unittest.TestCase):
+    """Tests for the JobStore class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.store = JobStore(self.base_dir / "jobs.sqlite3")
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_add_skips_queued_and_requeues_finished(self):
+        """Test that queued URLs are not duplicated and finished ones go to the back."""
+        first = self.store.add(URL_1)
+        self.store.add(URL_2)
+        self.assertIsNone(self.store.add(URL_1))
+
+        self.store.set_stage(first, "download", "done", {"video_path": "v.mp4"})
+        self.store.mark_completed(first)
+        requeued = self.store.add(URL_1)
+        self.assertGreater(requeued, first)
+        self.assertEqual(self.store.stages(requeued), {})
+        self.assertEqual([job.url for job in self.store.iter_jobs()], [URL_2, URL_1])
+
+    def test_iter_jobs_pages_and_sees_new_jobs(self):
+        """Test that paging yields every job, including ones added meanwhile."""
+        self.store.add_many(f"https://www.instagram.com/reel/C{i}/" for i in range(5))
+        seen = []
+        for job in self.store.iter_jobs(page_size=2):
+            seen.append(job.id)
+            if len(seen) == 1:
+                self.store.add(URL_1)
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_state_survives_reopen(self):
+        """Test that job and stage state are read back after a restart."""
+        job_id = self.store.add(URL_1)
+        self.store.mark_running(job_id, self.base_dir / "session", 3)
+        self.store.set_stage(job_id, "download", "done", {"title": "Reel"})
+        self.store.close()
+
+        self.store = JobStore(self.base_dir / "jobs.sqlite3")
+        job = self.store.get(URL_1)
+        self.assertEqual((job.status, job.reel_number), ("running", 3))
+        self.assertEqual(
+            self.store.stages(job_id)["download"],
+            {"state": "done", "detail": {"title": "Reel"}},
+        )
+        self.assertEqual(self.store.resumable_session(), str(self.base_dir / "session"))
+        self.assertEqual(self.store.next_reel_number(self.base_dir / "session"), 4)
+        self.assertEqual(self.store.counts()["running"], 1)
+
+    def test_migrates_databases_without_priority(self):
+        """Test that databases from before priority lanes gain the column."""
+        self.store.close()
+        db_path = self.base_dir / "old.sqlite3"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT "
+            "NOT NULL UNIQUE, status TEXT NOT NULL, session_folder TEXT, "
+            "reel_number INTEGER, error TEXT, created_at REAL NOT NULL, "
+            "updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO jobs (url, status, created_at, updated_at) "
+            "VALUES (?, 'pending', 0, 0)",
+            (URL_1,),
+        )
+        conn.commit()
+        conn.close()
+
+        self.store = JobStore(db_path)
+        self.assertEqual(self.store.get(URL_1).priority, "normal")
+        self.assertTrue(self.store.set_priority(URL_1, "high"))
+
+    def test_batches_read_only_their_jobs(self):
+        """Test that jobs are kept per batch and can be adopted by another."""
+        self.store.add(URL_1, batch="a")
+        self.store.add(URL_2, batch="b")
+        self.assertIsNone(self.store.add(URL_1, batch="b"))
+        self.assertEqual([job.url for job in self.store.iter_jobs(batch="b")], [URL_2])
+
+        self.assertEqual(self.store.adopt("c"), 2)
+        self.assertEqual(len(list(self.store.iter_jobs(batch="c"))), 2)
+        self.store.clear(batch="c")
+        self.assertEqual(self.store.counts()["pending"], 0)
+
+    def test_invalid_stage(self):
+        """Test that unknown stages are rejected."""
+        job_id = self.store.add(URL_1)
+        with self.assertRaises(ValueError):
+            self.store.set_stage(job_id, "upload", "done")
+
+
+class TestDownloaderResume(unittest.TestCase):
+    """Tests for resuming jobs in ReelDownloader."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.session_folder = self.base_dir / "session_1"
+        self.reel_folder = self.session_folder / "reel1"
+        self.reel_folder.mkdir(parents=True)
+        self.store = JobStore(self.base_dir / "jobs.sqlite3")
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def _downloader(self) -> ReelDownloader:
+        options = {"video": True, "transcribe": True, "dedupe": False}
+        downloader = ReelDownloader([], options, job_store=self.store)
+        # Keep reel placement inside the temporary directory
+        downloader.session_manager = SessionManager(self.base_dir)
+        downloader.session_manager.resume_session_folder(self.session_folder)
+        return downloader
+
+    @patch("src.core.downloader.ReelDownloader._download_with_instaloader")
+    def test_skips_completed_download_stage(self, mock_download):
+        """Test that a job interrupted during transcription only transcribes."""
+        video_path = self.reel_folder / "video1.mp4"
+        video_path.write_bytes(b"video")
+        job_id = self.store.add(URL_1)
+        self.store.mark_running(job_id, self.session_folder, 1)
+        self.store.set_stage(
+            job_id,
+            "download",
+            "done",
+            {"folder_path": str(self.reel_folder), "video_path": str(video_path)},
+        )
+
+        downloader = self._downloader()
+        with patch.object(
+            downloader, "_handle_transcription", return_value=True
+        ) as mock_transcription:
+            downloader._process_downloads()
+
+        mock_download.assert_not_called()
+        self.assertEqual(mock_transcription.call_args[0][1], 1)
+        self.assertEqual(self.store.get(URL_1).status, "completed")
+        self.assertEqual(self.store.stages(job_id)["transcribe"]["state"], "done")
+
+    @patch("src.core.downloader.ReelDownloader._download_with_instaloader")
+    def test_records_stages_of_new_jobs(self, mock_download):
+        """Test that a new job is numbered after earlier jobs and recorded."""
+        earlier = self.store.add(URL_1)
+        self.store.mark_running(earlier, self.session_folder, 1)
+        self.store.mark_completed(earlier)
+        job_id = self.store.add(URL_2)
+        mock_download.return_value = {"folder_path": str(self.reel_folder)}
+
+        downloader = self._downloader()
+        with patch.object(downloader, "_handle_transcription", return_value=False):
+            downloader._process_downloads()
+
+        self.assertEqual(mock_download.call_args[0][1], 2)
+        stages = self.store.stages(job_id)
+        self.assertEqual(stages["download"]["state"], "done")
+        self.assertEqual(stages["transcribe"]["state"], "failed")
+        self.assertEqual(self.store.get(URL_2).status, "completed")
+
+
+if __name__ == "__main__":
+    unittest.main()
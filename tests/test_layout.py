@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.layout import ShardedLayout
+
+
+class TestShardedLayout(unittest.TestCase):
+    """Tests for the ShardedLayout class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.layout = ShardedLayout(self.base_dir / "by-shortcode")
+        self.session_reel = self.base_dir / "session_20250101_120000" / "reel3"
+        self.session_reel.mkdir(parents=True)
+        (self.session_reel / "video3.mp4").write_bytes(b"video")
+        (self.session_reel / "caption3.txt").write_text("hello")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_reel_folder_is_sharded(self):
+        """Test that reel folders sit two hex shard levels below the root."""
+        folder = self.layout.reel_folder("Cxyz123")
+        self.assertEqual(folder, self.layout.reel_folder("Cxyz123"))
+        self.assertEqual(folder.name, "Cxyz123")
+        relative = folder.relative_to(self.layout.root)
+        self.assertEqual([len(part) for part in relative.parts[:2]], [2, 2])
+        self.assertIsNone(self.layout.locate("Cxyz123"))
+
+    def test_adopt_moves_files_to_canonical_names(self):
+        """Test that adopted files are moved and renamed."""
+        result = self.layout.adopt(
+            "Cxyz123",
+            {
+                "video_path": str(self.session_reel / "video3.mp4"),
+                "caption_path": str(self.session_reel / "caption3.txt"),
+                "caption": "hello",
+            },
+        )
+        folder = self.layout.locate("Cxyz123")
+        self.assertEqual(result["folder_path"], str(folder))
+        self.assertEqual(result["video_path"], str(folder / "video.mp4"))
+        self.assertEqual((folder / "caption.txt").read_text(), "hello")
+        self.assertEqual(list(self.session_reel.iterdir()), [])
+
+    def test_link_view_replaces_empty_session_folder(self):
+        """Test that the session reel folder becomes a link to the reel folder."""
+        self.layout.adopt(
+            "Cxyz123",
+            {
+                "video_path": str(self.session_reel / "video3.mp4"),
+                "caption_path": str(self.session_reel / "caption3.txt"),
+            },
+        )
+        self.assertTrue(self.layout.link_view(self.session_reel, "Cxyz123"))
+        self.assertTrue(self.session_reel.is_symlink())
+        self.assertEqual((self.session_reel / "video.mp4").read_bytes(), b"video")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.downloader import ReelDownloader
+from src.core.job_store import JobStore
+from src.core.live_queue import LiveQueue
+
+URLS = [f"https://www.instagram.com/reel/C{i}/" for i in range(4)]
+
+
+class TestLiveQueue(unittest.TestCase):
+    """Tests for the LiveQueue class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_cancel_and_reprioritize(self):
+        """Test that pending URLs can be cancelled and moved, but taken ones not."""
+        queue = LiveQueue()
+        queue.put_many(URLS)
+        self.assertFalse(queue.put(URLS[0]))
+
+        taken = queue.get()
+        self.assertFalse(queue.cancel(taken.url))
+        self.assertTrue(queue.cancel(URLS[1]))
+        self.assertTrue(queue.reprioritize(URLS[3], to_front=True))
+        self.assertEqual(queue.pending(), [URLS[3], URLS[2]])
+
+        queue.task_done(taken.url)
+        self.assertTrue(queue.put(taken.url))
+
+    def test_release_returns_unfinished_entry(self):
+        """Test that a reel not marked done goes back to the front."""
+        queue = LiveQueue()
+        queue.put_many(URLS[:2])
+        entry = queue.get()
+        queue.release(entry)
+        self.assertEqual(queue.pending(), URLS[:2])
+
+    def test_window_refills_from_store(self):
+        """Test that stored jobs are loaded a window at a time, in order."""
+        store = JobStore(self.base_dir / "jobs.sqlite3")
+        try:
+            store.add_many(URLS[:3])
+            queue = LiveQueue(store, window=2)
+            queue.put(URLS[3])
+            self.assertEqual(queue.pending(), [])
+
+            taken = []
+            while True:
+                entry = queue.get()
+                if entry is None:
+                    break
+                self.assertLessEqual(len(queue), 2)
+                taken.append(entry.url)
+                store.mark_completed(entry.job.id)
+                queue.task_done(entry.url)
+            self.assertEqual(taken, URLS)
+
+            self.assertFalse(queue.cancel(URLS[0]))
+            queue.put(URLS[0])
+            self.assertTrue(queue.cancel(URLS[0]))
+            self.assertIsNone(store.get(URLS[0]))
+        finally:
+            store.close()
+
+    def test_orders_by_lane_and_cost(self):
+        """Test that high lanes and cheap reels run first."""
+        costs = {URLS[0]: 600.0, URLS[1]: 5.0, URLS[2]: 5.0, URLS[3]: 5.0}
+        queue = LiveQueue(cost_estimator=costs.get)
+        queue.put_many(URLS[:3])
+        queue.put(URLS[3], priority="high")
+        queue.set_priority(URLS[2], "low")
+        self.assertEqual(queue.pending(), [URLS[3], URLS[1], URLS[0], URLS[2]])
+
+    def test_waiting_reels_age_ahead(self):
+        """Test that an expensive reel is not starved by later cheap ones."""
+        costs = {URLS[0]: 100.0, URLS[1]: 1.0, URLS[2]: 1.0}
+        queue = LiveQueue(cost_estimator=costs.get)
+        with patch("src.core.live_queue.time.monotonic", side_effect=[0, 50, 200]):
+            queue.put_many(URLS[:3])
+        self.assertEqual(queue.pending(), [URLS[1], URLS[0], URLS[2]])
+
+    def test_reestimate_does_not_block_puts(self):
+        """Test that URLs can be queued while pending costs are re-estimated."""
+        queue = LiveQueue()
+        queue.put_many(URLS[:2])
+        estimating = threading.Event()
+        release = threading.Event()
+        costs = {URLS[0]: 50.0, URLS[1]: 5.0}
+
+        def estimate(url):
+            if url in costs:
+                estimating.set()
+                release.wait(5)
+            return costs.get(url, 0.0)
+
+        thread = threading.Thread(target=queue.set_cost_estimator, args=(estimate,))
+        thread.start()
+        self.assertTrue(estimating.wait(5))
+        put = threading.Thread(target=queue.put, args=(URLS[2], "high"))
+        put.start()
+        put.join(1)
+        self.assertFalse(put.is_alive())
+        release.set()
+        thread.join(5)
+        self.assertEqual(queue.pending(), [URLS[2], URLS[1], URLS[0]])
+
+    def test_estimates_do_not_hold_the_lock(self):
+        """Test that puts and refills estimate costs without blocking the GUI."""
+        store = JobStore(self.base_dir / "jobs.sqlite3")
+        try:
+            store.add_many(URLS[:2])
+            estimating = threading.Event()
+            release = threading.Event()
+
+            def estimate(url):
+                if url != URLS[3]:
+                    estimating.set()
+                    release.wait(5)
+                return 1.0
+
+            queue = LiveQueue(store, cost_estimator=estimate)
+            taken = []
+            get = threading.Thread(target=lambda: taken.append(queue.get()))
+            get.start()
+            self.assertTrue(estimating.wait(5))
+
+            # The refill is estimating; the GUI can still cancel and move reels
+            done = threading.Event()
+
+            def edit():
+                queue.cancel(URLS[1])
+                queue.set_priority(URLS[0], "high")
+                done.set()
+
+            threading.Thread(target=edit).start()
+            self.assertTrue(done.wait(1))
+            release.set()
+            get.join(5)
+            self.assertEqual(taken[0].url, URLS[0])
+            self.assertEqual(taken[0].priority, "high")
+            self.assertEqual(queue.pending(), [])
+            self.assertIsNone(store.get(URLS[1]))
+        finally:
+            store.close()
+
+    def test_priority_is_stored(self):
+        """Test that a priority lane change reaches the job store."""
+        store = JobStore(self.base_dir / "jobs.sqlite3")
+        try:
+            queue = LiveQueue(store)
+            queue.put(URLS[0], priority="low")
+            self.assertTrue(queue.set_priority(URLS[0], "high"))
+            self.assertEqual(store.get(URLS[0]).priority, "high")
+            self.assertEqual(queue.get().priority, "high")
+        finally:
+            store.close()
+
+    @patch("src.core.downloader.ReelDownloader._download_with_instaloader")
+    def test_running_batch_picks_up_new_urls(self, mock_download):
+        """Test that a URL put while the batch runs is downloaded in it."""
+        queue = LiveQueue()
+        queue.put(URLS[0])
+        downloader = ReelDownloader(
+            [], {"video": True, "dedupe": False}, live_queue=queue
+        )
+
+        def download(item, reel_number, options):
+            if item.url == URLS[0]:
+                queue.put(URLS[1])
+            return {"folder_path": str(self.base_dir)}
+
+        mock_download.side_effect = download
+        downloader._process_downloads()
+
+        downloaded = [call[0][0].url for call in mock_download.call_args_list]
+        self.assertEqual(downloaded, URLS[:2])
+        self.assertEqual(mock_download.call_args[0][1], 2)
+        self.assertEqual(len(queue), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.manifest import (
+    MANIFEST_FILE_NAME,
+    SessionManifest,
+    build_entry,
+    build_upload_entry,
+    completed_entries,
+    entry_to_result,
+    read_manifest,
+)
+
+
+class TestSessionManifest(unittest.TestCase):
+    """Tests for the session manifest."""
+
+    def setUp(self):
+        self.session_folder = Path(tempfile.mkdtemp())
+        self.video_path = self.session_folder / "video1.mp4"
+        self.video_path.write_bytes(b"video")
+
+    def tearDown(self):
+        shutil.rmtree(self.session_folder, ignore_errors=True)
+
+    def test_append_and_read(self):
+        """Test that appended entries are read back in order."""
+        manifest = SessionManifest(self.session_folder)
+        manifest.append(build_entry("url1", "a", "completed", "yt-dlp"))
+        manifest.append(build_entry("url2", "b", "failed", error="boom"))
+        manifest.close()
+
+        entries = list(read_manifest(self.session_folder))
+        self.assertEqual([e["url"] for e in entries], ["url1", "url2"])
+        self.assertEqual(entries[1]["error"], "boom")
+        self.assertIn("recorded_at", entries[0])
+
+    def test_truncated_line_is_skipped(self):
+        """Test that a partially written last line does not break reading."""
+        manifest = SessionManifest(self.session_folder)
+        manifest.append(build_entry("url1", "a", "completed"))
+        manifest.close()
+        with open(self.session_folder / MANIFEST_FILE_NAME, "a") as f:
+            f.write('{"url": "url2", "sta')
+
+        self.assertEqual(len(list(read_manifest(self.session_folder))), 1)
+
+    def test_completed_entries_uses_latest_status(self):
+        """Test that only URLs whose latest entry is completed are returned."""
+        manifest = SessionManifest(self.session_folder)
+        manifest.append(build_entry("url1", "a", "failed", error="boom"))
+        manifest.append(build_entry("url1", "a", "completed"))
+        manifest.append(build_entry("url2", "b", "completed"))
+        manifest.append(build_entry("url2", "b", "failed", error="boom"))
+        manifest.close()
+
+        self.assertEqual(list(completed_entries(self.session_folder)), ["url1"])
+
+    def test_upload_entries_do_not_change_reel_status(self):
+        """Test that an upload entry after completion keeps the reel completed."""
+        manifest = SessionManifest(self.session_folder)
+        manifest.append(build_entry("url1", "a", "completed"))
+        manifest.append(
+            build_upload_entry("url1", "a", {"status": "upload_failed", "error": "x"})
+        )
+        manifest.close()
+
+        self.assertEqual(list(completed_entries(self.session_folder)), ["url1"])
+
+    def test_build_entry_files_round_trip(self):
+        """Test that file metadata is recorded and converted back to a result."""
+        result = {
+            "video_path": str(self.video_path),
+            "title": "Reel",
+            "hashes": {"video": "abc"},
+        }
+        entry = build_entry("url1", "a", "completed", "Instaloader", result)
+        self.assertEqual(
+            entry["files"]["video"],
+            {"path": str(self.video_path), "size": 5, "sha256": "abc"},
+        )
+        self.assertEqual(
+            entry_to_result(entry),
+            {
+                "video_path": str(self.video_path),
+                "title": "Reel",
+                "hashes": {"video": "abc"},
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
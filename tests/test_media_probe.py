@@ -0,0 +1,73 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from src.utils.media_probe import InvalidMediaError, probe_mp4
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    """Builds an ISO-BMFF box."""
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mvhd(timescale: int, duration: int, version: int = 0) -> bytes:
+    """Builds an mvhd box with the given timescale and duration."""
+    if version == 1:
+        body = struct.pack(">B3xQQIQ", 1, 0, 0, timescale, duration)
+    else:
+        body = struct.pack(">B3xIIII", 0, 0, 0, timescale, duration)
+    return _box(b"mvhd", body + b"\0" * 80)
+
+
+class TestProbeMp4(unittest.TestCase):
+    """Tests for probe_mp4."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".mp4")
+        os.close(fd)
+        self.ftyp = _box(b"ftyp", b"isom" + b"\0\0\2\0" + b"isomiso2")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _write(self, data: bytes):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_valid_file(self):
+        """Test that brand, duration and boxes are reported."""
+        moov = _box(b"moov", _mvhd(1000, 12500))
+        self._write(self.ftyp + moov + _box(b"mdat", b"\0" * 64))
+        info = probe_mp4(self.path)
+        self.assertEqual(info.major_brand, "isom")
+        self.assertEqual(info.duration, 12.5)
+        self.assertEqual(info.boxes, ["ftyp", "moov", "mdat"])
+
+    def test_version_1_mvhd(self):
+        """Test that 64-bit mvhd durations are read."""
+        self._write(self.ftyp + _box(b"moov", _mvhd(90000, 180000, version=1)))
+        self.assertEqual(probe_mp4(self.path).duration, 2.0)
+
+    def test_truncated_file(self):
+        """Test that a box extending past the end of the file is rejected."""
+        data = self.ftyp + _box(b"moov", _mvhd(1000, 1000)) + _box(b"mdat", b"\0" * 64)
+        self._write(data[:-10])
+        with self.assertRaises(InvalidMediaError):
+            probe_mp4(self.path)
+
+    def test_missing_moov(self):
+        """Test that a file without a moov box is rejected."""
+        self._write(self.ftyp + _box(b"mdat", b"\0" * 64))
+        with self.assertRaises(InvalidMediaError):
+            probe_mp4(self.path)
+
+    def test_not_an_mp4(self):
+        """Test that content without an ftyp box is rejected."""
+        self._write(b"<html>rate limited</html>")
+        with self.assertRaises(InvalidMediaError):
+            probe_mp4(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
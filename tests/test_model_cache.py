@@ -0,0 +1,102 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.model_cache import (
+    convert_checkpoint,
+    get_cache_path,
+    get_mmap_checkpoint,
+    is_cache_fresh,
+    load_mmap_checkpoint,
+)
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+class TestModelCache(unittest.TestCase):
+    """Tests for the memory-mapped checkpoint cache."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.model_file = self.base_dir / "tiny.pt"
+        self.cache_path = get_cache_path(self.model_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def _save_checkpoint(self, module):
+        """Saves a module in Whisper's checkpoint format."""
+        torch.save(
+            {"dims": {"n_state": 4}, "model_state_dict": module.state_dict()},
+            str(self.model_file),
+        )
+
+    def test_cache_without_record_is_stale(self):
+        """Test that a cache file whose source is not recorded is rebuilt."""
+        self.model_file.write_bytes(b"weights")
+        self.cache_path.parent.mkdir()
+        self.cache_path.write_bytes(b"converted")
+        self.assertFalse(is_cache_fresh(self.model_file, self.cache_path))
+
+    @unittest.skipIf(torch is None, "torch is not installed")
+    def test_build_converts_to_inference_dtype(self):
+        """Test that fp16 weights are stored as float32 and load by assignment."""
+        module = torch.nn.Linear(4, 2).half()
+        self._save_checkpoint(module)
+
+        checkpoint = load_mmap_checkpoint(self.model_file)
+        self.assertEqual(checkpoint["dims"], {"n_state": 4})
+        self.assertEqual(checkpoint["model_state_dict"]["weight"].dtype, torch.float32)
+
+        fresh = torch.nn.Linear(4, 2)
+        fresh.load_state_dict(checkpoint["model_state_dict"], assign=True)
+        self.assertEqual(fresh.weight.dtype, torch.float32)
+        self.assertTrue(torch.equal(fresh.weight, module.weight.float()))
+
+    @unittest.skipIf(torch is None, "torch is not installed")
+    def test_cache_reuse_and_invalidation(self):
+        """Test that a fresh cache is reused and a replaced source rebuilds it."""
+        self._save_checkpoint(torch.nn.Linear(4, 2))
+        get_mmap_checkpoint(self.model_file)
+        self.assertTrue(is_cache_fresh(self.model_file, self.cache_path))
+
+        with patch("src.core.model_cache.convert_checkpoint") as convert:
+            get_mmap_checkpoint(self.model_file)
+            convert.assert_not_called()
+
+        # A different checkpoint restored with an older mtime is still detected
+        stat = self.model_file.stat()
+        self._save_checkpoint(torch.nn.Linear(4, 3))
+        os.utime(self.model_file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+        self.assertFalse(is_cache_fresh(self.model_file, self.cache_path))
+
+        checkpoint = load_mmap_checkpoint(self.model_file)
+        self.assertEqual(tuple(checkpoint["model_state_dict"]["weight"].shape), (3, 4))
+        record = json.loads(
+            self.cache_path.with_name(self.cache_path.name + ".source.json").read_text()
+        )
+        self.assertEqual(record["size"], self.model_file.stat().st_size)
+        self.assertFalse(
+            is_cache_fresh(self.model_file, self.cache_path, dtype="float16")
+        )
+
+    @unittest.skipIf(torch is None, "torch is not installed")
+    def test_convert_leaves_no_temp_files(self):
+        """Test that conversion only leaves the cache and its source record."""
+        self._save_checkpoint(torch.nn.Linear(4, 2))
+        convert_checkpoint(self.model_file, self.cache_path)
+        self.assertEqual(
+            sorted(p.name for p in self.cache_path.parent.iterdir()),
+            ["tiny.mmap.pt", "tiny.mmap.pt.source.json"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.download_index import DownloadIndex
+from src.core.pack_store import PackStore, is_pack_uri, parse_pack_uri
+
+
+class TestPackStore(unittest.TestCase):
+    """Tests for the PackStore class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.store = PackStore(self.base_dir / "packs.sqlite3")
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_put_and_get_round_trip(self):
+        """Test that compressible and incompressible data are returned intact."""
+        text = ("hello world " * 100).encode("utf-8")
+        noise = bytes(range(256))
+        packed = self.store.put("abc", "caption", "caption1.txt", text)
+        self.store.put("abc", "thumbnail", "thumbnail1.jpg", noise)
+
+        self.assertEqual(self.store.get("abc", "caption"), text)
+        self.assertEqual(self.store.get("abc", "thumbnail"), noise)
+        self.assertEqual(self.store.get_uri(packed["uri"]), text)
+        self.assertIsNone(self.store.get("abc", "transcribe"))
+
+    def test_pack_uri(self):
+        """Test building and parsing pack URIs."""
+        uri = self.store.put("abc", "caption", "caption1.txt", b"x")["uri"]
+        self.assertTrue(is_pack_uri(uri))
+        self.assertFalse(is_pack_uri("downloads/reel1/caption1.txt"))
+        self.assertEqual(parse_pack_uri(uri), ("abc", "caption"))
+
+    def test_export_writes_original_names(self):
+        """Test that export recreates files under their shortcode."""
+        self.store.put("abc", "caption", "caption1.txt", b"hello")
+        self.store.put("def", "caption", "caption2.txt", b"other")
+
+        self.assertEqual(self.store.export(self.base_dir / "out", "abc"), 1)
+        self.assertEqual(
+            (self.base_dir / "out" / "abc" / "caption1.txt").read_bytes(), b"hello"
+        )
+
+    def test_download_index_resolves_packed_artifacts(self):
+        """Test that packed captions count as existing and keep their text."""
+        uri = self.store.put("abc", "caption", "caption1.txt", b"hello")["uri"]
+        index = DownloadIndex(self.base_dir / "index.sqlite3", self.store)
+        try:
+            index.record("abc", "url", {"caption_path": uri})
+            existing = index.find_existing("abc", ["caption"])
+        finally:
+            index.close()
+        self.assertEqual(existing["caption_path"], uri)
+        self.assertEqual(existing["caption"], "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
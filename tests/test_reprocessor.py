@@ -0,0 +1,159 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.layout import ShardedLayout
+from src.core.pack_store import PackStore
+from src.core.reprocessor import Reprocessor, MODEL_VERSION, main
+from src.core.search_index import SearchIndex
+
+
+class TestReprocessor(unittest.TestCase):
+    """Tests for the Reprocessor class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.reel_folder = self.base_dir / "session_20250101_120000" / "reel1"
+        self.reel_folder.mkdir(parents=True)
+        (self.reel_folder / "video1.mp4").write_bytes(b"video")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_scan_finds_missing_stages(self):
+        """Test that a reel with only a video needs audio and a transcript."""
+        tasks = Reprocessor(self.base_dir).scan()
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].reel_number, 1)
+        self.assertEqual(tasks[0].stages, ["audio", "transcribe"])
+
+    def test_scan_skips_complete_reels(self):
+        """Test that reels with all outputs are not scheduled."""
+        (self.reel_folder / "audio1.mp3").write_bytes(b"audio")
+        (self.reel_folder / "transcript1.txt").write_text("hello")
+        self.assertEqual(Reprocessor(self.base_dir).scan(), [])
+
+    def test_scan_redoes_stale_transcripts(self):
+        """Test that transcripts from another model version are redone."""
+        (self.reel_folder / "transcript1.txt").write_text("hello")
+        reprocessor = Reprocessor(self.base_dir, stages=["transcribe"], model="small")
+        reprocessor.index["session_20250101_120000/reel1"] = {
+            "stages": {"transcribe": MODEL_VERSION}
+        }
+        tasks = reprocessor.scan()
+        self.assertEqual(tasks[0].stages, ["transcribe"])
+
+    def test_rerun_uses_index(self):
+        """Test that a second run skips folders recorded as complete."""
+        with patch("src.core.reprocessor.instaloader_agent.extract_audio") as extract:
+            extract.return_value = True
+            summary = Reprocessor(self.base_dir, stages=["audio"]).run()
+        self.assertEqual(summary, {"scanned": 1, "processed": 1, "failed": 0})
+
+        with patch.object(Reprocessor, "_missing_stages") as missing_stages:
+            self.assertEqual(Reprocessor(self.base_dir, stages=["audio"]).scan(), [])
+            missing_stages.assert_not_called()
+
+    def test_sharded_and_packed_reels(self):
+        """Test that layout reels are found once and packed transcripts count."""
+        layout = ShardedLayout(self.base_dir / "by-shortcode")
+        folder = layout.reel_folder("C0abc")
+        folder.mkdir(parents=True)
+        (folder / "video.mp4").write_bytes(b"video")
+        layout.link_view(self.base_dir / "session_20250102_120000" / "reel1", "C0abc")
+        store = PackStore(self.base_dir / "packs.sqlite3")
+        store.put("C0abc", "transcribe", "transcript.txt", b"hello")
+        store.close()
+
+        with patch("src.core.reprocessor.instaloader_agent.extract_audio") as extract:
+            extract.side_effect = lambda video, audio: Path(audio).write_bytes(b"a")
+            tasks = Reprocessor(self.base_dir).scan()
+            self.assertEqual(
+                [task.stages for task in tasks], [["audio", "transcribe"], ["audio"]]
+            )
+            self.assertTrue(tasks[1].sharded)
+            summary = Reprocessor(self.base_dir, stages=["audio"]).run()
+        self.assertEqual(summary["processed"], 2)
+        self.assertTrue((folder / "audio.mp3").exists())
+
+    @patch("src.core.reprocessor.AudioTranscriber")
+    def test_new_transcripts_are_searchable(self, transcriber):
+        """Test that backfilled transcripts, plain and packed, are indexed."""
+        layout = ShardedLayout(self.base_dir / "by-shortcode")
+        folder = layout.reel_folder("C0abc")
+        folder.mkdir(parents=True)
+        (folder / "video.mp4").write_bytes(b"video")
+        layout.link_view(self.base_dir / "session_20250102_120000" / "reel1", "C0abc")
+        store = PackStore(self.base_dir / "packs.sqlite3")
+        store.put("C0abc", "transcribe", "transcript.txt", b"stale words")
+        store.close()
+
+        def transcribe(reel_folder, reel_number, result, *args):
+            path = reel_folder / f"transcript{reel_number}.txt"
+            path.write_text(f"spoken words {reel_folder.name}")
+            result.update(transcript=path.read_text(), transcript_path=str(path))
+
+        transcriber.return_value.transcribe_audio_from_reel.side_effect = transcribe
+        reprocessor = Reprocessor(self.base_dir, stages=["transcribe"], model="small")
+        reprocessor.index["session_20250102_120000/reel1"] = {
+            "stages": {"transcribe": MODEL_VERSION}
+        }
+        summary = reprocessor.run()
+        self.assertEqual(summary["processed"], 2)
+
+        index = SearchIndex(self.base_dir / "search.sqlite3")
+        try:
+            paths = sorted(hit["path"] for hit in index.search("spoken words"))
+        finally:
+            index.close()
+        self.assertEqual(
+            paths,
+            [str(self.reel_folder / "transcript1.txt"), "pack://C0abc/transcribe"],
+        )
+
+    def test_model_flag_selects_whisper_model(self):
+        """Test that --model picks the Whisper model and its version tag."""
+        with patch("src.core.reprocessor.Reprocessor") as reprocessor:
+            reprocessor.return_value.run.return_value = {
+                "scanned": 0,
+                "processed": 0,
+                "failed": 0,
+            }
+            self.assertEqual(main([str(self.base_dir), "--model", "small"]), 0)
+        self.assertEqual(reprocessor.call_args[1]["model"], "small")
+        self.assertEqual(
+            Reprocessor(self.base_dir, model="small").model_version, "whisper-small"
+        )
+
+    def test_output_roots_are_scanned(self):
+        """Test that reels on other output volumes are backfilled too."""
+        volume = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, volume, ignore_errors=True)
+        other = volume / "session_20250101_120000" / "reel2"
+        other.mkdir(parents=True)
+        (other / "video2.mp4").write_bytes(b"video")
+
+        with patch("src.core.reprocessor.instaloader_agent.extract_audio") as extract:
+            extract.side_effect = lambda video, audio: Path(audio).write_bytes(b"a")
+            reprocessor = Reprocessor(
+                self.base_dir, stages=["audio"], output_roots=[volume]
+            )
+            self.assertEqual(
+                [task.reel_folder for task in reprocessor.scan()],
+                [self.reel_folder, other],
+            )
+            summary = reprocessor.run()
+        self.assertEqual(summary["processed"], 2)
+        self.assertTrue((other / "audio2.mp3").exists())
+        self.assertIn(other.resolve().as_posix(), reprocessor.index)
+
+        with patch("src.core.reprocessor.Reprocessor") as mock_reprocessor:
+            mock_reprocessor.return_value.run.return_value = summary
+            main([str(self.base_dir), "--output-root", str(volume)])
+        self.assertEqual(mock_reprocessor.call_args[1]["output_roots"], [str(volume)])
+
+
+if __name__ == "__main__":
+    unittest.main()
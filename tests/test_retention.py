@@ -0,0 +1,241 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.blob_store import BlobStore
+from src.core.download_index import DownloadIndex
+from src.core.job_store import JobStore
+from src.core.layout import ShardedLayout
+from src.core.retention import (
+    DEFAULT_ESTIMATES,
+    DiskAdmission,
+    RetentionManager,
+    RetentionPolicy,
+    hold_session,
+    release_session,
+)
+from src.core.volumes import Volume
+from src.utils.hashing import sha256_file
+
+
+class TestDiskAdmission(unittest.TestCase):
+    """Tests for the DiskAdmission class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.volume = Volume(self.base_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_estimate_uses_history(self):
+        """Test that indexed sizes replace the defaults."""
+        video = self.base_dir / "video1.mp4"
+        video.write_bytes(b"x" * 1000)
+        index = DownloadIndex(self.base_dir / "index.sqlite3")
+        try:
+            index.record("abc", "url", {"video_path": str(video)})
+            admission = DiskAdmission(0, index)
+            options = {"thumbnail": False, "audio": False, "caption": False}
+            self.assertEqual(
+                admission.estimate({**options, "caption": True}),
+                1000 + DEFAULT_ESTIMATES["caption"],
+            )
+            self.assertEqual(admission.estimate(options, 5), 5)
+        finally:
+            index.close()
+
+    def test_estimate_reads_history_once(self):
+        """Test that averages are queried once and unset options use defaults."""
+        index = DownloadIndex(self.base_dir / "index.sqlite3")
+        try:
+            admission = DiskAdmission(0, index)
+            with patch.object(
+                index, "average_sizes", return_value={"video": 1000}
+            ) as average_sizes:
+                first = admission.estimate({})
+                self.assertEqual(admission.estimate({}), first)
+            average_sizes.assert_called_once()
+            self.assertEqual(
+                first,
+                1000
+                + DEFAULT_ESTIMATES["thumbnail"]
+                + DEFAULT_ESTIMATES["audio"]
+                + DEFAULT_ESTIMATES["caption"],
+            )
+        finally:
+            index.close()
+
+    def test_admit_reserves_space(self):
+        """Test that reservations count against free space."""
+        admission = DiskAdmission(min_free_bytes=100, poll_interval=0)
+        with patch.object(Volume, "free_bytes", return_value=1000):
+            self.assertTrue(admission.admit(self.volume, 800))
+            self.assertFalse(
+                admission.admit(self.volume, 800, should_continue=lambda: False)
+            )
+            admission.release(self.volume, 800)
+            self.assertTrue(admission.admit(self.volume, 800))
+
+
+class TestRetentionManager(unittest.TestCase):
+    """Tests for the RetentionManager class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.old = self._make_session("session_20200101_000000", b"o" * 1000)
+        self.new = self._make_session("session_20990101_000000", b"n" * 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def _make_session(self, name: str, data: bytes) -> Path:
+        reel_folder = self.base_dir / name / "reel1"
+        reel_folder.mkdir(parents=True)
+        video = reel_folder / "video1.mp4"
+        video.write_bytes(data)
+        past = time.time() - 86400
+        os.utime(video, (past, past))
+        return self.base_dir / name
+
+    def test_plan_by_age_keeps_latest(self):
+        """Test that old sessions are selected but the newest is kept."""
+        manager = RetentionManager(
+            self.base_dir, RetentionPolicy(max_age_days=30, keep_latest=1)
+        )
+        self.assertEqual([u.name for u in manager.plan()], [self.old.name])
+
+    def test_plan_by_size(self):
+        """Test that sessions are deleted until the total fits the budget."""
+        manager = RetentionManager(
+            self.base_dir, RetentionPolicy(max_total_bytes=1500, keep_latest=0)
+        )
+        self.assertEqual([u.name for u in manager.plan()], [self.old.name])
+        self.assertEqual(
+            [u.name for u in manager.plan(exclude=[self.old.name])], [self.new.name]
+        )
+
+    def test_apply_never_deletes_indexed_blobs(self):
+        """Test that blobs referenced by the index survive garbage collection."""
+        store = BlobStore(self.base_dir / ".blobs")
+        old_video = self.old / "reel1" / "video1.mp4"
+        new_video = self.new / "reel1" / "video1.mp4"
+        old_digest = sha256_file(old_video)
+        new_digest = sha256_file(new_video)
+        store.adopt(old_video, old_digest)
+        store.adopt(new_video, new_digest)
+
+        # Replace the new session's link by a plain copy, so only the index
+        # still refers to its blob
+        new_video.unlink()
+        new_video.write_bytes(b"n" * 1000)
+        index = DownloadIndex(self.base_dir / "index.sqlite3")
+        index.record("old", "url1", {"video_path": str(old_video)})
+        index.record("new", "url2", {"video_path": str(new_video)})
+        index.close()
+
+        summary = RetentionManager(
+            self.base_dir, RetentionPolicy(max_age_days=30)
+        ).apply()
+
+        self.assertEqual(summary["sessions"], 1)
+        self.assertFalse(self.old.exists())
+        self.assertFalse(store.contains(old_digest))
+        self.assertTrue(store.contains(new_digest))
+        self.assertEqual(summary["blobs"], 1)
+        self.assertEqual(summary["index_rows"], 1)
+
+    def test_sharded_reels_are_measured_and_freed_with_last_link(self):
+        """Test that layout reels count once and go with the last session linking them."""
+        layout = ShardedLayout(self.base_dir / "by-shortcode")
+        middle = self.base_dir / "session_20210101_000000"
+        for shortcode in ("AAA", "BBB"):
+            folder = layout.reel_folder(shortcode)
+            folder.mkdir(parents=True)
+            (folder / "video.mp4").write_bytes(b"r" * 4000)
+        layout.link_view(self.old / "reel2", "AAA")
+        layout.link_view(middle / "reel1", "AAA")
+        layout.link_view(middle / "reel2", "BBB")
+
+        manager = RetentionManager(
+            self.base_dir, RetentionPolicy(max_total_bytes=6000, keep_latest=1)
+        )
+        usage = {u.name: u for u in manager.sessions()}
+        self.assertEqual(usage[self.old.name].size, 1000)
+        self.assertEqual(sum(usage[middle.name].reels.values()), 8000)
+
+        summary = manager.apply()
+        self.assertEqual(summary["sessions"], 2)
+        self.assertEqual(summary["freed_bytes"], 9000)
+        self.assertIsNone(layout.locate("AAA"))
+        self.assertIsNone(layout.locate("BBB"))
+        self.assertEqual(list(layout.root.iterdir()), [])
+        self.assertTrue(self.new.exists())
+
+    def test_deduplicated_files_count_once(self):
+        """Test that a blob linked into several sessions counts once and is freed last."""
+        store = BlobStore(self.base_dir / ".blobs")
+        middle = self._make_session("session_20210101_000000", b"o" * 1000)
+        old_video = self.old / "reel1" / "video1.mp4"
+        middle_video = middle / "reel1" / "video1.mp4"
+        digest = sha256_file(old_video)
+        store.adopt(old_video, digest)
+        store.adopt(middle_video, digest)
+        if not os.path.samefile(old_video, middle_video):
+            self.skipTest("filesystem does not support hardlinks")
+        DownloadIndex(self.base_dir / "index.sqlite3").close()
+
+        manager = RetentionManager(
+            self.base_dir, RetentionPolicy(max_total_bytes=0, keep_latest=1)
+        )
+        usage = {u.name: u for u in manager.sessions()}
+        self.assertEqual(usage[self.old.name].size, 1000)
+        self.assertEqual(usage[middle.name].size, 1000)
+
+        plan = {u.name: u.freed for u in manager.plan()}
+        self.assertEqual(plan, {self.old.name: 0, middle.name: 1000})
+
+        summary = manager.apply()
+        self.assertEqual(summary["freed_bytes"], 1000)
+        self.assertFalse(store.contains(digest))
+
+    def test_audio_cache_budget(self):
+        """Test that the audio cache is trimmed to the policy budget, unless 0."""
+        with patch("src.core.retention.AudioCache") as audio_cache:
+            RetentionManager(
+                self.base_dir, RetentionPolicy(audio_cache_bytes=0)
+            ).apply()
+            audio_cache.assert_not_called()
+            RetentionManager(
+                self.base_dir, RetentionPolicy(audio_cache_bytes=1000)
+            ).apply()
+        audio_cache.assert_called_once_with(self.base_dir / ".audio_cache", 1000)
+        audio_cache.return_value.evict.assert_called_once()
+
+    def test_sessions_in_use_are_kept(self):
+        """Test that held sessions and sessions of unfinished jobs are not deleted."""
+        middle = self._make_session("session_20210101_000000", b"m" * 1000)
+        store = JobStore(self.base_dir / "jobs.sqlite3")
+        job_id = store.add("https://www.instagram.com/reel/AAA/")
+        store.mark_running(job_id, middle, 1)
+        store.close()
+        manager = RetentionManager(
+            self.base_dir, RetentionPolicy(max_total_bytes=0, keep_latest=0)
+        )
+
+        hold_session(self.old.name)
+        try:
+            self.assertEqual([u.name for u in manager.plan()], [self.new.name])
+        finally:
+            release_session(self.old.name)
+        self.assertEqual(
+            [u.name for u in manager.plan()], [self.old.name, self.new.name]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.utils.atomic_writer import AtomicWriter
+from src.utils.scratch import ScratchSpace
+
+
+class TestScratchSpace(unittest.TestCase):
+    """Tests for the ScratchSpace class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.scratch_dir = self.base_dir / "scratch"
+        self.output_dir = self.base_dir / "reel1"
+        self.output_dir.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_disabled_uses_fallback(self):
+        """Test that intermediates stay next to the output without a directory."""
+        scratch = ScratchSpace()
+        self.assertEqual(
+            scratch.allocate("temp_audio1.mp3", self.output_dir),
+            self.output_dir / "temp_audio1.mp3",
+        )
+
+    def test_spills_when_budget_is_exceeded(self):
+        """Test that intermediates spill to disk once the budget is used up."""
+        scratch = ScratchSpace(self.scratch_dir, budget_bytes=100)
+        first = scratch.allocate("a.mp3", self.output_dir, size=80)
+        second = scratch.allocate("b.mp3", self.output_dir, size=80)
+        self.assertEqual(first.parent, self.scratch_dir)
+        self.assertEqual(second, self.output_dir / "b.mp3")
+        self.assertEqual(scratch.spilled, 1)
+
+        first.write_bytes(b"x")
+        scratch.free(first)
+        self.assertFalse(first.exists())
+        self.assertEqual(scratch.reserved_bytes, 0)
+        self.assertEqual(scratch.reserve(80), self.scratch_dir)
+
+    def test_spills_when_volume_is_full(self):
+        """Test that a full scratch volume spills regardless of the budget."""
+        scratch = ScratchSpace(self.scratch_dir, budget_bytes=1000)
+        with patch("src.utils.scratch.shutil.disk_usage") as disk_usage:
+            disk_usage.return_value.free = 10
+            with scratch.temp_dir(100) as temp_dir:
+                self.assertIsNone(temp_dir)
+
+    def test_atomic_write_through_scratch(self):
+        """Test that only the finished file reaches the output folder."""
+        self.scratch_dir.mkdir()
+        writer = AtomicWriter("none")
+        destination = self.output_dir / "video1.mp4"
+        with writer.open(destination, "wb", temp_dir=self.scratch_dir) as f:
+            f.write(b"video")
+            self.assertEqual(Path(f.name).parent, self.scratch_dir)
+            self.assertFalse(destination.exists())
+        self.assertEqual(destination.read_bytes(), b"video")
+        self.assertEqual(list(self.scratch_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.core.search_index import SearchIndex
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Tests for the SearchIndex class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.reel_folder = self.base_dir / "session_20250101_120000" / "reel1"
+        self.reel_folder.mkdir(parents=True)
+        self.transcript = self.reel_folder / "transcript1.txt"
+        self.transcript.write_text("The quick brown fox jumps", encoding="utf-8")
+        (self.reel_folder / "caption1.txt").write_text("Sunset café", encoding="utf-8")
+        self.index = SearchIndex(self.base_dir / "search.sqlite3")
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_add_result_and_search(self):
+        """Test that a completed download's text can be found with its folder."""
+        self.index.add_result(
+            "https://www.instagram.com/reel/abc/",
+            "abc",
+            {
+                "folder_path": str(self.reel_folder),
+                "transcript_path": str(self.transcript),
+            },
+        )
+        matches = self.index.search("brown fox")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["shortcode"], "abc")
+        self.assertEqual(matches[0]["folder_path"], str(self.reel_folder))
+        self.assertIn("[brown]", matches[0]["snippet"])
+
+    def test_rebuild_is_incremental(self):
+        """Test that a rebuild only re-indexes new or changed files."""
+        self.assertEqual(self.index.rebuild(self.base_dir), 2)
+        self.assertEqual(self.index.rebuild(self.base_dir), 0)
+        self.assertEqual(self.index.search("cafe")[0]["kind"], "caption")
+
+    def test_rebuild_removes_deleted_files(self):
+        """Test that documents of deleted files disappear from results."""
+        self.index.rebuild(self.base_dir)
+        self.transcript.unlink()
+        self.index.rebuild(self.base_dir)
+        self.assertEqual(self.index.search("fox"), [])
+
+    def test_search_ignores_fts_syntax(self):
+        """Test that user input with FTS operators does not raise."""
+        self.index.rebuild(self.base_dir)
+        self.assertEqual(self.index.search('fox AND "NEAR('), [])
+        self.assertEqual(self.index.search("   "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
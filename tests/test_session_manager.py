@@ -25,6 +25,20 @@ class TestSessionManager(unittest.TestCase):
             # Cleanup
             os.rmdir(expected_path)
 
+    def test_setup_session_folder_same_second(self):
+        """Test that batches started in the same second get separate folders."""
+        with patch("src.core.session_manager.datetime") as mock_datetime:
+            mock_datetime.now.return_value.strftime.return_value = "20250101_123000"
+            first = self.session_manager.setup_session_folder()
+            second = SessionManager(self.base_dir).setup_session_folder()
+
+            self.assertEqual(second.name, "session_20250101_123000_2")
+            self.assertNotEqual(first, second)
+
+            # Cleanup
+            os.rmdir(first)
+            os.rmdir(second)
+
     def test_get_session_folder_before_setup(self):
         """Test getting session folder before setup returns None."""
         self.assertIsNone(self.session_manager.get_session_folder())
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, mock_open
 import json
+import os
+import tempfile
 from pathlib import Path
 from src.core.settings_manager import SettingsManager
 
@@ -30,18 +32,21 @@ class TestSettingsManager(unittest.TestCase):
             self.assertEqual(self.manager.settings, {})
 
     def test_save_settings(self):
-        """Test saving settings updates the file."""
+        """Test saving settings replaces the file atomically."""
         test_data = {"new_setting": "value"}
 
-        with patch("builtins.open", mock_open()) as mock_file:
-            self.manager.save_settings(test_data)
-            mock_file.assert_called_with(
-                Path(self.settings_file), "w", encoding="utf-8"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            settings_file = Path(temp_dir) / "settings.json"
+            settings_file.write_text('{"old": true}')
+            manager = SettingsManager(str(settings_file))
+            manager.save_settings(test_data)
+
+            self.assertEqual(
+                json.loads(settings_file.read_text(encoding="utf-8")),
+                {"old": True, **test_data},
             )
-            # Verify JSON was written correctly
-            handle = mock_file()
-            written_data = "".join(call[0][0] for call in handle.write.call_args_list)
-            self.assertEqual(json.loads(written_data), test_data)
+            # No temporary file is left behind
+            self.assertEqual(os.listdir(temp_dir), ["settings.json"])
 
     def test_get_setting(self):
         """Test retrieving a setting value."""
@@ -0,0 +1,206 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from src.core.data_models import ReelItem
+from src.core.downloader import ReelDownloader
+from src.core.transcriber import (
+    SAMPLE_RATE,
+    STREAM_QUEUE_WINDOWS,
+    AudioTranscriber,
+    TranscriptionStream,
+)
+from src.utils.atomic_writer import AtomicWriter
+
+# One second windows keep the fake PCM small
+WINDOW_SECONDS = 1
+
+
+class _FakeDecoder:
+    """Stands in for the ffmpeg process, emitting preset PCM on stdout."""
+
+    def __init__(self, pcm: bytes, returncode: int = 0):
+        self.stdin = io.BytesIO()
+        self.stdout = io.BytesIO(pcm)
+        self.returncode = returncode
+
+    def wait(self):
+        return self.returncode
+
+    def kill(self):
+        pass
+
+
+class _StubModel:
+    """Whisper stand-in returning one numbered segment per window."""
+
+    def __init__(self, fail_on=None, release=None):
+        self.calls = []
+        self.fail_on = fail_on
+        self.release = release
+
+    def transcribe(self, audio, initial_prompt=None):
+        self.calls.append((len(audio), initial_prompt))
+        if self.release is not None:
+            self.release.wait(5)
+        if len(self.calls) == self.fail_on:
+            raise RuntimeError("model failed")
+        text = f" window {len(self.calls)}."
+        return {"text": text, "segments": [{"start": 0.0, "text": text}]}
+
+
+def _pcm(seconds: float) -> bytes:
+    """Returns `seconds` of silent 16 kHz float32 PCM."""
+    return np.zeros(int(SAMPLE_RATE * seconds), dtype=np.float32).tobytes()
+
+
+@patch("src.core.transcriber.STREAM_WINDOW_SECONDS", WINDOW_SECONDS)
+class TestTranscriptionStream(unittest.TestCase):
+    """Tests for streaming transcription with a fake decoder and model."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def _stream(self, model, pcm: bytes, returncode: int = 0) -> TranscriptionStream:
+        with patch(
+            "src.core.transcriber.subprocess.Popen",
+            return_value=_FakeDecoder(pcm, returncode),
+        ):
+            return TranscriptionStream(
+                model, "ffmpeg", writer=AtomicWriter(fsync_policy="none")
+            )
+
+    def test_windows_are_transcribed_in_order(self):
+        """Test that each window is transcribed with the previous text as prompt."""
+        model = _StubModel()
+        stream = self._stream(model, _pcm(2.5))
+        stream.feed(b"video bytes")
+        result = {}
+
+        self.assertTrue(stream.finish(self.base_dir, 1, result))
+        self.assertEqual([n for n, _ in model.calls], [16000, 16000, 8000])
+        self.assertEqual(model.calls[1][1], " window 1.")
+        self.assertEqual(result["transcript"], "window 1. window 2. window 3.")
+        self.assertEqual(
+            (self.base_dir / "transcript1.txt").read_text(), result["transcript"]
+        )
+
+    def test_queue_is_bounded(self):
+        """Test that decoded windows wait for a slow model instead of piling up."""
+        release = threading.Event()
+        model = _StubModel(release=release)
+        stream = self._stream(model, _pcm(STREAM_QUEUE_WINDOWS + 6))
+        for _ in range(20):
+            if stream._windows.full():
+                break
+            threading.Event().wait(0.05)
+
+        self.assertTrue(stream._windows.full())
+        self.assertTrue(stream._reader.is_alive())
+        release.set()
+        self.assertTrue(stream.finish(self.base_dir, 1, {}))
+        self.assertEqual(len(model.calls), STREAM_QUEUE_WINDOWS + 6)
+
+    def test_failure_is_reported_by_finish(self):
+        """Test that a model error ends the stream and finish returns False."""
+        model = _StubModel(fail_on=2)
+        stream = self._stream(model, _pcm(STREAM_QUEUE_WINDOWS + 6))
+        result = {}
+
+        self.assertFalse(stream.finish(self.base_dir, 1, result))
+        self.assertEqual(len(model.calls), 2)
+        self.assertNotIn("transcript_path", result)
+        self.assertFalse((self.base_dir / "transcript1.txt").exists())
+
+    def test_decoder_error_is_reported_by_finish(self):
+        """Test that a non-zero ffmpeg exit makes finish return False."""
+        stream = self._stream(_StubModel(), _pcm(1), returncode=1)
+        self.assertFalse(stream.finish(self.base_dir, 1, {}))
+
+
+@patch("src.core.transcriber.STREAM_WINDOW_SECONDS", WINDOW_SECONDS)
+class TestStreamingFallback(unittest.TestCase):
+    """Tests for falling back to whole-file transcription."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.item = ReelItem("https://www.instagram.com/reel/Cxyz123/")
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    @patch("src.core.downloader.instaloader_agent.download_reel")
+    def test_failed_stream_falls_back_to_file(self, mock_download):
+        """Test that a failed stream leaves the reel to whole-file transcription."""
+        downloader = ReelDownloader([self.item], {"transcribe": True})
+        downloader.session_manager.resume_session_folder(self.base_dir)
+        transcriber = downloader.audio_transcriber
+        transcriber.whisper_model = _StubModel(fail_on=1)
+
+        def download(item, reel_number, folder, *args, chunk_callback=None, **kwargs):
+            chunk_callback(b"video bytes")
+            return {"folder_path": str(self.base_dir / "reel1")}
+
+        mock_download.side_effect = download
+        with patch(
+            "src.core.transcriber.subprocess.Popen",
+            return_value=_FakeDecoder(_pcm(2)),
+        ), patch("src.core.transcriber.get_ffmpeg_path", return_value="ffmpeg"):
+            result = downloader._download_with_instaloader(self.item, 1)
+        self.assertNotIn("transcript_path", result)
+
+        with patch.object(transcriber, "transcribe_audio_from_reel") as transcribe:
+            transcribe.side_effect = lambda folder, n, result, *args: result.update(
+                transcript_path=str(folder / f"transcript{n}.txt")
+            )
+            self.assertTrue(downloader._handle_transcription(result, 1, self.item))
+        transcribe.assert_called_once()
+
+
+class TestFileTranscription(unittest.TestCase):
+    """Tests for whole-file transcription."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    @patch.dict(os.environ, {"PATH": "/usr/bin"})
+    def test_uses_ffmpeg_found_on_any_platform(self):
+        """Test that the ffmpeg from get_ffmpeg_path is checked and put on PATH."""
+        audio = self.base_dir / "audio1.mp3"
+        audio.write_bytes(b"audio")
+        transcriber = AudioTranscriber(writer=AtomicWriter(fsync_policy="none"))
+        transcriber.whisper_model = _StubModel()
+        result = {"audio_path": str(audio)}
+
+        with patch(
+            "src.core.transcriber.get_ffmpeg_path", return_value="/opt/ffmpeg/ffmpeg"
+        ), patch(
+            "src.core.transcriber.subprocess.run",
+            return_value=subprocess.CompletedProcess([], 0, "", ""),
+        ) as run:
+            transcriber.transcribe_audio_from_reel(self.base_dir, 1, result)
+
+        self.assertEqual(run.call_args[0][0], ["/opt/ffmpeg/ffmpeg", "-version"])
+        self.assertEqual(
+            os.environ["PATH"].split(os.pathsep), ["/opt/ffmpeg", "/usr/bin"]
+        )
+        self.assertEqual(result["transcript"], " window 1.")
+        self.assertTrue((self.base_dir / "transcript1.txt").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
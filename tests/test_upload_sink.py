@@ -0,0 +1,134 @@
+import importlib.util
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.core.upload_sink import MIN_PART_SIZE, UploadSink
+
+HAS_MOTO = (
+    importlib.util.find_spec("moto") is not None
+    and importlib.util.find_spec("boto3") is not None
+)
+
+
+class _RecordingClient:
+    """Minimal in-memory S3 client recording multipart uploads."""
+
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+        self.aborted = []
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[Key] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key):
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self._lock:
+            self.parts.setdefault(UploadId, {})[PartNumber] = bytes(Body)
+        return {"ETag": f"etag{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        self.objects[Key] = b"".join(self.parts[UploadId][n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(Key)
+
+
+class TestUploadSink(unittest.TestCase):
+    """Tests for the UploadSink class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.video = self.base_dir / "video1.mp4"
+        self.video.write_bytes(b"v" * (2 * MIN_PART_SIZE + 10))
+        self.caption = self.base_dir / "caption1.txt"
+        self.caption.write_text("hello")
+        self.result = {
+            "video_path": str(self.video),
+            "caption_path": str(self.caption),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_multipart_upload_and_delete_local(self):
+        """Test that large files are sent in parts and local copies removed."""
+        client = _RecordingClient()
+        sink = UploadSink(
+            "bucket",
+            prefix="reels",
+            client=client,
+            part_size=MIN_PART_SIZE,
+            memory_budget=MIN_PART_SIZE,
+            delete_local=["video"],
+        )
+        status = sink.submit_reel("session_1/reel1", self.result).result()
+        sink.close()
+
+        self.assertEqual(status["status"], "uploaded")
+        self.assertEqual(len(client.parts["reels/session_1/reel1/video1.mp4"]), 3)
+        self.assertEqual(
+            len(client.objects["reels/session_1/reel1/video1.mp4"]),
+            2 * MIN_PART_SIZE + 10,
+        )
+        self.assertEqual(client.objects["reels/session_1/reel1/caption1.txt"], b"hello")
+        self.assertEqual(status["deleted"], ["video"])
+        self.assertFalse(self.video.exists())
+        self.assertTrue(self.caption.exists())
+
+    def test_failed_part_aborts_upload(self):
+        """Test that a failing part aborts the multipart upload."""
+        client = _RecordingClient()
+
+        def fail(**kwargs):
+            raise IOError("connection reset")
+
+        client.upload_part = fail
+        sink = UploadSink("bucket", client=client, delete_local=["video"])
+        sink.part_size = MIN_PART_SIZE
+        status = sink.submit_reel("reel1", self.result).result()
+        sink.close()
+
+        self.assertEqual(status["status"], "upload_failed")
+        self.assertEqual(client.aborted, ["reel1/video1.mp4"])
+        self.assertTrue(self.video.exists())
+
+    @unittest.skipUnless(HAS_MOTO, "moto and boto3 are not installed")
+    def test_upload_to_local_server(self):
+        """Test uploading to a local S3-compatible server."""
+        import boto3
+        from moto.server import ThreadedMotoServer
+
+        server = ThreadedMotoServer(port=0)
+        server.start()
+        try:
+            host, port = server.get_host_and_port()
+            endpoint_url = f"http://{host}:{port}"
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                region_name="us-east-1",
+                aws_access_key_id="test",
+                aws_secret_access_key="test",
+            )
+            client.create_bucket(Bucket="reels")
+            sink = UploadSink("reels", client=client, part_size=MIN_PART_SIZE)
+            status = sink.submit_reel("reel1", self.result).result()
+            sink.close()
+
+            self.assertEqual(status["status"], "uploaded")
+            body = client.get_object(Bucket="reels", Key="reel1/video1.mp4")["Body"]
+            self.assertEqual(len(body.read()), 2 * MIN_PART_SIZE + 10)
+        finally:
+            server.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.utils.url_validator import is_valid_instagram_url
+from src.utils.url_validator import is_valid_instagram_url, extract_shortcode
 
 
 class TestURLValidator(unittest.TestCase):
@@ -58,6 +58,18 @@ class TestURLValidator(unittest.TestCase):
         )  # Missing reel ID
         self.assertFalse(is_valid_instagram_url(""))  # Empty string
 
+    def test_extract_shortcode(self):
+        """Test that reel and post URLs share a canonical shortcode."""
+        self.assertEqual(
+            extract_shortcode("https://www.instagram.com/reel/Cxyz123/?igsh=abc"),
+            "Cxyz123",
+        )
+        self.assertEqual(
+            extract_shortcode("https://instagram.com/p/Cxyz123"), "Cxyz123"
+        )
+        self.assertIsNone(extract_shortcode("https://www.instagram.com/reel/"))
+        self.assertIsNone(extract_shortcode("https://www.instagram.com/explore/"))
+
 
 if __name__ == "__main__":
     unittest.main()
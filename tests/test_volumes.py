@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.session_manager import SessionManager
+from src.core.volumes import Volume, VolumeSet
+
+
+class TestVolumeSet(unittest.TestCase):
+    """Tests for the VolumeSet class."""
+
+    def setUp(self):
+        self.base_dir = Path(tempfile.mkdtemp())
+        self.roots = [self.base_dir / "a", self.base_dir / "b"]
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def test_round_robin(self):
+        """Test that volumes are used in turn."""
+        volumes = VolumeSet(self.roots, "round_robin")
+        names = [volumes.select().root.name for _ in range(3)]
+        self.assertEqual(names, ["a", "b", "a"])
+
+    def test_hash_is_stable(self):
+        """Test that the same key always lands on the same volume."""
+        volumes = VolumeSet(self.roots, "hash")
+        self.assertEqual(volumes.select("Cxyz123"), volumes.select("Cxyz123"))
+
+    def test_most_free(self):
+        """Test that the volume with the most free space is selected."""
+        volumes = VolumeSet(self.roots, "most_free")
+        free = {"a": 10, "b": 20}
+        with patch.object(Volume, "free_bytes", lambda volume: free[volume.root.name]):
+            self.assertEqual(volumes.select().root.name, "b")
+
+    def test_volume_for(self):
+        """Test mapping a path back to its volume."""
+        volumes = VolumeSet(self.roots)
+        self.assertEqual(
+            volumes.volume_for(self.roots[1] / "x" / "y.mp4").root.name, "b"
+        )
+        self.assertIsNone(volumes.volume_for(self.base_dir / "c" / "y.mp4"))
+
+    def test_record_write_tracks_throughput(self):
+        """Test that throughput is a moving average of write samples."""
+        volumes = VolumeSet(self.roots, smoothing=0.5)
+        volume = volumes.volumes[0]
+        volumes.record_write(volume, 100, 1.0)
+        volumes.record_write(volume, 300, 1.0)
+        self.assertEqual(volume.throughput_bps, 200)
+        self.assertEqual(volume.bytes_written, 400)
+
+    def test_invalid_policy(self):
+        """Test that an unknown policy is rejected."""
+        with self.assertRaises(ValueError):
+            VolumeSet(self.roots, "fastest")
+
+    def test_session_manager_place(self):
+        """Test that each volume gets a session folder with the session's name."""
+        manager = SessionManager(
+            str(self.base_dir / "downloads"), self.roots, "round_robin"
+        )
+        session_folder = manager.setup_session_folder()
+        folder, volume = manager.place()
+        self.assertEqual(folder, self.roots[0] / session_folder.name)
+        self.assertTrue(folder.is_dir())
+        self.assertIs(volume, manager.volumes.volumes[0])
+
+
+if __name__ == "__main__":
+    unittest.main()